@@ -0,0 +1,77 @@
+import sys
+import time
+
+from reahl.swordfish.gemstone.browser import GemstoneBrowserSession
+
+SYNTHETIC_METHOD_COUNT = 50000
+SYNTHETIC_CLASS_COUNT = 500
+
+
+class SyntheticCorpusBrowserSession(GemstoneBrowserSession):
+    def __init__(self, method_count):
+        super().__init__(None, require_gemstone_ast=False)
+        self.method_count = method_count
+
+    def query_scope_class_names(self, package_name, class_name):
+        return ["Synthetic%s" % index for index in range(SYNTHETIC_CLASS_COUNT)]
+
+    def method_source_rows_for_classes(
+        self,
+        class_names,
+        show_instance_side,
+        method_category,
+        skipped_classes=None,
+    ):
+        for method_index in range(self.method_count):
+            method_selector = "compute%s:" % method_index
+            yield {
+                "class_name": class_names[method_index % len(class_names)],
+                "method_selector": method_selector,
+                "method_category": "synthetic",
+                "source": self.synthetic_method_source(method_index),
+                "show_instance_side": show_instance_side,
+            }
+
+    def synthetic_method_source(self, method_index):
+        return (
+            "compute%s: anInput\n"
+            '    "synthetic method %s"\n'
+            "    | total |\n"
+            "    total := 0.\n"
+            "    anInput do: [:each |\n"
+            "        each isNil ifFalse: [total := total + (each * %s)]].\n"
+            "    ^total > 100\n"
+            "        ifTrue: [self report: total with: 'over %s']\n"
+            "        ifFalse: [total printString]"
+        ) % (method_index, method_index, method_index % 7, method_index)
+
+
+def timed_query(browser_session, parallel_workers):
+    started_at = time.perf_counter()
+    query_result = browser_session.query_methods_by_ast_pattern(
+        {"required_selectors": ["ifTrue:ifFalse:", "do:"]},
+        sort_by="send_count",
+        sort_descending=True,
+        parallel_workers=parallel_workers,
+    )
+    return query_result, time.perf_counter() - started_at
+
+
+def run_benchmark(parallel_workers):
+    browser_session = SyntheticCorpusBrowserSession(SYNTHETIC_METHOD_COUNT)
+    serial_result, serial_seconds = timed_query(browser_session, None)
+    parallel_result, parallel_seconds = timed_query(
+        SyntheticCorpusBrowserSession(SYNTHETIC_METHOD_COUNT),
+        parallel_workers,
+    )
+    if parallel_result != serial_result:
+        raise AssertionError("Parallel and serial AST queries disagree.")
+    print("methods scanned: %s" % serial_result["scanned_method_count"])
+    print("matches: %s" % serial_result["match_count"])
+    print("serial: %.2fs" % serial_seconds)
+    print("parallel (%s workers): %.2fs" % (parallel_workers, parallel_seconds))
+    print("speedup: %.1fx" % (serial_seconds / parallel_seconds))
+
+
+if __name__ == "__main__":
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 4)
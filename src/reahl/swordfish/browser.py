@@ -561,6 +561,217 @@ class CoveringTestsBrowseDialog(tk.Toplevel):
         )
 
 
+class TestRunProgressDialog(tk.Toplevel):
+    def __init__(self, browser_window, event_queue, test_case_class_names):
+        super().__init__(browser_window)
+        self.title('Test Run')
+        self.geometry('760x520')
+        self.transient(browser_window)
+
+        self.browser_window = browser_window
+        self.event_queue = event_queue
+        self.test_case_class_names = test_case_class_names
+        self.should_stop = threading.Event()
+        self.is_running = False
+        self.is_close_requested = False
+        self.test_results = []
+        self.test_count = None
+        self.run_summary = None
+
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(2, weight=1)
+
+        self.summary_label = ttk.Label(self, text='', justify='left')
+        self.summary_label.grid(
+            row=0,
+            column=0,
+            columnspan=2,
+            padx=10,
+            pady=(10, 6),
+            sticky='w',
+        )
+        self.progress_bar = ttk.Progressbar(self, mode='determinate', length=360)
+        self.progress_bar.grid(
+            row=1,
+            column=0,
+            columnspan=2,
+            sticky='ew',
+            padx=10,
+            pady=(0, 6),
+        )
+        self.results_listbox = tk.Listbox(self)
+        self.results_listbox.grid(
+            row=2,
+            column=0,
+            sticky='nsew',
+            padx=(10, 0),
+            pady=(0, 8),
+        )
+        self.scrollbar = ttk.Scrollbar(
+            self,
+            orient='vertical',
+            command=self.results_listbox.yview,
+        )
+        self.scrollbar.grid(row=2, column=1, sticky='ns', padx=(0, 10), pady=(0, 8))
+        self.results_listbox.configure(yscrollcommand=self.scrollbar.set)
+
+        self.buttons = ttk.Frame(self)
+        self.buttons.grid(row=3, column=0, columnspan=2, sticky='e', pady=(0, 10))
+        self.stop_button = ttk.Button(
+            self.buttons,
+            text='Stop',
+            command=self.request_stop,
+        )
+        self.stop_button.grid(row=0, column=0, padx=(0, 4))
+        self.close_button = ttk.Button(
+            self.buttons,
+            text='Close',
+            command=self.close_dialog,
+        )
+        self.close_button.grid(row=0, column=1, padx=(0, 10))
+        self.protocol('WM_DELETE_WINDOW', self.close_dialog)
+
+        self.event_queue.subscribe('TestResultReported', self.add_test_result)
+        self.event_queue.subscribe('TestRunFinished', self.finish_test_run)
+        self.run_tests()
+
+    @property
+    def gemstone_session_record(self):
+        return self.browser_window.gemstone_session_record
+
+    @property
+    def integrated_session_state(self):
+        return self.browser_window.application.integrated_session_state
+
+    def run_tests(self):
+        # AI: The tests run on the shared IDE session in a background thread, so
+        # the rest of the IDE and MCP clients of the IDE connection are kept off
+        # that session until the run has finished.
+        self.is_running = True
+        activity_message = 'Running tests in %s...' % ', '.join(
+            self.test_case_class_names
+        )
+        self.browser_window.application.begin_foreground_activity(activity_message)
+        self.integrated_session_state.begin_ide_operation(activity_message)
+        self.grab_set()
+        self.refresh_summary()
+
+        def report_test_result(test_result):
+            self.event_queue.publish(
+                'TestResultReported',
+                test_result=test_result,
+                origin=self,
+            )
+
+        def run_in_background():
+            run_summary = None
+            run_error = None
+            try:
+                run_summary = self.gemstone_session_record.run_tests_incrementally(
+                    self.test_case_class_names,
+                    should_stop=self.should_stop.is_set,
+                    on_test_result=report_test_result,
+                )
+            except (
+                DomainException,
+                GemstoneDomainException,
+                GemstoneError,
+            ) as error:
+                run_error = error
+            self.event_queue.publish(
+                'TestRunFinished',
+                run_summary=run_summary,
+                run_error=run_error,
+                origin=self,
+            )
+
+        test_run_thread = threading.Thread(target=run_in_background, daemon=True)
+        test_run_thread.start()
+
+    def format_test_result(self, test_result):
+        return '%s  %s  (%s ms)' % (
+            test_result['status'].upper(),
+            test_result['description'],
+            test_result['elapsed_ms'],
+        )
+
+    def add_test_result(self, test_result=None, origin=None):
+        if origin is not self or not self.winfo_exists():
+            return
+        self.test_results.append(test_result)
+        self.test_count = test_result['test_count']
+        self.results_listbox.insert(tk.END, self.format_test_result(test_result))
+        if test_result['status'] != 'passed':
+            self.results_listbox.itemconfigure(tk.END, foreground='red')
+        self.results_listbox.see(tk.END)
+        self.progress_bar.configure(
+            maximum=self.test_count,
+            value=len(self.test_results),
+        )
+        self.refresh_summary()
+
+    def finish_test_run(self, run_summary=None, run_error=None, origin=None):
+        if origin is not self:
+            return
+        self.is_running = False
+        self.integrated_session_state.end_ide_operation()
+        self.browser_window.application.end_foreground_activity()
+        if not self.winfo_exists():
+            return
+        self.grab_release()
+        if self.is_close_requested:
+            self.destroy()
+            return
+        self.run_summary = run_summary
+        self.stop_button.configure(state=tk.DISABLED)
+        self.refresh_summary()
+        if isinstance(run_error, GemstoneError):
+            self.browser_window.application.open_debugger(run_error)
+        elif run_error is not None:
+            messagebox.showerror('Run All Tests', str(run_error), parent=self)
+
+    def summary_text(self):
+        failed_count = len(
+            [
+                test_result
+                for test_result in self.test_results
+                if test_result['status'] != 'passed'
+            ]
+        )
+        progress_text = '%s of %s tests run, %s failed or errored.' % (
+            len(self.test_results),
+            '?' if self.test_count is None else self.test_count,
+            failed_count,
+        )
+        if self.is_running:
+            return 'Running... %s' % progress_text
+        if self.run_summary is None:
+            return 'Test run did not complete. %s' % progress_text
+        if self.run_summary['cancelled']:
+            return 'Stopped. %s' % progress_text
+        if self.run_summary['has_passed']:
+            return 'Passed. %s' % progress_text
+        return 'Finished. %s' % progress_text
+
+    def refresh_summary(self):
+        self.summary_label.configure(text=self.summary_text())
+
+    def request_stop(self):
+        self.should_stop.set()
+
+    def close_dialog(self):
+        self.should_stop.set()
+        if self.is_running:
+            self.is_close_requested = True
+            self.summary_label.configure(text='Stopping after the current test...')
+            return
+        self.destroy()
+
+    def destroy(self):
+        super().destroy()
+        self.event_queue.clear_subscribers(self)
+
+
 class FramedWidget(ttk.Frame):
     def __init__(self, parent, browser_window, event_queue, row, column, colspan=1):
         super().__init__(parent, borderwidth=2, relief='sunken')
@@ -959,30 +1170,31 @@ class ClassSelection(FramedWidget):
             self.synchronizing_hierarchy_selection = False
 
     def class_definition_map_for_classes(self, class_names):
+        try:
+            fetched_class_definitions = self.gemstone_session_record.gemstone_browser_session.get_class_definitions(
+                class_names,
+            )
+        except (GemstoneDomainException, GemstoneError):
+            fetched_class_definitions = {}
         class_definition_by_class_name = {}
-        classes_to_query = list(class_names)
-        while classes_to_query:
-            class_name = classes_to_query.pop()
+        superclass_names = [
+            class_definition['superclass_name']
+            for class_definition in fetched_class_definitions.values()
+            if class_definition['superclass_name'] is not None
+        ]
+        for class_name in (
+            list(class_names) + list(fetched_class_definitions) + superclass_names
+        ):
             if class_name not in class_definition_by_class_name:
                 class_definition = {
                     'class_name': class_name,
                     'superclass_name': None,
                     'package_name': '',
                 }
-                try:
-                    fetched_class_definition = self.gemstone_session_record.gemstone_browser_session.get_class_definition(
-                        class_name,
-                    )
-                    class_definition.update(fetched_class_definition)
-                except GemstoneDomainException:
-                    pass
-                superclass_name = class_definition.get('superclass_name')
+                class_definition.update(
+                    fetched_class_definitions.get(class_name, {})
+                )
                 class_definition_by_class_name[class_name] = class_definition
-                if (
-                    superclass_name is not None
-                    and superclass_name not in class_definition_by_class_name
-                ):
-                    classes_to_query.append(superclass_name)
         return class_definition_by_class_name
 
     def add_hierarchy_children(
@@ -1377,19 +1589,11 @@ class ClassSelection(FramedWidget):
         if not selection:
             return
         class_name = listbox.get(selection[0])
-        self.browser_window.application.begin_foreground_activity(
-            'Running tests in %s...' % class_name
+        self.test_run_dialog = TestRunProgressDialog(
+            self.browser_window,
+            self.event_queue,
+            [class_name],
         )
-        try:
-            try:
-                result = self.gemstone_session_record.run_gemstone_tests(class_name)
-                self.show_test_result(result)
-            except (DomainException, GemstoneDomainException) as domain_exception:
-                messagebox.showerror('Run All Tests', str(domain_exception))
-            except GemstoneError as error:
-                self.browser_window.application.open_debugger(error)
-        finally:
-            self.browser_window.application.end_foreground_activity()
 
 
 class CategorySelection(FramedWidget):
@@ -1641,13 +1845,13 @@ class MethodSelection(FramedWidget):
         if not selected_class or not selected_method_category:
             return method_selectors
         seen_selectors = set(method_selectors)
-        current_class_name = selected_class
         try:
-            class_definition = self.gemstone_session_record.gemstone_browser_session.get_class_definition(
-                current_class_name,
+            class_definitions = self.gemstone_session_record.gemstone_browser_session.get_class_definitions(
+                [selected_class],
             )
-        except GemstoneDomainException:
-            class_definition = {}
+        except (GemstoneDomainException, GemstoneError):
+            class_definitions = {}
+        class_definition = class_definitions.get(selected_class, {})
         current_class_name = class_definition.get('superclass_name')
         while current_class_name:
             inherited_selectors = list(
@@ -1666,12 +1870,7 @@ class MethodSelection(FramedWidget):
                 ] = current_class_name
                 seen_selectors.add(method_selector)
                 method_selectors.append(method_selector)
-            try:
-                class_definition = self.gemstone_session_record.gemstone_browser_session.get_class_definition(
-                    current_class_name,
-                )
-            except GemstoneDomainException:
-                class_definition = {}
+            class_definition = class_definitions.get(current_class_name, {})
             current_class_name = class_definition.get('superclass_name')
         return sorted(method_selectors)
 
@@ -1917,15 +2116,16 @@ class MethodSelection(FramedWidget):
 
     def superclass_chain_for_method_inheritance(self, class_name):
         superclass_chain = []
+        try:
+            class_definitions = self.gemstone_session_record.gemstone_browser_session.get_class_definitions(
+                [class_name],
+            )
+        except (GemstoneDomainException, GemstoneError):
+            class_definitions = {}
         current_class_name = class_name
         while current_class_name:
             superclass_chain.append(current_class_name)
-            try:
-                class_definition = self.gemstone_session_record.gemstone_browser_session.get_class_definition(
-                    current_class_name,
-                )
-            except GemstoneDomainException:
-                class_definition = {}
+            class_definition = class_definitions.get(current_class_name, {})
             current_class_name = class_definition.get('superclass_name')
         superclass_chain.reverse()
         return superclass_chain
@@ -874,6 +874,13 @@ class UmlClassDiagramTab(ttk.Frame):
                 messagebox.showerror("Class Diagram", str(error))
             return None
 
+    def ancestor_class_definitions_for(self, class_names):
+        browser_session = self.application.gemstone_session_record.gemstone_browser_session
+        try:
+            return browser_session.get_class_definitions(class_names)
+        except (GemstoneDomainException, GemstoneError):
+            return {}
+
     def add_class(self, class_name, record_history=True):
         class_definition = self.class_definition_for(class_name)
         if class_definition is None:
@@ -1104,11 +1111,12 @@ class UmlClassDiagramTab(ttk.Frame):
             return []
         class_names = []
         superclass_name = relationship.source_node.superclass_name
+        ancestor_definitions = self.ancestor_class_definitions_for(
+            [superclass_name] if superclass_name else []
+        )
         while superclass_name and superclass_name != relationship.target_node.class_name:
             class_names.append(superclass_name)
-            superclass_definition = self.class_definition_for(
-                superclass_name, show_errors=False
-            )
+            superclass_definition = ancestor_definitions.get(superclass_name)
             if superclass_definition is None:
                 superclass_name = None
             else:
@@ -1161,6 +1169,13 @@ class UmlClassDiagramTab(ttk.Frame):
         )
         for relationship in relationships_to_remove:
             self.uml_canvas.delete_relationship_items(relationship)
+        ancestor_definitions = self.ancestor_class_definitions_for(
+            [
+                node.superclass_name
+                for node in self.uml_canvas.registry.all_nodes()
+                if node.superclass_name
+            ]
+        )
         for node in self.uml_canvas.registry.all_nodes():
             superclass_name = node.superclass_name
             ancestor_distance = 1
@@ -1180,9 +1195,7 @@ class UmlClassDiagramTab(ttk.Frame):
                     )
                     found_visible_ancestor = True
                 if not found_visible_ancestor:
-                    superclass_definition = self.class_definition_for(
-                        superclass_name, show_errors=False
-                    )
+                    superclass_definition = ancestor_definitions.get(superclass_name)
                     if superclass_definition is None:
                         superclass_name = None
                     else:
@@ -6,7 +6,7 @@ from tkinter import ttk
 from reahl.ptongue import GemstoneError
 
 from reahl.swordfish.exceptions import DomainException
-from reahl.swordfish.gemstone import GemstoneDebugSession
+from reahl.swordfish.gemstone import GemstoneDebugSession, GemstoneStackFrameSnapshot
 from reahl.swordfish.gemstone.session import DomainException as GemstoneDomainException
 from reahl.swordfish.inspector import Explorer
 from reahl.swordfish.text_editing import (
@@ -899,7 +899,7 @@ class DebuggerWindow(ttk.PanedWindow):
         explorer = Explorer(
             self.explorer_frame,
             frame,
-            values=dict([('self', frame.self)] + list(frame.vars.items())),
+            values=self.explorer_values_for_frame(frame),
             root_tab_label='Context',
             external_inspect_action=self.application.open_inspector_for_object,
             graph_inspect_action=self.application.open_object_diagram_for_object,
@@ -907,6 +907,11 @@ class DebuggerWindow(ttk.PanedWindow):
         self.explorer = explorer
         explorer.grid(row=0, column=0, sticky='nsew')
 
+    def explorer_values_for_frame(self, frame):
+        if isinstance(frame, GemstoneStackFrameSnapshot):
+            return frame.context_variables()
+        return dict([('self', frame.self)] + list(frame.vars.items()))
+
     def on_listbox_select(self, event):
         frame = self.get_selected_stack_frame()
         if frame:
@@ -17,16 +17,21 @@ from reahl.swordfish.gemstone.debugging import (
     GemstoneCallStack,
     GemstoneDebugActionOutcome,
     GemstoneDebugSession,
+    GemstoneFrameVariables,
     GemstoneStackFrame,
+    GemstoneStackFrameSnapshot,
 )
+from reahl.swordfish.gemstone.inspection import GemstoneCollectionPages
 from reahl.swordfish.gemstone.session import (
     DomainException,
+    MethodsNotCompiled,
     abort_transaction,
     begin_transaction,
     close_session,
     commit_transaction,
     create_linked_session,
     create_rpc_session,
+    domain_error_payload,
     evaluate_source,
     gemstone_error_payload,
     session_summary,
@@ -36,15 +41,20 @@ __all__ = [
     "DomainException",
     "GemstoneBrowserSession",
     "GemstoneCallStack",
+    "GemstoneCollectionPages",
     "GemstoneDebugActionOutcome",
     "GemstoneDebugSession",
+    "GemstoneFrameVariables",
     "GemstoneStackFrame",
+    "GemstoneStackFrameSnapshot",
+    "MethodsNotCompiled",
     "abort_transaction",
     "begin_transaction",
     "close_session",
     "commit_transaction",
     "create_linked_session",
     "create_rpc_session",
+    "domain_error_payload",
     "evaluate_source",
     "find_classes",
     "find_implementors",
@@ -1,3 +1,7 @@
+import collections
+import concurrent.futures
+import copy
+import multiprocessing
 import os
 import re
 import time
@@ -12,33 +16,74 @@ from reahl.swordfish.gemstone.breakpoint_registry import (
     record_breakpoint_for_session,
     remove_breakpoint_for_session,
 )
-from reahl.swordfish.gemstone.session import DomainException, render_result
+from reahl.swordfish.gemstone.change_journal import (
+    change_journal_from_report,
+    change_journal_recording_statement,
+    change_journal_report_source,
+    change_journal_row_fields,
+)
+from reahl.swordfish.gemstone.session import (
+    DomainException,
+    MethodsNotCompiled,
+    length_prefixed_fields,
+    render_result,
+)
+from reahl.swordfish.gemstone.json_report import (
+    json_report_method_source,
+    json_report_script,
+    json_report_value,
+)
+from reahl.swordfish.gemstone.refactoring_plans import (
+    RefactoringPlan,
+    RefactoringPlans,
+    method_source_fingerprint,
+)
+from reahl.swordfish.gemstone.source_analysis import source_analysis_for
 from reahl.swordfish.mcp.ast_assets import (
     AST_SUPPORT_VERSION,
     ast_support_source,
     ast_support_source_hash,
 )
+from reahl.swordfish.mcp.change_journal_assets import (
+    CHANGE_JOURNAL_VERSION,
+    change_journal_source,
+    change_journal_source_hash,
+)
 from reahl.swordfish.mcp.tracer_assets import (
     TRACER_VERSION,
     tracer_source,
     tracer_source_hash,
 )
 
+METHOD_SOURCE_SCAN_CHUNK_SIZE = 50
+SELECTOR_INDEX_CHUNK_SIZE = 200
+AST_QUERY_PARALLEL_CHUNK_SIZE = 250
+
 
 class GemstoneBrowserSession:
+
     def __init__(
         self,
         gemstone_session,
         require_gemstone_ast=None,
+        metadata_cache=None,
     ):
         self.gemstone_session = gemstone_session
+        self.metadata_cache = metadata_cache
+        self.refactoring_plans = (
+            RefactoringPlans()
+            if metadata_cache is None
+            else metadata_cache.refactoring_plans
+        )
         if require_gemstone_ast is None:
             require_gemstone_ast = self.boolean_flag_from_environment(
                 "SWORDFISH_REQUIRE_GEMSTONE_AST"
             )
         self.require_gemstone_ast = require_gemstone_ast
         self.real_gemstone_ast_backend_available = None
+        self.json_report_support_available = None
         self.rowan_installed_cache = None
+        self.stone_name_cache = None
 
     def class_categories_by_class_name(self):
         category_by_class_name = {}
@@ -131,10 +176,58 @@ class GemstoneBrowserSession:
     def install_or_refresh_ast_support(self):
         if not self.installed_package_named("Reahl-Swordfish"):
             self.create_and_install_package("Reahl-Swordfish")
+        self.flush_metadata_cache()
         self.run_code(ast_support_source())
+        self.install_json_report_support()
         self.run_code(self.ast_support_manifest_install_script())
         self.real_gemstone_ast_backend_available = None
 
+    def install_json_report_support(self):
+        self.compile_method(
+            "SwordfishMcpAstSupport",
+            False,
+            json_report_method_source(),
+            "swordfish-mcp-ast",
+        )
+        self.json_report_support_available = None
+
+    def has_json_report_support(self):
+        if self.json_report_support_available is not None:
+            return self.json_report_support_available
+        if not self.can_attempt_ast_support_auto_install():
+            self.json_report_support_available = False
+            return False
+        try:
+            self.json_report_support_available = bool(
+                self.run_code(
+                    (
+                        "| swordfishDictionary |\n"
+                        "swordfishDictionary := "
+                        "System myUserProfile symbolList "
+                        "objectNamed: #'Reahl-Swordfish'.\n"
+                        "swordfishDictionary notNil and: [\n"
+                        "    (swordfishDictionary includesKey: "
+                        "#SwordfishMcpAstSupport) and: [\n"
+                        "        (swordfishDictionary at: #SwordfishMcpAstSupport)\n"
+                        "            respondsTo: #jsonReportFor:\n"
+                        "    ]\n"
+                        "]"
+                    )
+                ).to_py
+            )
+        except (GemstoneError, GemstoneApiError):
+            self.json_report_support_available = False
+        return self.json_report_support_available
+
+    def json_report(self, value_script):
+        if self.has_json_report_support():
+            report_script = (
+                "SwordfishMcpAstSupport jsonReportFor: [\n%s\n] value" % value_script
+            )
+        else:
+            report_script = json_report_script(value_script)
+        return json_report_value(self.run_code(report_script).to_py)
+
     def has_real_gemstone_ast_backend(self):
         if self.real_gemstone_ast_backend_available is not None:
             return self.real_gemstone_ast_backend_available
@@ -236,6 +329,13 @@ class GemstoneBrowserSession:
         return True
 
     def list_categories(self):
+        return self.cached_metadata(
+            self.class_lists_cache_scope(),
+            ("categories",),
+            self.uncached_categories,
+        )
+
+    def uncached_categories(self):
         category_names = []
         try:
             category_names = [
@@ -249,7 +349,14 @@ class GemstoneBrowserSession:
         return sorted(category_names)
 
     def list_dictionaries(self):
-        dictionary_names = self.run_code(
+        return self.cached_metadata(
+            self.class_lists_cache_scope(),
+            ("dictionaries",),
+            self.uncached_dictionaries,
+        )
+
+    def uncached_dictionaries(self):
+        return self.json_report(
             (
                 "| names |\n"
                 "names := OrderedCollection new.\n"
@@ -259,15 +366,16 @@ class GemstoneBrowserSession:
                 "(names asSortedCollection) asArray"
             )
         )
-        return [dictionary_name.to_py for dictionary_name in dictionary_names]
 
     def create_package(self, package_name):
+        self.flush_metadata_cache()
         package_name_literal = self.smalltalk_string_literal(package_name)
         return self.run_code(
             "GsPackageLibrary createPackageNamed: %s" % package_name_literal
         )
 
     def install_package(self, package_name):
+        self.flush_metadata_cache()
         package_name_literal = self.smalltalk_string_literal(package_name)
         return self.run_code(
             "GsPackageLibrary installPackageNamed: %s" % package_name_literal
@@ -278,6 +386,7 @@ class GemstoneBrowserSession:
         return self.install_package(package_name)
 
     def create_dictionary(self, dictionary_name):
+        self.flush_metadata_cache()
         dictionary_name_literal = self.smalltalk_string_literal(dictionary_name)
         return self.run_code(
             (
@@ -297,6 +406,7 @@ class GemstoneBrowserSession:
     def assign_class_to_package(self, class_name, package_name):
         class_name_literal = self.smalltalk_string_literal(class_name)
         package_name_literal = self.smalltalk_string_literal(package_name)
+        self.invalidate_cached_class(class_name)
         return self.run_code(
             (
                 "| className packageName classToAssign |\n"
@@ -327,6 +437,7 @@ class GemstoneBrowserSession:
         class_names = self.list_classes_in_category(package_name)
         for class_name in class_names:
             self.delete_class(class_name, in_dictionary=package_name)
+        self.flush_metadata_cache()
         package_name_literal = self.smalltalk_string_literal(package_name)
         return self.run_code(
             (
@@ -358,6 +469,13 @@ class GemstoneBrowserSession:
     def list_classes_in_category(self, category_name):
         if not category_name:
             return []
+        return self.cached_metadata(
+            self.class_lists_cache_scope(),
+            ("classes_in_category", category_name),
+            lambda: self.uncached_classes_in_category(category_name),
+        )
+
+    def uncached_classes_in_category(self, category_name):
         try:
             gemstone_classes = self.class_organizer.categories().at(category_name)
             class_names = [
@@ -374,8 +492,15 @@ class GemstoneBrowserSession:
     def list_classes_in_dictionary(self, dictionary_name):
         if not dictionary_name:
             return []
+        return self.cached_metadata(
+            self.class_lists_cache_scope(),
+            ("classes_in_dictionary", dictionary_name),
+            lambda: self.uncached_classes_in_dictionary(dictionary_name),
+        )
+
+    def uncached_classes_in_dictionary(self, dictionary_name):
         dictionary_name_literal = self.smalltalk_string_literal(dictionary_name)
-        class_names = self.run_code(
+        return self.json_report(
             (
                 "| dictionaryName dictionary classNames |\n"
                 "dictionaryName := %s.\n"
@@ -396,7 +521,6 @@ class GemstoneBrowserSession:
             )
             % dictionary_name_literal
         )
-        return [class_name.to_py for class_name in class_names]
 
     def dictionary_name_for_class(self, class_name):
         class_name_literal = self.smalltalk_string_literal(class_name)
@@ -432,18 +556,20 @@ class GemstoneBrowserSession:
             self.rowan_installed_cache = False
         return self.rowan_installed_cache
 
+    def stone_name(self):
+        if self.stone_name_cache is None:
+            self.stone_name_cache = self.run_code("System stoneName").to_py
+        return self.stone_name_cache
+
     def list_rowan_packages(self):
         if not self.rowan_installed():
             return []
         try:
-            package_names = self.run_code(
-                "Rowan packageNames asSortedCollection asArray"
-            )
+            return self.json_report("Rowan packageNames asSortedCollection asArray")
         except GemstoneError:
             return []
         except GemstoneApiError:
             return []
-        return [package_name.to_py for package_name in package_names]
 
     def list_classes_in_rowan_package(self, package_name):
         if not package_name:
@@ -452,7 +578,7 @@ class GemstoneBrowserSession:
             return []
         package_name_literal = self.smalltalk_string_literal(package_name)
         try:
-            class_names = self.run_code(
+            return self.json_report(
                 "((Rowan classNamesForPackageNamed: %s) asSortedCollection) asArray"
                 % package_name_literal
             )
@@ -460,7 +586,6 @@ class GemstoneBrowserSession:
             return []
         except GemstoneApiError:
             return []
-        return [class_name.to_py for class_name in class_names]
 
     def rowan_package_name_for_class(self, class_name):
         if not self.rowan_installed():
@@ -490,6 +615,13 @@ class GemstoneBrowserSession:
     def list_method_categories(self, class_name, show_instance_side):
         if not class_name:
             return []
+        return self.cached_metadata(
+            self.class_side_cache_scope(class_name, show_instance_side),
+            ("method_categories",),
+            lambda: self.uncached_method_categories(class_name, show_instance_side),
+        )
+
+    def uncached_method_categories(self, class_name, show_instance_side):
         class_to_query = self.class_to_query(class_name, show_instance_side)
         categories = [
             gemstone_category.to_py
@@ -505,6 +637,22 @@ class GemstoneBrowserSession:
     ):
         if not class_name or not method_category:
             return []
+        return self.cached_metadata(
+            self.class_side_cache_scope(class_name, show_instance_side),
+            ("methods", method_category),
+            lambda: self.uncached_methods(
+                class_name,
+                method_category,
+                show_instance_side,
+            ),
+        )
+
+    def uncached_methods(
+        self,
+        class_name,
+        method_category,
+        show_instance_side,
+    ):
         class_to_query = self.class_to_query(class_name, show_instance_side)
         if method_category == "all":
             selectors = class_to_query.selectors().asSortedCollection()
@@ -524,6 +672,22 @@ class GemstoneBrowserSession:
         class_name,
         method_selector,
         show_instance_side,
+    ):
+        return self.cached_metadata(
+            self.class_side_cache_scope(class_name, show_instance_side),
+            ("method_source", method_selector),
+            lambda: self.uncached_method_source(
+                class_name,
+                method_selector,
+                show_instance_side,
+            ),
+        )
+
+    def uncached_method_source(
+        self,
+        class_name,
+        method_selector,
+        show_instance_side,
     ):
         compiled_method = self.get_compiled_method(
             class_name,
@@ -537,6 +701,22 @@ class GemstoneBrowserSession:
         class_name,
         method_selector,
         show_instance_side,
+    ):
+        return self.cached_metadata(
+            self.class_side_cache_scope(class_name, show_instance_side),
+            ("method_category", method_selector),
+            lambda: self.uncached_method_category(
+                class_name,
+                method_selector,
+                show_instance_side,
+            ),
+        )
+
+    def uncached_method_category(
+        self,
+        class_name,
+        method_selector,
+        show_instance_side,
     ):
         class_to_query = self.class_to_query(class_name, show_instance_side)
         return class_to_query.categoryOfSelector(method_selector).to_py
@@ -590,6 +770,7 @@ class GemstoneBrowserSession:
         max_results=None,
         sort_by="scan_order",
         sort_descending=False,
+        parallel_workers=None,
     ):
         show_instance_side = self.validated_show_instance_side(show_instance_side)
         sort_by = self.validated_ast_query_sort_by(sort_by)
@@ -597,96 +778,44 @@ class GemstoneBrowserSession:
             sort_descending,
             "sort_descending",
         )
+        parallel_workers = self.validated_parallel_workers(parallel_workers)
         class_names = self.query_scope_class_names(
             package_name,
             class_name,
         )
-        matches = []
-        scanned_method_count = 0
-        for scoped_class_name in class_names:
-            selector_names = self.selector_names_for_scope(
-                scoped_class_name,
-                show_instance_side,
-                method_category,
+        skipped_classes = []
+        method_source_rows = self.method_source_rows_for_classes(
+            class_names,
+            show_instance_side,
+            method_category,
+            skipped_classes=skipped_classes,
+        )
+        scan_limit = max_results if sort_by == "scan_order" else None
+        if parallel_workers is None:
+            matches, scanned_method_count, limit_reached = self.ast_query_scan(
+                method_source_rows,
+                ast_pattern,
+                sort_by,
+                scan_limit,
             )
-            for selector_name in selector_names:
-                scanned_method_count = scanned_method_count + 1
-                method_source = self.get_method_source(
-                    scoped_class_name,
-                    selector_name,
-                    show_instance_side,
-                )
-                pattern_evaluation = self.pattern_evaluation_for_method(
-                    method_source,
-                    selector_name,
-                    ast_pattern,
-                    sort_by,
-                )
-                if pattern_evaluation["matches"]:
-                    structure_summary = pattern_evaluation["structure_summary"]
-                    control_flow_summary = pattern_evaluation["control_flow_summary"]
-                    matches.append(
-                        {
-                            "class_name": scoped_class_name,
-                            "show_instance_side": show_instance_side,
-                            "method_selector": selector_name,
-                            "method_category": self.get_method_category(
-                                scoped_class_name,
-                                selector_name,
-                                show_instance_side,
-                            ),
-                            "send_count": structure_summary["send_count"],
-                            "keyword_send_count": structure_summary[
-                                "keyword_send_count"
-                            ],
-                            "unary_send_count": structure_summary["unary_send_count"],
-                            "binary_send_count": structure_summary["binary_send_count"],
-                            "block_count": structure_summary["block_open_count"],
-                            "return_count": structure_summary["return_count"],
-                            "cascade_count": structure_summary["cascade_count"],
-                            "assignment_count": structure_summary["assignment_count"],
-                            "statement_terminator_count": structure_summary[
-                                "statement_terminator_count"
-                            ],
-                            "explicit_self_send_count": structure_summary[
-                                "explicit_self_send_count"
-                            ],
-                            "explicit_super_send_count": structure_summary[
-                                "explicit_super_send_count"
-                            ],
-                            "body_line_count": structure_summary["body_line_count"],
-                            "statement_count": pattern_evaluation["statement_count"],
-                            "temporary_count": pattern_evaluation["temporary_count"],
-                            "branch_selector_count": (
-                                control_flow_summary["branch_selector_count"]
-                                if control_flow_summary is not None
-                                else 0
-                            ),
-                            "loop_selector_count": (
-                                control_flow_summary["loop_selector_count"]
-                                if control_flow_summary is not None
-                                else 0
-                            ),
-                            "max_block_nesting_depth": (
-                                control_flow_summary["max_block_nesting_depth"]
-                                if control_flow_summary is not None
-                                else 0
-                            ),
-                        }
-                    )
-                    if (
-                        sort_by == "scan_order"
-                        and max_results is not None
-                        and len(matches) >= max_results
-                    ):
-                        return {
-                            "matches": matches,
-                            "match_count": len(matches),
-                            "scanned_method_count": scanned_method_count,
-                            "truncated": True,
-                            "sort_by": sort_by,
-                            "sort_descending": sort_descending,
-                        }
+        else:
+            matches, scanned_method_count, limit_reached = self.parallel_ast_query_scan(
+                method_source_rows,
+                ast_pattern,
+                sort_by,
+                scan_limit,
+                parallel_workers,
+            )
+        if limit_reached:
+            return {
+                "matches": matches,
+                "match_count": len(matches),
+                "scanned_method_count": scanned_method_count,
+                "truncated": True,
+                "sort_by": sort_by,
+                "sort_descending": sort_descending,
+                "skipped_classes": skipped_classes,
+            }
         if sort_by != "scan_order":
             matches = sorted(
                 matches,
@@ -703,6 +832,168 @@ class GemstoneBrowserSession:
             "truncated": truncated,
             "sort_by": sort_by,
             "sort_descending": sort_descending,
+            "skipped_classes": skipped_classes,
+        }
+
+    def validated_parallel_workers(self, parallel_workers):
+        if parallel_workers is None:
+            return None
+        if isinstance(parallel_workers, bool) or not isinstance(parallel_workers, int):
+            raise DomainException("parallel_workers must be an integer or None.")
+        if parallel_workers < 1:
+            raise DomainException("parallel_workers must be greater than zero.")
+        if parallel_workers == 1:
+            return None
+        return parallel_workers
+
+    def ast_query_scan(self, method_source_rows, ast_pattern, sort_by, scan_limit):
+        matches = []
+        scanned_method_count = 0
+        for method_row in method_source_rows:
+            scanned_method_count = scanned_method_count + 1
+            pattern_evaluation = self.pattern_evaluation_for_method(
+                method_row["source"],
+                method_row["method_selector"],
+                ast_pattern,
+                sort_by,
+            )
+            if pattern_evaluation["matches"]:
+                matches.append(
+                    self.ast_query_match_entry(method_row, pattern_evaluation)
+                )
+                if scan_limit is not None and len(matches) >= scan_limit:
+                    return matches, scanned_method_count, True
+        return matches, scanned_method_count, False
+
+    def parallel_ast_query_scan(
+        self,
+        method_source_rows,
+        ast_pattern,
+        sort_by,
+        scan_limit,
+        parallel_workers,
+    ):
+        matches = []
+        scanned_method_count = 0
+        pending_chunks = collections.deque()
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=parallel_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        ) as executor:
+            for method_rows in self.chunked_method_rows(method_source_rows):
+                pending_chunks.append(
+                    (
+                        len(method_rows),
+                        executor.submit(
+                            ast_query_matches_for_method_rows,
+                            method_rows,
+                            ast_pattern,
+                            sort_by,
+                        ),
+                    )
+                )
+                if len(pending_chunks) > parallel_workers * 2:
+                    merged_method_count, limit_reached = self.merged_ast_query_chunk(
+                        pending_chunks.popleft(),
+                        matches,
+                        scan_limit,
+                    )
+                    scanned_method_count = scanned_method_count + merged_method_count
+                    if limit_reached:
+                        self.cancel_ast_query_chunks(pending_chunks)
+                        return matches, scanned_method_count, True
+            while pending_chunks:
+                merged_method_count, limit_reached = self.merged_ast_query_chunk(
+                    pending_chunks.popleft(),
+                    matches,
+                    scan_limit,
+                )
+                scanned_method_count = scanned_method_count + merged_method_count
+                if limit_reached:
+                    self.cancel_ast_query_chunks(pending_chunks)
+                    return matches, scanned_method_count, True
+        return matches, scanned_method_count, False
+
+    def chunked_method_rows(self, method_source_rows):
+        method_rows = []
+        for method_row in method_source_rows:
+            method_rows.append(method_row)
+            if len(method_rows) >= AST_QUERY_PARALLEL_CHUNK_SIZE:
+                yield method_rows
+                method_rows = []
+        if method_rows:
+            yield method_rows
+
+    def merged_ast_query_chunk(self, pending_chunk, matches, scan_limit):
+        chunk_method_count, chunk_future = pending_chunk
+        for row_index, match_entry in chunk_future.result():
+            matches.append(match_entry)
+            if scan_limit is not None and len(matches) >= scan_limit:
+                return row_index + 1, True
+        return chunk_method_count, False
+
+    def cancel_ast_query_chunks(self, pending_chunks):
+        for _, chunk_future in pending_chunks:
+            chunk_future.cancel()
+        pending_chunks.clear()
+
+    def ast_query_matches_in_rows(self, method_rows, ast_pattern, sort_by):
+        row_matches = []
+        for row_index, method_row in enumerate(method_rows):
+            pattern_evaluation = self.pattern_evaluation_for_method(
+                method_row["source"],
+                method_row["method_selector"],
+                ast_pattern,
+                sort_by,
+            )
+            if pattern_evaluation["matches"]:
+                row_matches.append(
+                    (
+                        row_index,
+                        self.ast_query_match_entry(method_row, pattern_evaluation),
+                    )
+                )
+        return row_matches
+
+    def ast_query_match_entry(self, method_row, pattern_evaluation):
+        structure_summary = pattern_evaluation["structure_summary"]
+        control_flow_summary = pattern_evaluation["control_flow_summary"]
+        return {
+            "class_name": method_row["class_name"],
+            "show_instance_side": method_row["show_instance_side"],
+            "method_selector": method_row["method_selector"],
+            "method_category": method_row["method_category"],
+            "send_count": structure_summary["send_count"],
+            "keyword_send_count": structure_summary["keyword_send_count"],
+            "unary_send_count": structure_summary["unary_send_count"],
+            "binary_send_count": structure_summary["binary_send_count"],
+            "block_count": structure_summary["block_open_count"],
+            "return_count": structure_summary["return_count"],
+            "cascade_count": structure_summary["cascade_count"],
+            "assignment_count": structure_summary["assignment_count"],
+            "statement_terminator_count": structure_summary[
+                "statement_terminator_count"
+            ],
+            "explicit_self_send_count": structure_summary["explicit_self_send_count"],
+            "explicit_super_send_count": structure_summary["explicit_super_send_count"],
+            "body_line_count": structure_summary["body_line_count"],
+            "statement_count": pattern_evaluation["statement_count"],
+            "temporary_count": pattern_evaluation["temporary_count"],
+            "branch_selector_count": (
+                control_flow_summary["branch_selector_count"]
+                if control_flow_summary is not None
+                else 0
+            ),
+            "loop_selector_count": (
+                control_flow_summary["loop_selector_count"]
+                if control_flow_summary is not None
+                else 0
+            ),
+            "max_block_nesting_depth": (
+                control_flow_summary["max_block_nesting_depth"]
+                if control_flow_summary is not None
+                else 0
+            ),
         }
 
     def supported_ast_query_sort_fields(self):
@@ -858,7 +1149,19 @@ class GemstoneBrowserSession:
         ] + source_ast["analysis_limitations"]
         return source_ast
 
+    def source_analysis(self, source):
+        return source_analysis_for(source)
+
     def source_method_sends(self, source):
+        return copy.deepcopy(self.analysed_source_method_sends(source))
+
+    def analysed_source_method_sends(self, source):
+        return self.source_analysis(source).memoised(
+            "method_sends",
+            lambda: self.computed_source_method_sends(source),
+        )
+
+    def computed_source_method_sends(self, source):
         code_character_map = self.source_code_character_map(source)
         line_column_map = self.source_line_column_map(source)
         body_start_offset = self.body_start_offset_for_method_source(source)
@@ -935,48 +1238,42 @@ class GemstoneBrowserSession:
         }
 
     def source_method_structure_summary(self, source):
-        code_character_map = self.source_code_character_map(source)
+        return copy.deepcopy(self.analysed_source_method_structure_summary(source))
+
+    def analysed_source_method_structure_summary(self, source):
+        return self.source_analysis(source).memoised(
+            "structure_summary",
+            lambda: self.computed_source_method_structure_summary(source),
+        )
+
+    def computed_source_method_structure_summary(self, source):
+        source_analysis = self.source_analysis(source)
+        code_character_map = source_analysis.code_character_map()
         body_start_offset = self.body_start_offset_for_method_source(source)
         if body_start_offset >= len(source):
             body_start_offset = 0
         body_source = source[body_start_offset:]
-        method_sends = self.source_method_sends(source)
-        block_open_count = 0
-        block_close_count = 0
-        return_count = 0
-        cascade_count = 0
+        method_sends = self.analysed_source_method_sends(source)
+        punctuation_counts = {
+            "[": 0,
+            "]": 0,
+            "^": 0,
+            ";": 0,
+            ".": 0,
+        }
         assignment_count = 0
-        statement_terminator_count = 0
-        code_character_count = 0
-        non_code_character_count = 0
-        index = body_start_offset
-        while index < len(source):
-            is_code_character = code_character_map[index]
-            character = source[index]
-            if is_code_character:
-                code_character_count = code_character_count + 1
-                if character == "[":
-                    block_open_count = block_open_count + 1
-                if character == "]":
-                    block_close_count = block_close_count + 1
-                if character == "^":
-                    return_count = return_count + 1
-                if character == ";":
-                    cascade_count = cascade_count + 1
-                if character == ".":
-                    statement_terminator_count = statement_terminator_count + 1
-                has_next_character = index + 1 < len(source)
-                has_assignment = (
-                    character == ":"
-                    and has_next_character
-                    and source[index + 1] == "="
-                    and code_character_map[index + 1]
-                )
-                if has_assignment:
-                    assignment_count = assignment_count + 1
-            else:
-                non_code_character_count = non_code_character_count + 1
-            index = index + 1
+        for kind, _, _, text in source_analysis.code_tokens_from(body_start_offset):
+            if kind == "punctuation" and text in punctuation_counts:
+                punctuation_counts[text] = punctuation_counts[text] + 1
+            if kind == "assignment":
+                assignment_count = assignment_count + 1
+        block_open_count = punctuation_counts["["]
+        block_close_count = punctuation_counts["]"]
+        return_count = punctuation_counts["^"]
+        cascade_count = punctuation_counts[";"]
+        statement_terminator_count = punctuation_counts["."]
+        code_character_count = code_character_map[body_start_offset:].count(True)
+        non_code_character_count = len(body_source) - code_character_count
         keyword_send_count = 0
         unary_send_count = 0
         binary_send_count = 0
@@ -1016,8 +1313,17 @@ class GemstoneBrowserSession:
         }
 
     def source_method_control_flow_summary(self, source):
-        structure_summary = self.source_method_structure_summary(source)
-        method_sends = self.source_method_sends(source)
+        return copy.deepcopy(self.analysed_source_method_control_flow_summary(source))
+
+    def analysed_source_method_control_flow_summary(self, source):
+        return self.source_analysis(source).memoised(
+            "control_flow_summary",
+            lambda: self.computed_source_method_control_flow_summary(source),
+        )
+
+    def computed_source_method_control_flow_summary(self, source):
+        structure_summary = self.analysed_source_method_structure_summary(source)
+        method_sends = self.analysed_source_method_sends(source)
         control_selector_counts = {
             "ifTrue:": 0,
             "ifFalse:": 0,
@@ -1035,19 +1341,17 @@ class GemstoneBrowserSession:
                     control_selector_counts[send_selector] + 1
                 )
         body_start_offset = self.body_start_offset_for_method_source(source)
-        code_character_map = self.source_code_character_map(source)
         block_nesting_depth = 0
         max_block_nesting_depth = 0
-        index = body_start_offset
-        while index < len(source):
-            if code_character_map[index]:
-                if source[index] == "[":
-                    block_nesting_depth = block_nesting_depth + 1
-                    if block_nesting_depth > max_block_nesting_depth:
-                        max_block_nesting_depth = block_nesting_depth
-                if source[index] == "]" and block_nesting_depth > 0:
-                    block_nesting_depth = block_nesting_depth - 1
-            index = index + 1
+        for kind, _, _, text in self.source_analysis(source).code_tokens_from(
+            body_start_offset
+        ):
+            if kind == "punctuation" and text == "[":
+                block_nesting_depth = block_nesting_depth + 1
+                if block_nesting_depth > max_block_nesting_depth:
+                    max_block_nesting_depth = block_nesting_depth
+            if kind == "punctuation" and text == "]" and block_nesting_depth > 0:
+                block_nesting_depth = block_nesting_depth - 1
         branch_selector_count = (
             control_selector_counts["ifTrue:"]
             + control_selector_counts["ifFalse:"]
@@ -1097,6 +1401,130 @@ class GemstoneBrowserSession:
         selectors = class_to_query.selectorsIn(method_category).asSortedCollection()
         return [selector.to_py for selector in selectors]
 
+    def method_source_rows_for_classes(
+        self,
+        class_names,
+        show_instance_side,
+        method_category,
+        skipped_classes=None,
+    ):
+        chunk_start = 0
+        while chunk_start < len(class_names):
+            chunk_class_names = class_names[
+                chunk_start : chunk_start + METHOD_SOURCE_SCAN_CHUNK_SIZE
+            ]
+            method_source_report = self.run_code(
+                self.method_source_scan_script(
+                    chunk_class_names,
+                    show_instance_side,
+                    method_category,
+                )
+            ).to_py
+            for method_row in self.method_source_rows_from_report(method_source_report):
+                if not method_row["method_selector"]:
+                    if skipped_classes is not None:
+                        skipped_classes.append(
+                            {
+                                "class_name": method_row["class_name"],
+                                "reason": method_row["method_category"],
+                                "message": method_row["source"],
+                            }
+                        )
+                    continue
+                method_row["show_instance_side"] = show_instance_side
+                yield method_row
+            chunk_start = chunk_start + METHOD_SOURCE_SCAN_CHUNK_SIZE
+
+    def method_source_scan_script(
+        self,
+        class_names,
+        show_instance_side,
+        method_category,
+    ):
+        return (
+            "| symbolList showInstanceSide methodCategory stream writeField |\n"
+            "symbolList := System myUserProfile symbolList.\n"
+            "showInstanceSide := %s.\n"
+            "methodCategory := %s.\n"
+            "stream := WriteStream on: String new.\n"
+            "writeField := [ :value :fieldStream |\n"
+            "    fieldStream nextPutAll: value size printString.\n"
+            "    fieldStream nextPut: $:.\n"
+            "    fieldStream nextPutAll: value\n"
+            "].\n"
+            "%s do: [ :className |\n"
+            "    | gemstoneClass classToQuery selectors classStream |\n"
+            "    gemstoneClass := symbolList objectNamed: className asSymbol.\n"
+            "    (gemstoneClass notNil and: [ gemstoneClass isBehavior ])\n"
+            "        ifFalse: [\n"
+            "            writeField value: className value: stream.\n"
+            "            writeField value: '' value: stream.\n"
+            "            writeField value: 'not_found' value: stream.\n"
+            "            writeField value: 'Class could not be resolved.' value: stream\n"
+            "        ]\n"
+            "        ifTrue: [\n"
+            "            classStream := WriteStream on: String new.\n"
+            "            [\n"
+            "                classToQuery := showInstanceSide\n"
+            "                    ifTrue: [ gemstoneClass ]\n"
+            "                    ifFalse: [ gemstoneClass class ].\n"
+            "                selectors := methodCategory = 'all'\n"
+            "                    ifTrue: [ classToQuery selectors ]\n"
+            "                    ifFalse: [\n"
+            "                        (classToQuery categoryNames\n"
+            "                            detect: [ :each | each asString = methodCategory ]\n"
+            "                            ifNone: [ nil ]) isNil\n"
+            "                            ifTrue: [ #() ]\n"
+            "                            ifFalse: [ classToQuery selectorsIn: methodCategory ]\n"
+            "                    ].\n"
+            "                selectors asSortedCollection do: [ :selector |\n"
+            "                    | category |\n"
+            "                    category := classToQuery categoryOfSelector: selector.\n"
+            "                    writeField value: className value: classStream.\n"
+            "                    writeField value: selector asString value: classStream.\n"
+            "                    writeField\n"
+            "                        value: (category isNil\n"
+            "                            ifTrue: [ '' ]\n"
+            "                            ifFalse: [ category asString ])\n"
+            "                        value: classStream.\n"
+            "                    writeField\n"
+            "                        value: (classToQuery compiledMethodAt: selector)\n"
+            "                            sourceString\n"
+            "                        value: classStream\n"
+            "                ].\n"
+            "                stream nextPutAll: classStream contents\n"
+            "            ] on: Error do: [ :error |\n"
+            "                writeField value: className value: stream.\n"
+            "                writeField value: '' value: stream.\n"
+            "                writeField value: 'error' value: stream.\n"
+            "                writeField value: error messageText asString value: stream\n"
+            "            ]\n"
+            "        ]\n"
+            "].\n"
+            "stream contents"
+        ) % (
+            "true" if show_instance_side else "false",
+            self.smalltalk_string_literal(method_category),
+            self.string_array_literal(class_names),
+        )
+
+    def method_source_rows_from_report(self, method_source_report):
+        report_fields = self.length_prefixed_fields_from_report(method_source_report)
+        if len(report_fields) % 4 != 0:
+            raise DomainException("Method source report must have four fields per row.")
+        return [
+            {
+                "class_name": report_fields[index],
+                "method_selector": report_fields[index + 1],
+                "method_category": report_fields[index + 2],
+                "source": report_fields[index + 3],
+            }
+            for index in range(0, len(report_fields), 4)
+        ]
+
+    def length_prefixed_fields_from_report(self, report):
+        return length_prefixed_fields(report)
+
     def pattern_evaluation_for_method(
         self,
         method_source,
@@ -1104,8 +1532,8 @@ class GemstoneBrowserSession:
         ast_pattern,
         sort_by="scan_order",
     ):
-        structure_summary = self.source_method_structure_summary(method_source)
-        sends_payload = self.source_method_sends(method_source)
+        structure_summary = self.analysed_source_method_structure_summary(method_source)
+        sends_payload = self.analysed_source_method_sends(method_source)
         send_selector_names = [
             send_entry["selector"] for send_entry in sends_payload["sends"]
         ]
@@ -1128,7 +1556,7 @@ class GemstoneBrowserSession:
             or sort_by == "temporary_count"
         )
         if statement_count_requested or temporary_count_requested:
-            method_ast = self.source_method_ast(
+            method_ast = self.analysed_source_method_ast(
                 method_source,
                 method_selector,
             )
@@ -1153,7 +1581,7 @@ class GemstoneBrowserSession:
             )
         )
         if control_flow_requested:
-            control_flow_summary = self.source_method_control_flow_summary(
+            control_flow_summary = self.analysed_source_method_control_flow_summary(
                 method_source
             )
         matches = self.method_matches_ast_pattern(
@@ -1327,6 +1755,15 @@ class GemstoneBrowserSession:
         return True
 
     def source_method_ast(self, source, method_selector=None):
+        return copy.deepcopy(self.analysed_source_method_ast(source, method_selector))
+
+    def analysed_source_method_ast(self, source, method_selector=None):
+        return self.source_analysis(source).memoised(
+            ("method_ast", method_selector),
+            lambda: self.computed_source_method_ast(source, method_selector),
+        )
+
+    def computed_source_method_ast(self, source, method_selector=None):
         code_character_map = self.source_code_character_map(source)
         line_column_map = self.source_line_column_map(source)
         body_start_offset = self.body_start_offset_for_method_source(source)
@@ -1335,8 +1772,8 @@ class GemstoneBrowserSession:
             code_character_map,
             body_start_offset,
         )
-        method_sends = self.source_method_sends(source)
-        structure_summary = self.source_method_structure_summary(source)
+        method_sends = self.analysed_source_method_sends(source)
+        structure_summary = self.analysed_source_method_structure_summary(source)
         statement_entries = self.source_method_statements(
             source,
             code_character_map,
@@ -1554,17 +1991,7 @@ class GemstoneBrowserSession:
         return header_separator_offset + 1
 
     def source_line_column_map(self, source):
-        line_column_map = []
-        line_number = 1
-        column_number = 1
-        for character in source:
-            line_column_map.append((line_number, column_number))
-            if character == "\n":
-                line_number = line_number + 1
-                column_number = 1
-            else:
-                column_number = column_number + 1
-        return line_column_map
+        return self.source_analysis(source).line_column_map()
 
     def source_range_coordinates(
         self,
@@ -2039,13 +2466,37 @@ class GemstoneBrowserSession:
         source,
         method_category="as yet unclassified",
     ):
-        class_to_query = self.class_to_query(class_name, show_instance_side)
-        symbol_list = self.gemstone_session.execute("System myUserProfile symbolList")
-        return class_to_query.compileMethod_dictionaries_category_environmentId(
-            source,
-            symbol_list,
-            method_category,
-            0,
+        self.invalidate_cached_class_side(class_name, show_instance_side)
+        show_instance_side = self.validated_show_instance_side(show_instance_side)
+        return self.run_code(
+            (
+                "| classToQuery symbolList compiledMethod |\n"
+                "symbolList := System myUserProfile symbolList.\n"
+                "classToQuery := (symbolList objectNamed: (%s asSymbol))%s.\n"
+                "compiledMethod := classToQuery\n"
+                "    compileMethod: %s\n"
+                "    dictionaries: symbolList\n"
+                "    category: %s\n"
+                "    environmentId: 0.\n"
+                "%s"
+                "compiledMethod"
+            )
+            % (
+                self.smalltalk_string_literal(class_name),
+                "" if show_instance_side else " class",
+                self.smalltalk_string_literal(source),
+                self.smalltalk_string_literal(method_category),
+                self.change_journal_recording_source(
+                    "method_compiled",
+                    [
+                        (
+                            class_name,
+                            show_instance_side,
+                            self.method_selector_from_source(source),
+                        )
+                    ],
+                ),
+            )
         )
 
     def compile_method_in_dictionary(
@@ -2056,6 +2507,7 @@ class GemstoneBrowserSession:
         source,
         method_category="as yet unclassified",
     ):
+        self.invalidate_cached_class_side(class_name, show_instance_side)
         class_literal = self.smalltalk_string_literal(class_name)
         source_literal = self.smalltalk_string_literal(source)
         method_category_literal = self.smalltalk_string_literal(method_category)
@@ -2063,14 +2515,16 @@ class GemstoneBrowserSession:
         class_side_suffix = "" if show_instance_side else " class"
         return self.run_code(
             (
-                "| classToQuery symbolList |\n"
+                "| classToQuery symbolList compiledMethod |\n"
                 "classToQuery := (%s at: (%s asSymbol)).\n"
                 "symbolList := System myUserProfile symbolList.\n"
-                "classToQuery%s\n"
+                "compiledMethod := classToQuery%s\n"
                 "    compileMethod: %s\n"
                 "    dictionaries: symbolList\n"
                 "    category: %s\n"
-                "    environmentId: 0"
+                "    environmentId: 0.\n"
+                "%s"
+                "compiledMethod"
             )
             % (
                 dictionary_expression,
@@ -2078,8 +2532,201 @@ class GemstoneBrowserSession:
                 class_side_suffix,
                 source_literal,
                 method_category_literal,
+                self.change_journal_recording_source(
+                    "method_compiled",
+                    [
+                        (
+                            class_name,
+                            show_instance_side,
+                            self.method_selector_from_source(source),
+                        )
+                    ],
+                ),
+            )
+        )
+
+    def compile_methods(self, method_entries):
+        row_fields = []
+        for method_entry in method_entries:
+            self.invalidate_cached_class_side(
+                method_entry["class_name"],
+                method_entry["show_instance_side"],
+            )
+            row_fields.extend(
+                [
+                    method_entry["class_name"],
+                    "true" if method_entry["show_instance_side"] else "false",
+                    method_entry.get("method_selector")
+                    or self.method_selector_from_source(method_entry["source"]),
+                    method_entry.get("method_category") or "as yet unclassified",
+                    method_entry["source"],
+                ]
+            )
+        failure_rows = (
+            self.json_report(
+                self.compile_methods_script(
+                    row_fields,
+                    self.change_journal_recording_source(
+                        "method_compiled",
+                        [
+                            (
+                                method_entry["class_name"],
+                                method_entry["show_instance_side"],
+                                row_fields[entry_index * 5 + 2],
+                            )
+                            for entry_index, method_entry in enumerate(method_entries)
+                        ],
+                    ),
+                )
             )
+            if method_entries
+            else []
         )
+        compile_errors = []
+        for failure_row in failure_rows:
+            method_entry = method_entries[failure_row[0] - 1]
+            compile_errors.append(
+                {
+                    "index": failure_row[0] - 1,
+                    "class_name": method_entry["class_name"],
+                    "show_instance_side": method_entry["show_instance_side"],
+                    "method_selector": row_fields[(failure_row[0] - 1) * 5 + 2],
+                    "error_number": failure_row[1],
+                    "message": failure_row[2],
+                    "error_details": [
+                        {"offset": error_detail[0], "message": error_detail[1]}
+                        for error_detail in failure_row[3]
+                    ],
+                }
+            )
+        return {
+            "compiled": not compile_errors,
+            "compiled_count": 0 if compile_errors else len(method_entries),
+            "errors": compile_errors,
+        }
+
+    def compile_methods_script(self, row_fields, change_journal_recording_source=""):
+        return (
+            "| symbolList rowFields compiledRows failures |\n"
+            "symbolList := System myUserProfile symbolList.\n"
+            "rowFields := %s.\n"
+            "compiledRows := OrderedCollection new.\n"
+            "failures := OrderedCollection new.\n"
+            "1 to: rowFields size by: 5 do: [ :index |\n"
+            "    | classToQuery selector hadMethod previousSource previousCategory |\n"
+            "    hadMethod := false.\n"
+            "    [\n"
+            "        classToQuery := symbolList objectNamed: (rowFields at: index) asSymbol.\n"
+            "        classToQuery isNil ifTrue: [\n"
+            "            Error signal: 'Class not found: ', (rowFields at: index)\n"
+            "        ].\n"
+            "        (rowFields at: index + 1) = 'true'\n"
+            "            ifFalse: [ classToQuery := classToQuery class ].\n"
+            "        selector := (rowFields at: index + 2) asSymbol.\n"
+            "        hadMethod := classToQuery includesSelector: selector.\n"
+            "        hadMethod ifTrue: [\n"
+            "            previousSource := (classToQuery compiledMethodAt: selector) sourceString.\n"
+            "            previousCategory := classToQuery categoryOfSelector: selector\n"
+            "        ].\n"
+            "        classToQuery\n"
+            "            compileMethod: (rowFields at: index + 4)\n"
+            "            dictionaries: symbolList\n"
+            "            category: (rowFields at: index + 3)\n"
+            "            environmentId: 0.\n"
+            "        compiledRows add: (Array\n"
+            "            with: classToQuery\n"
+            "            with: selector\n"
+            "            with: hadMethod\n"
+            "            with: previousSource\n"
+            "            with: previousCategory)\n"
+            "    ] on: Error do: [ :error |\n"
+            "        | errorNumber details |\n"
+            "        errorNumber := [ error number ] on: Error do: [ :numberError | nil ].\n"
+            "        details := errorNumber = 1001\n"
+            "            ifTrue: [ [ error args first ] on: Error do: [ :detailsError | nil ] ].\n"
+            "        failures add: (Array\n"
+            "            with: index - 1 // 5 + 1\n"
+            "            with: errorNumber\n"
+            "            with: (error messageText ifNil: [ error printString ]) asString\n"
+            "            with: (details isNil\n"
+            "                ifTrue: [ #() ]\n"
+            "                ifFalse: [\n"
+            "                    details collect: [ :detail |\n"
+            "                        Array\n"
+            "                            with: (detail at: 2)\n"
+            "                            with: ((detail size >= 3 and: [ (detail at: 3) notNil ])\n"
+            "                                ifTrue: [ (detail at: 3) asString ]\n"
+            "                                ifFalse: [ '' ])\n"
+            "                    ]\n"
+            "                ]))\n"
+            "    ]\n"
+            "].\n"
+            "failures isEmpty ifFalse: [\n"
+            "    compiledRows reverseDo: [ :compiledRow |\n"
+            "        [\n"
+            "            (compiledRow at: 3)\n"
+            "                ifTrue: [\n"
+            "                    (compiledRow at: 1)\n"
+            "                        compileMethod: (compiledRow at: 4)\n"
+            "                        dictionaries: symbolList\n"
+            "                        category: (compiledRow at: 5)\n"
+            "                        environmentId: 0\n"
+            "                ]\n"
+            "                ifFalse: [\n"
+            "                    (compiledRow at: 1)\n"
+            "                        removeSelector: (compiledRow at: 2)\n"
+            "                        environmentId: 0\n"
+            "                        ifAbsent: [ ]\n"
+            "                ]\n"
+            "        ] on: Error do: [ :restoreError | nil ]\n"
+            "    ]\n"
+            "].\n"
+            "failures isEmpty ifTrue: [\n"
+            "%s"
+            "].\n"
+            "failures asArray"
+        ) % (self.string_array_literal(row_fields), change_journal_recording_source)
+
+    def ensure_methods_compiled(self, method_entries):
+        compile_result = self.compile_methods(method_entries)
+        if compile_result["compiled"]:
+            return compile_result
+        error_descriptions = [
+            "%s%s>>%s: %s"
+            % (
+                compile_error["class_name"],
+                "" if compile_error["show_instance_side"] else " class",
+                compile_error["method_selector"],
+                compile_error["message"],
+            )
+            for compile_error in compile_result["errors"]
+        ]
+        raise MethodsNotCompiled(
+            "%s of %s methods failed to compile, so none were changed. %s"
+            % (
+                len(compile_result["errors"]),
+                len(method_entries),
+                "; ".join(error_descriptions),
+            ),
+            compile_result["errors"],
+        )
+
+    def method_selector_from_source(self, method_source):
+        header_tokens = re.findall(
+            r"[A-Za-z_][A-Za-z0-9_]*:?|[-+*/\\~<>=@%|&?,]+|\S",
+            method_source,
+        )
+        if not header_tokens:
+            raise DomainException("Method source has no method header.")
+        first_token = header_tokens[0]
+        if not first_token.endswith(":"):
+            return first_token
+        keyword_tokens = []
+        for token_index in range(0, len(header_tokens) - 1, 2):
+            if not header_tokens[token_index].endswith(":"):
+                break
+            keyword_tokens.append(header_tokens[token_index])
+        return "".join(keyword_tokens)
 
     def create_class(
         self,
@@ -2115,7 +2762,17 @@ class GemstoneBrowserSession:
             self.symbol_array_literal(pool_dictionary_names),
             self.dictionary_reference_expression(in_dictionary),
         )
-        return self.run_code(source)
+        self.invalidate_cached_class(class_name)
+        return self.run_code(
+            "| newClass |\nnewClass := %s.\n%snewClass"
+            % (
+                source,
+                self.change_journal_recording_source(
+                    "class_defined",
+                    [(class_name, True, "")],
+                ),
+            )
+        )
 
     def create_test_case_class(
         self,
@@ -2139,6 +2796,11 @@ class GemstoneBrowserSession:
     def smalltalk_string_literal(self, value):
         return "'%s'" % value.replace("'", "''")
 
+    def string_array_literal(self, values):
+        return "#(%s)" % " ".join(
+            [self.smalltalk_string_literal(value) for value in values]
+        )
+
     def dictionary_reference_expression(self, in_dictionary):
         if re.match("^[A-Za-z][A-Za-z0-9_]*$", in_dictionary):
             return in_dictionary
@@ -2335,33 +2997,56 @@ class GemstoneBrowserSession:
         return clear_breakpoints_for_session(self.gemstone_session)
 
     def evaluate_source(self, source):
+        self.flush_metadata_cache()
         result = self.run_code(source)
         return {
             "result": render_result(result),
         }
 
     def run_gemstone_tests(self, test_case_class_name):
-        test_case_class = self.gemstone_session.resolve_symbol(test_case_class_name)
-        test_suite = test_case_class.suite()
-        test_result = test_suite.run()
-        return self.summarized_test_result(test_result)
+        self.flush_metadata_cache()
+        class_result = self.test_case_class_results([test_case_class_name])[0]
+        return {
+            "run_count": class_result["run_count"],
+            "failure_count": class_result["failure_count"],
+            "error_count": class_result["error_count"],
+            "has_passed": class_result["failure_count"] == 0
+            and class_result["error_count"] == 0,
+            "failures": class_result["failures"],
+            "errors": class_result["errors"],
+            "elapsed_ms": class_result["elapsed_ms"],
+            "test_timings": class_result["test_timings"],
+        }
 
     def run_test_method(self, test_case_class_name, test_method_selector):
-        selector_literal = self.smalltalk_string_literal(test_method_selector)
-        test_result = self.run_code(
-            (
-                "| testCaseClass testCase testSuite |\n"
-                "testCaseClass := %s.\n"
-                "testCase := testCaseClass selector: (%s asSymbol).\n"
-                "testSuite := TestSuite named: testCaseClass name.\n"
-                "testSuite addTest: testCase.\n"
-                "testSuite run"
-            )
-            % (test_case_class_name, selector_literal)
+        self.flush_metadata_cache()
+        test_result = self.single_test_result(
+            test_case_class_name,
+            test_method_selector,
         )
-        return self.summarized_test_result(test_result)
+        status = test_result["status"]
+        return {
+            "run_count": 1,
+            "failure_count": 1 if status == "failure" else 0,
+            "error_count": 1 if status == "error" else 0,
+            "has_passed": status == "passed",
+            "failures": [test_result["description"]] if status == "failure" else [],
+            "errors": [test_result["description"]] if status == "error" else [],
+            "elapsed_ms": test_result["elapsed_ms"],
+            "test_timings": [self.test_timing_from_result(test_result)],
+        }
+
+    def test_timing_from_result(self, test_result):
+        return {
+            "test_case_class_name": test_result["test_case_class_name"],
+            "test_method_selector": test_result["test_method_selector"],
+            "package_name": test_result["package_name"],
+            "status": test_result["status"],
+            "elapsed_ms": test_result["elapsed_ms"],
+        }
 
     def debug_test_method(self, test_case_class_name, test_method_selector):
+        self.flush_metadata_cache()
         selector_literal = self.smalltalk_string_literal(test_method_selector)
         self.run_code(
             (
@@ -2372,49 +3057,380 @@ class GemstoneBrowserSession:
             % (test_case_class_name, selector_literal)
         )
 
-    def summarized_test_result(self, test_result):
-        failure_entries = [
-            failure.printString().to_py
-            for failure in test_result.failures().asSortedCollection()
-        ]
-        error_entries = [
-            error.printString().to_py
-            for error in test_result.errors().asSortedCollection()
-        ]
-        return {
-            "run_count": test_result.runCount().to_py,
-            "failure_count": test_result.failureCount().to_py,
-            "error_count": test_result.errorCount().to_py,
-            "has_passed": test_result.hasPassed().to_py,
-            "failures": failure_entries,
-            "errors": error_entries,
-        }
-
-    def run_tests_in_package(self, package_name):
+    def run_tests_in_package(
+        self,
+        package_name,
+        worker_count=1,
+        worker_sessions=None,
+    ):
+        self.flush_metadata_cache()
         test_case_classes = self.list_test_case_classes(package_name)
-        run_count = 0
-        failure_count = 0
-        error_count = 0
-        has_passed = True
+        if worker_count > 1 and worker_sessions is None:
+            raise DomainException("Parallel test runs need worker sessions.")
+        requested_worker_count = worker_count
+        if worker_count > 1 and self.has_uncommitted_changes():
+            # AI: Worker sessions only see committed code, so shards would
+            # test something other than what this session has compiled.
+            worker_count = 1
+        if worker_count > 1:
+            class_results = self.sharded_test_case_class_results(
+                test_case_classes,
+                worker_count,
+                worker_sessions,
+            )
+        else:
+            class_results = self.test_case_class_results(test_case_classes)
+        class_results = sorted(
+            class_results,
+            key=lambda class_result: class_result["test_case_class_name"],
+        )
         failure_entries = []
         error_entries = []
-        for test_case_class_name in test_case_classes:
-            test_result = self.run_gemstone_tests(test_case_class_name)
-            run_count += test_result["run_count"]
-            failure_count += test_result["failure_count"]
-            error_count += test_result["error_count"]
-            has_passed = has_passed and test_result["has_passed"]
-            failure_entries += test_result["failures"]
-            error_entries += test_result["errors"]
+        for class_result in class_results:
+            failure_entries += class_result["failures"]
+            error_entries += class_result["errors"]
+        failure_count = sum(
+            class_result["failure_count"] for class_result in class_results
+        )
+        error_count = sum(class_result["error_count"] for class_result in class_results)
         return {
             "package_name": package_name,
             "test_case_classes": test_case_classes,
-            "run_count": run_count,
+            "run_count": sum(
+                class_result["run_count"] for class_result in class_results
+            ),
             "failure_count": failure_count,
             "error_count": error_count,
-            "has_passed": has_passed,
+            "has_passed": failure_count == 0 and error_count == 0,
             "failures": failure_entries,
             "errors": error_entries,
+            "worker_count": worker_count,
+            "requested_worker_count": requested_worker_count,
+            "ran_serially_because_of_uncommitted_changes": (
+                worker_count < requested_worker_count
+            ),
+            "class_timings": [
+                {
+                    "test_case_class_name": class_result["test_case_class_name"],
+                    "run_count": class_result["run_count"],
+                    "elapsed_ms": class_result["elapsed_ms"],
+                }
+                for class_result in class_results
+            ],
+            "test_timings": [
+                test_timing
+                for class_result in class_results
+                for test_timing in class_result["test_timings"]
+            ],
+        }
+
+    def has_uncommitted_changes(self):
+        return self.run_code("System needsCommit").to_py
+
+    def sharded_test_case_class_results(
+        self,
+        test_case_classes,
+        worker_count,
+        worker_sessions,
+    ):
+        shards = [
+            shard
+            for shard in (
+                test_case_classes[shard_index::worker_count]
+                for shard_index in range(worker_count)
+            )
+            if shard
+        ]
+        if not shards:
+            return []
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=len(shards),
+            thread_name_prefix="SwordfishTestShard",
+        ) as executor:
+            shard_futures = [
+                executor.submit(
+                    self.test_case_class_results_in_worker_session,
+                    shard,
+                    worker_sessions,
+                )
+                for shard in shards
+            ]
+            return [
+                class_result
+                for shard_future in shard_futures
+                for class_result in shard_future.result()
+            ]
+
+    def test_case_class_results_in_worker_session(
+        self,
+        test_case_classes,
+        worker_sessions,
+    ):
+        worker_session = worker_sessions.acquire()
+        try:
+            worker_session.abort()
+            return GemstoneBrowserSession(worker_session).test_case_class_results(
+                test_case_classes
+            )
+        finally:
+            worker_sessions.release(worker_session)
+
+    def test_case_class_results(self, test_case_classes):
+        if not test_case_classes:
+            return []
+        test_report = self.run_code(
+            self.test_case_class_results_script(test_case_classes)
+        ).to_py
+        return self.test_case_class_results_from_report(test_report)
+
+    def test_case_class_results_script(self, test_case_classes):
+        return (
+            "| symbolList stream writeField writeEntries |\n"
+            "symbolList := System myUserProfile symbolList.\n"
+            "stream := WriteStream on: String new.\n"
+            "writeField := [ :value |\n"
+            "    stream nextPutAll: value size printString.\n"
+            "    stream nextPut: $:.\n"
+            "    stream nextPutAll: value\n"
+            "].\n"
+            "writeEntries := [ :entries |\n"
+            "    writeField value: entries size printString.\n"
+            "    entries asSortedCollection do: [ :each |\n"
+            "        writeField value: each printString\n"
+            "    ]\n"
+            "].\n"
+            "%s do: [ :className |\n"
+            "    | testCaseClass testSuite testResult testTimings elapsedMilliseconds |\n"
+            "    testCaseClass := symbolList objectNamed: className asSymbol.\n"
+            "    testCaseClass isNil ifTrue: [\n"
+            "        Error signal: 'Unknown test case class: ', className\n"
+            "    ].\n"
+            "    testSuite := testCaseClass suite.\n"
+            "    testResult := TestResult new.\n"
+            "    testTimings := OrderedCollection new.\n"
+            "    testSuite resources do: [ :each |\n"
+            "        each isAvailable ifFalse: [ each signalInitializationError ]\n"
+            "    ].\n"
+            "    elapsedMilliseconds := Time millisecondsToRun: [\n"
+            "        [ testSuite tests do: [ :testCase |\n"
+            "            | failureCount errorCount testMilliseconds status |\n"
+            "            failureCount := testResult failures size.\n"
+            "            errorCount := testResult errors size.\n"
+            "            testMilliseconds := Time millisecondsToRun: [\n"
+            "                testCase run: testResult\n"
+            "            ].\n"
+            "            status := testResult errors size > errorCount\n"
+            "                ifTrue: [ 'error' ]\n"
+            "                ifFalse: [\n"
+            "                    testResult failures size > failureCount\n"
+            "                        ifTrue: [ 'failure' ]\n"
+            "                        ifFalse: [ 'passed' ]\n"
+            "                ].\n"
+            "            testTimings add: (Array\n"
+            "                with: testCase selector asString\n"
+            "                with: status\n"
+            "                with: testMilliseconds printString)\n"
+            "        ] ] ensure: [\n"
+            "            testSuite resources do: [ :each | each reset ]\n"
+            "        ]\n"
+            "    ].\n"
+            "    writeField value: className.\n"
+            "    writeField value: (testCaseClass category ifNil: [ '' ]) asString.\n"
+            "    writeField value: testResult runCount printString.\n"
+            "    writeField value: elapsedMilliseconds printString.\n"
+            "    writeEntries value: testResult failures.\n"
+            "    writeEntries value: testResult errors.\n"
+            "    writeField value: testTimings size printString.\n"
+            "    testTimings do: [ :testTiming |\n"
+            "        testTiming do: [ :each | writeField value: each ]\n"
+            "    ]\n"
+            "].\n"
+            "stream contents"
+        ) % self.string_array_literal(test_case_classes)
+
+    def test_case_class_results_from_report(self, test_report):
+        report_fields = self.length_prefixed_fields_from_report(test_report)
+        class_results = []
+        index = 0
+        while index < len(report_fields):
+            test_case_class_name = report_fields[index]
+            package_name = report_fields[index + 1]
+            run_count = int(report_fields[index + 2])
+            elapsed_ms = int(report_fields[index + 3])
+            index += 4
+            failure_count = int(report_fields[index])
+            failures = report_fields[index + 1 : index + 1 + failure_count]
+            index += 1 + failure_count
+            error_count = int(report_fields[index])
+            errors = report_fields[index + 1 : index + 1 + error_count]
+            index += 1 + error_count
+            test_timing_count = int(report_fields[index])
+            index += 1
+            test_timings = []
+            for _ in range(test_timing_count):
+                test_timings.append(
+                    {
+                        "test_case_class_name": test_case_class_name,
+                        "test_method_selector": report_fields[index],
+                        "package_name": package_name,
+                        "status": report_fields[index + 1],
+                        "elapsed_ms": int(report_fields[index + 2]),
+                    }
+                )
+                index += 3
+            class_results.append(
+                {
+                    "test_case_class_name": test_case_class_name,
+                    "package_name": package_name,
+                    "run_count": run_count,
+                    "failure_count": failure_count,
+                    "error_count": error_count,
+                    "elapsed_ms": elapsed_ms,
+                    "failures": failures,
+                    "errors": errors,
+                    "test_timings": test_timings,
+                }
+            )
+        return class_results
+
+    def run_tests_incrementally(
+        self,
+        test_case_class_names,
+        should_stop=None,
+        on_test_result=None,
+    ):
+        self.flush_metadata_cache()
+        test_cases = self.test_cases_in_classes(test_case_class_names)
+        test_results = []
+        cancelled = False
+        for test_index, (test_case_class_name, test_method_selector) in enumerate(
+            test_cases
+        ):
+            if should_stop is not None and should_stop():
+                cancelled = True
+                break
+            test_result = self.single_test_result(
+                test_case_class_name,
+                test_method_selector,
+            )
+            test_result["test_index"] = test_index + 1
+            test_result["test_count"] = len(test_cases)
+            test_results.append(test_result)
+            if on_test_result is not None:
+                on_test_result(dict(test_result))
+        failure_entries = [
+            test_result["description"]
+            for test_result in test_results
+            if test_result["status"] == "failure"
+        ]
+        error_entries = [
+            test_result["description"]
+            for test_result in test_results
+            if test_result["status"] == "error"
+        ]
+        return {
+            "test_case_classes": list(test_case_class_names),
+            "test_count": len(test_cases),
+            "run_count": len(test_results),
+            "failure_count": len(failure_entries),
+            "error_count": len(error_entries),
+            "has_passed": not cancelled and not failure_entries and not error_entries,
+            "cancelled": cancelled,
+            "failures": failure_entries,
+            "errors": error_entries,
+            "elapsed_ms": sum(
+                test_result["elapsed_ms"] for test_result in test_results
+            ),
+            "test_results": test_results,
+            "test_timings": [
+                self.test_timing_from_result(test_result)
+                for test_result in test_results
+            ],
+        }
+
+    def test_cases_in_classes(self, test_case_class_names):
+        if not test_case_class_names:
+            return []
+        test_case_report = self.run_code(
+            (
+                "| symbolList stream writeField writeTests |\n"
+                "symbolList := System myUserProfile symbolList.\n"
+                "stream := WriteStream on: String new.\n"
+                "writeField := [ :value |\n"
+                "    stream nextPutAll: value size printString.\n"
+                "    stream nextPut: $:.\n"
+                "    stream nextPutAll: value\n"
+                "].\n"
+                "writeTests := nil.\n"
+                "writeTests := [ :test |\n"
+                "    (test isKindOf: TestSuite)\n"
+                "        ifTrue: [ test tests do: [ :each | writeTests value: each ] ]\n"
+                "        ifFalse: [\n"
+                "            writeField value: test class name asString.\n"
+                "            writeField value: test selector asString\n"
+                "        ]\n"
+                "].\n"
+                "%s do: [ :className |\n"
+                "    | testCaseClass |\n"
+                "    testCaseClass := symbolList objectNamed: className asSymbol.\n"
+                "    testCaseClass isNil ifTrue: [\n"
+                "        Error signal: 'Unknown test case class: ', className\n"
+                "    ].\n"
+                "    writeTests value: testCaseClass suite\n"
+                "].\n"
+                "stream contents"
+            )
+            % self.string_array_literal(test_case_class_names)
+        ).to_py
+        report_fields = self.length_prefixed_fields_from_report(test_case_report)
+        return [
+            (report_fields[index], report_fields[index + 1])
+            for index in range(0, len(report_fields) - 1, 2)
+        ]
+
+    def single_test_result(self, test_case_class_name, test_method_selector):
+        test_report = self.run_code(
+            (
+                "| testCaseClass testCase testResult elapsedMilliseconds status stream writeField |\n"
+                "testCaseClass := System myUserProfile symbolList objectNamed: %s asSymbol.\n"
+                "testCase := testCaseClass selector: %s asSymbol.\n"
+                "elapsedMilliseconds := Time millisecondsToRun: [\n"
+                "    testResult := testCase run\n"
+                "].\n"
+                "status := testResult errors isEmpty\n"
+                "    ifTrue: [\n"
+                "        testResult failures isEmpty\n"
+                "            ifTrue: [ 'passed' ]\n"
+                "            ifFalse: [ 'failure' ]\n"
+                "    ]\n"
+                "    ifFalse: [ 'error' ].\n"
+                "stream := WriteStream on: String new.\n"
+                "writeField := [ :value |\n"
+                "    stream nextPutAll: value size printString.\n"
+                "    stream nextPut: $:.\n"
+                "    stream nextPutAll: value\n"
+                "].\n"
+                "writeField value: status.\n"
+                "writeField value: elapsedMilliseconds printString.\n"
+                "writeField value: testCase printString.\n"
+                "writeField value: (testCaseClass category ifNil: [ '' ]) asString.\n"
+                "stream contents"
+            )
+            % (
+                self.smalltalk_string_literal(test_case_class_name),
+                self.smalltalk_string_literal(test_method_selector),
+            )
+        ).to_py
+        status, elapsed_ms, description, package_name = (
+            self.length_prefixed_fields_from_report(test_report)
+        )
+        return {
+            "test_case_class_name": test_case_class_name,
+            "test_method_selector": test_method_selector,
+            "package_name": package_name,
+            "status": status,
+            "elapsed_ms": int(elapsed_ms),
+            "description": description,
         }
 
     def tracer_status(self):
@@ -2429,26 +3445,21 @@ class GemstoneBrowserSession:
         enabled = self.run_code(
             "UserGlobals at: #SwordfishMcpTracerEnabled ifAbsent: [ false ]"
         ).to_py
-        observed_selector_count = self.run_code(
-            (
-                "(UserGlobals at: #SwordfishMcpTracerEdgeCounts "
-                "ifAbsent: [ Dictionary new ]) size"
+        observed_selector_count = 0
+        observed_edge_count = 0
+        if manifest_exists:
+            observed_edges = self.observed_edge_counts()
+            observed_selector_count = len(
+                set(
+                    observed_edge["method_selector"] for observed_edge in observed_edges
+                )
             )
-        ).to_py
-        observed_edge_count = self.run_code(
-            (
-                "| edgeCounts edgeTotal |\n"
-                "edgeCounts := UserGlobals\n"
-                "    at: #SwordfishMcpTracerEdgeCounts\n"
-                "    ifAbsent: [ Dictionary new ].\n"
-                "edgeTotal := 0.\n"
-                "edgeCounts valuesDo: [ :selectorEdgeCounts |\n"
-                "    edgeTotal := edgeTotal + selectorEdgeCounts size\n"
-                "].\n"
-                "edgeTotal"
+            observed_edge_count = len(
+                set(
+                    self.observed_edge_key(observed_edge)
+                    for observed_edge in observed_edges
+                )
             )
-        ).to_py
-        if manifest_exists:
             installed_source_hash = self.run_code(
                 (
                     "(UserGlobals at: #SwordfishMcpTracerManifest) "
@@ -2558,18 +3569,8 @@ class GemstoneBrowserSession:
         self,
         sender_method_selector,
         alias_selector,
-        target_method_name,
-        caller_class_name,
-        caller_show_instance_side,
+        edge_id,
     ):
-        target_selector_literal = self.selector_reference_expression(target_method_name)
-        caller_class_name_literal = self.smalltalk_string_literal(caller_class_name)
-        caller_method_selector_literal = self.selector_reference_expression(
-            sender_method_selector
-        )
-        caller_show_instance_side_literal = (
-            "true" if caller_show_instance_side else "false"
-        )
         if ":" in sender_method_selector:
             method_tokens = self.selector_keyword_tokens(sender_method_selector)
             alias_tokens = self.selector_keyword_tokens(alias_selector)
@@ -2595,17 +3596,11 @@ class GemstoneBrowserSession:
         return (
             "%s\n"
             "    SwordfishMcpTracer\n"
-            "        recordSenderExecutionForTarget: %s\n"
-            "        callerClassName: %s\n"
-            "        callerMethodSelector: %s\n"
-            "        callerShowInstanceSide: %s.\n"
+            "        recordEdge: %s.\n"
             "    ^self %s"
         ) % (
             method_header,
-            target_selector_literal,
-            caller_class_name_literal,
-            caller_method_selector_literal,
-            caller_show_instance_side_literal,
+            int(edge_id),
             alias_send,
         )
 
@@ -2649,15 +3644,83 @@ class GemstoneBrowserSession:
     def tracer_class_method_sources(self):
         return [
             (
-                "edgeCounts\n"
+                "edges\n"
                 "    ^UserGlobals\n"
-                "        at: #SwordfishMcpTracerEdgeCounts\n"
+                "        at: #SwordfishMcpTracerEdges\n"
+                "        ifAbsentPut: [ OrderedCollection new ]"
+            ),
+            (
+                "edgeIdForTarget: aTargetSelector "
+                "callerClassName: callerClassName callerMethodSelector: "
+                "callerMethodSelector callerShowInstanceSide: "
+                "callerShowInstanceSide\n"
+                "    | edge edgeId |\n"
+                "    edge := Array\n"
+                "        with: aTargetSelector asString\n"
+                "        with: callerClassName asString\n"
+                "        with: callerShowInstanceSide\n"
+                "        with: callerMethodSelector asString.\n"
+                "    edgeId := self edges indexOf: edge.\n"
+                "    edgeId = 0 ifTrue: [\n"
+                "        self edges add: edge.\n"
+                "        edgeId := self edges size\n"
+                "    ].\n"
+                "    ^edgeId"
+            ),
+            (
+                "edgeCounters\n"
+                "    ^SessionTemps current\n"
+                "        at: #SwordfishMcpTracerEdgeCounters\n"
+                "        ifAbsentPut: [ Array new: self edges size withAll: 0 ]"
+            ),
+            (
+                "edgeCountersCovering: anEdgeId\n"
+                "    | counters grownCounters |\n"
+                "    counters := self edgeCounters.\n"
+                "    anEdgeId <= counters size ifTrue: [ ^counters ].\n"
+                "    grownCounters := Array\n"
+                "        new: (anEdgeId max: self edges size)\n"
+                "        withAll: 0.\n"
+                "    grownCounters\n"
+                "        replaceFrom: 1\n"
+                "        to: counters size\n"
+                "        with: counters\n"
+                "        startingAt: 1.\n"
+                "    SessionTemps current\n"
+                "        at: #SwordfishMcpTracerEdgeCounters\n"
+                "        put: grownCounters.\n"
+                "    ^grownCounters"
+            ),
+            (
+                "sessionEdgeCounts\n"
+                "    ^SessionTemps current\n"
+                "        at: #SwordfishMcpTracerSessionEdgeCounts\n"
                 "        ifAbsentPut: [ Dictionary new ]"
             ),
             (
                 "clearEdgeCounts\n"
-                "    UserGlobals at: #SwordfishMcpTracerEdgeCounts put: "
-                "Dictionary new.\n"
+                "    SessionTemps current\n"
+                "        removeKey: #SwordfishMcpTracerEdgeCounters\n"
+                "        ifAbsent: [ ].\n"
+                "    SessionTemps current\n"
+                "        removeKey: #SwordfishMcpTracerSessionEdgeCounts\n"
+                "        ifAbsent: [ ].\n"
+                "    true"
+            ),
+            (
+                "clearEdgeCountsForTarget: aTargetSelector\n"
+                "    | target counters sessionEdgeCounts |\n"
+                "    target := aTargetSelector asString.\n"
+                "    counters := self edgeCounters.\n"
+                "    self edges withIndexDo: [ :edge :edgeId |\n"
+                "        ((edge at: 1) = target and: [ edgeId <= counters size ])\n"
+                "            ifTrue: [ counters at: edgeId put: 0 ]\n"
+                "    ].\n"
+                "    sessionEdgeCounts := self sessionEdgeCounts.\n"
+                "    sessionEdgeCounts keys do: [ :edge |\n"
+                "        (edge at: 1) = target\n"
+                "            ifTrue: [ sessionEdgeCounts removeKey: edge ]\n"
+                "    ].\n"
                 "    true"
             ),
             (
@@ -2672,26 +3735,6 @@ class GemstoneBrowserSession:
                 "        at: aTargetSelector asString\n"
                 "        ifAbsent: [ OrderedCollection new ]"
             ),
-            (
-                "instrumentationReportForTarget: aTargetSelector\n"
-                "    | instrumentationEntries stream |\n"
-                "    instrumentationEntries := self "
-                "instrumentationEntriesForTarget: aTargetSelector.\n"
-                "    stream := WriteStream on: String new.\n"
-                "    instrumentationEntries withIndexDo: [ :entry :index |\n"
-                "        stream nextPutAll: (entry at: 1).\n"
-                "        stream nextPut: $|.\n"
-                "        stream nextPutAll: ((entry at: 2) "
-                "ifTrue: [ 'true' ] ifFalse: [ 'false' ]).\n"
-                "        stream nextPut: $|.\n"
-                "        stream nextPutAll: (entry at: 3).\n"
-                "        stream nextPut: $|.\n"
-                "        stream nextPutAll: (entry at: 4).\n"
-                "        index < instrumentationEntries size\n"
-                "            ifTrue: [ stream nextPut: Character lf ]\n"
-                "    ].\n"
-                "    ^stream contents"
-            ),
             (
                 "clearInstrumentationForTarget: aTargetSelector\n"
                 "    self instrumentation\n"
@@ -2719,81 +3762,76 @@ class GemstoneBrowserSession:
                 "    true"
             ),
             (
-                "selectorEdgeCountsFor: aSelector\n"
-                "    ^self edgeCounts\n"
-                "        at: aSelector asString\n"
-                "        ifAbsentPut: [ Dictionary new ]"
+                "recordEdge: anEdgeId\n"
+                "    | counters |\n"
+                "    (UserGlobals at: #SwordfishMcpTracerEnabled "
+                "ifAbsent: [ false ])\n"
+                "        ifFalse: [ ^self ].\n"
+                "    counters := self edgeCountersCovering: anEdgeId.\n"
+                "    counters at: anEdgeId put: (counters at: anEdgeId) + 1.\n"
+                "    ^self"
             ),
             (
                 "recordSenderExecutionForTarget: aTargetSelector "
                 "callerClassName: callerClassName callerMethodSelector: "
                 "callerMethodSelector callerShowInstanceSide: "
                 "callerShowInstanceSide\n"
-                "    | edge selectorEdgeCounts |\n"
+                "    | edge sessionEdgeCounts |\n"
                 "    (UserGlobals at: #SwordfishMcpTracerEnabled "
                 "ifAbsent: [ false ])\n"
                 "        ifFalse: [ ^self ].\n"
                 "    edge := Array\n"
-                "        with: callerClassName\n"
+                "        with: aTargetSelector asString\n"
+                "        with: callerClassName asString\n"
                 "        with: callerShowInstanceSide\n"
                 "        with: callerMethodSelector asString.\n"
-                "    selectorEdgeCounts := self selectorEdgeCountsFor: "
-                "aTargetSelector.\n"
-                "    selectorEdgeCounts\n"
+                "    sessionEdgeCounts := self sessionEdgeCounts.\n"
+                "    sessionEdgeCounts\n"
                 "        at: edge\n"
-                "        put: ((selectorEdgeCounts at: edge "
+                "        put: ((sessionEdgeCounts at: edge "
                 "ifAbsent: [ 0 ]) + 1).\n"
                 "    ^self"
             ),
             (
-                "observedEdgesFor: aSelector\n"
-                "    | selectorEdgeCounts observedEdges |\n"
-                "    selectorEdgeCounts := self edgeCounts\n"
-                "        at: aSelector asString\n"
-                "        ifAbsent: [ Dictionary new ].\n"
+                "observedEdgesFor: aTargetSelectorOrNil\n"
+                "    | target observedEdges addEdge counters |\n"
+                "    target := aTargetSelectorOrNil isNil\n"
+                "        ifTrue: [ nil ]\n"
+                "        ifFalse: [ aTargetSelectorOrNil asString ].\n"
                 "    observedEdges := OrderedCollection new.\n"
-                "    selectorEdgeCounts keysAndValuesDo: [ :edge :count |\n"
-                "        observedEdges add: (Array\n"
-                "            with: (edge at: 1)\n"
-                "            with: (edge at: 2)\n"
-                "            with: (edge at: 3)\n"
-                "            with: count)\n"
+                "    addEdge := [ :edge :count |\n"
+                "        (count > 0 and: [ target isNil or: [ (edge at: 1) = target ] ])\n"
+                "            ifTrue: [ observedEdges add: (edge copyWith: count) ]\n"
                 "    ].\n"
-                "    ^observedEdges asArray"
-            ),
-            (
-                "observedEdgesReportFor: aSelector\n"
-                "    | observedEdges stream |\n"
-                "    observedEdges := self observedEdgesFor: aSelector.\n"
-                "    stream := WriteStream on: String new.\n"
-                "    observedEdges withIndexDo: [ :edge :index |\n"
-                "        stream nextPutAll: (edge at: 1).\n"
-                "        stream nextPut: $|.\n"
-                "        stream nextPutAll: ((edge at: 2) "
-                "ifTrue: [ 'true' ] ifFalse: [ 'false' ]).\n"
-                "        stream nextPut: $|.\n"
-                "        stream nextPutAll: (edge at: 3).\n"
-                "        stream nextPut: $|.\n"
-                "        stream nextPutAll: (edge at: 4) printString.\n"
-                "        index < observedEdges size\n"
-                "            ifTrue: [ stream nextPut: Character lf ]\n"
+                "    counters := self edgeCounters.\n"
+                "    self edges withIndexDo: [ :edge :edgeId |\n"
+                "        edgeId <= counters size\n"
+                "            ifTrue: [ addEdge value: edge value: (counters at: edgeId) ]\n"
                 "    ].\n"
-                "    ^stream contents"
+                "    self sessionEdgeCounts keysAndValuesDo: [ :edge :count |\n"
+                "        addEdge value: edge value: count\n"
+                "    ].\n"
+                "    ^observedEdges asArray"
             ),
         ]
 
     def install_tracer_methods(self):
-        for method_source in self.tracer_class_method_sources():
-            self.compile_method(
-                "SwordfishMcpTracer",
-                False,
-                method_source,
-                "tracing",
-            )
+        self.ensure_methods_compiled(
+            [
+                {
+                    "class_name": "SwordfishMcpTracer",
+                    "show_instance_side": False,
+                    "source": method_source,
+                    "method_category": "tracing",
+                }
+                for method_source in self.tracer_class_method_sources()
+            ]
+        )
 
     def install_or_refresh_tracer(self):
         if not self.installed_package_named("Reahl-Swordfish"):
             self.create_and_install_package("Reahl-Swordfish")
+        self.flush_metadata_cache()
         self.run_code(tracer_source())
         self.install_tracer_methods()
         self.run_code(self.tracer_manifest_install_script())
@@ -2819,6 +3857,9 @@ class GemstoneBrowserSession:
                 "ifAbsent: [ ].\n"
                 "UserGlobals removeKey: #SwordfishMcpTracerEdgeCounts "
                 "ifAbsent: [ ].\n"
+                "UserGlobals removeKey: #SwordfishMcpTracerEdges "
+                "ifAbsent: [ ].\n"
+                "SwordfishMcpTracer clearEdgeCounts.\n"
                 "UserGlobals removeKey: #SwordfishMcpTracerInstrumentation "
                 "ifAbsent: [ ].\n"
                 "UserGlobals at: #SwordfishMcpTracerEnabled put: false.\n"
@@ -2826,167 +3867,432 @@ class GemstoneBrowserSession:
             )
         )
 
-    def trace_selector(self, method_name, max_results=None):
+    def change_journal_status(self):
+        status_fields = self.json_report(
+            (
+                "| manifest journal |\n"
+                "manifest := UserGlobals\n"
+                "    at: #SwordfishMcpChangeJournalManifest\n"
+                "    ifAbsent: [ nil ].\n"
+                "journal := System myUserProfile symbolList "
+                "objectNamed: #SwordfishMcpChangeJournal.\n"
+                "Array\n"
+                "    with: manifest notNil\n"
+                "    with: (manifest isNil\n"
+                "        ifTrue: [ '' ]\n"
+                "        ifFalse: [ manifest at: #version ifAbsent: [ '' ] ])\n"
+                "    with: (manifest isNil\n"
+                "        ifTrue: [ '' ]\n"
+                "        ifFalse: [ manifest at: #sourceHash ifAbsent: [ '' ] ])\n"
+                "    with: (manifest isNil\n"
+                "        ifTrue: [ '' ]\n"
+                "        ifFalse: [ manifest at: #installedAt ifAbsent: [ '' ] ])\n"
+                "    with: (journal isNil\n"
+                "        ifTrue: [ nil ]\n"
+                "        ifFalse: [ journal currentSequence ])"
+            )
+        )
+        (
+            manifest_exists,
+            installed_version,
+            installed_source_hash,
+            installed_at,
+            current_sequence,
+        ) = status_fields
+        expected_source_hash = change_journal_source_hash()
+        versions_match = manifest_exists and (
+            installed_version == CHANGE_JOURNAL_VERSION
+        )
+        hashes_match = manifest_exists and (
+            installed_source_hash == expected_source_hash
+        )
+        return {
+            "change_journal_installed": current_sequence is not None,
+            "expected_version": CHANGE_JOURNAL_VERSION,
+            "installed_version": installed_version,
+            "versions_match": versions_match,
+            "expected_source_hash": expected_source_hash,
+            "installed_source_hash": installed_source_hash,
+            "hashes_match": hashes_match,
+            "manifest_matches": versions_match and hashes_match,
+            "installed_at": installed_at,
+            "current_sequence": current_sequence,
+            "followed_sequence": (
+                None
+                if self.metadata_cache is None
+                else self.metadata_cache.change_journal_sequence
+            ),
+        }
+
+    def change_journal_manifest_install_script(self):
+        return (
+            "| manifest |\n"
+            "manifest := Dictionary new.\n"
+            "manifest at: #version put: %s.\n"
+            "manifest at: #sourceHash put: %s.\n"
+            "manifest at: #installedBy put: %s.\n"
+            "manifest at: #installedAt put: DateAndTime now printString.\n"
+            "UserGlobals at: #SwordfishMcpChangeJournalManifest put: manifest.\n"
+            "true"
+        ) % (
+            self.smalltalk_string_literal(CHANGE_JOURNAL_VERSION),
+            self.smalltalk_string_literal(change_journal_source_hash()),
+            self.smalltalk_string_literal("swordfish-ide"),
+        )
+
+    def install_or_refresh_change_journal(self):
+        if not self.installed_package_named("Reahl-Swordfish"):
+            self.create_and_install_package("Reahl-Swordfish")
+        self.flush_metadata_cache()
+        self.run_code(change_journal_source())
+        self.run_code(self.change_journal_manifest_install_script())
+        if self.metadata_cache is not None:
+            self.metadata_cache.follow_change_journal(
+                self.changes_since(-1)["current_sequence"]
+            )
+
+    def uninstall_change_journal(self):
+        self.flush_metadata_cache()
         self.run_code(
-            "SwordfishMcpTracer clearInstrumentationForTarget: %s"
-            % self.selector_reference_expression(method_name)
+            (
+                "| swordfishDictionary |\n"
+                "UserGlobals removeKey: #SwordfishMcpChangeJournalManifest "
+                "ifAbsent: [ ].\n"
+                "swordfishDictionary := System myUserProfile symbolList "
+                "objectNamed: #'Reahl-Swordfish'.\n"
+                "swordfishDictionary notNil ifTrue: [\n"
+                "    swordfishDictionary removeKey: #SwordfishMcpChangeJournal "
+                "ifAbsent: [ ]\n"
+                "].\n"
+                "true"
+            )
+        )
+        if self.metadata_cache is not None:
+            self.metadata_cache.stop_following_change_journal()
+
+    def changes_since(self, since_sequence):
+        change_journal = change_journal_from_report(
+            self.run_code(change_journal_report_source(since_sequence)).to_py
+        )
+        if change_journal is None:
+            raise DomainException("The change journal is not installed.")
+        return change_journal
+
+    def follows_change_journal(self):
+        if self.metadata_cache is None:
+            return False
+        if not self.metadata_cache.is_change_journal_checked:
+            change_journal = change_journal_from_report(
+                self.run_code(change_journal_report_source(-1)).to_py
+            )
+            if change_journal is None:
+                self.metadata_cache.stop_following_change_journal()
+            else:
+                self.metadata_cache.follow_change_journal(
+                    change_journal["current_sequence"]
+                )
+        return self.metadata_cache.change_journal_sequence is not None
+
+    def change_journal_recording_source(self, change_kind, method_keys):
+        if not method_keys or not self.follows_change_journal():
+            return ""
+        return change_journal_recording_statement(
+            change_journal_row_fields(change_kind, method_keys)
         )
+
+    def trace_selector(self, method_name, max_results=None):
         sender_search_result = self.find_senders(
             method_name,
             max_results=max_results,
             count_only=False,
         )
-        traced_senders = []
+        sender_entries = sender_search_result["senders"]
+        sender_states = self.tracer_sender_states(method_name, sender_entries)
+        instrumentation_rows = []
         skipped_senders = []
-        for sender_entry in sender_search_result["senders"]:
+        for sender_entry, sender_state in zip(sender_entries, sender_states):
             class_name = sender_entry["class_name"]
             show_instance_side = sender_entry["show_instance_side"]
             sender_method_selector = sender_entry["method_selector"]
             alias_selector = self.tracer_alias_selector(sender_method_selector)
-            selectors = self.list_methods(
-                class_name,
-                "all",
-                show_instance_side,
-            )
-            alias_already_exists = alias_selector in selectors
-            alias_method_source = None
-            method_category = None
-            wrapper_was_compiled = False
-            can_register_instrumentation = alias_already_exists
-            skip_error_message = None
-            skip_error_number = None
-            skip_reason = ""
-
-            if alias_already_exists:
-                skip_reason = "Alias selector already exists."
-            if not alias_already_exists:
-                try:
-                    method_source = self.get_method_source(
-                        class_name,
-                        sender_method_selector,
-                        show_instance_side,
-                    )
-                    method_category = self.get_method_category(
-                        class_name,
-                        sender_method_selector,
-                        show_instance_side,
-                    )
-                    alias_method_source = self.source_with_rewritten_method_header(
-                        method_source,
-                        sender_method_selector,
-                        alias_selector,
-                    )
-                    self.compile_method(
-                        class_name,
-                        show_instance_side,
-                        alias_method_source,
-                        method_category,
-                    )
-                    wrapper_method_source = self.tracer_sender_wrapper_source(
-                        sender_method_selector,
-                        alias_selector,
-                        method_name,
-                        class_name,
-                        show_instance_side,
-                    )
-                    self.compile_method(
-                        class_name,
-                        show_instance_side,
-                        wrapper_method_source,
-                        method_category,
-                    )
-                    wrapper_was_compiled = True
-                    can_register_instrumentation = True
-                except (
-                    DomainException,
-                    GemstoneError,
-                    GemstoneApiError,
-                ) as error:
-                    skip_error_message = str(error)
-                    skip_error_number = getattr(error, "number", None)
-                    self.rollback_traced_sender(
-                        class_name,
-                        sender_method_selector,
-                        show_instance_side,
-                        alias_selector,
-                        alias_method_source,
-                        method_category,
-                        wrapper_was_compiled,
-                    )
-
-            instrumentation_was_registered = False
-            if can_register_instrumentation:
-                try:
-                    self.run_code(
-                        (
-                            "SwordfishMcpTracer "
-                            "registerInstrumentationForTarget: %s "
-                            "callerClassName: %s "
-                            "callerMethodSelector: %s "
-                            "callerShowInstanceSide: %s "
-                            "aliasSelector: %s"
-                        )
-                        % (
-                            self.selector_reference_expression(method_name),
-                            self.smalltalk_string_literal(class_name),
-                            self.selector_reference_expression(sender_method_selector),
-                            "true" if show_instance_side else "false",
-                            self.selector_reference_expression(alias_selector),
-                        )
+            traced_sender_entry = {
+                "class_name": class_name,
+                "show_instance_side": show_instance_side,
+                "method_selector": sender_method_selector,
+                "alias_selector": alias_selector,
+            }
+            if sender_state["state"] == "missing":
+                skipped_senders.append(
+                    dict(
+                        traced_sender_entry,
+                        reason="Sender method no longer exists.",
                     )
-                    instrumentation_was_registered = True
-                except (
-                    DomainException,
-                    GemstoneError,
-                    GemstoneApiError,
-                ) as error:
-                    skip_error_message = str(error)
-                    skip_error_number = getattr(error, "number", None)
-                    if not alias_already_exists:
-                        self.rollback_traced_sender(
-                            class_name,
-                            sender_method_selector,
-                            show_instance_side,
-                            alias_selector,
-                            alias_method_source,
-                            method_category,
-                            wrapper_was_compiled,
-                        )
-
-            if instrumentation_was_registered:
-                traced_senders.append(
+                )
+                continue
+            if sender_state["state"] == "alias":
+                instrumentation_rows.append(
                     {
-                        "class_name": class_name,
-                        "show_instance_side": show_instance_side,
-                        "method_selector": sender_method_selector,
-                        "alias_selector": alias_selector,
+                        "sender": traced_sender_entry,
+                        "installs_wrapper": False,
+                        "alias_method_source": "",
+                        "wrapper_method_source": "",
+                        "method_category": "",
+                        "method_source": "",
                     }
                 )
-            if not instrumentation_was_registered:
-                skipped_sender_entry = {
-                    "class_name": class_name,
-                    "show_instance_side": show_instance_side,
-                    "method_selector": sender_method_selector,
-                    "alias_selector": alias_selector,
+                continue
+            try:
+                alias_method_source = self.source_with_rewritten_method_header(
+                    sender_state["method_source"],
+                    sender_method_selector,
+                    alias_selector,
+                )
+            except DomainException as error:
+                skipped_senders.append(
+                    dict(traced_sender_entry, error_message=str(error))
+                )
+                continue
+            instrumentation_rows.append(
+                {
+                    "sender": traced_sender_entry,
+                    "installs_wrapper": True,
+                    "alias_method_source": alias_method_source,
+                    "wrapper_method_source": self.tracer_sender_wrapper_source(
+                        sender_method_selector,
+                        alias_selector,
+                        sender_state["edge_id"],
+                    ),
+                    "method_category": sender_state["method_category"],
+                    "method_source": sender_state["method_source"],
                 }
-                if skip_reason:
-                    skipped_sender_entry["reason"] = skip_reason
-                if skip_error_message:
-                    skipped_sender_entry["error_message"] = skip_error_message
-                if skip_error_number is not None:
-                    skipped_sender_entry["error_number"] = skip_error_number
-                skipped_senders.append(skipped_sender_entry)
+            )
+        traced_senders = []
+        instrumentation_outcomes = self.install_tracer_instrumentation(
+            method_name,
+            instrumentation_rows,
+        )
+        for instrumentation_row, instrumentation_outcome in zip(
+            instrumentation_rows,
+            instrumentation_outcomes,
+        ):
+            traced_sender_entry = instrumentation_row["sender"]
+            if instrumentation_outcome["status"] == "traced":
+                traced_senders.append(traced_sender_entry)
+                continue
+            skipped_sender_entry = dict(traced_sender_entry)
+            if not instrumentation_row["installs_wrapper"]:
+                skipped_sender_entry["reason"] = "Alias selector already exists."
+            skipped_sender_entry["error_message"] = instrumentation_outcome[
+                "error_message"
+            ]
+            if instrumentation_outcome["error_number"] is not None:
+                skipped_sender_entry["error_number"] = instrumentation_outcome[
+                    "error_number"
+                ]
+            skipped_senders.append(skipped_sender_entry)
         return {
             "method_name": method_name,
             "max_results": max_results,
             "total_sender_count": sender_search_result["total_count"],
-            "targeted_sender_count": len(sender_search_result["senders"]),
+            "targeted_sender_count": len(sender_entries),
             "traced_sender_count": len(traced_senders),
             "skipped_sender_count": len(skipped_senders),
             "traced_senders": traced_senders,
             "skipped_senders": skipped_senders,
         }
 
+    def tracer_sender_states(self, method_name, sender_entries):
+        sender_fields = []
+        for sender_entry in sender_entries:
+            sender_fields.extend(
+                [
+                    sender_entry["class_name"],
+                    "true" if sender_entry["show_instance_side"] else "false",
+                    sender_entry["method_selector"],
+                    self.tracer_alias_selector(sender_entry["method_selector"]),
+                ]
+            )
+        sender_state_report = self.run_code(
+            (
+                "| symbolList stream writeField senderFields target |\n"
+                "target := %s.\n"
+                "SwordfishMcpTracer clearInstrumentationForTarget: target.\n"
+                "symbolList := System myUserProfile symbolList.\n"
+                "stream := WriteStream on: String new.\n"
+                "writeField := [ :value |\n"
+                "    stream nextPutAll: value size printString.\n"
+                "    stream nextPut: $:.\n"
+                "    stream nextPutAll: value\n"
+                "].\n"
+                "senderFields := %s.\n"
+                "1 to: senderFields size by: 4 do: [ :index |\n"
+                "    | classToQuery selector |\n"
+                "    classToQuery := symbolList objectNamed: (senderFields at: index) asSymbol.\n"
+                "    (classToQuery notNil and: [ (senderFields at: index + 1) = 'false' ])\n"
+                "        ifTrue: [ classToQuery := classToQuery class ].\n"
+                "    selector := (senderFields at: index + 2) asSymbol.\n"
+                "    (classToQuery isNil or: [ (classToQuery includesSelector: selector) not ])\n"
+                "        ifTrue: [\n"
+                "            writeField value: ''.\n"
+                "            writeField value: 'missing'.\n"
+                "            writeField value: ''.\n"
+                "            writeField value: ''\n"
+                "        ]\n"
+                "        ifFalse: [\n"
+                "            writeField value: (SwordfishMcpTracer\n"
+                "                edgeIdForTarget: target\n"
+                "                callerClassName: (senderFields at: index)\n"
+                "                callerMethodSelector: selector\n"
+                "                callerShowInstanceSide: (senderFields at: index + 1) = 'true') printString.\n"
+                "            (classToQuery includesSelector: (senderFields at: index + 3) asSymbol)\n"
+                "                ifTrue: [\n"
+                "                    writeField value: 'alias'.\n"
+                "                    writeField value: ''.\n"
+                "                    writeField value: ''\n"
+                "                ]\n"
+                "                ifFalse: [\n"
+                "                    writeField value: 'source'.\n"
+                "                    writeField value: (classToQuery compiledMethodAt: selector) sourceString.\n"
+                "                    writeField value: (classToQuery categoryOfSelector: selector) asString\n"
+                "                ]\n"
+                "        ]\n"
+                "].\n"
+                "stream contents"
+            )
+            % (
+                self.selector_reference_expression(method_name),
+                self.string_array_literal(sender_fields),
+            )
+        ).to_py
+        report_fields = self.length_prefixed_fields_from_report(sender_state_report)
+        if len(report_fields) != 4 * len(sender_entries):
+            raise DomainException("Tracer sender report has an unexpected shape.")
+        return [
+            {
+                "edge_id": int(report_fields[index]) if report_fields[index] else None,
+                "state": report_fields[index + 1],
+                "method_source": report_fields[index + 2],
+                "method_category": report_fields[index + 3],
+            }
+            for index in range(0, len(report_fields), 4)
+        ]
+
+    def install_tracer_instrumentation(self, method_name, instrumentation_rows):
+        if not instrumentation_rows:
+            return []
+        row_fields = []
+        for instrumentation_row in instrumentation_rows:
+            sender = instrumentation_row["sender"]
+            if instrumentation_row["installs_wrapper"]:
+                self.invalidate_cached_class_side(
+                    sender["class_name"],
+                    sender["show_instance_side"],
+                )
+            row_fields.extend(
+                [
+                    sender["class_name"],
+                    "true" if sender["show_instance_side"] else "false",
+                    sender["method_selector"],
+                    sender["alias_selector"],
+                    (
+                        "install"
+                        if instrumentation_row["installs_wrapper"]
+                        else "register"
+                    ),
+                    instrumentation_row["alias_method_source"],
+                    instrumentation_row["wrapper_method_source"],
+                    instrumentation_row["method_category"],
+                    instrumentation_row["method_source"],
+                ]
+            )
+        outcome_report = self.run_code(
+            self.install_tracer_instrumentation_script(method_name, row_fields)
+        ).to_py
+        report_fields = self.length_prefixed_fields_from_report(outcome_report)
+        if len(report_fields) != 3 * len(instrumentation_rows):
+            raise DomainException("Tracer install report has an unexpected shape.")
+        return [
+            {
+                "status": report_fields[index],
+                "error_message": report_fields[index + 1],
+                "error_number": (
+                    int(report_fields[index + 2]) if report_fields[index + 2] else None
+                ),
+            }
+            for index in range(0, len(report_fields), 3)
+        ]
+
+    def install_tracer_instrumentation_script(self, method_name, row_fields):
+        return (
+            "| symbolList stream writeField rowFields target |\n"
+            "target := %s.\n"
+            "symbolList := System myUserProfile symbolList.\n"
+            "stream := WriteStream on: String new.\n"
+            "writeField := [ :value |\n"
+            "    stream nextPutAll: value size printString.\n"
+            "    stream nextPut: $:.\n"
+            "    stream nextPutAll: value\n"
+            "].\n"
+            "rowFields := %s.\n"
+            "1 to: rowFields size by: 9 do: [ :index |\n"
+            "    | classToQuery isInstanceSide selector aliasSelector category aliasCompiled wrapperCompiled |\n"
+            "    classToQuery := symbolList objectNamed: (rowFields at: index) asSymbol.\n"
+            "    isInstanceSide := (rowFields at: index + 1) = 'true'.\n"
+            "    isInstanceSide ifFalse: [ classToQuery := classToQuery class ].\n"
+            "    selector := (rowFields at: index + 2) asSymbol.\n"
+            "    aliasSelector := (rowFields at: index + 3) asSymbol.\n"
+            "    category := rowFields at: index + 7.\n"
+            "    aliasCompiled := false.\n"
+            "    wrapperCompiled := false.\n"
+            "    [\n"
+            "        (rowFields at: index + 4) = 'install' ifTrue: [\n"
+            "            classToQuery\n"
+            "                compileMethod: (rowFields at: index + 5)\n"
+            "                dictionaries: symbolList\n"
+            "                category: category\n"
+            "                environmentId: 0.\n"
+            "            aliasCompiled := true.\n"
+            "            classToQuery\n"
+            "                compileMethod: (rowFields at: index + 6)\n"
+            "                dictionaries: symbolList\n"
+            "                category: category\n"
+            "                environmentId: 0.\n"
+            "            wrapperCompiled := true\n"
+            "        ].\n"
+            "        SwordfishMcpTracer\n"
+            "            registerInstrumentationForTarget: target\n"
+            "            callerClassName: (rowFields at: index)\n"
+            "            callerMethodSelector: selector\n"
+            "            callerShowInstanceSide: isInstanceSide\n"
+            "            aliasSelector: aliasSelector.\n"
+            "        writeField value: 'traced'.\n"
+            "        writeField value: ''.\n"
+            "        writeField value: ''\n"
+            "    ] on: Error do: [ :error |\n"
+            "        wrapperCompiled ifTrue: [\n"
+            "            [ classToQuery\n"
+            "                compileMethod: (rowFields at: index + 8)\n"
+            "                dictionaries: symbolList\n"
+            "                category: category\n"
+            "                environmentId: 0 ] on: Error do: [ :restoreError | nil ]\n"
+            "        ].\n"
+            "        aliasCompiled ifTrue: [\n"
+            "            [ classToQuery\n"
+            "                removeSelector: aliasSelector\n"
+            "                environmentId: 0\n"
+            "                ifAbsent: [] ] on: Error do: [ :removeError | nil ]\n"
+            "        ].\n"
+            "        writeField value: 'failed'.\n"
+            "        writeField value: (error messageText ifNil: [ error printString ]) asString.\n"
+            "        writeField value: ([ error number printString ] on: Error do: [ :numberError | '' ])\n"
+            "    ]\n"
+            "].\n"
+            "stream contents"
+        ) % (
+            self.selector_reference_expression(method_name),
+            self.string_array_literal(row_fields),
+        )
+
     def trace_implementation(self, class_name, show_instance_side, method_name):
         self.run_code(
             'SwordfishMcpTracer clearInstrumentationForTarget: %s'
@@ -3019,94 +4325,46 @@ class GemstoneBrowserSession:
         self.compile_method(class_name, show_instance_side, alias_method_source, method_category)
         wrapper_source = self.tracer_target_implementation_wrapper_source(
             method_name, alias_selector
-        )
-        self.compile_method(class_name, show_instance_side, wrapper_source, method_category)
-        self.run_code(
-            (
-                'SwordfishMcpTracer '
-                'registerInstrumentationForTarget: %s '
-                'callerClassName: %s '
-                'callerMethodSelector: %s '
-                'callerShowInstanceSide: %s '
-                'aliasSelector: %s'
-            ) % (
-                self.selector_reference_expression(method_name),
-                self.smalltalk_string_literal(class_name),
-                self.selector_reference_expression(method_name),
-                'true' if show_instance_side else 'false',
-                self.selector_reference_expression(alias_selector),
-            )
-        )
-        return {
-            'method_name': method_name,
-            'class_name': class_name,
-            'show_instance_side': show_instance_side,
-            'instrumented': True,
-            'alias_selector': alias_selector,
-        }
-
-    def rollback_traced_sender(
-        self,
-        class_name,
-        sender_method_selector,
-        show_instance_side,
-        alias_selector,
-        alias_method_source,
-        method_category,
-        wrapper_was_compiled,
-    ):
-        if wrapper_was_compiled and alias_method_source and method_category:
-            try:
-                restored_method_source = self.source_with_rewritten_method_header(
-                    alias_method_source,
-                    alias_selector,
-                    sender_method_selector,
-                )
-                self.compile_method(
-                    class_name,
-                    show_instance_side,
-                    restored_method_source,
-                    method_category,
-                )
-            except (
-                DomainException,
-                GemstoneError,
-                GemstoneApiError,
-            ):
-                pass
-        try:
-            self.delete_method(
-                class_name,
-                alias_selector,
-                show_instance_side,
+        )
+        self.compile_method(class_name, show_instance_side, wrapper_source, method_category)
+        self.run_code(
+            (
+                'SwordfishMcpTracer '
+                'registerInstrumentationForTarget: %s '
+                'callerClassName: %s '
+                'callerMethodSelector: %s '
+                'callerShowInstanceSide: %s '
+                'aliasSelector: %s'
+            ) % (
+                self.selector_reference_expression(method_name),
+                self.smalltalk_string_literal(class_name),
+                self.selector_reference_expression(method_name),
+                'true' if show_instance_side else 'false',
+                self.selector_reference_expression(alias_selector),
             )
-        except (
-            DomainException,
-            GemstoneError,
-            GemstoneApiError,
-        ):
-            pass
+        )
+        return {
+            'method_name': method_name,
+            'class_name': class_name,
+            'show_instance_side': show_instance_side,
+            'instrumented': True,
+            'alias_selector': alias_selector,
+        }
 
     def untrace_selector(self, method_name):
-        instrumentation_entries_report = self.run_code(
-            "SwordfishMcpTracer instrumentationReportForTarget: %s"
+        instrumentation_entries = self.json_report(
+            "SwordfishMcpTracer instrumentationEntriesForTarget: %s"
             % self.selector_reference_expression(method_name)
-        ).to_py
-        instrumentation_entry_lines = (
-            []
-            if instrumentation_entries_report == ""
-            else instrumentation_entries_report.splitlines()
         )
         restored_senders = []
         skipped_senders = []
-        for instrumentation_entry_line in instrumentation_entry_lines:
-            instrumentation_entry_fields = instrumentation_entry_line.split("|")
-            if len(instrumentation_entry_fields) != 4:
+        for instrumentation_entry in instrumentation_entries:
+            if len(instrumentation_entry) != 4:
                 raise DomainException("Instrumentation entry must have four fields.")
-            class_name = instrumentation_entry_fields[0]
-            show_instance_side = instrumentation_entry_fields[1] == "true"
-            sender_method_selector = instrumentation_entry_fields[2]
-            alias_selector = instrumentation_entry_fields[3]
+            class_name = instrumentation_entry[0]
+            show_instance_side = instrumentation_entry[1]
+            sender_method_selector = instrumentation_entry[2]
+            alias_selector = instrumentation_entry[3]
             selectors = self.list_methods(
                 class_name,
                 "all",
@@ -3162,7 +4420,7 @@ class GemstoneBrowserSession:
         )
         return {
             "method_name": method_name,
-            "total_instrumented_sender_count": len(instrumentation_entry_lines),
+            "total_instrumented_sender_count": len(instrumentation_entries),
             "restored_sender_count": len(restored_senders),
             "skipped_sender_count": len(skipped_senders),
             "restored_senders": restored_senders,
@@ -3173,10 +4431,46 @@ class GemstoneBrowserSession:
         if method_name is None:
             self.run_code("SwordfishMcpTracer clearEdgeCounts")
             return
-        method_name_literal = self.smalltalk_string_literal(method_name)
         self.run_code(
-            "(SwordfishMcpTracer edgeCounts) removeKey: %s ifAbsent: [ ]. true"
-            % method_name_literal
+            "SwordfishMcpTracer clearEdgeCountsForTarget: %s"
+            % self.selector_reference_expression(method_name)
+        )
+
+    def observed_edge_counts(self, method_name=None):
+        target_expression = (
+            "nil"
+            if method_name is None
+            else self.selector_reference_expression(method_name)
+        )
+        observed_edge_rows = self.json_report(
+            "SwordfishMcpTracer observedEdgesFor: %s" % target_expression
+        )
+        observed_counts_by_edge = collections.OrderedDict()
+        for observed_edge_row in observed_edge_rows:
+            if len(observed_edge_row) != 5:
+                raise DomainException("Observed tracer edge must have five fields.")
+            observed_edge = {
+                "method_selector": observed_edge_row[0],
+                "caller_class_name": observed_edge_row[1],
+                "caller_show_instance_side": observed_edge_row[2],
+                "caller_method_selector": observed_edge_row[3],
+                "observed_count": observed_edge_row[4],
+            }
+            edge_key = self.observed_edge_key(observed_edge)
+            if edge_key in observed_counts_by_edge:
+                observed_counts_by_edge[edge_key]["observed_count"] += observed_edge[
+                    "observed_count"
+                ]
+            else:
+                observed_counts_by_edge[edge_key] = observed_edge
+        return list(observed_counts_by_edge.values())
+
+    def observed_edge_key(self, observed_edge):
+        return (
+            observed_edge["method_selector"],
+            observed_edge["caller_class_name"],
+            observed_edge["caller_show_instance_side"],
+            observed_edge["caller_method_selector"],
         )
 
     def observed_senders_for_selector(
@@ -3185,33 +4479,8 @@ class GemstoneBrowserSession:
         max_results=None,
         count_only=False,
     ):
-        selector_expression = self.selector_reference_expression(method_name)
-        observed_edges_report = self.run_code(
-            "SwordfishMcpTracer observedEdgesReportFor: %s" % selector_expression
-        ).to_py
-        observed_sender_entries = []
-        observed_edge_lines = (
-            [] if observed_edges_report == "" else observed_edges_report.splitlines()
-        )
-        for observed_edge_line in observed_edge_lines:
-            observed_edge_fields = observed_edge_line.split("|")
-            if len(observed_edge_fields) != 4:
-                raise DomainException("Observed tracer edge must have four fields.")
-            caller_class_name = observed_edge_fields[0]
-            caller_show_instance_side = observed_edge_fields[1] == "true"
-            caller_method_selector = observed_edge_fields[2]
-            observed_count = int(observed_edge_fields[3])
-            observed_sender_entries.append(
-                {
-                    "caller_class_name": caller_class_name,
-                    "caller_show_instance_side": caller_show_instance_side,
-                    "caller_method_selector": caller_method_selector,
-                    "method_selector": method_name,
-                    "observed_count": observed_count,
-                }
-            )
         observed_sender_entries = sorted(
-            observed_sender_entries,
+            self.observed_edge_counts(method_name),
             key=lambda observed_sender_entry: (
                 observed_sender_entry["caller_class_name"],
                 observed_sender_entry["caller_show_instance_side"],
@@ -3398,6 +4667,13 @@ class GemstoneBrowserSession:
         }
 
     def get_class_definition(self, class_name):
+        return self.cached_metadata(
+            self.class_cache_scope(class_name),
+            ("class_definition",),
+            lambda: self.uncached_class_definition(class_name),
+        )
+
+    def uncached_class_definition(self, class_name):
         gemstone_class = self.resolved_class(class_name)
         if gemstone_class is None:
             raise DomainException("Unknown class_name.")
@@ -3429,29 +4705,172 @@ class GemstoneBrowserSession:
             "pool_dictionary_names": pool_names,
         }
 
+    def get_class_definitions(self, class_names, include_ancestors=True):
+        class_definitions = {}
+        unresolved_class_names = set()
+        pending_class_names = list(dict.fromkeys(class_names))
+        while pending_class_names:
+            uncached_class_names = []
+            for class_name in pending_class_names:
+                is_cached, class_definition = self.cached_metadata_if_present(
+                    self.class_cache_scope(class_name),
+                    ("class_definition",),
+                )
+                if is_cached:
+                    class_definitions[class_name] = class_definition
+                else:
+                    uncached_class_names.append(class_name)
+            if uncached_class_names:
+                fetched_class_definitions = self.uncached_class_definitions(
+                    uncached_class_names,
+                    include_ancestors,
+                )
+                for class_name, class_definition in fetched_class_definitions.items():
+                    self.store_cached_metadata(
+                        self.class_cache_scope(class_name),
+                        ("class_definition",),
+                        class_definition,
+                    )
+                    class_definitions[class_name] = class_definition
+                unresolved_class_names.update(
+                    set(uncached_class_names) - set(fetched_class_definitions)
+                )
+            pending_class_names = []
+            if include_ancestors:
+                pending_class_names = sorted(
+                    {
+                        class_definition["superclass_name"]
+                        for class_definition in class_definitions.values()
+                        if class_definition["superclass_name"] is not None
+                        and class_definition["superclass_name"] not in class_definitions
+                        and class_definition["superclass_name"]
+                        not in unresolved_class_names
+                    }
+                )
+        return class_definitions
+
+    def uncached_class_definitions(self, class_names, include_ancestors):
+        class_definition_report = self.run_code(
+            self.class_definitions_script(class_names, include_ancestors)
+        ).to_py
+        return self.class_definitions_from_report(class_definition_report)
+
+    def class_definitions_script(self, class_names, include_ancestors):
+        return (
+            "| symbolList includeAncestors emitted stream writeField writeNames |\n"
+            "symbolList := System myUserProfile symbolList.\n"
+            "includeAncestors := %s.\n"
+            "emitted := IdentitySet new.\n"
+            "stream := WriteStream on: String new.\n"
+            "writeField := [ :value |\n"
+            "    stream nextPutAll: value size printString.\n"
+            "    stream nextPut: $:.\n"
+            "    stream nextPutAll: value\n"
+            "].\n"
+            "writeNames := [ :names |\n"
+            "    | namesStream |\n"
+            "    namesStream := WriteStream on: String new.\n"
+            "    names do: [ :each | namesStream nextPutAll: each asString ]\n"
+            "        separatedBy: [ namesStream space ].\n"
+            "    writeField value: namesStream contents\n"
+            "].\n"
+            "%s do: [ :className |\n"
+            "    | gemstoneClass lookupName |\n"
+            "    lookupName := className.\n"
+            "    gemstoneClass := symbolList objectNamed: className asSymbol.\n"
+            "    [ gemstoneClass notNil\n"
+            "        and: [ gemstoneClass isBehavior\n"
+            "        and: [ (emitted includes: gemstoneClass) not ] ] ] whileTrue: [\n"
+            "        | superclass category |\n"
+            "        emitted add: gemstoneClass.\n"
+            "        superclass := gemstoneClass superclass.\n"
+            "        category := gemstoneClass category.\n"
+            "        writeField value: lookupName.\n"
+            "        writeField value: gemstoneClass name asString.\n"
+            "        writeField value: (superclass isNil\n"
+            "            ifTrue: [ '' ]\n"
+            "            ifFalse: [ superclass name asString ]).\n"
+            "        writeField value: (category isNil\n"
+            "            ifTrue: [ '' ]\n"
+            "            ifFalse: [ category asString ]).\n"
+            "        writeNames value: gemstoneClass instVarNames.\n"
+            "        writeNames value: gemstoneClass classVarNames.\n"
+            "        writeNames value: gemstoneClass class instVarNames.\n"
+            "        writeNames value: (gemstoneClass allSharedPools\n"
+            "            collect: [ :each | each name ]).\n"
+            "        gemstoneClass := includeAncestors\n"
+            "            ifTrue: [ superclass ]\n"
+            "            ifFalse: [ nil ].\n"
+            "        superclass isNil ifFalse: [ lookupName := superclass name asString ]\n"
+            "    ]\n"
+            "].\n"
+            "stream contents"
+        ) % (
+            "true" if include_ancestors else "false",
+            self.string_array_literal(class_names),
+        )
+
+    def class_definitions_from_report(self, class_definition_report):
+        report_fields = self.length_prefixed_fields_from_report(class_definition_report)
+        if len(report_fields) % 8 != 0:
+            raise DomainException(
+                "Class definition report must have eight fields per row."
+            )
+        class_definitions = {}
+        for index in range(0, len(report_fields), 8):
+            class_definitions[report_fields[index]] = {
+                "class_name": report_fields[index + 1],
+                "superclass_name": report_fields[index + 2] or None,
+                "package_name": report_fields[index + 3] or None,
+                "inst_var_names": report_fields[index + 4].split(),
+                "class_var_names": report_fields[index + 5].split(),
+                "class_inst_var_names": report_fields[index + 6].split(),
+                "pool_dictionary_names": report_fields[index + 7].split(),
+            }
+        return class_definitions
+
     def delete_class(self, class_name, in_dictionary="UserGlobals"):
+        self.invalidate_cached_class(class_name)
         return self.run_code(
             (
                 "| classToDelete |\n"
                 "classToDelete := %s at: #%s ifAbsent: [ nil ].\n"
+                "%s"
                 "classToDelete ifNotNil: [\n"
                 "    classToDelete removeAllMethods: 0.\n"
                 "    classToDelete class removeAllMethods: 0.\n"
                 "    %s removeKey: #%s ifAbsent: [].\n"
                 "]."
             )
-            % (in_dictionary, class_name, in_dictionary, class_name)
+            % (
+                in_dictionary,
+                class_name,
+                self.change_journal_recording_source(
+                    "class_removed",
+                    [(class_name, True, "")],
+                ),
+                in_dictionary,
+                class_name,
+            )
         )
 
     def delete_method(self, class_name, method_selector, show_instance_side):
+        self.invalidate_cached_class_side(class_name, show_instance_side)
         class_reference = self.class_reference_expression(
             class_name,
             show_instance_side,
         )
         selector_literal = self.smalltalk_string_literal(method_selector)
         return self.run_code(
-            ("%s removeSelector: (%s asSymbol) " "environmentId: 0 ifAbsent: []")
-            % (class_reference, selector_literal)
+            ("%s" "%s removeSelector: (%s asSymbol) environmentId: 0 ifAbsent: []")
+            % (
+                self.change_journal_recording_source(
+                    "method_removed",
+                    [(class_name, show_instance_side, method_selector)],
+                ),
+                class_reference,
+                selector_literal,
+            )
         )
 
     def set_method_category(
@@ -3484,6 +4903,7 @@ class GemstoneBrowserSession:
             show_instance_side,
         )
         category_literal = self.smalltalk_string_literal(method_category)
+        self.invalidate_cached_class_side(class_name, show_instance_side)
         return self.run_code(
             (
                 "| classToQuery categoryName categorySymbol |\n"
@@ -3508,6 +4928,7 @@ class GemstoneBrowserSession:
             show_instance_side,
         )
         category_literal = self.smalltalk_string_literal(method_category)
+        self.invalidate_cached_class_side(class_name, show_instance_side)
         return self.run_code(
             (
                 "| classToQuery categoryName categorySymbol selectors |\n"
@@ -3566,7 +4987,19 @@ class GemstoneBrowserSession:
             target_show_instance_side,
             method_selector,
         )
-        return self.method_move_summary(move_plan)
+        preview = self.method_move_summary(move_plan)
+        preview["plan_id"] = self.remembered_refactoring_plan(
+            "method_move",
+            [
+                source_class_name,
+                source_show_instance_side,
+                target_class_name,
+                target_show_instance_side,
+                method_selector,
+            ],
+            move_plan,
+        )
+        return preview
 
     def apply_method_move(
         self,
@@ -3577,6 +5010,7 @@ class GemstoneBrowserSession:
         method_selector,
         overwrite_target_method=False,
         delete_source_method=True,
+        plan_id=None,
     ):
         self.ensure_refactoring_uses_real_ast("method move apply")
         source_show_instance_side = self.validated_show_instance_side(
@@ -3593,13 +5027,25 @@ class GemstoneBrowserSession:
             delete_source_method,
             "delete_source_method",
         )
-        move_plan = self.method_move_plan(
-            source_class_name,
-            source_show_instance_side,
-            target_class_name,
-            target_show_instance_side,
-            method_selector,
+        move_plan = self.previewed_refactoring_plan(
+            plan_id,
+            "method_move",
+            [
+                source_class_name,
+                source_show_instance_side,
+                target_class_name,
+                target_show_instance_side,
+                method_selector,
+            ],
         )
+        if move_plan is None:
+            move_plan = self.method_move_plan(
+                source_class_name,
+                source_show_instance_side,
+                target_class_name,
+                target_show_instance_side,
+                method_selector,
+            )
         if move_plan["target_has_method"] and not overwrite_target_method:
             raise DomainException(
                 (
@@ -3612,11 +5058,16 @@ class GemstoneBrowserSession:
                     method_selector,
                 )
             )
-        self.compile_method(
-            class_name=target_class_name,
-            show_instance_side=target_show_instance_side,
-            source=move_plan["source_method_source"],
-            method_category=move_plan["source_method_category"],
+        self.ensure_methods_compiled(
+            [
+                {
+                    "class_name": target_class_name,
+                    "show_instance_side": target_show_instance_side,
+                    "source": move_plan["source_method_source"],
+                    "method_category": move_plan["source_method_category"],
+                    "method_selector": method_selector,
+                }
+            ]
         )
         source_deleted = False
         if delete_source_method:
@@ -3631,6 +5082,7 @@ class GemstoneBrowserSession:
         summary["overwrite_target_method"] = overwrite_target_method
         summary["delete_source_method"] = delete_source_method
         summary["source_deleted"] = source_deleted
+        self.refactoring_plans.remove(plan_id)
         return summary
 
     def method_move_plan(
@@ -3774,7 +5226,20 @@ class GemstoneBrowserSession:
             parameter_name,
             default_argument_source,
         )
-        return self.method_add_parameter_summary(add_parameter_plan)
+        preview = self.method_add_parameter_summary(add_parameter_plan)
+        preview["plan_id"] = self.remembered_refactoring_plan(
+            "method_add_parameter",
+            [
+                class_name,
+                show_instance_side,
+                method_selector,
+                parameter_keyword,
+                parameter_name,
+                default_argument_source,
+            ],
+            add_parameter_plan,
+        )
+        return preview
 
     def apply_method_add_parameter(
         self,
@@ -3784,31 +5249,50 @@ class GemstoneBrowserSession:
         parameter_keyword,
         parameter_name,
         default_argument_source,
+        plan_id=None,
     ):
         self.ensure_refactoring_uses_real_ast("add parameter apply")
         show_instance_side = self.validated_show_instance_side(show_instance_side)
-        add_parameter_plan = self.method_add_parameter_plan(
-            class_name,
-            show_instance_side,
-            method_selector,
-            parameter_keyword,
-            parameter_name,
-            default_argument_source,
-        )
-        self.compile_method(
-            class_name=class_name,
-            show_instance_side=show_instance_side,
-            source=add_parameter_plan["new_method_source"],
-            method_category=add_parameter_plan["method_category"],
+        add_parameter_plan = self.previewed_refactoring_plan(
+            plan_id,
+            "method_add_parameter",
+            [
+                class_name,
+                show_instance_side,
+                method_selector,
+                parameter_keyword,
+                parameter_name,
+                default_argument_source,
+            ],
         )
-        self.compile_method(
-            class_name=class_name,
-            show_instance_side=show_instance_side,
-            source=add_parameter_plan["compatibility_wrapper_source"],
-            method_category=add_parameter_plan["method_category"],
+        if add_parameter_plan is None:
+            add_parameter_plan = self.method_add_parameter_plan(
+                class_name,
+                show_instance_side,
+                method_selector,
+                parameter_keyword,
+                parameter_name,
+                default_argument_source,
+            )
+        self.ensure_methods_compiled(
+            [
+                {
+                    "class_name": class_name,
+                    "show_instance_side": show_instance_side,
+                    "source": add_parameter_plan["new_method_source"],
+                    "method_category": add_parameter_plan["method_category"],
+                },
+                {
+                    "class_name": class_name,
+                    "show_instance_side": show_instance_side,
+                    "source": add_parameter_plan["compatibility_wrapper_source"],
+                    "method_category": add_parameter_plan["method_category"],
+                },
+            ]
         )
         summary = self.method_add_parameter_summary(add_parameter_plan)
         summary["applied"] = True
+        self.refactoring_plans.remove(plan_id)
         return summary
 
     def method_add_parameter_plan(
@@ -3970,7 +5454,19 @@ class GemstoneBrowserSession:
             parameter_keyword,
             rewrite_source_senders=rewrite_source_senders,
         )
-        return self.method_remove_parameter_summary(remove_parameter_plan)
+        preview = self.method_remove_parameter_summary(remove_parameter_plan)
+        preview["plan_id"] = self.remembered_refactoring_plan(
+            "method_remove_parameter",
+            [
+                class_name,
+                show_instance_side,
+                method_selector,
+                parameter_keyword,
+                rewrite_source_senders,
+            ],
+            remove_parameter_plan,
+        )
+        return preview
 
     def apply_method_remove_parameter(
         self,
@@ -3980,6 +5476,7 @@ class GemstoneBrowserSession:
         parameter_keyword,
         overwrite_new_method=False,
         rewrite_source_senders=False,
+        plan_id=None,
     ):
         self.ensure_refactoring_uses_real_ast("remove parameter apply")
         show_instance_side = self.validated_show_instance_side(show_instance_side)
@@ -3991,13 +5488,25 @@ class GemstoneBrowserSession:
             rewrite_source_senders,
             "rewrite_source_senders",
         )
-        remove_parameter_plan = self.method_remove_parameter_plan(
-            class_name,
-            show_instance_side,
-            method_selector,
-            parameter_keyword,
-            rewrite_source_senders=rewrite_source_senders,
+        remove_parameter_plan = self.previewed_refactoring_plan(
+            plan_id,
+            "method_remove_parameter",
+            [
+                class_name,
+                show_instance_side,
+                method_selector,
+                parameter_keyword,
+                rewrite_source_senders,
+            ],
         )
+        if remove_parameter_plan is None:
+            remove_parameter_plan = self.method_remove_parameter_plan(
+                class_name,
+                show_instance_side,
+                method_selector,
+                parameter_keyword,
+                rewrite_source_senders=rewrite_source_senders,
+            )
         if remove_parameter_plan["new_selector_exists"] and not overwrite_new_method:
             raise DomainException(
                 (
@@ -4010,28 +5519,33 @@ class GemstoneBrowserSession:
                     "instance" if show_instance_side else "class",
                 )
             )
-        self.compile_method(
-            class_name=class_name,
-            show_instance_side=show_instance_side,
-            source=remove_parameter_plan["new_method_source"],
-            method_category=remove_parameter_plan["method_category"],
-        )
-        self.compile_method(
-            class_name=class_name,
-            show_instance_side=show_instance_side,
-            source=remove_parameter_plan["compatibility_wrapper_source"],
-            method_category=remove_parameter_plan["method_category"],
-        )
+        method_entries = [
+            {
+                "class_name": class_name,
+                "show_instance_side": show_instance_side,
+                "source": remove_parameter_plan["new_method_source"],
+                "method_category": remove_parameter_plan["method_category"],
+            },
+            {
+                "class_name": class_name,
+                "show_instance_side": show_instance_side,
+                "source": remove_parameter_plan["compatibility_wrapper_source"],
+                "method_category": remove_parameter_plan["method_category"],
+            },
+        ]
         if rewrite_source_senders:
-            for caller_rewrite_plan in remove_parameter_plan[
-                "source_sender_rewrite_plans"
-            ]:
-                self.compile_method(
-                    class_name=class_name,
-                    show_instance_side=show_instance_side,
-                    source=caller_rewrite_plan["updated_source"],
-                    method_category=caller_rewrite_plan["method_category"],
-                )
+            method_entries.extend(
+                {
+                    "class_name": class_name,
+                    "show_instance_side": show_instance_side,
+                    "source": caller_rewrite_plan["updated_source"],
+                    "method_category": caller_rewrite_plan["method_category"],
+                }
+                for caller_rewrite_plan in remove_parameter_plan[
+                    "source_sender_rewrite_plans"
+                ]
+            )
+        self.ensure_methods_compiled(method_entries)
         summary = self.method_remove_parameter_summary(remove_parameter_plan)
         summary["applied"] = True
         summary["overwrite_new_method"] = overwrite_new_method
@@ -4039,6 +5553,7 @@ class GemstoneBrowserSession:
         summary["rewritten_source_sender_count"] = len(
             remove_parameter_plan["source_sender_rewrite_plans"]
         )
+        self.refactoring_plans.remove(plan_id)
         return summary
 
     def method_remove_parameter_plan(
@@ -4431,7 +5946,19 @@ class GemstoneBrowserSession:
             new_selector,
             statement_indexes,
         )
-        return self.method_extract_summary(extract_plan)
+        preview = self.method_extract_summary(extract_plan)
+        preview["plan_id"] = self.remembered_refactoring_plan(
+            "method_extract",
+            [
+                class_name,
+                show_instance_side,
+                method_selector,
+                new_selector,
+                statement_indexes,
+            ],
+            extract_plan,
+        )
+        return preview
 
     def apply_method_extract(
         self,
@@ -4441,6 +5968,7 @@ class GemstoneBrowserSession:
         new_selector,
         statement_indexes,
         overwrite_new_method=False,
+        plan_id=None,
     ):
         self.ensure_refactoring_uses_real_ast("extract method apply")
         show_instance_side = self.validated_show_instance_side(show_instance_side)
@@ -4448,13 +5976,25 @@ class GemstoneBrowserSession:
             overwrite_new_method,
             "overwrite_new_method",
         )
-        extract_plan = self.method_extract_plan(
-            class_name,
-            show_instance_side,
-            method_selector,
-            new_selector,
-            statement_indexes,
+        extract_plan = self.previewed_refactoring_plan(
+            plan_id,
+            "method_extract",
+            [
+                class_name,
+                show_instance_side,
+                method_selector,
+                new_selector,
+                statement_indexes,
+            ],
         )
+        if extract_plan is None:
+            extract_plan = self.method_extract_plan(
+                class_name,
+                show_instance_side,
+                method_selector,
+                new_selector,
+                statement_indexes,
+            )
         if extract_plan["new_selector_exists"] and not overwrite_new_method:
             raise DomainException(
                 (
@@ -4467,21 +6007,28 @@ class GemstoneBrowserSession:
                     "instance" if show_instance_side else "class",
                 )
             )
-        self.compile_method(
-            class_name=class_name,
-            show_instance_side=show_instance_side,
-            source=extract_plan["new_method_source"],
-            method_category=extract_plan["method_category"],
-        )
-        self.compile_method(
-            class_name=class_name,
-            show_instance_side=show_instance_side,
-            source=extract_plan["updated_method_source"],
-            method_category=extract_plan["method_category"],
+        self.ensure_methods_compiled(
+            [
+                {
+                    "class_name": class_name,
+                    "show_instance_side": show_instance_side,
+                    "source": extract_plan["new_method_source"],
+                    "method_category": extract_plan["method_category"],
+                    "method_selector": new_selector,
+                },
+                {
+                    "class_name": class_name,
+                    "show_instance_side": show_instance_side,
+                    "source": extract_plan["updated_method_source"],
+                    "method_category": extract_plan["method_category"],
+                    "method_selector": method_selector,
+                },
+            ]
         )
         summary = self.method_extract_summary(extract_plan)
         summary["applied"] = True
         summary["overwrite_new_method"] = overwrite_new_method
+        self.refactoring_plans.remove(plan_id)
         return summary
 
     def method_extract_plan(
@@ -4785,7 +6332,18 @@ class GemstoneBrowserSession:
             caller_selector,
             inline_selector,
         )
-        return self.method_inline_summary(inline_plan)
+        preview = self.method_inline_summary(inline_plan)
+        preview["plan_id"] = self.remembered_refactoring_plan(
+            "method_inline",
+            [
+                class_name,
+                show_instance_side,
+                caller_selector,
+                inline_selector,
+            ],
+            inline_plan,
+        )
+        return preview
 
     def apply_method_inline(
         self,
@@ -4794,6 +6352,7 @@ class GemstoneBrowserSession:
         caller_selector,
         inline_selector,
         delete_inlined_method=False,
+        plan_id=None,
     ):
         self.ensure_refactoring_uses_real_ast("inline method apply")
         show_instance_side = self.validated_show_instance_side(show_instance_side)
@@ -4801,17 +6360,33 @@ class GemstoneBrowserSession:
             delete_inlined_method,
             "delete_inlined_method",
         )
-        inline_plan = self.method_inline_plan(
-            class_name,
-            show_instance_side,
-            caller_selector,
-            inline_selector,
+        inline_plan = self.previewed_refactoring_plan(
+            plan_id,
+            "method_inline",
+            [
+                class_name,
+                show_instance_side,
+                caller_selector,
+                inline_selector,
+            ],
         )
-        self.compile_method(
-            class_name=class_name,
-            show_instance_side=show_instance_side,
-            source=inline_plan["updated_caller_source"],
-            method_category=inline_plan["caller_method_category"],
+        if inline_plan is None:
+            inline_plan = self.method_inline_plan(
+                class_name,
+                show_instance_side,
+                caller_selector,
+                inline_selector,
+            )
+        self.ensure_methods_compiled(
+            [
+                {
+                    "class_name": class_name,
+                    "show_instance_side": show_instance_side,
+                    "source": inline_plan["updated_caller_source"],
+                    "method_category": inline_plan["caller_method_category"],
+                    "method_selector": caller_selector,
+                }
+            ]
         )
         if delete_inlined_method:
             self.delete_method(
@@ -4822,6 +6397,7 @@ class GemstoneBrowserSession:
         summary = self.method_inline_summary(inline_plan)
         summary["applied"] = True
         summary["delete_inlined_method"] = delete_inlined_method
+        self.refactoring_plans.remove(plan_id)
         return summary
 
     def method_inline_plan(
@@ -5241,6 +6817,22 @@ class GemstoneBrowserSession:
             old_selector,
             new_selector,
         )
+        preview = self.selector_rename_summary(
+            old_selector,
+            new_selector,
+            planned_changes,
+        )
+        preview["plan_id"] = self.remembered_refactoring_plan(
+            "selector_rename",
+            [
+                old_selector,
+                new_selector,
+            ],
+            planned_changes,
+        )
+        return preview
+
+    def selector_rename_summary(self, old_selector, new_selector, planned_changes):
         return {
             "old_selector": old_selector,
             "new_selector": new_selector,
@@ -5271,19 +6863,24 @@ class GemstoneBrowserSession:
             ],
         }
 
-    def apply_selector_rename(self, old_selector, new_selector):
+    def apply_selector_rename(self, old_selector, new_selector, plan_id=None):
         self.ensure_refactoring_uses_real_ast("selector rename apply")
-        planned_changes = self.selector_rename_plan(
-            old_selector,
-            new_selector,
+        planned_changes = self.previewed_refactoring_plan(
+            plan_id,
+            "selector_rename",
+            [
+                old_selector,
+                new_selector,
+            ],
         )
-        for planned_change in planned_changes:
-            self.compile_method(
-                class_name=planned_change["class_name"],
-                show_instance_side=planned_change["show_instance_side"],
-                source=planned_change["updated_source"],
-                method_category=planned_change["method_category"],
+        if planned_changes is None:
+            planned_changes = self.selector_rename_plan(
+                old_selector,
+                new_selector,
             )
+        self.ensure_methods_compiled(
+            self.method_entries_for_planned_changes(planned_changes)
+        )
         if old_selector != new_selector:
             deleted_implementors = set()
             for planned_change in planned_changes:
@@ -5302,11 +6899,229 @@ class GemstoneBrowserSession:
                         show_instance_side=planned_change["show_instance_side"],
                     )
                     deleted_implementors.add(implementor_key)
-        preview = self.selector_rename_preview(old_selector, new_selector)
+        preview = self.selector_rename_summary(
+            old_selector,
+            new_selector,
+            planned_changes,
+        )
         preview["applied_change_count"] = len(planned_changes)
         preview["old_selector_removed"] = old_selector != new_selector
+        self.refactoring_plans.remove(plan_id)
         return preview
 
+    def method_entries_for_planned_changes(self, planned_changes):
+        return [
+            {
+                "class_name": planned_change["class_name"],
+                "show_instance_side": planned_change["show_instance_side"],
+                "source": planned_change["updated_source"],
+                "method_category": planned_change["method_category"],
+            }
+            for planned_change in planned_changes
+        ]
+
+    def remembered_refactoring_plan(self, refactoring_kind, arguments, plan):
+        method_keys = self.refactoring_plan_method_keys(
+            refactoring_kind,
+            arguments,
+            plan,
+        )
+        method_fingerprints, usage_fingerprint = self.current_refactoring_fingerprints(
+            method_keys,
+            self.refactoring_plan_usage_selector(refactoring_kind, arguments),
+        )
+        return self.refactoring_plans.add(
+            RefactoringPlan(
+                refactoring_kind,
+                arguments,
+                plan,
+                method_fingerprints,
+                usage_fingerprint=usage_fingerprint,
+            )
+        )
+
+    def previewed_refactoring_plan(self, plan_id, refactoring_kind, arguments):
+        if plan_id is None:
+            return None
+        refactoring_plan = self.refactoring_plans.get(plan_id)
+        if refactoring_plan is None:
+            raise DomainException(
+                "Unknown or expired plan_id %s. Preview the refactoring again."
+                % plan_id
+            )
+        is_same_refactoring = (
+            refactoring_plan.refactoring_kind == refactoring_kind
+            and refactoring_plan.arguments == arguments
+        )
+        if not is_same_refactoring:
+            raise DomainException(
+                "plan_id %s was previewed for a different refactoring." % plan_id
+            )
+        previewed_fingerprints = refactoring_plan.method_fingerprints
+        usage_selector = self.refactoring_plan_usage_selector(
+            refactoring_kind,
+            arguments,
+        )
+        current_fingerprints, usage_fingerprint = self.current_refactoring_fingerprints(
+            list(previewed_fingerprints.keys()),
+            usage_selector,
+        )
+        changed_method_names = [
+            "%s%s>>%s"
+            % (
+                class_name,
+                "" if show_instance_side else " class",
+                method_selector,
+            )
+            for (
+                class_name,
+                show_instance_side,
+                method_selector,
+            ), fingerprint in previewed_fingerprints.items()
+            if current_fingerprints[(class_name, show_instance_side, method_selector)]
+            != fingerprint
+        ]
+        if changed_method_names:
+            self.refactoring_plans.remove(plan_id)
+            raise DomainException(
+                "Methods changed since plan_id %s was previewed: %s. "
+                "Preview the refactoring again."
+                % (plan_id, ", ".join(changed_method_names))
+            )
+        if usage_fingerprint != refactoring_plan.usage_fingerprint:
+            self.refactoring_plans.remove(plan_id)
+            raise DomainException(
+                "Senders or implementors of %s changed since plan_id %s was "
+                "previewed. Preview the refactoring again." % (usage_selector, plan_id)
+            )
+        return refactoring_plan.plan
+
+    def refactoring_plan_usage_selector(self, refactoring_kind, arguments):
+        if refactoring_kind == "selector_rename":
+            return arguments[0]
+        if refactoring_kind == "method_rename":
+            return arguments[2]
+        return None
+
+    def refactoring_plan_method_keys(self, refactoring_kind, arguments, plan):
+        if refactoring_kind in ("selector_rename", "method_rename"):
+            method_keys = []
+            for planned_change in plan:
+                method_keys.append(
+                    (
+                        planned_change["class_name"],
+                        planned_change["show_instance_side"],
+                        planned_change["method_selector"],
+                    )
+                )
+                if planned_change["change_type"] == "implementor":
+                    method_keys.append(
+                        (
+                            planned_change["class_name"],
+                            planned_change["show_instance_side"],
+                            arguments[-1],
+                        )
+                    )
+            return method_keys
+        if refactoring_kind == "method_move":
+            return [
+                (
+                    plan["source_class_name"],
+                    plan["source_show_instance_side"],
+                    plan["method_selector"],
+                ),
+                (
+                    plan["target_class_name"],
+                    plan["target_show_instance_side"],
+                    plan["method_selector"],
+                ),
+            ]
+        if refactoring_kind == "method_inline":
+            changed_selectors = [plan["caller_selector"], plan["inline_selector"]]
+        elif refactoring_kind == "method_extract":
+            changed_selectors = [plan["method_selector"], plan["new_selector"]]
+        else:
+            changed_selectors = [plan["old_selector"], plan["new_selector"]] + [
+                caller_rewrite_plan["method_selector"]
+                for caller_rewrite_plan in plan.get("source_sender_rewrite_plans", [])
+            ]
+        return [
+            (plan["class_name"], plan["show_instance_side"], changed_selector)
+            for changed_selector in changed_selectors
+        ]
+
+    def current_refactoring_fingerprints(self, method_keys, usage_selector=None):
+        unique_method_keys = list(dict.fromkeys(method_keys))
+        row_fields = []
+        for class_name, show_instance_side, method_selector in unique_method_keys:
+            row_fields.extend(
+                [
+                    class_name,
+                    "true" if show_instance_side else "false",
+                    method_selector,
+                ]
+            )
+        if not unique_method_keys and usage_selector is None:
+            return {}, None
+        method_sources, usage_names = self.json_report(
+            (
+                "| symbolList rowFields usageSelector usageNames collectUsages |\n"
+                "symbolList := System myUserProfile symbolList.\n"
+                "rowFields := %s.\n"
+                "usageSelector := %s.\n"
+                "usageNames := nil.\n"
+                "usageSelector isNil\n"
+                "    ifFalse: [\n"
+                "        usageNames := SortedCollection new.\n"
+                "        collectUsages := nil.\n"
+                "        collectUsages := [ :candidate |\n"
+                "            candidate class name = #GsNMethod\n"
+                "                ifTrue: [\n"
+                "                    usageNames add: candidate inClass name asString, '>>',\n"
+                "                        candidate selector asString\n"
+                "                ]\n"
+                "                ifFalse: [\n"
+                "                    (candidate isKindOf: Collection) ifTrue: [\n"
+                "                        candidate do: [ :each | collectUsages value: each ]\n"
+                "                    ]\n"
+                "                ]\n"
+                "        ].\n"
+                "        collectUsages value: (ClassOrganizer new implementorsOf: usageSelector).\n"
+                "        collectUsages value: (ClassOrganizer new sendersOf: usageSelector).\n"
+                "        usageNames := usageNames asArray\n"
+                "    ].\n"
+                "Array\n"
+                "    with: ((1 to: rowFields size by: 3) collect: [ :index |\n"
+                "        | classToQuery selector |\n"
+                "        classToQuery := symbolList objectNamed: (rowFields at: index) asSymbol.\n"
+                "        (classToQuery notNil and: [ (rowFields at: index + 1) = 'false' ])\n"
+                "            ifTrue: [ classToQuery := classToQuery class ].\n"
+                "        selector := (rowFields at: index + 2) asSymbol.\n"
+                "        (classToQuery notNil and: [ classToQuery includesSelector: selector ])\n"
+                "            ifTrue: [ (classToQuery compiledMethodAt: selector) sourceString ]\n"
+                "            ifFalse: [ nil ]\n"
+                "    ])\n"
+                "    with: usageNames"
+            )
+            % (
+                self.string_array_literal(row_fields),
+                (
+                    "nil"
+                    if usage_selector is None
+                    else self.selector_reference_expression(usage_selector)
+                ),
+            )
+        )
+        usage_fingerprint = (
+            None
+            if usage_names is None
+            else method_source_fingerprint("\n".join(usage_names))
+        )
+        return {
+            method_key: method_source_fingerprint(method_source)
+            for method_key, method_source in zip(unique_method_keys, method_sources)
+        }, usage_fingerprint
+
     def method_rename_preview(
         self,
         class_name,
@@ -5322,13 +7137,24 @@ class GemstoneBrowserSession:
             old_selector,
             new_selector,
         )
-        return self.method_rename_summary(
+        preview = self.method_rename_summary(
             class_name,
             show_instance_side,
             old_selector,
             new_selector,
             planned_changes,
         )
+        preview["plan_id"] = self.remembered_refactoring_plan(
+            "method_rename",
+            [
+                class_name,
+                show_instance_side,
+                old_selector,
+                new_selector,
+            ],
+            planned_changes,
+        )
+        return preview
 
     def apply_method_rename(
         self,
@@ -5336,22 +7162,30 @@ class GemstoneBrowserSession:
         show_instance_side,
         old_selector,
         new_selector,
+        plan_id=None,
     ):
         self.ensure_refactoring_uses_real_ast("method rename apply")
         show_instance_side = self.validated_show_instance_side(show_instance_side)
-        planned_changes = self.method_rename_plan(
-            class_name,
-            show_instance_side,
-            old_selector,
-            new_selector,
+        planned_changes = self.previewed_refactoring_plan(
+            plan_id,
+            "method_rename",
+            [
+                class_name,
+                show_instance_side,
+                old_selector,
+                new_selector,
+            ],
         )
-        for planned_change in planned_changes:
-            self.compile_method(
-                class_name=planned_change["class_name"],
-                show_instance_side=planned_change["show_instance_side"],
-                source=planned_change["updated_source"],
-                method_category=planned_change["method_category"],
+        if planned_changes is None:
+            planned_changes = self.method_rename_plan(
+                class_name,
+                show_instance_side,
+                old_selector,
+                new_selector,
             )
+        self.ensure_methods_compiled(
+            self.method_entries_for_planned_changes(planned_changes)
+        )
         has_implementor_change = any(
             planned_change["change_type"] == "implementor"
             for planned_change in planned_changes
@@ -5374,6 +7208,7 @@ class GemstoneBrowserSession:
         )
         preview["applied_change_count"] = len(planned_changes)
         preview["old_selector_removed"] = should_remove_old_selector
+        self.refactoring_plans.remove(plan_id)
         return preview
 
     def method_rename_summary(
@@ -5425,42 +7260,49 @@ class GemstoneBrowserSession:
         new_selector,
     ):
         show_instance_side = self.validated_show_instance_side(show_instance_side)
-        class_to_query = self.class_to_query(
+        self.class_to_query(
             class_name,
             show_instance_side,
         )
-        implementor_method = class_to_query.compiledMethodAt(old_selector)
         selector_expression = self.selector_reference_expression(old_selector)
-        senders = self.run_code(
-            "ClassOrganizer new sendersOf: %s" % selector_expression
+        implementor_rows = self.method_occurrence_rows(
+            "%s compiledMethodAt: %s"
+            % (
+                self.class_reference_expression(class_name, show_instance_side),
+                selector_expression,
+            ),
+            include_source=True,
+        )
+        sender_rows = self.method_occurrence_rows(
+            "ClassOrganizer new sendersOf: %s" % selector_expression,
+            include_source=True,
         )
-        sender_methods = self.flatten_compiled_methods(senders)
         planned_changes = []
         planned_method_keys = set()
-        implementor_change = self.planned_selector_rename_change(
-            implementor_method,
-            old_selector,
-            new_selector,
-            "implementor",
-        )
-        if implementor_change is not None:
-            planned_changes.append(implementor_change)
-            planned_method_keys.add(
-                (
-                    implementor_change["class_name"],
-                    implementor_change["show_instance_side"],
-                    implementor_change["method_selector"],
-                )
+        for implementor_row in implementor_rows:
+            implementor_change = self.planned_selector_rename_change(
+                implementor_row,
+                old_selector,
+                new_selector,
+                "implementor",
             )
-        for compiled_method in sender_methods:
-            method_summary = self.method_summary(compiled_method)
+            if implementor_change is not None:
+                planned_changes.append(implementor_change)
+                planned_method_keys.add(
+                    (
+                        implementor_change["class_name"],
+                        implementor_change["show_instance_side"],
+                        implementor_change["method_selector"],
+                    )
+                )
+        for sender_row in sender_rows:
             matches_target_class = (
-                method_summary["class_name"] == class_name
-                and method_summary["show_instance_side"] == show_instance_side
+                sender_row["class_name"] == class_name
+                and sender_row["show_instance_side"] == show_instance_side
             )
             if matches_target_class:
                 planned_change = self.planned_selector_rename_change(
-                    compiled_method,
+                    sender_row,
                     old_selector,
                     new_selector,
                     "sender",
@@ -5493,19 +7335,19 @@ class GemstoneBrowserSession:
 
     def selector_rename_plan(self, old_selector, new_selector):
         selector_expression = self.selector_reference_expression(old_selector)
-        implementors = self.run_code(
-            "ClassOrganizer new implementorsOf: %s" % selector_expression
+        implementor_rows = self.method_occurrence_rows(
+            "ClassOrganizer new implementorsOf: %s" % selector_expression,
+            include_source=True,
         )
-        senders = self.run_code(
-            "ClassOrganizer new sendersOf: %s" % selector_expression
+        sender_rows = self.method_occurrence_rows(
+            "ClassOrganizer new sendersOf: %s" % selector_expression,
+            include_source=True,
         )
-        implementor_methods = self.flatten_compiled_methods(implementors)
-        sender_methods = self.flatten_compiled_methods(senders)
         planned_changes = []
         planned_method_keys = set()
-        for compiled_method in implementor_methods:
+        for implementor_row in implementor_rows:
             planned_change = self.planned_selector_rename_change(
-                compiled_method,
+                implementor_row,
                 old_selector,
                 new_selector,
                 "implementor",
@@ -5519,9 +7361,9 @@ class GemstoneBrowserSession:
                         planned_change["method_selector"],
                     )
                 )
-        for compiled_method in sender_methods:
+        for sender_row in sender_rows:
             planned_change = self.planned_selector_rename_change(
-                compiled_method,
+                sender_row,
                 old_selector,
                 new_selector,
                 "sender",
@@ -5552,27 +7394,89 @@ class GemstoneBrowserSession:
             ),
         )
 
-    def flatten_compiled_methods(self, candidate_value):
-        flattened_methods = []
-        candidate_class_name = candidate_value.gemstone_class().name().to_py
-        if candidate_class_name == "GsNMethod":
-            flattened_methods.append(candidate_value)
-        else:
-            try:
-                for nested_candidate in candidate_value:
-                    flattened_methods += self.flatten_compiled_methods(nested_candidate)
-            except (TypeError, GemstoneError, GemstoneApiError):
-                flattened_methods = []
-        return flattened_methods
+    def method_occurrence_rows(self, occurrence_expression, include_source=False):
+        occurrence_report = self.run_code(
+            self.method_occurrence_script(occurrence_expression, include_source)
+        ).to_py
+        return self.method_occurrence_rows_from_report(
+            occurrence_report,
+            include_source,
+        )
+
+    def method_occurrence_script(self, occurrence_expression, include_source):
+        return (
+            "| includeSource stream writeField writeMethods |\n"
+            "includeSource := %s.\n"
+            "stream := WriteStream on: String new.\n"
+            "writeField := [ :value |\n"
+            "    stream nextPutAll: value size printString.\n"
+            "    stream nextPut: $:.\n"
+            "    stream nextPutAll: value\n"
+            "].\n"
+            "writeMethods := nil.\n"
+            "writeMethods := [ :candidate |\n"
+            "    candidate class name = #GsNMethod\n"
+            "        ifTrue: [\n"
+            "            | behavior category |\n"
+            "            behavior := candidate inClass.\n"
+            "            category := behavior categoryOfSelector: candidate selector.\n"
+            "            writeField value: behavior name asString.\n"
+            "            writeField value: behavior isMeta printString.\n"
+            "            writeField value: candidate selector asString.\n"
+            "            writeField value: (category isNil\n"
+            "                ifTrue: [ '' ]\n"
+            "                ifFalse: [ category asString ]).\n"
+            "            includeSource ifTrue: [\n"
+            "                writeField value: candidate sourceString\n"
+            "            ]\n"
+            "        ]\n"
+            "        ifFalse: [\n"
+            "            (candidate isKindOf: Collection) ifTrue: [\n"
+            "                candidate do: [ :each | writeMethods value: each ]\n"
+            "            ]\n"
+            "        ]\n"
+            "].\n"
+            "writeMethods value: (%s).\n"
+            "stream contents"
+        ) % (
+            "true" if include_source else "false",
+            occurrence_expression,
+        )
+
+    def method_occurrence_rows_from_report(self, occurrence_report, include_source):
+        report_fields = self.length_prefixed_fields_from_report(occurrence_report)
+        field_count = 5 if include_source else 4
+        if len(report_fields) % field_count != 0:
+            raise DomainException(
+                "Method occurrence report must have %s fields per row." % field_count
+            )
+        occurrence_rows = []
+        for index in range(0, len(report_fields), field_count):
+            show_instance_side = report_fields[index + 1] != "true"
+            in_class_name = report_fields[index]
+            occurrence_row = {
+                "class_name": (
+                    in_class_name[:-6]
+                    if not show_instance_side and in_class_name.endswith(" class")
+                    else in_class_name
+                ),
+                "show_instance_side": show_instance_side,
+                "method_selector": report_fields[index + 2],
+                "method_category": report_fields[index + 3] or None,
+            }
+            if include_source:
+                occurrence_row["source"] = report_fields[index + 4]
+            occurrence_rows.append(occurrence_row)
+        return occurrence_rows
 
     def planned_selector_rename_change(
         self,
-        compiled_method,
+        method_row,
         old_selector,
         new_selector,
         change_type,
     ):
-        source = compiled_method.sourceString().to_py
+        source = method_row["source"]
         updated_source = self.renamed_selector_source(
             source,
             old_selector,
@@ -5580,25 +7484,11 @@ class GemstoneBrowserSession:
         )
         if source == updated_source:
             return None
-        selector = compiled_method.selector().to_py
-        in_class = compiled_method.inClass()
-        show_instance_side = not in_class.isMeta().to_py
-        in_class_name = in_class.name().to_py
-        class_name = (
-            in_class_name[:-6]
-            if not show_instance_side and in_class_name.endswith(" class")
-            else in_class_name
-        )
-        method_category = self.get_method_category(
-            class_name,
-            selector,
-            show_instance_side,
-        )
         return {
-            "class_name": class_name,
-            "show_instance_side": show_instance_side,
-            "method_selector": selector,
-            "method_category": method_category,
+            "class_name": method_row["class_name"],
+            "show_instance_side": method_row["show_instance_side"],
+            "method_selector": method_row["method_selector"],
+            "method_category": method_row["method_category"],
             "change_type": change_type,
             "updated_source": updated_source,
         }
@@ -5781,35 +7671,7 @@ class GemstoneBrowserSession:
         return is_code
 
     def source_code_character_map(self, source):
-        code_character_map = [True for _ in source]
-        index = 0
-        state = "code"
-        while index < len(source):
-            character = source[index]
-            if state == "code":
-                if character == "'":
-                    code_character_map[index] = False
-                    state = "string"
-                elif character == '"':
-                    code_character_map[index] = False
-                    state = "comment"
-            elif state == "string":
-                code_character_map[index] = False
-                if character == "'":
-                    has_escaped_quote = (
-                        index + 1 < len(source) and source[index + 1] == "'"
-                    )
-                    if has_escaped_quote:
-                        code_character_map[index + 1] = False
-                        index = index + 1
-                    else:
-                        state = "code"
-            elif state == "comment":
-                code_character_map[index] = False
-                if character == '"':
-                    state = "code"
-            index = index + 1
-        return code_character_map
+        return self.source_analysis(source).code_character_map()
 
     def replacement_plan_for_selector_tokens(
         self,
@@ -5872,6 +7734,7 @@ class GemstoneBrowserSession:
         in_dictionary="UserGlobals",
     ):
         literal_source = self.smalltalk_literal(literal_value)
+        self.flush_metadata_cache()
         return self.run_code(
             "%s at: #%s put: %s"
             % (
@@ -5882,6 +7745,7 @@ class GemstoneBrowserSession:
         )
 
     def global_remove(self, symbol_name, in_dictionary="UserGlobals"):
+        self.flush_metadata_cache()
         return self.run_code(
             "%s removeKey: #%s ifAbsent: []" % (in_dictionary, symbol_name)
         )
@@ -5903,6 +7767,9 @@ class GemstoneBrowserSession:
         return class_matches
 
     def find_selectors(self, search_input, should_stop=None):
+        selector_index = self.selector_index(should_stop=should_stop)
+        if selector_index is not None:
+            return selector_index.matching_selectors(search_input)
         selector_matches = set()
         class_names = self.all_class_names()
         for class_name in class_names:
@@ -5999,13 +7866,12 @@ class GemstoneBrowserSession:
             True,
         )
         try:
-            candidate_value = self.run_code(
+            occurrence_rows = self.method_occurrence_rows(
                 "ClassOrganizer new allCallsOn: %s" % class_reference
             )
-            compiled_methods = self.flatten_compiled_methods(candidate_value)
             method_summaries = [
-                self.method_summary(compiled_method)
-                for compiled_method in compiled_methods
+                self.method_summary_from_occurrence_row(occurrence_row)
+                for occurrence_row in occurrence_rows
             ]
             return self.unique_sorted_method_summaries(method_summaries)
         except (DomainException, GemstoneError, GemstoneApiError):
@@ -6070,30 +7936,239 @@ class GemstoneBrowserSession:
         occurrence_type,
         include_category_details=False,
     ):
+        if occurrence_type not in ("implementors", "senders"):
+            raise DomainException("occurrence_type must be implementors or senders.")
+        if include_category_details:
+            class_categories = self.class_categories_by_class_name()
+            method_summaries = [
+                self.method_summary_with_category(
+                    self.method_summary_from_occurrence_row(occurrence_row),
+                    class_categories,
+                    occurrence_row["method_category"],
+                )
+                for occurrence_row in self.class_organizer_occurrence_rows(
+                    method_name,
+                    occurrence_type,
+                )
+            ]
+            return self.unique_sorted_method_summaries(method_summaries)
+        return self.method_summaries_for_keys(
+            self.selector_occurrence_keys(method_name, occurrence_type)
+        )
+
+    def selector_occurrence_keys(self, method_name, occurrence_type):
+        if occurrence_type not in ("implementors", "senders"):
+            raise DomainException("occurrence_type must be implementors or senders.")
+        selector_index = self.selector_index()
+        if selector_index is None:
+            method_keys = {
+                (
+                    occurrence_row["class_name"],
+                    occurrence_row["show_instance_side"],
+                    occurrence_row["method_selector"],
+                )
+                for occurrence_row in self.class_organizer_occurrence_rows(
+                    method_name,
+                    occurrence_type,
+                )
+            }
+        elif occurrence_type == "implementors":
+            method_keys = selector_index.implementor_keys(method_name)
+        else:
+            method_keys = selector_index.sender_keys(method_name)
+        return sorted(method_keys)
+
+    def method_summaries_for_keys(self, method_keys):
+        return [
+            {
+                "class_name": class_name,
+                "show_instance_side": show_instance_side,
+                "method_selector": method_selector,
+            }
+            for class_name, show_instance_side, method_selector in method_keys
+        ]
+
+    def class_organizer_occurrence_rows(self, method_name, occurrence_type):
         selector_expression = self.selector_reference_expression(method_name)
         if occurrence_type == "implementors":
-            candidate_value = self.run_code(
+            return self.method_occurrence_rows(
                 "ClassOrganizer new implementorsOf: %s" % selector_expression
             )
-        elif occurrence_type == "senders":
-            candidate_value = self.run_code(
-                "ClassOrganizer new sendersOf: %s" % selector_expression
+        return self.method_occurrence_rows(
+            "ClassOrganizer new sendersOf: %s" % selector_expression
+        )
+
+    def selector_index(self, should_stop=None):
+        if self.metadata_cache is None:
+            return None
+        selector_index = self.metadata_cache.selector_index
+        try:
+            if selector_index.is_built:
+                self.refresh_selector_index(selector_index, should_stop)
+            else:
+                self.build_selector_index(selector_index, should_stop)
+        except (DomainException, GemstoneError, GemstoneApiError):
+            selector_index.clear()
+            return None
+        return selector_index
+
+    def build_selector_index(self, selector_index, should_stop=None):
+        selector_index.clear()
+        class_fingerprints = self.selector_index_class_fingerprints()
+        unexported_class_names = self.add_selector_index_rows(
+            selector_index,
+            sorted(class_fingerprints),
+            should_stop,
+        )
+        if not unexported_class_names:
+            selector_index.mark_built(class_fingerprints)
+
+    def refresh_selector_index(self, selector_index, should_stop=None):
+        # AI: A flush only marks the index stale. One fingerprint report then
+        # picks out the classes whose methods changed, so evaluating code does
+        # not cost a full re-export of the image.
+        changed_class_names = set(selector_index.take_dirty_class_names())
+        class_fingerprints = None
+        if selector_index.is_stale:
+            class_fingerprints = self.selector_index_class_fingerprints()
+            changed_class_names.update(
+                selector_index.changed_class_names(class_fingerprints)
+            )
+        changed_class_names = sorted(changed_class_names)
+        for class_name in changed_class_names:
+            selector_index.remove_class(class_name)
+        unexported_class_names = self.add_selector_index_rows(
+            selector_index,
+            changed_class_names,
+            should_stop,
+        )
+        for class_name in unexported_class_names:
+            selector_index.mark_class_dirty(class_name)
+        if class_fingerprints is not None and not unexported_class_names:
+            selector_index.mark_refreshed(class_fingerprints)
+
+    def add_selector_index_rows(self, selector_index, class_names, should_stop=None):
+        chunk_start = 0
+        while chunk_start < len(class_names):
+            if should_stop is not None and should_stop():
+                return class_names[chunk_start:]
+            chunk_class_names = class_names[
+                chunk_start : chunk_start + SELECTOR_INDEX_CHUNK_SIZE
+            ]
+            selector_index_report = self.run_code(
+                self.selector_index_export_script(chunk_class_names)
+            ).to_py
+            for selector_index_row in self.selector_index_rows_from_report(
+                selector_index_report
+            ):
+                selector_index.add_method(
+                    selector_index_row["class_name"],
+                    selector_index_row["show_instance_side"],
+                    selector_index_row["method_selector"],
+                    selector_index_row["sent_selectors"],
+                )
+            chunk_start = chunk_start + SELECTOR_INDEX_CHUNK_SIZE
+        return []
+
+    def selector_index_class_fingerprints(self):
+        report_fields = self.length_prefixed_fields_from_report(
+            self.run_code(self.selector_index_fingerprint_script()).to_py
+        )
+        if len(report_fields) % 2 != 0:
+            raise DomainException(
+                "Selector index fingerprint report must have two fields per row."
+            )
+        class_fingerprints = {}
+        for index in range(0, len(report_fields), 2):
+            class_fingerprints.setdefault(
+                report_fields[index], report_fields[index + 1]
             )
-        else:
-            raise DomainException("occurrence_type must be implementors or senders.")
-        compiled_methods = self.flatten_compiled_methods(candidate_value)
-        class_categories = None
-        if include_category_details:
-            class_categories = self.class_categories_by_class_name()
-        method_summaries = [
-            self.method_summary(
-                compiled_method,
-                include_category_details=include_category_details,
-                class_categories=class_categories,
+        return class_fingerprints
+
+    def selector_index_fingerprint_script(self):
+        return (
+            "| symbolList stream writeField seenClasses |\n"
+            "symbolList := System myUserProfile symbolList.\n"
+            "stream := WriteStream on: String new.\n"
+            "writeField := [ :value |\n"
+            "    stream nextPutAll: value size printString.\n"
+            "    stream nextPut: $:.\n"
+            "    stream nextPutAll: value\n"
+            "].\n"
+            "seenClasses := IdentitySet new.\n"
+            "symbolList do: [ :symbolDictionary |\n"
+            "    symbolDictionary keysAndValuesDo: [ :key :value |\n"
+            "        ((value isBehavior and: [ value name == key ])\n"
+            "            and: [ (seenClasses includes: value) not ]) ifTrue: [\n"
+            "            | methodCount methodOopTotal |\n"
+            "            seenClasses add: value.\n"
+            "            methodCount := 0.\n"
+            "            methodOopTotal := 0.\n"
+            "            (Array with: value with: value class) do: [ :behavior |\n"
+            "                behavior selectors do: [ :selector |\n"
+            "                    methodCount := methodCount + 1.\n"
+            "                    methodOopTotal := methodOopTotal\n"
+            "                        + ([ (behavior compiledMethodAt: selector) asOop ]\n"
+            "                            on: Error do: [ :error | 0 ])\n"
+            "                ]\n"
+            "            ].\n"
+            "            writeField value: key asString.\n"
+            "            writeField value: methodCount printString, '/', methodOopTotal printString\n"
+            "        ]\n"
+            "    ]\n"
+            "].\n"
+            "stream contents"
+        )
+
+    def selector_index_export_script(self, class_names):
+        return (
+            "| symbolList stream writeField |\n"
+            "symbolList := System myUserProfile symbolList.\n"
+            "stream := WriteStream on: String new.\n"
+            "writeField := [ :value |\n"
+            "    stream nextPutAll: value size printString.\n"
+            "    stream nextPut: $:.\n"
+            "    stream nextPutAll: value\n"
+            "].\n"
+            "%s do: [ :className |\n"
+            "    | gemstoneClass |\n"
+            "    gemstoneClass := symbolList objectNamed: className asSymbol.\n"
+            "    (gemstoneClass notNil and: [ gemstoneClass isBehavior ]) ifTrue: [\n"
+            "        (Array with: gemstoneClass with: gemstoneClass class) do: [ :behavior |\n"
+            "            behavior selectors do: [ :selector |\n"
+            "                | sentSelectors |\n"
+            "                sentSelectors := WriteStream on: String new.\n"
+            "                ([ (behavior compiledMethodAt: selector) _selectorPool ]\n"
+            "                    on: Error do: [ :error | #() ]) do: [ :sentSelector |\n"
+            "                        sentSelectors nextPutAll: sentSelector.\n"
+            "                        sentSelectors space\n"
+            "                    ].\n"
+            "                writeField value: className.\n"
+            "                writeField value: behavior isMeta printString.\n"
+            "                writeField value: selector asString.\n"
+            "                writeField value: sentSelectors contents\n"
+            "            ]\n"
+            "        ]\n"
+            "    ]\n"
+            "].\n"
+            "stream contents"
+        ) % self.string_array_literal(class_names)
+
+    def selector_index_rows_from_report(self, selector_index_report):
+        report_fields = self.length_prefixed_fields_from_report(selector_index_report)
+        if len(report_fields) % 4 != 0:
+            raise DomainException(
+                "Selector index report must have four fields per row."
             )
-            for compiled_method in compiled_methods
+        return [
+            {
+                "class_name": report_fields[index],
+                "show_instance_side": report_fields[index + 1] != "true",
+                "method_selector": report_fields[index + 2],
+                "sent_selectors": report_fields[index + 3].split(),
+            }
+            for index in range(0, len(report_fields), 4)
         ]
-        return self.unique_sorted_method_summaries(method_summaries)
 
     def implementor_entries_from_method_summaries(self, method_summaries):
         implementors = []
@@ -6142,52 +8217,33 @@ class GemstoneBrowserSession:
             ),
         )
 
-    def method_summary(
+    def method_summary_from_occurrence_row(self, occurrence_row):
+        return {
+            "class_name": occurrence_row["class_name"],
+            "show_instance_side": occurrence_row["show_instance_side"],
+            "method_selector": occurrence_row["method_selector"],
+        }
+
+    def method_summary_with_category(
         self,
-        compiled_method,
-        include_category_details=False,
-        class_categories=None,
+        method_summary,
+        class_categories,
+        method_category,
     ):
-        selector = compiled_method.selector().to_py
-        in_class = compiled_method.inClass()
-        show_instance_side = not in_class.isMeta().to_py
-        in_class_name = in_class.name().to_py
-        class_name = (
-            in_class_name[:-6]
-            if not show_instance_side and in_class_name.endswith(" class")
-            else in_class_name
-        )
-        method_summary = {
-            "class_name": class_name,
-            "show_instance_side": show_instance_side,
-            "method_selector": selector,
-        }
-        if include_category_details:
-            class_category = None
-            if class_categories is not None:
-                class_category = class_categories.get(class_name)
-            method_category = None
-            try:
-                method_category = self.get_method_category(
-                    class_name,
-                    selector,
-                    show_instance_side,
-                )
-            except (GemstoneError, GemstoneApiError, KeyError):
-                method_category = None
-            method_category_is_extension = (
-                isinstance(method_category, str)
-                and method_category.startswith("*")
-            )
-            extension_category_name = None
-            if method_category_is_extension:
-                extension_category_name = method_category[1:].strip() or None
-            method_summary["class_category"] = class_category
-            method_summary["method_category"] = method_category
-            method_summary["method_category_is_extension"] = (
-                method_category_is_extension
-            )
-            method_summary["extension_category_name"] = extension_category_name
+        class_category = None
+        if class_categories is not None:
+            class_category = class_categories.get(method_summary["class_name"])
+        method_category_is_extension = isinstance(
+            method_category, str
+        ) and method_category.startswith("*")
+        extension_category_name = None
+        if method_category_is_extension:
+            extension_category_name = method_category[1:].strip() or None
+        method_summary = dict(method_summary)
+        method_summary["class_category"] = class_category
+        method_summary["method_category"] = method_category
+        method_summary["method_category_is_extension"] = method_category_is_extension
+        method_summary["extension_category_name"] = extension_category_name
         return method_summary
 
     def limited_entries(self, entries, max_results):
@@ -6217,12 +8273,87 @@ class GemstoneBrowserSession:
                 return False
         raise DomainException("%s must be a boolean." % argument_name)
 
+    def cached_metadata(self, scope, key, fetch_value):
+        if self.metadata_cache is None:
+            return fetch_value()
+        return self.metadata_cache.cached_value(scope, key, fetch_value)
+
+    def cached_metadata_if_present(self, scope, key):
+        if self.metadata_cache is None:
+            return False, None
+        return self.metadata_cache.cached_value_if_present(scope, key)
+
+    def store_cached_metadata(self, scope, key, value):
+        if self.metadata_cache is not None:
+            self.metadata_cache.store_value(scope, key, value)
+
+    def class_lists_cache_scope(self):
+        return ("class_lists",)
+
+    def class_cache_scope(self, class_name):
+        return ("class", class_name)
+
+    def class_side_cache_scope(self, class_name, show_instance_side):
+        return (
+            "class_side",
+            class_name,
+            self.validated_show_instance_side(show_instance_side),
+        )
+
+    def invalidate_cached_class_side(self, class_name, show_instance_side):
+        if self.metadata_cache is None:
+            return
+        self.metadata_cache.invalidate_scope(
+            self.class_side_cache_scope(class_name, show_instance_side)
+        )
+        self.metadata_cache.selector_index.mark_class_dirty(class_name)
+        self.metadata_cache.note_class_changed(class_name)
+
+    def invalidate_cached_class(self, class_name):
+        if self.metadata_cache is None:
+            return
+        self.metadata_cache.invalidate_scope(self.class_lists_cache_scope())
+        self.metadata_cache.invalidate_scope(self.class_cache_scope(class_name))
+        self.metadata_cache.forget_class_resolution(class_name)
+        self.invalidate_cached_class_side(class_name, True)
+        self.invalidate_cached_class_side(class_name, False)
+
+    def flush_metadata_cache(self):
+        if self.metadata_cache is None:
+            return
+        self.metadata_cache.flush()
+        self.metadata_cache.note_unscoped_change()
+
+    def cached_resolution(self, key, resolve):
+        if self.metadata_cache is None:
+            return resolve()
+        return self.metadata_cache.cached_resolution(key, resolve)
+
+    def symbol_list(self):
+        return self.cached_resolution(
+            ("symbol_list",),
+            lambda: self.gemstone_session.execute("System myUserProfile symbolList"),
+        )
+
     def class_to_query(self, class_name, show_instance_side):
         show_instance_side = self.validated_show_instance_side(show_instance_side)
-        gemstone_class = self.gemstone_session.resolve_symbol(class_name)
-        return gemstone_class if show_instance_side else gemstone_class.gemstone_class()
+        return self.cached_resolution(
+            ("class", class_name, show_instance_side),
+            lambda: (
+                self.gemstone_session.resolve_symbol(class_name)
+                if show_instance_side
+                else self.class_to_query(class_name, True).gemstone_class()
+            ),
+        )
 
     def all_class_names(self):
+        return self.cached_metadata(
+            self.class_lists_cache_scope(),
+            ("all_class_names",),
+            self.uncached_all_class_names,
+        )
+
+    def uncached_all_class_names(self):
         return [
             gemstone_name.value().to_py
             for gemstone_name in self.class_organizer.classNames()
@@ -6245,22 +8376,32 @@ class GemstoneBrowserSession:
         self,
         class_name,
         show_instance_side,
+    ):
+        return self.cached_metadata(
+            self.class_side_cache_scope(class_name, show_instance_side),
+            ("selectors",),
+            lambda: self.uncached_selectors_for_class_side(
+                class_name,
+                show_instance_side,
+            ),
+        )
+
+    def uncached_selectors_for_class_side(
+        self,
+        class_name,
+        show_instance_side,
     ):
         selector_names = []
         gemstone_class = self.resolved_class(class_name)
         if gemstone_class:
-            class_to_query = (
-                gemstone_class
-                if show_instance_side
-                else gemstone_class.gemstone_class()
-            )
+            class_to_query = self.class_to_query(class_name, show_instance_side)
             selector_names = self.sorted_selectors(class_to_query)
         return selector_names
 
     def resolved_class(self, class_name):
         gemstone_class = None
         try:
-            gemstone_class = self.gemstone_session.resolve_symbol(class_name)
+            gemstone_class = self.class_to_query(class_name, True)
         except GemstoneError:
             gemstone_class = None
         except GemstoneApiError:
@@ -6399,6 +8540,7 @@ def query_methods_by_ast_pattern(
     max_results,
     sort_by="scan_order",
     sort_descending=False,
+    parallel_workers=None,
 ):
     return GemstoneBrowserSession(gemstone_session).query_methods_by_ast_pattern(
         ast_pattern,
@@ -6409,9 +8551,17 @@ def query_methods_by_ast_pattern(
         max_results=max_results,
         sort_by=sort_by,
         sort_descending=sort_descending,
+        parallel_workers=parallel_workers,
     )
 
 
+def ast_query_matches_for_method_rows(method_rows, ast_pattern, sort_by):
+    return GemstoneBrowserSession(
+        None,
+        require_gemstone_ast=False,
+    ).ast_query_matches_in_rows(method_rows, ast_pattern, sort_by)
+
+
 def method_ast(
     gemstone_session,
     class_name,
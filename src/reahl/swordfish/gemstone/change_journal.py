@@ -0,0 +1,75 @@
+CHANGE_JOURNAL_MAXIMUM_ENTRY_COUNT = 10000
+CHANGE_JOURNAL_SEQUENCE_OVERLAP = 1000
+CLASS_LIST_CHANGE_KINDS = ("class_defined", "class_removed")
+FLUSH_ALL_CHANGE_KIND = "flush_all"
+
+
+def change_journal_report_source(since_sequence):
+    return (
+        "| journal |\n"
+        "journal := System myUserProfile symbolList "
+        "objectNamed: #SwordfishMcpChangeJournal.\n"
+        "journal isNil\n"
+        "    ifTrue: [ '' ]\n"
+        "    ifFalse: [ journal changesReportSince: %s ]"
+    ) % int(since_sequence)
+
+
+def change_journal_row_fields(change_kind, method_keys):
+    row_fields = []
+    for class_name, show_instance_side, method_selector in method_keys:
+        row_fields.extend(
+            [
+                change_kind,
+                class_name,
+                "true" if show_instance_side else "false",
+                method_selector,
+            ]
+        )
+    return row_fields
+
+
+def change_journal_recording_statement(row_fields):
+    return (
+        "[ :journal | journal isNil ifFalse: [ journal recordChanges: #(%s) ] ]\n"
+        "    value: (System myUserProfile symbolList "
+        "objectNamed: #SwordfishMcpChangeJournal).\n"
+    ) % " ".join("'%s'" % field.replace("'", "''") for field in row_fields)
+
+
+def change_journal_from_report(report):
+    if not report:
+        return None
+    report_lines = report.splitlines()
+    current_sequence, oldest_sequence = report_lines[0].split()
+    changes = []
+    for report_line in report_lines[1:]:
+        (
+            sequence,
+            change_kind,
+            class_name,
+            show_instance_side,
+            method_selector,
+            session_id,
+        ) = report_line.split()
+        changes.append(
+            {
+                "sequence": int(sequence),
+                "change_kind": change_kind,
+                "class_name": class_name,
+                "show_instance_side": show_instance_side == "true",
+                "method_selector": None if method_selector == "-" else method_selector,
+                "session_id": int(session_id),
+            }
+        )
+    return {
+        "current_sequence": int(current_sequence),
+        "oldest_sequence": None if oldest_sequence == "-" else int(oldest_sequence),
+        "changes": changes,
+    }
+
+
+def change_journal_since(gemstone_session, since_sequence):
+    return change_journal_from_report(
+        gemstone_session.execute(change_journal_report_source(since_sequence)).to_py
+    )
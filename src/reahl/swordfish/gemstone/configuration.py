@@ -0,0 +1,12 @@
+import os
+
+
+def config_home_directory():
+    xdg_config_home = os.environ.get("XDG_CONFIG_HOME", "").strip()
+    if xdg_config_home:
+        return xdg_config_home
+    return os.path.join(os.path.expanduser("~"), ".config")
+
+
+def swordfish_config_directory():
+    return os.path.join(config_home_directory(), "swordfish")
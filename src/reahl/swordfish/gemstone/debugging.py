@@ -1,6 +1,97 @@
+import collections
+import collections.abc
+import threading
+
 from reahl.ptongue import GemstoneError
 
-from reahl.swordfish.gemstone.session import render_result
+from reahl.swordfish.gemstone.session import (
+    DomainException,
+    length_prefixed_fields,
+    render_result,
+)
+
+STACK_FRAME_SOURCE_CACHE_SIZE = 256
+STACK_SNAPSHOT_FIELD_COUNT = 9
+FRAME_VARIABLE_ROW_CACHE_SIZE = 2048
+FRAME_VARIABLE_PRINT_STRING_LIMIT = 200
+FRAME_SELF_SLOT_INDEX = 8
+FRAME_FIRST_VARIABLE_SLOT_INDEX = 11
+
+
+class LeastRecentlyUsedCache:
+    def __init__(self, size):
+        self.size = size
+        self.values_by_key = collections.OrderedDict()
+        self.lock = threading.Lock()
+
+    def value_for(self, key):
+        with self.lock:
+            value = self.values_by_key.get(key)
+            if value is not None:
+                self.values_by_key.move_to_end(key)
+            return value
+
+    def store(self, key, value):
+        with self.lock:
+            self.values_by_key[key] = value
+            self.values_by_key.move_to_end(key)
+            while len(self.values_by_key) > self.size:
+                self.values_by_key.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.values_by_key.clear()
+
+
+stack_frame_sources = LeastRecentlyUsedCache(STACK_FRAME_SOURCE_CACHE_SIZE)
+
+
+def clear_debugger_caches():
+    stack_frame_sources.clear()
+
+
+def displayed_step_point_offset(source, offset):
+    if offset < 1:
+        return offset
+    source_length = len(source)
+    if offset > source_length:
+        return source_length
+    if source[offset - 1].isspace():
+        left_offset = offset
+        while left_offset > 1 and source[left_offset - 1].isspace():
+            left_offset -= 1
+        if not source[left_offset - 1].isspace():
+            offset = left_offset
+        else:
+            right_offset = offset
+            while right_offset <= source_length and source[right_offset - 1].isspace():
+                right_offset += 1
+            if right_offset <= source_length:
+                offset = right_offset
+    return keyword_message_offset_for_argument(source, offset)
+
+
+def keyword_message_offset_for_argument(source, offset):
+    if offset < 1 or offset > len(source):
+        return offset
+    current_character = source[offset - 1]
+    if not (current_character.isalnum() or current_character in "#$'"):
+        return offset
+    previous_non_space = offset - 1
+    while previous_non_space > 0 and source[previous_non_space - 1].isspace():
+        previous_non_space -= 1
+    if previous_non_space < 1:
+        return offset
+    if source[previous_non_space - 1] != ":":
+        return offset
+    selector_start = previous_non_space
+    while selector_start > 1 and (
+        source[selector_start - 2].isalnum() or source[selector_start - 2] == "_"
+    ):
+        selector_start -= 1
+    if selector_start == previous_non_space:
+        return offset
+    return selector_start
 
 
 class GemstoneDebugActionOutcome:
@@ -36,49 +127,7 @@ class GemstoneStackFrame:
         )
         bounded_step_point = step_point.min(offsets.size())
         offset = offsets.at(bounded_step_point).to_py
-        source = self.method_source
-        if offset < 1:
-            return offset
-        source_length = len(source)
-        if offset > source_length:
-            return source_length
-        if source[offset - 1].isspace():
-            left_offset = offset
-            while left_offset > 1 and source[left_offset - 1].isspace():
-                left_offset -= 1
-            if not source[left_offset - 1].isspace():
-                offset = left_offset
-            else:
-                right_offset = offset
-                while (
-                    right_offset <= source_length and source[right_offset - 1].isspace()
-                ):
-                    right_offset += 1
-                if right_offset <= source_length:
-                    offset = right_offset
-        return self.keyword_message_offset_for_argument(source, offset)
-
-    def keyword_message_offset_for_argument(self, source, offset):
-        if offset < 1 or offset > len(source):
-            return offset
-        current_character = source[offset - 1]
-        if not (current_character.isalnum() or current_character in "#$'"):
-            return offset
-        previous_non_space = offset - 1
-        while previous_non_space > 0 and source[previous_non_space - 1].isspace():
-            previous_non_space -= 1
-        if previous_non_space < 1:
-            return offset
-        if source[previous_non_space - 1] != ":":
-            return offset
-        selector_start = previous_non_space
-        while selector_start > 1 and (
-            source[selector_start - 2].isalnum() or source[selector_start - 2] == "_"
-        ):
-            selector_start -= 1
-        if selector_start == previous_non_space:
-            return offset
-        return selector_start
+        return displayed_step_point_offset(self.method_source, offset)
 
     @property
     def method_source(self):
@@ -106,23 +155,336 @@ class GemstoneStackFrame:
         return frame_vars
 
 
+class GemstoneStackFrameSnapshot:
+    def __init__(
+        self,
+        call_stack,
+        level,
+        class_name,
+        method_name,
+        source_offset,
+        source_key,
+        var_names,
+        self_oop,
+        var_oops,
+    ):
+        self.call_stack = call_stack
+        self.gemstone_process = call_stack.gemstone_process
+        self.gemstone_session = call_stack.gemstone_session
+        self.level = level
+        self.class_name = class_name
+        self.method_name = method_name
+        self.source_offset = source_offset
+        self.source_key = source_key
+        self.var_names = var_names
+        self.self_oop = self_oop
+        self.var_oops = var_oops
+        self.is_valid = True
+        self.live_frame = None
+        self.frame_variables = None
+        self.context_frame_variables = None
+
+    @property
+    def method_source(self):
+        method_source = stack_frame_sources.value_for(self.source_key)
+        if method_source is None:
+            self.call_stack.load_method_sources()
+            method_source = stack_frame_sources.value_for(self.source_key)
+        return method_source
+
+    @property
+    def step_point_offset(self):
+        return displayed_step_point_offset(self.method_source, self.source_offset)
+
+    def gemstone_frame(self):
+        if self.live_frame is None:
+            self.live_frame = self.call_stack.stack_frame(self.level)
+        return self.live_frame
+
+    @property
+    def frame_data(self):
+        return self.gemstone_frame().frame_data
+
+    @property
+    def gemstone_method(self):
+        return self.gemstone_frame().gemstone_method
+
+    @property
+    def ip_offset(self):
+        return self.gemstone_frame().ip_offset
+
+    @property
+    def var_context(self):
+        return self.gemstone_frame().var_context
+
+    @property
+    def self(self):
+        return self.gemstone_frame().self
+
+    @property
+    def vars(self):
+        if self.frame_variables is None:
+            self.frame_variables = GemstoneFrameVariables(
+                self,
+                self.variable_slots(),
+            )
+        return self.frame_variables
+
+    def context_variables(self):
+        if self.context_frame_variables is None:
+            self.context_frame_variables = GemstoneFrameVariables(
+                self,
+                [("self", FRAME_SELF_SLOT_INDEX, self.self_oop)]
+                + self.variable_slots(),
+            )
+        return self.context_frame_variables
+
+    def variable_slots(self):
+        return [
+            (var_name, FRAME_FIRST_VARIABLE_SLOT_INDEX + index, var_oop)
+            for index, (var_name, var_oop) in enumerate(
+                zip(self.var_names, self.var_oops)
+            )
+        ]
+
+
+class GemstoneFrameVariables(collections.abc.Mapping):
+    def __init__(self, frame, variable_slots):
+        self.frame = frame
+        self.variable_names = [slot[0] for slot in variable_slots]
+        self.slots_by_name = {
+            var_name: (slot_index, var_oop)
+            for var_name, slot_index, var_oop in variable_slots
+        }
+        self.values_by_name = {}
+
+    def __getitem__(self, var_name):
+        slot_index, _ = self.slots_by_name[var_name]
+        if var_name not in self.values_by_name:
+            self.values_by_name[var_name] = self.frame.frame_data.at(slot_index)
+        return self.values_by_name[var_name]
+
+    def __contains__(self, var_name):
+        return var_name in self.slots_by_name
+
+    def __iter__(self):
+        return iter(self.variable_names)
+
+    def __len__(self):
+        return len(self.variable_names)
+
+    def oop_of(self, var_name):
+        return self.slots_by_name[var_name][1]
+
+    @property
+    def frame_variable_rows(self):
+        return self.frame.call_stack.frame_variable_rows
+
+    def display_rows(
+        self,
+        var_names,
+        print_string_limit=FRAME_VARIABLE_PRINT_STRING_LIMIT,
+    ):
+        uncached_slot_indexes = sorted(
+            {
+                self.slots_by_name[var_name][0]
+                for var_name in var_names
+                if self.frame_variable_rows.value_for(
+                    (self.oop_of(var_name), print_string_limit)
+                )
+                is None
+            }
+        )
+        if uncached_slot_indexes:
+            self.load_display_rows(uncached_slot_indexes, print_string_limit)
+        display_rows = []
+        for var_name in var_names:
+            class_name, print_string = self.frame_variable_rows.value_for(
+                (self.oop_of(var_name), print_string_limit)
+            )
+            display_rows.append((var_name, class_name, print_string))
+        return display_rows
+
+    def load_display_rows(self, slot_indexes, print_string_limit):
+        row_report = self.frame.gemstone_session.execute(
+            self.display_rows_script(slot_indexes, print_string_limit),
+            context=self.frame.gemstone_process,
+        ).to_py
+        report_fields = length_prefixed_fields(row_report)
+        if len(report_fields) % 3 != 0:
+            raise DomainException(
+                "Frame variable report must have three fields per row."
+            )
+        rows_by_slot_index = {
+            int(report_fields[index]): (
+                report_fields[index + 1],
+                report_fields[index + 2],
+            )
+            for index in range(0, len(report_fields), 3)
+        }
+        for slot_index, var_oop in self.slots_by_name.values():
+            if slot_index in rows_by_slot_index:
+                self.frame_variable_rows.store(
+                    (var_oop, print_string_limit),
+                    rows_by_slot_index[slot_index],
+                )
+
+    def display_rows_script(self, slot_indexes, print_string_limit):
+        return (
+            "| frame stream writeField limit |\n"
+            "frame := self _frameContentsAt: %s.\n"
+            "limit := %s.\n"
+            "stream := WriteStream on: String new.\n"
+            "writeField := [ :value |\n"
+            "    stream nextPutAll: value size printString.\n"
+            "    stream nextPut: $:.\n"
+            "    stream nextPutAll: value\n"
+            "].\n"
+            "#(%s) do: [ :slotIndex |\n"
+            "    | value printed |\n"
+            "    value := frame at: slotIndex.\n"
+            "    printed := [ value printString ]\n"
+            "        on: Error\n"
+            "        do: [ :error | '<error printing>' ].\n"
+            "    printed size > limit ifTrue: [\n"
+            "        printed := (printed copyFrom: 1 to: limit), '...'\n"
+            "    ].\n"
+            "    writeField value: slotIndex printString.\n"
+            "    writeField value: value class name asString.\n"
+            "    writeField value: printed\n"
+            "].\n"
+            "stream contents"
+        ) % (
+            self.frame.level,
+            print_string_limit,
+            " ".join(str(slot_index) for slot_index in slot_indexes),
+        )
+
+
 class GemstoneCallStack:
     def __init__(self, gemstone_process):
         self.gemstone_process = gemstone_process
+        self.gemstone_session = gemstone_process.session
+        self.frame_variable_rows = LeastRecentlyUsedCache(FRAME_VARIABLE_ROW_CACHE_SIZE)
         self.frames = self.make_frames()
 
     def make_frames(self):
-        max_level = self.gemstone_process.stackDepth().to_py
-        stack = []
-        level = 1
-        while level <= max_level:
-            frame = self.stack_frame(level)
-            if frame.is_valid:
-                stack.append(frame)
-                level += 1
-            else:
-                level = max_level + 1
-        return stack
+        stack_report = self.gemstone_session.execute(
+            self.stack_snapshot_script(),
+            context=self.gemstone_process,
+        ).to_py
+        return self.stack_frames_from_report(stack_report)
+
+    def stack_snapshot_script(self):
+        return (
+            "| process stream writeField level frame |\n"
+            "process := self.\n"
+            "stream := WriteStream on: String new.\n"
+            "writeField := [ :value |\n"
+            "    stream nextPutAll: value size printString.\n"
+            "    stream nextPut: $:.\n"
+            "    stream nextPutAll: value\n"
+            "].\n"
+            "level := 1.\n"
+            "[ level <= process stackDepth\n"
+            "    and: [ (frame := process _frameContentsAt: level) notNil ] ] whileTrue: [\n"
+            "    | method source offsets stepPoint namesStream oopsStream |\n"
+            "    method := frame at: 1.\n"
+            "    source := method fullSource.\n"
+            "    offsets := method _sourceOffsets.\n"
+            "    stepPoint := method\n"
+            "        _stepPointForIp: (frame at: 2)\n"
+            "        level: level\n"
+            "        useNext: level = 1.\n"
+            "    namesStream := WriteStream on: String new.\n"
+            "    oopsStream := WriteStream on: String new.\n"
+            "    (frame at: 9) doWithIndex: [ :each :index |\n"
+            "        index > 1 ifTrue: [ namesStream space. oopsStream space ].\n"
+            "        namesStream nextPutAll: each asString.\n"
+            "        oopsStream nextPutAll: (frame at: 10 + index) asOop printString\n"
+            "    ].\n"
+            "    writeField value: level printString.\n"
+            "    writeField value: method homeMethod inClass asString.\n"
+            "    writeField value: (method selector isNil\n"
+            "        ifTrue: [ '' ]\n"
+            "        ifFalse: [ method selector asString ]).\n"
+            "    writeField value: (offsets at: (stepPoint min: offsets size)) printString.\n"
+            "    writeField value: source hash printString.\n"
+            "    writeField value: source size printString.\n"
+            "    writeField value: namesStream contents.\n"
+            "    writeField value: (frame at: 8) asOop printString.\n"
+            "    writeField value: oopsStream contents.\n"
+            "    level := level + 1\n"
+            "].\n"
+            "stream contents"
+        )
+
+    def stack_frames_from_report(self, stack_report):
+        report_fields = length_prefixed_fields(stack_report)
+        if len(report_fields) % STACK_SNAPSHOT_FIELD_COUNT != 0:
+            raise DomainException(
+                "Call stack report must have %s fields per frame."
+                % STACK_SNAPSHOT_FIELD_COUNT
+            )
+        stack_frames = []
+        for index in range(0, len(report_fields), STACK_SNAPSHOT_FIELD_COUNT):
+            class_name = report_fields[index + 1]
+            method_name = report_fields[index + 2] or None
+            stack_frames.append(
+                GemstoneStackFrameSnapshot(
+                    self,
+                    int(report_fields[index]),
+                    class_name,
+                    method_name,
+                    int(report_fields[index + 3]),
+                    (
+                        class_name,
+                        method_name,
+                        report_fields[index + 4],
+                        int(report_fields[index + 5]),
+                    ),
+                    report_fields[index + 6].split(),
+                    int(report_fields[index + 7]),
+                    [int(var_oop) for var_oop in report_fields[index + 8].split()],
+                )
+            )
+        return stack_frames
+
+    def load_method_sources(self):
+        levels_by_source_key = {}
+        for frame in self.frames:
+            if stack_frame_sources.value_for(frame.source_key) is None:
+                levels_by_source_key.setdefault(frame.source_key, frame.level)
+        if not levels_by_source_key:
+            return
+        source_report = self.gemstone_session.execute(
+            self.method_sources_script(sorted(levels_by_source_key.values())),
+            context=self.gemstone_process,
+        ).to_py
+        report_fields = length_prefixed_fields(source_report)
+        sources_by_level = {
+            report_fields[index]: report_fields[index + 1]
+            for index in range(0, len(report_fields), 2)
+        }
+        for source_key, level in levels_by_source_key.items():
+            stack_frame_sources.store(source_key, sources_by_level[str(level)])
+
+    def method_sources_script(self, levels):
+        return (
+            "| process stream writeField |\n"
+            "process := self.\n"
+            "stream := WriteStream on: String new.\n"
+            "writeField := [ :value |\n"
+            "    stream nextPutAll: value size printString.\n"
+            "    stream nextPut: $:.\n"
+            "    stream nextPutAll: value\n"
+            "].\n"
+            "#(%s) do: [ :level |\n"
+            "    writeField value: level printString.\n"
+            "    writeField value: ((process _frameContentsAt: level) at: 1) fullSource\n"
+            "].\n"
+            "stream contents"
+        ) % " ".join(str(level) for level in levels)
 
     def stack_frame(self, level):
         return GemstoneStackFrame(self.gemstone_process, level)
@@ -140,11 +502,17 @@ class GemstoneCallStack:
 class GemstoneDebugSession:
     def __init__(self, exception):
         self.exception = exception
+        self.current_call_stack = None
 
     def call_stack(self):
         if self.exception is None or self.exception.context is None:
             return []
-        return GemstoneCallStack(self.exception.context)
+        self.current_call_stack = GemstoneCallStack(self.exception.context)
+        return self.current_call_stack
+
+    def forget_frame_variable_rows(self):
+        if self.current_call_stack is not None:
+            self.current_call_stack.frame_variable_rows.clear()
 
     def rendered_result_payload(self, result):
         return {
@@ -178,6 +546,7 @@ class GemstoneDebugSession:
         return self.exception.context.gciStepThruFromLevel(level)
 
     def restart_frame(self, level):
+        self.forget_frame_variable_rows()
         try:
             self.restart_frame_result(level)
             return GemstoneDebugActionOutcome(False)
@@ -202,6 +571,7 @@ class GemstoneDebugSession:
         return self.debug_action_outcome(lambda: action(level))
 
     def debug_action_outcome(self, action):
+        self.forget_frame_variable_rows()
         try:
             result = action()
             return GemstoneDebugActionOutcome(True, result=result)
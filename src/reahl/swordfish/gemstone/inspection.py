@@ -0,0 +1,196 @@
+from reahl.swordfish.gemstone.metadata_cache import metadata_cache_for_session
+from reahl.swordfish.gemstone.session import DomainException, length_prefixed_fields
+
+INSPECTOR_PRINT_STRING_LIMIT = 200
+COLLECTION_PAGE_FIELD_COUNT = 4
+
+
+class GemstoneCollectionPages:
+    def __init__(
+        self,
+        inspected_object,
+        collection_kind,
+        print_string_limit=INSPECTOR_PRINT_STRING_LIMIT,
+    ):
+        if collection_kind not in ("indexed", "dictionary", "set"):
+            raise DomainException("Unsupported collection kind: %s" % collection_kind)
+        self.inspected_object = inspected_object
+        self.gemstone_session = inspected_object.session
+        self.collection_kind = collection_kind
+        self.print_string_limit = print_string_limit
+        self.snapshot_stride = 2 if collection_kind == "dictionary" else 1
+        self.metadata_cache = metadata_cache_for_session(self.gemstone_session)
+        self.capture_snapshot()
+
+    def capture_snapshot(self):
+        self.transaction_boundary_count = self.metadata_cache.transaction_boundary_count
+        self.total_items = self.inspected_object.size().to_py
+        self.snapshot_holder = self.collection_snapshot_holder()
+        self.snapshot = self.collection_snapshot()
+        self.captured_item_count = 0 if self.snapshot_holder else self.total_items
+
+    def recapture_snapshot_after_transaction_boundary(self):
+        # AI: After a commit or abort the walk may see the collection in another
+        # order, so a new walk is started instead of continuing the old one.
+        if (
+            self.transaction_boundary_count
+            == self.metadata_cache.transaction_boundary_count
+        ):
+            return
+        if self.snapshot_holder is not None:
+            self.gemstone_session.execute(
+                "(self at: 7) terminate.\ntrue",
+                context=self.snapshot_holder,
+            )
+        self.capture_snapshot()
+
+    def collection_snapshot_holder(self):
+        # AI: Sets and dictionaries have no stable positions, so rows are captured
+        # server-side by a walk that is suspended between pages. Each page only
+        # continues the walk as far as it needs, instead of copying the whole
+        # collection up front or walking it again from the start.
+        if self.collection_kind == "indexed":
+            return None
+        return self.gemstone_session.execute(
+            self.snapshot_holder_script(),
+            context=self.inspected_object,
+        )
+
+    def snapshot_holder_script(self):
+        if self.snapshot_stride == 2:
+            walk = (
+                "            self keysAndValuesDo: [ :key :value |\n"
+                "                (holder at: 2) add: key; add: value.\n"
+            )
+        else:
+            walk = (
+                "            self do: [ :each |\n"
+                "                (holder at: 2) add: each.\n"
+            )
+        return (
+            "| holder |\n"
+            "holder := Array new: 7.\n"
+            "holder at: 1 put: self.\n"
+            "holder at: 2 put: OrderedCollection new.\n"
+            "holder at: 3 put: 0.\n"
+            "holder at: 4 put: Semaphore new.\n"
+            "holder at: 5 put: Semaphore new.\n"
+            "holder at: 6 put: false.\n"
+            "holder at: 7 put: [\n"
+            "    [\n"
+            "        [\n"
+            "            (holder at: 4) wait.\n"
+            "%s"
+            "                (holder at: 2) size >= (holder at: 3) ifTrue: [\n"
+            "                    (holder at: 5) signal.\n"
+            "                    (holder at: 4) wait\n"
+            "                ]\n"
+            "            ]\n"
+            "        ] on: Error do: [ :error | nil ]\n"
+            "    ] ensure: [\n"
+            "        holder at: 6 put: true.\n"
+            "        (holder at: 5) signal\n"
+            "    ]\n"
+            "] fork.\n"
+            "holder"
+        ) % walk
+
+    def collection_snapshot(self):
+        if self.snapshot_holder is None:
+            return self.inspected_object
+        return self.snapshot_holder.at(2)
+
+    def extend_snapshot_to(self, item_count):
+        if item_count <= self.captured_item_count:
+            return
+        captured_size = self.gemstone_session.execute(
+            self.snapshot_extension_script(item_count * self.snapshot_stride),
+            context=self.snapshot_holder,
+        ).to_py
+        self.captured_item_count = captured_size // self.snapshot_stride
+
+    def snapshot_extension_script(self, target_size):
+        return (
+            "((self at: 6) or: [ (self at: 2) size >= %s ])\n"
+            "    ifTrue: [ ^ (self at: 2) size ].\n"
+            "self at: 3 put: %s.\n"
+            "(self at: 4) signal.\n"
+            "(self at: 5) wait.\n"
+            "^ (self at: 2) size"
+        ) % (target_size, target_size)
+
+    def rows_for_range(self, start_index, end_index):
+        if end_index <= start_index:
+            return []
+        self.recapture_snapshot_after_transaction_boundary()
+        self.extend_snapshot_to(end_index)
+        end_index = min(end_index, self.captured_item_count)
+        if end_index <= start_index:
+            return []
+        page_report = self.gemstone_session.execute(
+            self.page_script(start_index + 1, end_index),
+            context=self.snapshot,
+        ).to_py
+        report_fields = length_prefixed_fields(page_report)
+        if len(report_fields) % COLLECTION_PAGE_FIELD_COUNT != 0:
+            raise DomainException(
+                "Collection page report must have %s fields per row."
+                % COLLECTION_PAGE_FIELD_COUNT
+            )
+        return [
+            {
+                "label": report_fields[index],
+                "oop": int(report_fields[index + 1]),
+                "class_name": report_fields[index + 2],
+                "print_string": report_fields[index + 3],
+            }
+            for index in range(0, len(report_fields), COLLECTION_PAGE_FIELD_COUNT)
+        ]
+
+    def page_script(self, first_row, last_row):
+        return (
+            "| stream writeField limit truncated |\n"
+            "limit := %s.\n"
+            "stream := WriteStream on: String new.\n"
+            "writeField := [ :value |\n"
+            "    stream nextPutAll: value size printString.\n"
+            "    stream nextPut: $:.\n"
+            "    stream nextPutAll: value\n"
+            "].\n"
+            "truncated := [ :text |\n"
+            "    text size > limit\n"
+            "        ifTrue: [ (text copyFrom: 1 to: limit), '...' ]\n"
+            "        ifFalse: [ text ]\n"
+            "].\n"
+            "%s to: %s do: [ :row |\n"
+            "    | key value label printed |\n"
+            "    %s\n"
+            "    printed := [ value printString ]\n"
+            "        on: Error\n"
+            "        do: [ :error | '<error printing>' ].\n"
+            "    writeField value: (truncated value: label).\n"
+            "    writeField value: value asOop printString.\n"
+            "    writeField value: value class name asString.\n"
+            "    writeField value: (truncated value: printed)\n"
+            "].\n"
+            "stream contents"
+        ) % (
+            self.print_string_limit,
+            first_row,
+            last_row,
+            self.row_value_script(),
+        )
+
+    def row_value_script(self):
+        if self.snapshot_stride == 2:
+            return (
+                "key := self at: row * 2 - 1.\n"
+                "    value := self at: row * 2.\n"
+                "    label := [ key asString ]\n"
+                "        on: Error\n"
+                "        do: [ :error | key printString ]."
+            )
+        return "value := self at: row.\n    label := '[', row printString, ']'."
+
+    def value_at(self, row_index):
+        return self.snapshot.at((row_index + 1) * self.snapshot_stride)
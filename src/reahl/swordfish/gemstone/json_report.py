@@ -0,0 +1,117 @@
+import json
+
+from reahl.swordfish.gemstone.session import DomainException
+
+JSON_REPORT_TEMPORARY_NAMES = (
+    "jsonStream jsonHexDigits writeJsonEscape writeJsonString writeJson"
+)
+JSON_REPORT_WRITER_STATEMENTS = (
+    "jsonStream := WriteStream on: String new.\n"
+    "jsonHexDigits := '0123456789abcdef'.\n"
+    "writeJsonEscape := [ :code |\n"
+    "    jsonStream nextPutAll: '\\u'.\n"
+    "    #(4096 256 16 1) do: [ :radix |\n"
+    "        jsonStream nextPut: (jsonHexDigits at: code // radix \\\\ 16 + 1)\n"
+    "    ]\n"
+    "].\n"
+    "writeJsonString := [ :aString |\n"
+    '    jsonStream nextPut: $".\n'
+    "    aString do: [ :character |\n"
+    "        | code |\n"
+    "        code := character asInteger.\n"
+    '        (character = $" or: [ character = $\\ ])\n'
+    "            ifTrue: [ jsonStream nextPut: $\\; nextPut: character ]\n"
+    "            ifFalse: [\n"
+    "                (code < 32 or: [ code > 126 ])\n"
+    "                    ifTrue: [\n"
+    "                        code > 65535\n"
+    "                            ifTrue: [\n"
+    "                                writeJsonEscape value: 55296 + (code - 65536 // 1024).\n"
+    "                                writeJsonEscape value: 56320 + (code - 65536 \\\\ 1024)\n"
+    "                            ]\n"
+    "                            ifFalse: [ writeJsonEscape value: code ]\n"
+    "                    ]\n"
+    "                    ifFalse: [ jsonStream nextPut: character ]\n"
+    "            ]\n"
+    "    ].\n"
+    '    jsonStream nextPut: $"\n'
+    "].\n"
+    "writeJson := [ :value |\n"
+    "    | kind isFirst |\n"
+    "    kind := #other.\n"
+    "    isFirst := true.\n"
+    "    value isNil ifTrue: [ kind := #null ].\n"
+    "    (value == true or: [ value == false ]) ifTrue: [ kind := #boolean ].\n"
+    "    value isNumber ifTrue: [ kind := #number ].\n"
+    "    value isString ifTrue: [ kind := #string ].\n"
+    "    (kind == #other and: [ value isKindOf: AbstractDictionary ])\n"
+    "        ifTrue: [ kind := #object ].\n"
+    "    (kind == #other and: [ value isKindOf: Collection ])\n"
+    "        ifTrue: [ kind := #array ].\n"
+    "    kind == #null ifTrue: [ jsonStream nextPutAll: 'null' ].\n"
+    "    kind == #boolean ifTrue: [ jsonStream nextPutAll: value printString ].\n"
+    "    kind == #number ifTrue: [\n"
+    "        jsonStream nextPutAll: (value isInteger\n"
+    "            ifTrue: [ value printString ]\n"
+    "            ifFalse: [ value asFloat printString ])\n"
+    "    ].\n"
+    "    kind == #string ifTrue: [ writeJsonString value: value asString ].\n"
+    "    kind == #object ifTrue: [\n"
+    "        jsonStream nextPut: ${.\n"
+    "        value keysAndValuesDo: [ :key :element |\n"
+    "            isFirst ifFalse: [ jsonStream nextPut: $, ].\n"
+    "            isFirst := false.\n"
+    "            writeJsonString value: key asString.\n"
+    "            jsonStream nextPut: $:.\n"
+    "            writeJson value: element\n"
+    "        ].\n"
+    "        jsonStream nextPut: $}\n"
+    "    ].\n"
+    "    kind == #array ifTrue: [\n"
+    "        jsonStream nextPut: $[.\n"
+    "        value do: [ :element |\n"
+    "            isFirst ifFalse: [ jsonStream nextPut: $, ].\n"
+    "            isFirst := false.\n"
+    "            writeJson value: element\n"
+    "        ].\n"
+    "        jsonStream nextPut: $]\n"
+    "    ].\n"
+    "    kind == #other ifTrue: [ writeJsonString value: value printString ]\n"
+    "].\n"
+)
+
+
+def json_report_script(value_script):
+    return (
+        "| jsonReportValue %s |\n"
+        "jsonReportValue := [\n"
+        "%s\n"
+        "] value.\n"
+        "%s"
+        "writeJson value: jsonReportValue.\n"
+        "jsonStream contents"
+    ) % (
+        JSON_REPORT_TEMPORARY_NAMES,
+        value_script,
+        JSON_REPORT_WRITER_STATEMENTS,
+    )
+
+
+def json_report_method_source():
+    return (
+        "jsonReportFor: anObject\n"
+        "    | %s |\n"
+        "%s"
+        "    writeJson value: anObject.\n"
+        "    ^jsonStream contents"
+    ) % (
+        JSON_REPORT_TEMPORARY_NAMES,
+        JSON_REPORT_WRITER_STATEMENTS,
+    )
+
+
+def json_report_value(report):
+    try:
+        return json.loads(report)
+    except (TypeError, ValueError) as error:
+        raise DomainException("Malformed JSON report: %s" % error)
@@ -0,0 +1,284 @@
+import copy
+import threading
+
+from reahl.ptongue import GemstoneApiError, GemstoneError
+
+from reahl.swordfish.gemstone.change_journal import (
+    CHANGE_JOURNAL_MAXIMUM_ENTRY_COUNT,
+    CHANGE_JOURNAL_SEQUENCE_OVERLAP,
+    CLASS_LIST_CHANGE_KINDS,
+    FLUSH_ALL_CHANGE_KIND,
+    change_journal_recording_statement,
+    change_journal_row_fields,
+    change_journal_since,
+)
+from reahl.swordfish.gemstone.refactoring_plans import RefactoringPlans
+from reahl.swordfish.gemstone.selector_index import SelectorIndex
+
+metadata_caches_by_session_key = {}
+metadata_caches_lock = threading.Lock()
+
+
+class MetadataCache:
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.generation = 0
+        self.entries_by_scope = {}
+        self.hit_count = 0
+        self.miss_count = 0
+        self.invalidation_count = 0
+        self.flush_count = 0
+        self.selector_index = SelectorIndex()
+        self.refactoring_plans = RefactoringPlans()
+        self.resolutions_by_key = {}
+        self.resolution_hit_count = 0
+        self.resolution_miss_count = 0
+        self.is_change_journal_checked = False
+        self.change_journal_sequence = None
+        self.seen_change_journal_sequences = set()
+        self.changed_class_names_in_transaction = set()
+        self.has_unscoped_change_in_transaction = False
+        self.journal_refresh_count = 0
+        self.transaction_boundary_count = 0
+
+    def cached_value(self, scope, key, fetch_value):
+        with self.lock:
+            scope_entries = self.entries_by_scope.get(scope)
+            if scope_entries is not None and key in scope_entries:
+                self.hit_count = self.hit_count + 1
+                return copy.deepcopy(scope_entries[key])
+            self.miss_count = self.miss_count + 1
+            fetched_in_generation = self.generation
+        value = fetch_value()
+        with self.lock:
+            if self.generation == fetched_in_generation:
+                self.entries_by_scope.setdefault(scope, {})[key] = copy.deepcopy(value)
+        return value
+
+    def cached_value_if_present(self, scope, key):
+        with self.lock:
+            scope_entries = self.entries_by_scope.get(scope)
+            if scope_entries is not None and key in scope_entries:
+                self.hit_count = self.hit_count + 1
+                return True, copy.deepcopy(scope_entries[key])
+            return False, None
+
+    def store_value(self, scope, key, value):
+        with self.lock:
+            self.miss_count = self.miss_count + 1
+            self.entries_by_scope.setdefault(scope, {})[key] = copy.deepcopy(value)
+
+    def cached_resolution(self, key, resolve):
+        with self.lock:
+            if key in self.resolutions_by_key:
+                self.resolution_hit_count = self.resolution_hit_count + 1
+                return self.resolutions_by_key[key]
+            self.resolution_miss_count = self.resolution_miss_count + 1
+            resolved_in_generation = self.generation
+        resolution = resolve()
+        with self.lock:
+            if self.generation == resolved_in_generation:
+                self.resolutions_by_key[key] = resolution
+        return resolution
+
+    def forget_class_resolution(self, class_name):
+        with self.lock:
+            self.generation = self.generation + 1
+            for show_instance_side in (True, False):
+                self.resolutions_by_key.pop(
+                    ("class", class_name, show_instance_side), None
+                )
+
+    def invalidate_scope(self, scope):
+        with self.lock:
+            self.generation = self.generation + 1
+            if self.entries_by_scope.pop(scope, None) is not None:
+                self.invalidation_count = self.invalidation_count + 1
+
+    def note_class_changed(self, class_name):
+        with self.lock:
+            self.changed_class_names_in_transaction.add(class_name)
+
+    def note_unscoped_change(self):
+        with self.lock:
+            self.has_unscoped_change_in_transaction = True
+
+    def has_unscoped_change_to_journal(self):
+        with self.lock:
+            return (
+                self.has_unscoped_change_in_transaction
+                and self.change_journal_sequence is not None
+            )
+
+    def invalidate_class(self, class_name, includes_class_lists=False):
+        with self.lock:
+            self.invalidate_scope(("class", class_name))
+            self.invalidate_scope(("class_side", class_name, True))
+            self.invalidate_scope(("class_side", class_name, False))
+            self.forget_class_resolution(class_name)
+            self.selector_index.mark_class_dirty(class_name)
+            if includes_class_lists:
+                self.invalidate_scope(("class_lists",))
+
+    def follow_change_journal(self, current_sequence):
+        self.is_change_journal_checked = True
+        self.change_journal_sequence = current_sequence
+        self.seen_change_journal_sequences.clear()
+
+    def stop_following_change_journal(self):
+        self.is_change_journal_checked = True
+        self.change_journal_sequence = None
+        self.seen_change_journal_sequences.clear()
+
+    def change_journal_poll_start(self):
+        if self.change_journal_sequence is None:
+            return -1
+        return max(0, self.change_journal_sequence - CHANGE_JOURNAL_SEQUENCE_OVERLAP)
+
+    def refresh_after_transaction_boundary(self, gemstone_session):
+        self.transaction_boundary_count = self.transaction_boundary_count + 1
+        # AI: A session that is not following is polled again too, so it starts
+        # following a journal that another session installed since.
+        try:
+            change_journal = change_journal_since(
+                gemstone_session,
+                self.change_journal_poll_start(),
+            )
+        except (GemstoneError, GemstoneApiError):
+            change_journal = None
+        self.refresh_from_change_journal(change_journal)
+
+    def refresh_from_change_journal(self, change_journal):
+        with self.lock:
+            self.refresh_from_change_journal_while_locked(change_journal)
+
+    def refresh_from_change_journal_while_locked(self, change_journal):
+        changed_class_names = self.changed_class_names_in_transaction
+        self.changed_class_names_in_transaction = set()
+        self.has_unscoped_change_in_transaction = False
+        if change_journal is None:
+            self.stop_following_change_journal()
+            self.flush()
+            return
+        has_missed_changes = (
+            self.change_journal_sequence is None
+            or change_journal["current_sequence"] - self.change_journal_sequence
+            >= CHANGE_JOURNAL_MAXIMUM_ENTRY_COUNT
+        )
+        if has_missed_changes:
+            self.follow_change_journal(change_journal["current_sequence"])
+            self.flush()
+            return
+        for class_name in changed_class_names:
+            self.invalidate_class(class_name, includes_class_lists=True)
+        for change in change_journal["changes"]:
+            if change["sequence"] not in self.seen_change_journal_sequences:
+                self.seen_change_journal_sequences.add(change["sequence"])
+                if change["change_kind"] == FLUSH_ALL_CHANGE_KIND:
+                    self.flush()
+                else:
+                    self.invalidate_class(
+                        change["class_name"],
+                        includes_class_lists=change["change_kind"]
+                        in CLASS_LIST_CHANGE_KINDS,
+                    )
+            self.change_journal_sequence = max(
+                self.change_journal_sequence,
+                change["sequence"],
+            )
+        self.seen_change_journal_sequences = {
+            sequence
+            for sequence in self.seen_change_journal_sequences
+            if sequence > self.change_journal_poll_start()
+        }
+        self.journal_refresh_count = self.journal_refresh_count + 1
+
+    def flush(self):
+        with self.lock:
+            self.generation = self.generation + 1
+            self.entries_by_scope.clear()
+            self.resolutions_by_key.clear()
+            self.selector_index.mark_stale()
+            self.flush_count = self.flush_count + 1
+
+    def entry_count(self):
+        with self.lock:
+            return sum(
+                len(scope_entries) for scope_entries in self.entries_by_scope.values()
+            )
+
+    def statistics(self):
+        with self.lock:
+            return self.statistics_while_locked()
+
+    def statistics_while_locked(self):
+        return {
+            "hit_count": self.hit_count,
+            "miss_count": self.miss_count,
+            "invalidation_count": self.invalidation_count,
+            "flush_count": self.flush_count,
+            "entry_count": self.entry_count(),
+            "resolution_hit_count": self.resolution_hit_count,
+            "resolution_miss_count": self.resolution_miss_count,
+            "change_journal_sequence": self.change_journal_sequence,
+            "journal_refresh_count": self.journal_refresh_count,
+            "selector_index": self.selector_index.statistics(),
+            "refactoring_plan_count": self.refactoring_plans.plan_count(),
+        }
+
+
+def session_key_for(gemstone_session):
+    return id(gemstone_session)
+
+
+def metadata_cache_for_session(gemstone_session):
+    selected_session_key = session_key_for(gemstone_session)
+    with metadata_caches_lock:
+        metadata_cache = metadata_caches_by_session_key.get(selected_session_key)
+        if metadata_cache is None:
+            metadata_cache = MetadataCache()
+            metadata_caches_by_session_key[selected_session_key] = metadata_cache
+        return metadata_cache
+
+
+def refresh_metadata_cache_for_session(gemstone_session):
+    metadata_cache = metadata_caches_by_session_key.get(
+        session_key_for(gemstone_session)
+    )
+    if metadata_cache is not None:
+        metadata_cache.refresh_after_transaction_boundary(gemstone_session)
+
+
+def record_unscoped_changes_before_commit(gemstone_session):
+    # AI: Evaluated code can change any class without naming it, so a session
+    # that ran such code tells the journal to make every follower flush.
+    metadata_cache = metadata_caches_by_session_key.get(
+        session_key_for(gemstone_session)
+    )
+    if metadata_cache is None or not metadata_cache.has_unscoped_change_to_journal():
+        return
+    try:
+        gemstone_session.execute(
+            change_journal_recording_statement(
+                change_journal_row_fields(FLUSH_ALL_CHANGE_KIND, [("*", True, "")])
+            )
+            + "true"
+        )
+    except (GemstoneError, GemstoneApiError):
+        metadata_cache.stop_following_change_journal()
+
+
+def flush_metadata_cache_for_session(gemstone_session):
+    metadata_cache = metadata_caches_by_session_key.get(
+        session_key_for(gemstone_session)
+    )
+    if metadata_cache is not None:
+        metadata_cache.flush()
+
+
+def discard_metadata_cache_for_session(gemstone_session):
+    metadata_caches_by_session_key.pop(session_key_for(gemstone_session), None)
+
+
+def clear_all_metadata_caches():
+    metadata_caches_by_session_key.clear()
@@ -0,0 +1,52 @@
+import collections
+import hashlib
+import uuid
+
+REFACTORING_PLAN_LIMIT = 32
+
+
+def method_source_fingerprint(method_source):
+    if method_source is None:
+        return None
+    return hashlib.sha256(method_source.encode("utf-8")).hexdigest()
+
+
+class RefactoringPlan:
+    def __init__(
+        self,
+        refactoring_kind,
+        arguments,
+        plan,
+        method_fingerprints,
+        usage_fingerprint=None,
+    ):
+        self.plan_id = str(uuid.uuid4())
+        self.refactoring_kind = refactoring_kind
+        self.arguments = arguments
+        self.plan = plan
+        self.method_fingerprints = method_fingerprints
+        self.usage_fingerprint = usage_fingerprint
+
+
+class RefactoringPlans:
+    def __init__(self, plan_limit=REFACTORING_PLAN_LIMIT):
+        self.plan_limit = plan_limit
+        self.plans_by_id = collections.OrderedDict()
+
+    def add(self, refactoring_plan):
+        self.plans_by_id[refactoring_plan.plan_id] = refactoring_plan
+        while len(self.plans_by_id) > self.plan_limit:
+            self.plans_by_id.popitem(last=False)
+        return refactoring_plan.plan_id
+
+    def get(self, plan_id):
+        return self.plans_by_id.get(plan_id)
+
+    def remove(self, plan_id):
+        self.plans_by_id.pop(plan_id, None)
+
+    def clear(self):
+        self.plans_by_id.clear()
+
+    def plan_count(self):
+        return len(self.plans_by_id)
@@ -0,0 +1,116 @@
+class SelectorIndex:
+    def __init__(self):
+        self.implementor_keys_by_selector = {}
+        self.sender_keys_by_selector = {}
+        self.sent_selectors_by_method_key = {}
+        self.method_keys_by_class_name = {}
+        self.dirty_class_names = set()
+        self.class_fingerprints = {}
+        self.is_built = False
+        self.is_stale = False
+        self.build_count = 0
+        self.stale_refresh_count = 0
+
+    def clear(self):
+        self.implementor_keys_by_selector.clear()
+        self.sender_keys_by_selector.clear()
+        self.sent_selectors_by_method_key.clear()
+        self.method_keys_by_class_name.clear()
+        self.dirty_class_names.clear()
+        self.class_fingerprints = {}
+        self.is_built = False
+        self.is_stale = False
+
+    def mark_built(self, class_fingerprints):
+        self.class_fingerprints = dict(class_fingerprints)
+        self.is_built = True
+        self.is_stale = False
+        self.build_count = self.build_count + 1
+
+    def mark_stale(self):
+        if self.is_built:
+            self.is_stale = True
+
+    def mark_refreshed(self, class_fingerprints):
+        self.class_fingerprints = dict(class_fingerprints)
+        self.is_stale = False
+        self.stale_refresh_count = self.stale_refresh_count + 1
+
+    def changed_class_names(self, class_fingerprints):
+        changed_class_names = {
+            class_name
+            for class_name, class_fingerprint in class_fingerprints.items()
+            if self.class_fingerprints.get(class_name) != class_fingerprint
+        }
+        removed_class_names = set(self.class_fingerprints) - set(class_fingerprints)
+        return sorted(changed_class_names | removed_class_names)
+
+    def mark_class_dirty(self, class_name):
+        if self.is_built:
+            self.dirty_class_names.add(class_name)
+
+    def take_dirty_class_names(self):
+        dirty_class_names = sorted(self.dirty_class_names)
+        self.dirty_class_names.clear()
+        return dirty_class_names
+
+    def add_method(self, class_name, show_instance_side, selector, sent_selectors):
+        method_key = (class_name, show_instance_side, selector)
+        self.remove_method(method_key)
+        self.implementor_keys_by_selector.setdefault(selector, set()).add(method_key)
+        for sent_selector in sent_selectors:
+            self.sender_keys_by_selector.setdefault(sent_selector, set()).add(
+                method_key
+            )
+        self.sent_selectors_by_method_key[method_key] = set(sent_selectors)
+        self.method_keys_by_class_name.setdefault(class_name, set()).add(method_key)
+
+    def remove_method(self, method_key):
+        sent_selectors = self.sent_selectors_by_method_key.pop(method_key, None)
+        if sent_selectors is None:
+            return
+        class_name, show_instance_side, selector = method_key
+        self.discard_key(self.implementor_keys_by_selector, selector, method_key)
+        for sent_selector in sent_selectors:
+            self.discard_key(self.sender_keys_by_selector, sent_selector, method_key)
+        self.discard_key(self.method_keys_by_class_name, class_name, method_key)
+
+    def remove_class(self, class_name):
+        method_keys = list(self.method_keys_by_class_name.get(class_name, set()))
+        for method_key in method_keys:
+            self.remove_method(method_key)
+
+    def discard_key(self, keys_by_name, name, method_key):
+        keys = keys_by_name.get(name)
+        if keys is None:
+            return
+        keys.discard(method_key)
+        if not keys:
+            keys_by_name.pop(name)
+
+    def matching_selectors(self, search_input):
+        normalized_search_input = search_input.lower()
+        return sorted(
+            [
+                selector
+                for selector in self.implementor_keys_by_selector
+                if normalized_search_input in selector.lower()
+            ]
+        )
+
+    def implementor_keys(self, selector):
+        return sorted(self.implementor_keys_by_selector.get(selector, set()))
+
+    def sender_keys(self, selector):
+        return sorted(self.sender_keys_by_selector.get(selector, set()))
+
+    def statistics(self):
+        return {
+            "is_built": self.is_built,
+            "is_stale": self.is_stale,
+            "build_count": self.build_count,
+            "stale_refresh_count": self.stale_refresh_count,
+            "selector_count": len(self.implementor_keys_by_selector),
+            "method_count": len(self.sent_selectors_by_method_key),
+            "dirty_class_count": len(self.dirty_class_names),
+        }
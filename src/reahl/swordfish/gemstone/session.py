@@ -11,11 +11,23 @@ from reahl.ptongue import (
     RPCSession,
 )
 
+from reahl.swordfish.gemstone.metadata_cache import (
+    discard_metadata_cache_for_session,
+    record_unscoped_changes_before_commit,
+    refresh_metadata_cache_for_session,
+)
+
 
 class DomainException(Exception):
     pass
 
 
+class MethodsNotCompiled(DomainException):
+    def __init__(self, message, compile_errors):
+        super().__init__(message)
+        self.compile_errors = compile_errors
+
+
 standard_stream_lock = threading.Lock()
 
 
@@ -88,19 +100,30 @@ def create_rpc_session(
 
 
 def close_session(gemstone_session):
+    discard_metadata_cache_for_session(gemstone_session)
     perform_without_process_output(gemstone_session.log_out)
 
 
 def begin_transaction(gemstone_session):
-    perform_without_process_output(gemstone_session.begin)
+    try:
+        perform_without_process_output(gemstone_session.begin)
+    finally:
+        refresh_metadata_cache_for_session(gemstone_session)
 
 
 def commit_transaction(gemstone_session):
-    perform_without_process_output(gemstone_session.commit)
+    try:
+        record_unscoped_changes_before_commit(gemstone_session)
+        perform_without_process_output(gemstone_session.commit)
+    finally:
+        refresh_metadata_cache_for_session(gemstone_session)
 
 
 def abort_transaction(gemstone_session):
-    perform_without_process_output(gemstone_session.abort)
+    try:
+        perform_without_process_output(gemstone_session.abort)
+    finally:
+        refresh_metadata_cache_for_session(gemstone_session)
 
 
 def session_summary(gemstone_session):
@@ -122,6 +145,20 @@ def evaluate_source(gemstone_session, source):
     }
 
 
+def length_prefixed_fields(report):
+    fields = []
+    index = 0
+    while index < len(report):
+        separator_index = report.find(":", index)
+        if separator_index == -1:
+            raise DomainException("Malformed length-prefixed report.")
+        field_start = separator_index + 1
+        field_end = field_start + int(report[index:separator_index])
+        fields.append(report[field_start:field_end])
+        index = field_end
+    return fields
+
+
 def render_result(result):
     result_payload = {
         "oop": result.oop,
@@ -159,6 +196,13 @@ def add_string_value(result, result_payload):
         result_payload["string_value_error"] = {"message": str(error)}
 
 
+def domain_error_payload(error):
+    payload = {"message": str(error)}
+    if isinstance(error, MethodsNotCompiled):
+        payload["compile_errors"] = error.compile_errors
+    return payload
+
+
 def gemstone_error_payload(error):
     payload = {
         "message": str(error),
@@ -0,0 +1,93 @@
+import collections
+import re
+import threading
+
+SOURCE_ANALYSIS_CACHE_SIZE = 512
+
+SMALLTALK_TOKEN_PATTERN = re.compile(
+    r"(?P<whitespace>\s+)"
+    r'|(?P<comment>"[^"]*"?)'
+    r"|(?P<string>'(?:[^']|'')*'?)"
+    r"|(?P<character>\$.)"
+    r"|(?P<keyword>[A-Za-z_][A-Za-z0-9_]*:(?!=))"
+    r"|(?P<identifier>[A-Za-z_][A-Za-z0-9_]*)"
+    r"|(?P<number>[0-9]+)"
+    r"|(?P<assignment>:=)"
+    r"|(?P<binary>[-+*/\\~<>=@%|&?,]+)"
+    r"|(?P<punctuation>.)",
+    re.DOTALL,
+)
+NON_CODE_TOKEN_KINDS = ("comment", "string")
+
+source_analyses_by_source = collections.OrderedDict()
+source_analyses_lock = threading.Lock()
+
+
+def smalltalk_tokens(source):
+    return [
+        (match.lastgroup, match.start(), match.end(), match.group())
+        for match in SMALLTALK_TOKEN_PATTERN.finditer(source)
+    ]
+
+
+class SourceAnalysis:
+    def __init__(self, source):
+        self.source = source
+        self.memoised_values = {}
+
+    def memoised(self, name, compute_value):
+        if name not in self.memoised_values:
+            self.memoised_values[name] = compute_value()
+        return self.memoised_values[name]
+
+    def tokens(self):
+        return self.memoised("tokens", lambda: smalltalk_tokens(self.source))
+
+    def code_character_map(self):
+        return self.memoised("code_character_map", self.computed_code_character_map)
+
+    def computed_code_character_map(self):
+        code_character_map = [True] * len(self.source)
+        for kind, start, end, _ in self.tokens():
+            if kind in NON_CODE_TOKEN_KINDS:
+                code_character_map[start:end] = [False] * (end - start)
+        return code_character_map
+
+    def line_column_map(self):
+        return self.memoised("line_column_map", self.computed_line_column_map)
+
+    def computed_line_column_map(self):
+        line_column_map = []
+        for line_number, line in enumerate(self.source.split("\n"), start=1):
+            line_column_map.extend(
+                [
+                    (line_number, column_number)
+                    for column_number in range(1, len(line) + 2)
+                ]
+            )
+        return line_column_map[: len(self.source)]
+
+    def code_tokens_from(self, start_offset):
+        return [
+            token
+            for token in self.tokens()
+            if token[1] >= start_offset and token[0] not in NON_CODE_TOKEN_KINDS
+        ]
+
+
+def source_analysis_for(source):
+    with source_analyses_lock:
+        source_analysis = source_analyses_by_source.get(source)
+        if source_analysis is not None:
+            source_analyses_by_source.move_to_end(source)
+            return source_analysis
+        source_analysis = SourceAnalysis(source)
+        source_analyses_by_source[source] = source_analysis
+        if len(source_analyses_by_source) > SOURCE_ANALYSIS_CACHE_SIZE:
+            source_analyses_by_source.popitem(last=False)
+        return source_analysis
+
+
+def clear_source_analyses():
+    with source_analyses_lock:
+        source_analyses_by_source.clear()
@@ -0,0 +1,188 @@
+import json
+import os
+import threading
+import time
+
+from reahl.swordfish.gemstone.configuration import swordfish_config_directory
+
+TEST_TIMING_HISTORY_FILE_NAME = "test_timing_history.json"
+TEST_TIMING_HISTORY_SCHEMA_VERSION = 2
+TEST_TIMING_RUNS_KEPT = 10
+TEST_TIMING_REGRESSION_RATIO = 1.5
+TEST_TIMING_REGRESSION_MINIMUM_MS = 50
+
+
+def test_timing_key(stone_name, test_case_class_name, test_method_selector):
+    return "%s:%s>>%s" % (stone_name, test_case_class_name, test_method_selector)
+
+
+class TimingHistory:
+    def __init__(self, history_file_path=None):
+        self.configured_history_file_path = history_file_path
+        self.lock = threading.Lock()
+
+    @property
+    def history_file_path(self):
+        if self.configured_history_file_path is not None:
+            return self.configured_history_file_path
+        return os.path.join(
+            swordfish_config_directory(),
+            TEST_TIMING_HISTORY_FILE_NAME,
+        )
+
+    def timing_entries_by_key(self):
+        try:
+            with open(self.history_file_path, "r", encoding="utf-8") as history_file:
+                payload = json.load(history_file)
+        except (OSError, TypeError, ValueError):
+            return {}
+        if not isinstance(payload, dict):
+            return {}
+        if payload.get("schema_version") != TEST_TIMING_HISTORY_SCHEMA_VERSION:
+            return {}
+        timing_entries_by_key = payload.get("tests")
+        if not isinstance(timing_entries_by_key, dict):
+            return {}
+        return timing_entries_by_key
+
+    def save_timing_entries(self, timing_entries_by_key):
+        history_directory = os.path.dirname(self.history_file_path)
+        temporary_file_path = self.history_file_path + ".tmp"
+        payload = {
+            "schema_version": TEST_TIMING_HISTORY_SCHEMA_VERSION,
+            "tests": timing_entries_by_key,
+        }
+        try:
+            if history_directory:
+                os.makedirs(history_directory, exist_ok=True)
+            with open(temporary_file_path, "w", encoding="utf-8") as history_file:
+                json.dump(payload, history_file, sort_keys=True)
+            os.replace(temporary_file_path, self.history_file_path)
+            return True
+        except OSError:
+            try:
+                os.remove(temporary_file_path)
+            except OSError:
+                pass
+            return False
+
+    def record_test_timings(self, test_timings, stone_name="", recorded_at=None):
+        if not test_timings:
+            return False
+        if recorded_at is None:
+            recorded_at = time.time()
+        with self.lock:
+            timing_entries_by_key = self.timing_entries_by_key()
+            for test_timing in test_timings:
+                timing_key = test_timing_key(
+                    stone_name,
+                    test_timing["test_case_class_name"],
+                    test_timing["test_method_selector"],
+                )
+                timing_entry = timing_entries_by_key.setdefault(
+                    timing_key,
+                    {
+                        "stone_name": stone_name,
+                        "test_case_class_name": test_timing["test_case_class_name"],
+                        "test_method_selector": test_timing["test_method_selector"],
+                        "package_name": "",
+                        "runs": [],
+                    },
+                )
+                if test_timing.get("package_name"):
+                    timing_entry["package_name"] = test_timing["package_name"]
+                timing_entry["runs"].append(
+                    {
+                        "elapsed_ms": test_timing["elapsed_ms"],
+                        "status": test_timing["status"],
+                        "recorded_at": recorded_at,
+                    }
+                )
+                timing_entry["runs"] = timing_entry["runs"][-TEST_TIMING_RUNS_KEPT:]
+            return self.save_timing_entries(timing_entries_by_key)
+
+    def timing_report(self, limit=20, package_name=None, stone_name=None):
+        with self.lock:
+            timing_entries = list(self.timing_entries_by_key().values())
+        if stone_name is not None:
+            timing_entries = [
+                timing_entry
+                for timing_entry in timing_entries
+                if timing_entry.get("stone_name") == stone_name
+            ]
+        if package_name:
+            timing_entries = [
+                timing_entry
+                for timing_entry in timing_entries
+                if timing_entry.get("package_name") == package_name
+            ]
+        latest_timings = [
+            self.latest_timing(timing_entry)
+            for timing_entry in timing_entries
+            if timing_entry.get("runs")
+        ]
+        slowest_tests = sorted(
+            latest_timings,
+            key=lambda latest_timing: -latest_timing["elapsed_ms"],
+        )
+        regressions = sorted(
+            [
+                latest_timing
+                for latest_timing in latest_timings
+                if self.is_regression(latest_timing)
+            ],
+            key=lambda latest_timing: -(
+                latest_timing["elapsed_ms"] - latest_timing["previous_elapsed_ms"]
+            ),
+        )
+        package_totals_by_name = {}
+        for latest_timing in latest_timings:
+            package_total = package_totals_by_name.setdefault(
+                latest_timing["package_name"],
+                {
+                    "package_name": latest_timing["package_name"],
+                    "test_count": 0,
+                    "elapsed_ms": 0,
+                },
+            )
+            package_total["test_count"] += 1
+            package_total["elapsed_ms"] += latest_timing["elapsed_ms"]
+        package_totals = sorted(
+            package_totals_by_name.values(),
+            key=lambda package_total: -package_total["elapsed_ms"],
+        )
+        return {
+            "test_count": len(latest_timings),
+            "slowest_tests": slowest_tests[:limit],
+            "regressions": regressions[:limit],
+            "package_totals": package_totals,
+        }
+
+    def latest_timing(self, timing_entry):
+        runs = timing_entry["runs"]
+        return {
+            "stone_name": timing_entry.get("stone_name", ""),
+            "test_case_class_name": timing_entry["test_case_class_name"],
+            "test_method_selector": timing_entry["test_method_selector"],
+            "package_name": timing_entry.get("package_name", ""),
+            "elapsed_ms": runs[-1]["elapsed_ms"],
+            "status": runs[-1]["status"],
+            "previous_elapsed_ms": runs[-2]["elapsed_ms"] if len(runs) > 1 else None,
+            "run_count": len(runs),
+        }
+
+    def is_regression(self, latest_timing):
+        previous_elapsed_ms = latest_timing["previous_elapsed_ms"]
+        if previous_elapsed_ms is None:
+            return False
+        elapsed_ms = latest_timing["elapsed_ms"]
+        if elapsed_ms - previous_elapsed_ms < TEST_TIMING_REGRESSION_MINIMUM_MS:
+            return False
+        return elapsed_ms > previous_elapsed_ms * TEST_TIMING_REGRESSION_RATIO
+
+
+timing_history = TimingHistory()
+
+
+def current_timing_history():
+    return timing_history
@@ -2,8 +2,9 @@ import tkinter as tk
 import tkinter.messagebox as messagebox
 from tkinter import ttk
 
-from reahl.ptongue import GemstoneError
+from reahl.ptongue import GemObject, GemstoneError
 
+from reahl.swordfish.gemstone import GemstoneCollectionPages, GemstoneFrameVariables
 from reahl.swordfish.navigation import NavigationHistory
 from reahl.swordfish.tab_registry import DeduplicatedTabRegistry
 from reahl.swordfish.ui_support import add_close_command_to_popup_menu, popup_menu
@@ -33,7 +34,11 @@ class ObjectInspector(ttk.Frame):
         self.pagination_mode = None
         self.dictionary_keys = []
         self.set_as_array = None
+        self.inspected_values = None
+        self.value_names = []
+        self.collection_pages = None
         self.actual_values = []
+        self.deferred_value_for = None
         self.treeview_heading = 'Name'
 
         self.treeview = ttk.Treeview(
@@ -68,8 +73,7 @@ class ObjectInspector(ttk.Frame):
         self.footer.columnconfigure(0, weight=1)
 
         if values is not None:
-            self.pagination_mode = None
-            self.load_rows(list(values.items()), 'Name', len(values))
+            self.configure_value_rows(values)
         else:
             self.inspect_object(an_object)
 
@@ -178,7 +182,24 @@ class ObjectInspector(ttk.Frame):
         set_markers = ('Set', 'Bag')
         return any(marker in class_name for marker in set_markers)
 
+    def configure_collection_pages(self, an_object, collection_kind, heading):
+        # AI: Live GemStone collections are paged server-side: each page is one
+        # script over a stable snapshot instead of several calls per element.
+        try:
+            self.collection_pages = GemstoneCollectionPages(an_object, collection_kind)
+        except GemstoneError:
+            self.collection_pages = None
+            return False
+        self.pagination_mode = collection_kind
+        self.current_page = 0
+        self.total_items = self.collection_pages.total_items
+        self.treeview_heading = heading
+        self.refresh_rows_for_current_page()
+        return True
+
     def configure_set_rows(self, an_object):
+        if isinstance(an_object, GemObject):
+            return self.configure_collection_pages(an_object, 'set', 'Element')
         try:
             self.set_as_array = an_object.asArray()
         except GemstoneError:
@@ -254,7 +275,18 @@ class ObjectInspector(ttk.Frame):
         inspected_values = self.inspect_instance(an_object)
         self.load_rows(list(inspected_values.items()), 'Name', len(inspected_values))
 
+    def configure_value_rows(self, values):
+        self.inspected_values = values
+        self.value_names = list(values.keys())
+        self.pagination_mode = 'values'
+        self.current_page = 0
+        self.total_items = len(self.value_names)
+        self.treeview_heading = 'Name'
+        self.refresh_rows_for_current_page()
+
     def configure_dictionary_rows(self, an_object):
+        if isinstance(an_object, GemObject):
+            return self.configure_collection_pages(an_object, 'dictionary', 'Key')
         try:
             self.dictionary_keys = list(an_object.keys())
         except GemstoneError:
@@ -283,6 +315,8 @@ class ObjectInspector(ttk.Frame):
                 can_access_index_one = False
         if not can_access_index_one:
             return False
+        if isinstance(an_object, GemObject):
+            return self.configure_collection_pages(an_object, 'indexed', 'Index')
 
         self.pagination_mode = 'indexed'
         self.current_page = 0
@@ -332,6 +366,18 @@ class ObjectInspector(ttk.Frame):
     def refresh_rows_for_current_page(self):
         start_index, end_index = self.row_range_for_current_page()
         rows = []
+        if self.collection_pages is not None:
+            self.load_collection_page_rows(start_index, end_index)
+            return
+        if self.pagination_mode == 'values':
+            value_names = self.value_names[start_index:end_index]
+            if isinstance(self.inspected_values, GemstoneFrameVariables):
+                self.load_frame_variable_rows(value_names)
+                return
+            rows = [
+                (value_name, self.inspected_values[value_name])
+                for value_name in value_names
+            ]
         if self.pagination_mode == 'dictionary':
             rows = self.dictionary_rows_for_range(start_index, end_index)
         if self.pagination_mode == 'indexed':
@@ -384,9 +430,7 @@ class ObjectInspector(ttk.Frame):
         self.total_items = total_items
         self.treeview.heading('Name', text=self.treeview_heading)
 
-        for existing_item in self.treeview.get_children():
-            self.treeview.delete(existing_item)
-        self.actual_values = []
+        self.clear_rows()
 
         for row_name, row_value in rows:
             self.treeview.insert(
@@ -402,11 +446,66 @@ class ObjectInspector(ttk.Frame):
 
         self.update_footer()
 
+    def clear_rows(self):
+        for existing_item in self.treeview.get_children():
+            self.treeview.delete(existing_item)
+        self.actual_values = []
+        self.deferred_value_for = None
+
+    def load_frame_variable_rows(self, value_names):
+        # AI: Frame variables are described by one batched server-side fetch for
+        # the visible page; the values themselves are only fetched when a row is used.
+        try:
+            display_rows = self.inspected_values.display_rows(value_names)
+        except GemstoneError:
+            display_rows = [
+                (value_name, 'Unknown', '<unavailable>') for value_name in value_names
+            ]
+        self.load_deferred_rows(
+            display_rows,
+            value_names,
+            self.inspected_values.__getitem__,
+        )
+
+    def load_collection_page_rows(self, start_index, end_index):
+        try:
+            page_rows = self.collection_pages.rows_for_range(start_index, end_index)
+        except GemstoneError:
+            page_rows = []
+        self.load_deferred_rows(
+            [
+                (page_row['label'], page_row['class_name'], page_row['print_string'])
+                for page_row in page_rows
+            ],
+            list(range(start_index, start_index + len(page_rows))),
+            self.collection_pages.value_at,
+        )
+
+    def load_deferred_rows(self, display_rows, value_keys, value_for):
+        self.treeview.heading('Name', text=self.treeview_heading)
+        self.clear_rows()
+        for (row_name, class_name, print_string), value_key in zip(
+            display_rows, value_keys
+        ):
+            normalized_class_name = self.normalized_text(class_name) or 'Unknown'
+            self.treeview.insert(
+                '',
+                'end',
+                values=(
+                    self.normalized_text(row_name),
+                    normalized_class_name,
+                    self.normalized_text(print_string)
+                    or f'<{normalized_class_name}>',
+                ),
+            )
+            self.actual_values.append(value_key)
+        self.deferred_value_for = value_for
+        self.update_footer()
+
     def update_footer(self):
         start_index, end_index = self.row_range_for_current_page()
         show_page_window = (
-            self.pagination_mode in ('dictionary', 'indexed')
-            and self.total_items > self.page_size
+            self.has_paged_rows() and self.total_items > self.page_size
         )
         if show_page_window:
             self.status_label.configure(
@@ -426,10 +525,11 @@ class ObjectInspector(ttk.Frame):
             if end_index < self.total_items:
                 self.next_button.configure(state=tk.NORMAL)
 
+    def has_paged_rows(self):
+        return self.pagination_mode in ('dictionary', 'indexed', 'set', 'values')
+
     def on_previous_page(self):
-        can_page_backwards = (
-            self.pagination_mode in ('dictionary', 'indexed') and self.current_page > 0
-        )
+        can_page_backwards = self.has_paged_rows() and self.current_page > 0
         if can_page_backwards:
             self.current_page -= 1
             self.refresh_rows_for_current_page()
@@ -437,8 +537,7 @@ class ObjectInspector(ttk.Frame):
     def on_next_page(self):
         start_index, end_index = self.row_range_for_current_page()
         can_page_forwards = (
-            self.pagination_mode in ('dictionary', 'indexed')
-            and end_index < self.total_items
+            self.has_paged_rows() and end_index < self.total_items
         )
         if can_page_forwards:
             self.current_page += 1
@@ -477,6 +576,11 @@ class ObjectInspector(ttk.Frame):
             return None
         index = self.treeview.index(selected_item)
         if index < len(self.actual_values):
+            if self.deferred_value_for is not None:
+                try:
+                    return self.deferred_value_for(self.actual_values[index])
+                except GemstoneError:
+                    return None
             return self.actual_values[index]
         return None
 
@@ -3,6 +3,7 @@
 import argparse
 import asyncio
 import functools
+import inspect
 import json
 import logging
 import os
@@ -10,6 +11,7 @@ import queue
 import re
 import sys
 import threading
+import time
 import tkinter as tk
 import tkinter.messagebox as messagebox
 import tkinter.simpledialog as simpledialog
@@ -45,10 +47,20 @@ from reahl.swordfish.class_diagram import (
 from reahl.swordfish.exceptions import DomainException
 from reahl.swordfish.execution import DebuggerControls, DebuggerWindow, RunTab
 from reahl.swordfish.gemstone import GemstoneBrowserSession, GemstoneDebugSession
+from reahl.swordfish.gemstone.configuration import config_home_directory
+from reahl.swordfish.gemstone.metadata_cache import (
+    discard_metadata_cache_for_session,
+    metadata_cache_for_session,
+    record_unscoped_changes_before_commit,
+    refresh_metadata_cache_for_session,
+)
 from reahl.swordfish.gemstone.session import DomainException as GemstoneDomainException
+from reahl.swordfish.gemstone.timing_history import current_timing_history
 from reahl.swordfish.inspector import Explorer, InspectorTab, ObjectInspector
 from reahl.swordfish.mcp.integration_state import current_integrated_session_state
 from reahl.swordfish.mcp.server import McpDependencyNotInstalled, create_server
+from reahl.swordfish.mcp.session_registry import configure_session_pool
+from reahl.swordfish.mcp.tool_executor import ConnectionToolExecutor
 from reahl.swordfish.navigation import (
     GlobalNavigationEntry,
     GlobalNavigationHistory,
@@ -101,7 +113,10 @@ from reahl.swordfish.ui_support import (
 class GemstoneSessionRecord:
     def __init__(self, gemstone_session):
         self.gemstone_session = gemstone_session
-        self.gemstone_browser_session = GemstoneBrowserSession(gemstone_session)
+        self.gemstone_browser_session = GemstoneBrowserSession(
+            gemstone_session,
+            metadata_cache=metadata_cache_for_session(gemstone_session),
+        )
         self.change_event_publisher = None
         self.integrated_session_state = None
         self.selected_package = None
@@ -112,6 +127,7 @@ class GemstoneSessionRecord:
         self.show_instance_side = True
         self.browse_mode = "categories"
         self.transaction_is_dirty = False
+        self.timing_history = current_timing_history()
 
     def set_integrated_session_state(self, integrated_session_state):
         self.integrated_session_state = integrated_session_state
@@ -207,12 +223,19 @@ class GemstoneSessionRecord:
 
     def commit(self):
         self.require_write_access("commit")
-        self.gemstone_session.commit()
+        try:
+            record_unscoped_changes_before_commit(self.gemstone_session)
+            self.gemstone_session.commit()
+        finally:
+            refresh_metadata_cache_for_session(self.gemstone_session)
         self.transaction_is_dirty = False
 
     def abort(self):
         self.require_write_access("abort")
-        self.gemstone_session.abort()
+        try:
+            self.gemstone_session.abort()
+        finally:
+            refresh_metadata_cache_for_session(self.gemstone_session)
         self.transaction_is_dirty = False
 
     @classmethod
@@ -279,6 +302,7 @@ class GemstoneSessionRecord:
 
     def log_out(self):
         self.gemstone_browser_session.clear_stored_breakpoints()
+        discard_metadata_cache_for_session(self.gemstone_session)
         self.gemstone_session.log_out()
 
     @property
@@ -436,14 +460,14 @@ class GemstoneSessionRecord:
         return self.gemstone_browser_session.rowan_package_name_for_class(class_name)
 
     def jump_to_class(self, class_name, show_instance_side):
-        selected_gemstone_class = self.gemstone_session.resolve_symbol(class_name)
+        selected_gemstone_class = self.gemstone_browser_session.class_to_query(class_name, True)
         selected_category = self.class_category_containing_class(class_name, selected_gemstone_class)
         self.select_class_category(selected_category)
         self.select_instance_side(show_instance_side)
         self.select_class(class_name)
 
     def jump_to_method(self, class_name, show_instance_side, method_symbol):
-        selected_gemstone_class = self.gemstone_session.resolve_symbol(class_name)
+        selected_gemstone_class = self.gemstone_browser_session.class_to_query(class_name, True)
         selected_package = selected_gemstone_class.category().to_py
         selected_method_category = self.gemstone_browser_session.get_method_category(
             class_name,
@@ -935,6 +959,7 @@ class GemstoneSessionRecord:
 
     def run_code(self, source):
         self.require_write_access("run_code")
+        self.gemstone_browser_session.flush_metadata_cache()
         result = self.gemstone_browser_session.run_code(source)
         self.mark_transaction_dirty()
         return result
@@ -942,9 +967,41 @@ class GemstoneSessionRecord:
     def resolve_object(self, source):
         return self.gemstone_browser_session.run_code(source)
 
+    def record_test_timings(self, test_result):
+        if not isinstance(test_result, dict):
+            return
+        self.timing_history.record_test_timings(
+            test_result.get("test_timings", []),
+            stone_name=self.gemstone_browser_session.stone_name(),
+        )
+
+    def test_timing_report(self, limit=20, package_name=None):
+        return self.timing_history.timing_report(
+            limit=limit,
+            package_name=package_name,
+            stone_name=self.gemstone_browser_session.stone_name(),
+        )
+
     def run_gemstone_tests(self, class_name):
         self.require_write_access("run_gemstone_tests")
         result = self.gemstone_browser_session.run_gemstone_tests(class_name)
+        self.record_test_timings(result)
+        self.mark_transaction_dirty()
+        return result
+
+    def run_tests_incrementally(
+        self,
+        class_names,
+        should_stop=None,
+        on_test_result=None,
+    ):
+        self.require_write_access("run_tests_incrementally")
+        result = self.gemstone_browser_session.run_tests_incrementally(
+            class_names,
+            should_stop=should_stop,
+            on_test_result=on_test_result,
+        )
+        self.record_test_timings(result)
         self.mark_transaction_dirty()
         return result
 
@@ -953,6 +1010,7 @@ class GemstoneSessionRecord:
         result = self.gemstone_browser_session.run_test_method(
             class_name, method_selector
         )
+        self.record_test_timings(result)
         self.mark_transaction_dirty()
         return result
 
@@ -1098,42 +1156,128 @@ class ActionGate:
     def read_only_for(self, action_name, is_busy=False):
         return not self.allows(action_name, is_busy=is_busy)
 
+ACTIVITY_LOG_STACK_CAPTURE_MODES = ('off', 'sampled', 'on-error')
+ACTIVITY_LOG_QUEUE_SIZE = 10000
+ACTIVITY_LOG_BATCH_SIZE = 500
+ACTIVITY_LOG_FLUSH_INTERVAL_SECONDS = 0.5
+ACTIVITY_LOG_MAXIMUM_FILE_BYTES = 50 * 1024 * 1024
+ACTIVITY_LOG_BACKUP_COUNT = 3
+ACTIVITY_LOG_STACK_SAMPLE_INTERVAL = 100
+ACTIVITY_LOG_CLOSE_TIMEOUT_SECONDS = 2
+
+
 class ActivityLog:
-    """AI: Records IDE events and MCP tool calls with stack traces to a JSONL file."""
+    """AI: Records IDE events and MCP tool calls to a size-rotated JSONL file.
+
+    Callers only enqueue an entry; a background thread serialises and writes
+    entries in batches. When the bounded queue is full entries are dropped and
+    counted rather than blocking the IDE or an MCP tool call.
+    """
 
-    def __init__(self, file_path):
+    def __init__(
+        self,
+        file_path,
+        stack_capture='on-error',
+        maximum_file_bytes=ACTIVITY_LOG_MAXIMUM_FILE_BYTES,
+        backup_count=ACTIVITY_LOG_BACKUP_COUNT,
+        queue_size=ACTIVITY_LOG_QUEUE_SIZE,
+        stack_sample_interval=ACTIVITY_LOG_STACK_SAMPLE_INTERVAL,
+    ):
+        if stack_capture not in ACTIVITY_LOG_STACK_CAPTURE_MODES:
+            raise ValueError('Unknown stack capture mode: %s' % stack_capture)
         self.file_path = file_path
+        self.stack_capture = stack_capture
+        self.maximum_file_bytes = maximum_file_bytes
+        self.backup_count = backup_count
+        self.stack_sample_interval = max(1, stack_sample_interval)
+        self.entries = queue.Queue(maxsize=queue_size)
         self.lock = threading.Lock()
-        open(self.file_path, 'w').close()
+        self.logged_entry_count = 0
+        self.dropped_entry_count = 0
+        self.write_error_count = 0
+        self.is_closed = False
+        self.log_file = open(self.file_path, 'w', encoding='utf-8')
+        self.writer_thread = threading.Thread(
+            target=self.write_queued_entries,
+            name='SwordfishActivityLog',
+            daemon=True,
+        )
+        self.writer_thread.start()
 
     def log_ide_event(self, event_name, args, kwargs):
-        stack = traceback.extract_stack()[:-2]
-        self.write_entry({
-            'ts': datetime.now().isoformat(),
+        entry = {
+            'ts': time.time(),
             'source': 'ide',
             'action': event_name,
             'args': self.repr_for_log(args),
             'kwargs': self.repr_for_log(kwargs),
-            'stack': [str(frame) for frame in stack],
-        })
+        }
+        if self.should_capture_stack(False):
+            entry['stack'] = self.current_stack()
+        self.write_entry(entry)
 
     def wrap_mcp_tool(self, fn):
         log = self
 
-        @functools.wraps(fn)
-        def logged(**kwargs):
-            stack = traceback.extract_stack()[:-1]
-            log.write_entry({
-                'ts': datetime.now().isoformat(),
+        def log_call(kwargs, started_at, result=None, error=None):
+            is_error = error is not None or (
+                isinstance(result, dict) and result.get('ok') is False
+            )
+            entry = {
+                'ts': started_at,
                 'source': 'mcp',
                 'action': fn.__name__,
                 'args': log.repr_for_log(kwargs),
-                'stack': [str(frame) for frame in stack],
-            })
-            return fn(**kwargs)
+                'elapsed_ms': int((time.time() - started_at) * 1000),
+                'outcome': 'error' if is_error else 'ok',
+            }
+            if error is not None:
+                entry['exception'] = log.repr_for_log(error)
+            if log.should_capture_stack(is_error):
+                entry['stack'] = log.current_stack()
+            log.write_entry(entry)
+
+        if inspect.iscoroutinefunction(fn):
+
+            @functools.wraps(fn)
+            async def logged_async(**kwargs):
+                started_at = time.time()
+                try:
+                    result = await fn(**kwargs)
+                except Exception as error:
+                    log_call(kwargs, started_at, error=error)
+                    raise
+                log_call(kwargs, started_at, result=result)
+                return result
+
+            return logged_async
+
+        @functools.wraps(fn)
+        def logged(**kwargs):
+            started_at = time.time()
+            try:
+                result = fn(**kwargs)
+            except Exception as error:
+                log_call(kwargs, started_at, error=error)
+                raise
+            log_call(kwargs, started_at, result=result)
+            return result
 
         return logged
 
+    def should_capture_stack(self, is_error):
+        if self.stack_capture == 'on-error':
+            return is_error
+        if self.stack_capture == 'sampled':
+            with self.lock:
+                is_sampled = self.logged_entry_count % self.stack_sample_interval == 0
+                self.logged_entry_count = self.logged_entry_count + 1
+                return is_sampled
+        return False
+
+    def current_stack(self):
+        return [str(frame) for frame in traceback.extract_stack()[:-3]]
+
     def repr_for_log(self, value):
         try:
             return repr(value)
@@ -1141,9 +1285,86 @@ class ActivityLog:
             return '<unrepresentable>'
 
     def write_entry(self, entry):
+        if self.is_closed:
+            return
+        try:
+            self.entries.put_nowait(entry)
+        except queue.Full:
+            with self.lock:
+                self.dropped_entry_count = self.dropped_entry_count + 1
+
+    def write_queued_entries(self):
+        keep_writing = True
+        while keep_writing:
+            try:
+                batch = [self.entries.get(timeout=ACTIVITY_LOG_FLUSH_INTERVAL_SECONDS)]
+            except queue.Empty:
+                batch = []
+            while batch and len(batch) < ACTIVITY_LOG_BATCH_SIZE:
+                try:
+                    batch.append(self.entries.get_nowait())
+                except queue.Empty:
+                    break
+            if None in batch:
+                keep_writing = False
+                batch = [entry for entry in batch if entry is not None]
+            entry_count = len(batch)
+            try:
+                self.write_batch(batch)
+            except (OSError, ValueError):
+                with self.lock:
+                    self.write_error_count = self.write_error_count + 1
+                    self.dropped_entry_count = self.dropped_entry_count + entry_count
+
+    def write_batch(self, batch):
+        with self.lock:
+            dropped_entry_count = self.dropped_entry_count
+        if dropped_entry_count:
+            batch.append({
+                'ts': time.time(),
+                'source': 'activity_log',
+                'action': 'dropped_entries',
+                'count': dropped_entry_count,
+            })
+        if not batch:
+            return
+        lines = []
+        for entry in batch:
+            entry['ts'] = datetime.fromtimestamp(entry['ts']).isoformat()
+            lines.append(json.dumps(entry) + '\n')
+        self.log_file.write(''.join(lines))
+        self.log_file.flush()
         with self.lock:
-            with open(self.file_path, 'a', encoding='utf-8') as f:
-                f.write(json.dumps(entry) + '\n')
+            self.dropped_entry_count = self.dropped_entry_count - dropped_entry_count
+        if self.log_file.tell() >= self.maximum_file_bytes:
+            try:
+                self.rotate_log_file()
+            except OSError:
+                with self.lock:
+                    self.write_error_count = self.write_error_count + 1
+
+    def rotate_log_file(self):
+        self.log_file.close()
+        for backup_number in range(self.backup_count, 0, -1):
+            source_path = (
+                self.file_path
+                if backup_number == 1
+                else '%s.%s' % (self.file_path, backup_number - 1)
+            )
+            if os.path.exists(source_path):
+                os.replace(source_path, '%s.%s' % (self.file_path, backup_number))
+        self.log_file = open(self.file_path, 'w', encoding='utf-8')
+
+    def close(self):
+        if self.is_closed:
+            return
+        self.is_closed = True
+        try:
+            self.entries.put(None, timeout=ACTIVITY_LOG_CLOSE_TIMEOUT_SECONDS)
+        except queue.Full:
+            pass
+        self.writer_thread.join(timeout=ACTIVITY_LOG_CLOSE_TIMEOUT_SECONDS)
+        self.log_file.close()
 
 
 class EventQueue:
@@ -1486,10 +1707,7 @@ class McpConfigurationAccess:
 
 class McpConfigurationStore:
     def config_home_directory(self):
-        xdg_config_home = os.environ.get("XDG_CONFIG_HOME", "").strip()
-        if xdg_config_home:
-            return xdg_config_home
-        return os.path.join(os.path.expanduser("~"), ".config")
+        return config_home_directory()
 
     def config_file_path(self):
         return os.path.join(
@@ -2194,7 +2412,7 @@ class McpServerController:
     def wait_for_server_thread_exit(self, server_thread):
         server_thread.join(timeout=5)
 
-    def server_for_runtime_config(self, runtime_config):
+    def server_for_runtime_config(self, runtime_config, tool_executor=None):
         return create_server(
             get_permissions=self.current_permissions,
             integrated_session_state=self.integrated_session_state,
@@ -2203,12 +2421,20 @@ class McpServerController:
             mcp_port=runtime_config.mcp_port,
             mcp_streamable_http_path=runtime_config.mcp_http_path,
             activity_log=self.activity_log,
+            tool_executor=tool_executor,
         )
 
     def run(self, transport):
         local_runtime_config = self.current_runtime_config()
-        mcp_server = self.server_for_runtime_config(local_runtime_config)
-        mcp_server.run(transport=transport)
+        tool_executor = ConnectionToolExecutor()
+        try:
+            mcp_server = self.server_for_runtime_config(
+                local_runtime_config,
+                tool_executor=tool_executor,
+            )
+            mcp_server.run(transport=transport)
+        finally:
+            tool_executor.shutdown()
 
     def run_server(self):
         local_runtime_config = self.current_runtime_config()
@@ -2219,8 +2445,12 @@ class McpServerController:
                 self.server_thread = None
                 self.notify_server_state_subscribers()
                 return
+        tool_executor = ConnectionToolExecutor()
         try:
-            mcp_server = self.server_for_runtime_config(local_runtime_config)
+            mcp_server = self.server_for_runtime_config(
+                local_runtime_config,
+                tool_executor=tool_executor,
+            )
             import uvicorn
 
             streamable_http_application = mcp_server.streamable_http_app()
@@ -2253,6 +2483,7 @@ class McpServerController:
                 self.last_error_message = str(error)
             self.notify_server_state_subscribers()
         finally:
+            tool_executor.shutdown()
             with self.lock:
                 self.running = False
                 self.starting = False
@@ -2700,6 +2931,10 @@ class MainMenu(tk.Menu):
                 command=self.show_breakpoints_dialog,
                 state=breakpoints_state,
             )
+            self.file_menu.add_command(
+                label="Test Timings",
+                command=self.show_test_timing_report_dialog,
+            )
             self.file_menu.add_separator()
         self.file_menu.add_command(label="Exit", command=self.parent.quit)
 
@@ -2723,6 +2958,10 @@ class MainMenu(tk.Menu):
         self.event_queue.publish('MenuCommandInvoked', command='Breakpoints')
         self.parent.open_breakpoints_dialog()
 
+    def show_test_timing_report_dialog(self):
+        self.event_queue.publish("MenuCommandInvoked", command="Test Timings")
+        self.parent.open_test_timing_report_dialog()
+
     def start_mcp_server(self):
         self.event_queue.publish('MenuCommandInvoked', command='Start MCP Server')
         self.parent.start_mcp_server_from_menu()
@@ -4710,6 +4949,118 @@ class BreakpointsDialog(tk.Toplevel):
             messagebox.showerror("Breakpoints", str(error))
 
 
+class TestTimingReportDialog(tk.Toplevel):
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.parent = parent
+        self.gemstone_session_record = parent.gemstone_session_record
+        self.title("Test Timings")
+        self.geometry("820x420")
+        self.transient(parent)
+
+        self.report_notebook = ttk.Notebook(self)
+        self.report_notebook.grid(
+            row=0,
+            column=0,
+            columnspan=2,
+            sticky="nsew",
+            padx=10,
+            pady=(10, 6),
+        )
+        test_columns = ("Test", "Package", "Status", "Elapsed ms", "Previous ms")
+        self.slowest_tests_list = self.add_report_list("Slowest Tests", test_columns)
+        self.regressions_list = self.add_report_list("Regressions", test_columns)
+        self.package_totals_list = self.add_report_list(
+            "Package Totals",
+            ("Package", "Tests", "Elapsed ms"),
+        )
+
+        self.refresh_button = ttk.Button(
+            self,
+            text="Refresh",
+            command=self.refresh_report,
+        )
+        self.refresh_button.grid(
+            row=1,
+            column=0,
+            padx=(10, 5),
+            pady=(0, 10),
+            sticky="w",
+        )
+        self.close_button = ttk.Button(
+            self,
+            text="Close",
+            command=self.destroy,
+        )
+        self.close_button.grid(
+            row=1,
+            column=1,
+            padx=(5, 10),
+            pady=(0, 10),
+            sticky="e",
+        )
+        self.columnconfigure(0, weight=1)
+        self.rowconfigure(0, weight=1)
+
+        self.refresh_report()
+
+    def add_report_list(self, tab_label, columns):
+        report_list = ttk.Treeview(
+            self.report_notebook,
+            columns=columns,
+            show="headings",
+            height=12,
+        )
+        for column_name in columns:
+            report_list.heading(column_name, text=column_name)
+            anchor = "e" if column_name.endswith("ms") else "w"
+            report_list.column(column_name, width=120, anchor=anchor)
+        report_list.column(columns[0], width=300, anchor="w")
+        self.report_notebook.add(report_list, text=tab_label)
+        return report_list
+
+    def refresh_report(self):
+        timing_report = self.gemstone_session_record.test_timing_report()
+        self.fill_test_list(self.slowest_tests_list, timing_report["slowest_tests"])
+        self.fill_test_list(self.regressions_list, timing_report["regressions"])
+        for row_id in self.package_totals_list.get_children():
+            self.package_totals_list.delete(row_id)
+        for package_total in timing_report["package_totals"]:
+            self.package_totals_list.insert(
+                "",
+                "end",
+                values=(
+                    package_total["package_name"] or "(unknown)",
+                    package_total["test_count"],
+                    package_total["elapsed_ms"],
+                ),
+            )
+
+    def fill_test_list(self, report_list, test_timings):
+        for row_id in report_list.get_children():
+            report_list.delete(row_id)
+        for test_timing in test_timings:
+            previous_elapsed_ms = test_timing["previous_elapsed_ms"]
+            report_list.insert(
+                "",
+                "end",
+                values=(
+                    "%s>>%s"
+                    % (
+                        test_timing["test_case_class_name"],
+                        test_timing["test_method_selector"],
+                    ),
+                    test_timing["package_name"],
+                    test_timing["status"],
+                    test_timing["elapsed_ms"],
+                    "" if previous_elapsed_ms is None else previous_elapsed_ms,
+                ),
+            )
+
+
+MODEL_REFRESH_COALESCING_MILLISECONDS = 150
+
+
 class Swordfish(tk.Tk):
     @classmethod
     def new_argument_parser(cls, default_mode='ide'):
@@ -4832,7 +5183,49 @@ class Swordfish(tk.Tk):
             default=None,
             metavar='PATH',
             dest='activity_log',
-            help='Write a JSONL activity log (IDE events and MCP tool calls with stack traces) to PATH.',
+            help='Write a JSONL activity log (IDE events and MCP tool calls) to PATH.',
+        )
+        argument_parser.add_argument(
+            '--activity-log-stacks',
+            default='on-error',
+            choices=ACTIVITY_LOG_STACK_CAPTURE_MODES,
+            dest='activity_log_stacks',
+            help=(
+                'When to record the call stack with an activity log entry: never, '
+                'for one in every %s entries, or only for failed MCP tool calls.'
+                % ACTIVITY_LOG_STACK_SAMPLE_INTERVAL
+            ),
+        )
+        argument_parser.add_argument(
+            '--activity-log-max-mb',
+            default=ACTIVITY_LOG_MAXIMUM_FILE_BYTES // (1024 * 1024),
+            type=int,
+            dest='activity_log_max_mb',
+            help=(
+                'Rotate the activity log once it reaches this many megabytes, '
+                'keeping %s older files.' % ACTIVITY_LOG_BACKUP_COUNT
+            ),
+        )
+        argument_parser.add_argument(
+            '--session-pool-max-idle',
+            default=0,
+            type=int,
+            help=(
+                'Keep up to this many logged-in RPC GemStone sessions per '
+                'user/stone for reuse by gs_connect (0 disables pooling).'
+            ),
+        )
+        argument_parser.add_argument(
+            '--session-pool-min-idle',
+            default=0,
+            type=int,
+            help='Pre-warm this many idle RPC sessions per user/stone once it has connected.',
+        )
+        argument_parser.add_argument(
+            '--session-pool-idle-timeout',
+            default=300,
+            type=int,
+            help='Log out pooled sessions idle for longer than this many seconds.',
         )
         return argument_parser
 
@@ -4842,6 +5235,16 @@ class Swordfish(tk.Tk):
             argument_parser.error("--mcp-port must be greater than zero.")
         if not arguments.mcp_http_path.startswith("/"):
             argument_parser.error("--mcp-http-path must start with /.")
+        if arguments.session_pool_min_idle < 0:
+            argument_parser.error("--session-pool-min-idle cannot be negative.")
+        if arguments.session_pool_max_idle < arguments.session_pool_min_idle:
+            argument_parser.error(
+                "--session-pool-max-idle cannot be less than --session-pool-min-idle."
+            )
+        if arguments.session_pool_idle_timeout <= 0:
+            argument_parser.error("--session-pool-idle-timeout must be greater than zero.")
+        if arguments.activity_log_max_mb <= 0:
+            argument_parser.error("--activity-log-max-mb must be greater than zero.")
 
     @classmethod
     def run(cls, default_mode='ide'):
@@ -4857,7 +5260,39 @@ class Swordfish(tk.Tk):
         apply_gemstone_exe_conf(
             read_gemstone_exe_conf(configuration_store.config_file_path())
         )
-        activity_log = ActivityLog(arguments.activity_log) if arguments.activity_log else None
+        activity_log = (
+            ActivityLog(
+                arguments.activity_log,
+                stack_capture=arguments.activity_log_stacks,
+                maximum_file_bytes=arguments.activity_log_max_mb * 1024 * 1024,
+            )
+            if arguments.activity_log
+            else None
+        )
+        try:
+            cls.run_with_activity_log(
+                arguments,
+                runtime_config,
+                configuration_store,
+                activity_log,
+            )
+        finally:
+            if activity_log is not None:
+                activity_log.close()
+
+    @classmethod
+    def run_with_activity_log(
+        cls,
+        arguments,
+        runtime_config,
+        configuration_store,
+        activity_log,
+    ):
+        configure_session_pool(
+            minimum_idle_sessions=arguments.session_pool_min_idle,
+            maximum_idle_sessions=arguments.session_pool_max_idle,
+            idle_timeout_seconds=arguments.session_pool_idle_timeout,
+        )
         run_headless_mcp = arguments.headless_mcp
         if arguments.mode == 'mcp-headless':
             run_headless_mcp = True
@@ -4928,6 +5363,7 @@ class Swordfish(tk.Tk):
         self.foreground_activity_message = ''
 
         self.gemstone_session_record = None
+        self.model_refresh_is_scheduled = False
         self.last_mcp_busy_state = None
         self.last_mcp_server_running_state = None
         self.last_mcp_server_starting_state = None
@@ -5868,14 +6304,28 @@ class Swordfish(tk.Tk):
         )
 
     def process_pending_model_refresh_requests(self):
-        pending_change_kinds = (
+        refresh_requests = (
             self.integrated_session_state.consume_model_refresh_requests()
         )
         if not self.is_logged_in:
             return
-        for change_kind in pending_change_kinds:
+        for change_kind in self.change_kinds_to_refresh_for(refresh_requests):
             self.publish_model_change_events(change_kind)
 
+    def change_kinds_to_refresh_for(self, refresh_requests):
+        if ("transaction", None) in refresh_requests:
+            return ["transaction"]
+        selected_class = self.gemstone_session_record.selected_class
+        change_kinds = []
+        for change_kind, class_name in refresh_requests:
+            changes_another_class = (
+                class_name is not None and class_name != selected_class
+            )
+            if changes_another_class or change_kind in change_kinds:
+                continue
+            change_kinds.append(change_kind)
+        return change_kinds
+
     def apply_collaboration_read_only_state(self, read_only):
         if self.browser_tab is not None and self.browser_tab.winfo_exists():
             self.browser_tab.editor_area_widget.set_read_only(read_only)
@@ -5978,6 +6428,18 @@ class Swordfish(tk.Tk):
         self.run_tab.present_source(source, run_immediately=False)
 
     def handle_model_refresh_requested(self, change_kind=""):
+        if self.model_refresh_is_scheduled:
+            return
+        self.model_refresh_is_scheduled = True
+        self.after(
+            MODEL_REFRESH_COALESCING_MILLISECONDS,
+            self.apply_coalesced_model_refresh,
+        )
+
+    def apply_coalesced_model_refresh(self):
+        self.model_refresh_is_scheduled = False
+        if not self.winfo_exists():
+            return
         self.process_pending_model_refresh_requests()
         self.refresh_collaboration_status()
 
@@ -7295,6 +7757,11 @@ class Swordfish(tk.Tk):
             return
         BreakpointsDialog(self)
 
+    def open_test_timing_report_dialog(self):
+        if self.gemstone_session_record is None:
+            return
+        TestTimingReportDialog(self)
+
 
 class LoginFrame(ttk.Frame):
     def __init__(self, parent, default_stone_name="gs64stone"):
@@ -0,0 +1 @@
+"""Change journal source assets for Swordfish MCP."""
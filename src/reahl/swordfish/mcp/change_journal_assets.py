@@ -0,0 +1,22 @@
+from hashlib import sha256
+from pkgutil import get_data
+
+CHANGE_JOURNAL_VERSION = "1"
+CHANGE_JOURNAL_RESOURCE_PACKAGE = "reahl.swordfish.mcp.change_journal"
+CHANGE_JOURNAL_RESOURCE_NAME = "swordfish_mcp_change_journal.st"
+
+
+def change_journal_source():
+    source_bytes = get_data(
+        CHANGE_JOURNAL_RESOURCE_PACKAGE,
+        CHANGE_JOURNAL_RESOURCE_NAME,
+    )
+    if source_bytes is None:
+        raise FileNotFoundError(
+            "Change journal source asset could not be loaded from package data."
+        )
+    return source_bytes.decode("utf-8")
+
+
+def change_journal_source_hash():
+    return sha256(change_journal_source().encode("utf-8")).hexdigest()
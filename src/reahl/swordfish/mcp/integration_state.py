@@ -12,7 +12,9 @@ class IntegratedSessionState:
         self.ide_transaction_active = True
         self.mcp_operation_depth = 0
         self.active_mcp_operation = ""
+        self.active_ide_operation = ""
         self.pending_model_changes = []
+        self.is_model_refresh_notified = False
         self.ide_connection_identifier = "ide-session"
         self.mcp_busy_state_subscribers = []
         self.model_refresh_subscribers = []
@@ -47,6 +49,7 @@ class IntegratedSessionState:
             self.ide_session = None
             self.ide_transaction_active = True
             self.pending_model_changes = []
+            self.is_model_refresh_notified = False
 
     def is_ide_gui_active(self):
         with self.lock:
@@ -63,6 +66,7 @@ class IntegratedSessionState:
             self.ide_session = None
             self.ide_transaction_active = True
             self.pending_model_changes = []
+            self.is_model_refresh_notified = False
 
     def has_ide_session(self):
         with self.lock:
@@ -150,6 +154,18 @@ class IntegratedSessionState:
             active_operation_name = self.active_mcp_operation
         self.notify_mcp_busy_state_subscribers(is_busy, active_operation_name)
 
+    def begin_ide_operation(self, operation_name):
+        with self.lock:
+            self.active_ide_operation = operation_name
+
+    def end_ide_operation(self):
+        with self.lock:
+            self.active_ide_operation = ""
+
+    def current_ide_operation_name(self):
+        with self.lock:
+            return self.active_ide_operation
+
     def is_mcp_busy(self):
         with self.lock:
             return self.mcp_operation_depth > 0
@@ -158,16 +174,22 @@ class IntegratedSessionState:
         with self.lock:
             return self.active_mcp_operation
 
-    def request_model_refresh(self, change_kind):
+    def request_model_refresh(self, change_kind, class_name=None):
+        refresh_request = (change_kind, class_name)
         with self.lock:
-            self.pending_model_changes.append(change_kind)
-        self.notify_model_refresh_subscribers(change_kind)
+            if refresh_request not in self.pending_model_changes:
+                self.pending_model_changes.append(refresh_request)
+            should_notify = not self.is_model_refresh_notified
+            self.is_model_refresh_notified = True
+        if should_notify:
+            self.notify_model_refresh_subscribers(change_kind)
 
     def consume_model_refresh_requests(self):
         with self.lock:
-            change_kinds = list(self.pending_model_changes)
+            refresh_requests = list(self.pending_model_changes)
             self.pending_model_changes = []
-            return change_kinds
+            self.is_model_refresh_notified = False
+            return refresh_requests
 
     def add_config_change_notice(self, notice):
         with self.lock:
@@ -0,0 +1,87 @@
+import base64
+import collections
+import json
+import threading
+import time
+import uuid
+
+RESULT_SNAPSHOT_LIMIT = 64
+RESULT_SNAPSHOT_TIMEOUT_SECONDS = 900
+
+result_snapshots_by_id = collections.OrderedDict()
+result_snapshots_lock = threading.Lock()
+
+
+class ResultSnapshot:
+    def __init__(self, connection_id, result_kind, query, entries, page_size):
+        self.connection_id = connection_id
+        self.result_kind = result_kind
+        self.query = query
+        self.entries = entries
+        self.page_size = page_size
+        self.last_used_at = time.monotonic()
+
+
+def add_result_snapshot(connection_id, result_kind, query, entries, page_size):
+    snapshot_id = str(uuid.uuid4())
+    with result_snapshots_lock:
+        discard_expired_result_snapshots()
+        result_snapshots_by_id[snapshot_id] = ResultSnapshot(
+            connection_id,
+            result_kind,
+            query,
+            entries,
+            page_size,
+        )
+        while len(result_snapshots_by_id) > RESULT_SNAPSHOT_LIMIT:
+            result_snapshots_by_id.popitem(last=False)
+    return snapshot_id
+
+
+def get_result_snapshot(snapshot_id):
+    with result_snapshots_lock:
+        discard_expired_result_snapshots()
+        result_snapshot = result_snapshots_by_id.get(snapshot_id)
+        if result_snapshot is not None:
+            result_snapshot.last_used_at = time.monotonic()
+            result_snapshots_by_id.move_to_end(snapshot_id)
+        return result_snapshot
+
+
+def remove_result_snapshot(snapshot_id):
+    with result_snapshots_lock:
+        result_snapshots_by_id.pop(snapshot_id, None)
+
+
+def remove_result_snapshots_for_connection(connection_id):
+    with result_snapshots_lock:
+        for snapshot_id, result_snapshot in list(result_snapshots_by_id.items()):
+            if result_snapshot.connection_id == connection_id:
+                result_snapshots_by_id.pop(snapshot_id)
+
+
+def discard_expired_result_snapshots():
+    expired_before = time.monotonic() - RESULT_SNAPSHOT_TIMEOUT_SECONDS
+    for snapshot_id, result_snapshot in list(result_snapshots_by_id.items()):
+        if result_snapshot.last_used_at < expired_before:
+            result_snapshots_by_id.pop(snapshot_id)
+
+
+def clear_result_snapshots():
+    with result_snapshots_lock:
+        result_snapshots_by_id.clear()
+
+
+def continuation_token_for(snapshot_id, offset):
+    token_payload = json.dumps({"snapshot_id": snapshot_id, "offset": offset})
+    return base64.urlsafe_b64encode(token_payload.encode("utf-8")).decode("ascii")
+
+
+def snapshot_position_from_token(continuation_token):
+    try:
+        token_payload = json.loads(
+            base64.urlsafe_b64decode(continuation_token.encode("ascii"))
+        )
+        return token_payload["snapshot_id"], int(token_payload["offset"])
+    except (AttributeError, KeyError, TypeError, ValueError):
+        return None, None
@@ -2,6 +2,7 @@ import inspect
 
 from reahl.swordfish import __version__
 from reahl.swordfish.mcp.integration_state import current_integrated_session_state
+from reahl.swordfish.mcp.tool_executor import ConnectionToolExecutor
 
 
 class McpDependencyNotInstalled(Exception):
@@ -36,6 +37,7 @@ def create_server(
     mcp_streamable_http_path="/mcp",
     activity_log=None,
     get_permissions=None,
+    tool_executor=None,
 ):
     if integrated_session_state is None:
         integrated_session_state = current_integrated_session_state()
@@ -97,6 +99,9 @@ def create_server(
         require_gemstone_ast=require_gemstone_ast,
         experimental=experimental,
         get_permissions=get_permissions,
+        tool_executor=(
+            ConnectionToolExecutor() if tool_executor is None else tool_executor
+        ),
     )
     return mcp_server
 
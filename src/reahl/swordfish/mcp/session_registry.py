@@ -1,7 +1,27 @@
+import hashlib
+import threading
+import time
 import uuid
 
+from reahl.ptongue import GemstoneApiError, GemstoneError
+
+from reahl.swordfish.gemstone.debugging import clear_debugger_caches
+from reahl.swordfish.gemstone.metadata_cache import discard_metadata_cache_for_session
+from reahl.swordfish.gemstone.session import (
+    DomainException,
+    abort_transaction,
+    close_session,
+)
+
+POOLED_CONNECTION_MODES = ("rpc",)
+SWORDFISH_SESSION_TEMP_NAMES = (
+    "SwordfishMcpTracerEdgeCounters",
+    "SwordfishMcpTracerSessionEdgeCounts",
+)
+
 sessions_by_connection_id = {}
 metadata_by_connection_id = {}
+worker_session_sources_by_connection_id = {}
 
 
 def add_connection(gemstone_session, metadata):
@@ -22,9 +42,14 @@ def get_metadata(connection_id):
 def remove_connection(connection_id):
     gemstone_session = sessions_by_connection_id.pop(connection_id)
     metadata_by_connection_id.pop(connection_id, None)
+    worker_session_sources_by_connection_id.pop(connection_id, None)
     return gemstone_session
 
 
+def list_connection_ids():
+    return sorted(sessions_by_connection_id.keys())
+
+
 def has_connection(connection_id):
     return connection_id in sessions_by_connection_id
 
@@ -32,3 +57,321 @@ def has_connection(connection_id):
 def clear_connections():
     sessions_by_connection_id.clear()
     metadata_by_connection_id.clear()
+    worker_session_sources_by_connection_id.clear()
+
+
+class WorkerSessionSource:
+    def __init__(self, pool_key, create_session):
+        self.pool_key = pool_key
+        self.create_session = create_session
+
+    def acquire(self):
+        gemstone_session, _ = current_session_pool().acquire(
+            self.pool_key,
+            self.create_session,
+        )
+        return gemstone_session
+
+    def release(self, gemstone_session):
+        current_session_pool().release(gemstone_session)
+
+
+def add_worker_session_source(connection_id, pool_key, create_session):
+    worker_session_sources_by_connection_id[connection_id] = WorkerSessionSource(
+        pool_key,
+        create_session,
+    )
+
+
+def get_worker_session_source(connection_id):
+    return worker_session_sources_by_connection_id.get(connection_id)
+
+
+def reset_pooled_session(gemstone_session):
+    abort_transaction(gemstone_session)
+    gemstone_session.execute(
+        "#(%s) do: [ :name | SessionTemps current removeKey: name ifAbsent: [ ] ].\n"
+        "true" % " ".join("#%s" % name for name in SWORDFISH_SESSION_TEMP_NAMES)
+    )
+    discard_metadata_cache_for_session(gemstone_session)
+    clear_debugger_caches()
+
+
+class SessionPool:
+    def __init__(
+        self,
+        minimum_idle_sessions=0,
+        maximum_idle_sessions=0,
+        idle_timeout_seconds=300,
+        reset_session=reset_pooled_session,
+        close_session=close_session,
+        clock=time.monotonic,
+    ):
+        if minimum_idle_sessions < 0:
+            raise DomainException("minimum_idle_sessions cannot be negative.")
+        if maximum_idle_sessions < minimum_idle_sessions:
+            raise DomainException(
+                "maximum_idle_sessions cannot be less than minimum_idle_sessions."
+            )
+        self.minimum_idle_sessions = minimum_idle_sessions
+        self.maximum_idle_sessions = maximum_idle_sessions
+        self.idle_timeout_seconds = idle_timeout_seconds
+        self.reset_session = reset_session
+        self.close_session = close_session
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.idle_entries_by_key = {}
+        self.pool_key_by_session_id = {}
+        self.counts_by_key = {}
+        self.prewarming_keys = set()
+
+    def is_enabled(self):
+        return self.maximum_idle_sessions > 0
+
+    def is_pooled(self, pool_key):
+        # AI: Only RPC sessions are pooled: a linked session lives in this
+        # process, so keeping spare ones logged in would be wasteful.
+        return self.is_enabled() and pool_key[0] in POOLED_CONNECTION_MODES
+
+    def counts_for(self, pool_key):
+        counts = self.counts_by_key.get(pool_key)
+        if counts is None:
+            counts = {
+                "login_count": 0,
+                "reuse_count": 0,
+                "release_count": 0,
+                "expired_count": 0,
+                "reset_failure_count": 0,
+            }
+            self.counts_by_key[pool_key] = counts
+        return counts
+
+    def increment(self, pool_key, count_name):
+        with self.lock:
+            counts = self.counts_for(pool_key)
+            counts[count_name] = counts[count_name] + 1
+
+    def acquire(self, pool_key, create_session):
+        self.close_expired_sessions()
+        while self.is_pooled(pool_key):
+            gemstone_session = self.take_idle_session(pool_key)
+            if gemstone_session is None:
+                break
+            if self.reset_quietly(pool_key, gemstone_session):
+                self.increment(pool_key, "reuse_count")
+                self.check_out(pool_key, gemstone_session)
+                self.prewarm_in_background(pool_key, create_session)
+                return gemstone_session, True
+        gemstone_session = create_session()
+        self.increment(pool_key, "login_count")
+        self.check_out(pool_key, gemstone_session)
+        self.prewarm_in_background(pool_key, create_session)
+        return gemstone_session, False
+
+    def release(self, gemstone_session):
+        with self.lock:
+            pool_key = self.pool_key_by_session_id.pop(id(gemstone_session), None)
+        if pool_key is None or not self.is_pooled(pool_key):
+            self.close_session(gemstone_session)
+            return
+        self.increment(pool_key, "release_count")
+        self.close_expired_sessions()
+        if not self.reset_quietly(pool_key, gemstone_session):
+            return
+        with self.lock:
+            idle_entries = self.idle_entries_by_key.setdefault(pool_key, [])
+            if len(idle_entries) < self.maximum_idle_sessions:
+                idle_entries.append((gemstone_session, self.clock()))
+                return
+        self.close_session(gemstone_session)
+
+    def discard(self, gemstone_session):
+        with self.lock:
+            self.pool_key_by_session_id.pop(id(gemstone_session), None)
+        self.close_session(gemstone_session)
+
+    def prewarm(self, pool_key, create_session):
+        try:
+            while self.idle_count(pool_key) < self.minimum_idle_sessions:
+                gemstone_session = create_session()
+                self.increment(pool_key, "login_count")
+                with self.lock:
+                    self.idle_entries_by_key.setdefault(pool_key, []).append(
+                        (gemstone_session, self.clock())
+                    )
+        finally:
+            with self.lock:
+                self.prewarming_keys.discard(pool_key)
+
+    def prewarm_in_background(self, pool_key, create_session):
+        if not self.is_pooled(pool_key):
+            return
+        with self.lock:
+            if pool_key in self.prewarming_keys:
+                return
+            if (
+                len(self.idle_entries_by_key.get(pool_key, []))
+                >= self.minimum_idle_sessions
+            ):
+                return
+            self.prewarming_keys.add(pool_key)
+        threading.Thread(
+            target=self.prewarm_quietly,
+            args=(pool_key, create_session),
+            daemon=True,
+            name="SwordfishSessionPoolPrewarm",
+        ).start()
+
+    def prewarm_quietly(self, pool_key, create_session):
+        try:
+            self.prewarm(pool_key, create_session)
+        except (DomainException, GemstoneError, GemstoneApiError):
+            pass
+
+    def take_idle_session(self, pool_key):
+        with self.lock:
+            idle_entries = self.idle_entries_by_key.get(pool_key)
+            if not idle_entries:
+                return None
+            gemstone_session, _ = idle_entries.pop()
+            return gemstone_session
+
+    def check_out(self, pool_key, gemstone_session):
+        if not self.is_pooled(pool_key):
+            return
+        with self.lock:
+            self.pool_key_by_session_id[id(gemstone_session)] = pool_key
+
+    def reset_quietly(self, pool_key, gemstone_session):
+        try:
+            self.reset_session(gemstone_session)
+            return True
+        except (GemstoneError, GemstoneApiError):
+            self.increment(pool_key, "reset_failure_count")
+            self.close_quietly(gemstone_session)
+            return False
+
+    def close_quietly(self, gemstone_session):
+        try:
+            self.close_session(gemstone_session)
+        except (GemstoneError, GemstoneApiError):
+            pass
+
+    def close_expired_sessions(self):
+        for gemstone_session in self.expired_sessions():
+            self.close_quietly(gemstone_session)
+
+    def expired_sessions(self):
+        expired_sessions = []
+        now = self.clock()
+        with self.lock:
+            for pool_key, idle_entries in self.idle_entries_by_key.items():
+                expirable_count = len(idle_entries) - self.minimum_idle_sessions
+                kept_entries = []
+                for gemstone_session, released_at in sorted(
+                    idle_entries,
+                    key=lambda idle_entry: idle_entry[1],
+                ):
+                    has_expired = now - released_at > self.idle_timeout_seconds
+                    if has_expired and expirable_count > 0:
+                        expired_sessions.append(gemstone_session)
+                        expirable_count = expirable_count - 1
+                        counts = self.counts_for(pool_key)
+                        counts["expired_count"] = counts["expired_count"] + 1
+                    else:
+                        kept_entries.append((gemstone_session, released_at))
+                idle_entries[:] = kept_entries
+        return expired_sessions
+
+    def idle_count(self, pool_key):
+        with self.lock:
+            return len(self.idle_entries_by_key.get(pool_key, []))
+
+    def close_all(self):
+        with self.lock:
+            idle_sessions = [
+                gemstone_session
+                for idle_entries in self.idle_entries_by_key.values()
+                for gemstone_session, _ in idle_entries
+            ]
+            self.idle_entries_by_key.clear()
+        for gemstone_session in idle_sessions:
+            self.close_quietly(gemstone_session)
+
+    def statistics(self):
+        with self.lock:
+            checked_out_counts = {}
+            for pool_key in self.pool_key_by_session_id.values():
+                checked_out_counts[pool_key] = checked_out_counts.get(pool_key, 0) + 1
+            pool_keys = (
+                set(self.counts_by_key)
+                | set(self.idle_entries_by_key)
+                | set(checked_out_counts)
+            )
+            return {
+                "enabled": self.is_enabled(),
+                "minimum_idle_sessions": self.minimum_idle_sessions,
+                "maximum_idle_sessions": self.maximum_idle_sessions,
+                "idle_timeout_seconds": self.idle_timeout_seconds,
+                "pools": {
+                    self.pool_key_description(pool_key): dict(
+                        self.counts_for(pool_key),
+                        idle_count=len(self.idle_entries_by_key.get(pool_key, [])),
+                        checked_out_count=checked_out_counts.get(pool_key, 0),
+                    )
+                    for pool_key in sorted(pool_keys)
+                },
+            }
+
+    def pool_key_description(self, pool_key):
+        connection_mode, user_name, stone_name, rpc_hostname, netldi_name, _ = pool_key
+        if connection_mode == "rpc":
+            return "rpc:%s@%s/%s#%s" % (
+                user_name,
+                stone_name,
+                rpc_hostname,
+                netldi_name,
+            )
+        return "%s:%s@%s" % (connection_mode, user_name, stone_name)
+
+
+def session_pool_key(
+    connection_mode,
+    gemstone_user_name,
+    gemstone_password,
+    stone_name,
+    rpc_hostname,
+    netldi_name,
+):
+    is_rpc = connection_mode == "rpc"
+    return (
+        connection_mode,
+        gemstone_user_name,
+        stone_name,
+        rpc_hostname if is_rpc else "",
+        netldi_name if is_rpc else "",
+        hashlib.sha256(gemstone_password.encode("utf-8")).hexdigest(),
+    )
+
+
+def current_session_pool():
+    return session_pool
+
+
+def configure_session_pool(
+    minimum_idle_sessions=0,
+    maximum_idle_sessions=0,
+    idle_timeout_seconds=300,
+):
+    global session_pool
+    previous_session_pool = session_pool
+    session_pool = SessionPool(
+        minimum_idle_sessions=minimum_idle_sessions,
+        maximum_idle_sessions=maximum_idle_sessions,
+        idle_timeout_seconds=idle_timeout_seconds,
+    )
+    previous_session_pool.close_all()
+    return session_pool
+
+
+session_pool = SessionPool()
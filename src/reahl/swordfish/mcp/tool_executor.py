@@ -0,0 +1,112 @@
+import asyncio
+import concurrent.futures
+import threading
+
+UNBOUND_TOOL_WORKER_COUNT = 4
+
+
+class ConnectionLane:
+    def __init__(self, connection_id):
+        self.connection_id = connection_id
+        self.executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1,
+            thread_name_prefix="SwordfishMCPTool-%s" % connection_id,
+        )
+        self.queued_count = 0
+        self.in_flight_count = 0
+        self.completed_count = 0
+        self.failed_count = 0
+
+    def statistics(self):
+        return {
+            "queue_depth": self.queued_count,
+            "in_flight": self.in_flight_count,
+            "completed_count": self.completed_count,
+            "failed_count": self.failed_count,
+        }
+
+
+class ConnectionToolExecutor:
+    def __init__(self, unbound_worker_count=UNBOUND_TOOL_WORKER_COUNT):
+        self.lock = threading.Lock()
+        self.lanes_by_connection_id = {}
+        self.unbound_lane = ConnectionLane(None)
+        self.unbound_lane.executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=unbound_worker_count,
+            thread_name_prefix="SwordfishMCPTool",
+        )
+        self.is_shut_down = False
+
+    def lane_for(self, connection_id):
+        if connection_id is None:
+            return self.unbound_lane
+        lane = self.lanes_by_connection_id.get(connection_id)
+        if lane is None:
+            lane = ConnectionLane(connection_id)
+            self.lanes_by_connection_id[connection_id] = lane
+        return lane
+
+    def submit(self, lane_connection_id, function, *arguments, **keywords):
+        with self.lock:
+            if self.is_shut_down:
+                raise RuntimeError("The MCP tool executor has been shut down.")
+            lane = self.lane_for(lane_connection_id)
+            lane.queued_count = lane.queued_count + 1
+            return lane.executor.submit(
+                self.run_in_lane,
+                lane,
+                function,
+                arguments,
+                keywords,
+            )
+
+    def run_in_lane(self, lane, function, arguments, keywords):
+        with self.lock:
+            lane.queued_count = lane.queued_count - 1
+            lane.in_flight_count = lane.in_flight_count + 1
+        succeeded = False
+        try:
+            result = function(*arguments, **keywords)
+            succeeded = True
+            return result
+        finally:
+            with self.lock:
+                lane.in_flight_count = lane.in_flight_count - 1
+                if succeeded:
+                    lane.completed_count = lane.completed_count + 1
+                else:
+                    lane.failed_count = lane.failed_count + 1
+
+    async def run(self, lane_connection_id, function, *arguments, **keywords):
+        return await asyncio.wrap_future(
+            self.submit(lane_connection_id, function, *arguments, **keywords)
+        )
+
+    def retire_connection(self, connection_id):
+        with self.lock:
+            lane = self.lanes_by_connection_id.pop(connection_id, None)
+        if lane is not None:
+            lane.executor.shutdown(wait=False)
+
+    def shutdown(self, wait=False):
+        with self.lock:
+            self.is_shut_down = True
+            lanes = list(self.lanes_by_connection_id.values())
+            self.lanes_by_connection_id.clear()
+        for lane in lanes + [self.unbound_lane]:
+            lane.executor.shutdown(wait=wait)
+
+    def statistics(self):
+        with self.lock:
+            lanes = list(self.lanes_by_connection_id.values())
+            return {
+                "mode": "per_connection_serial",
+                "queue_depth": sum(lane.queued_count for lane in lanes)
+                + self.unbound_lane.queued_count,
+                "in_flight": sum(lane.in_flight_count for lane in lanes)
+                + self.unbound_lane.in_flight_count,
+                "connections": {
+                    lane.connection_id: lane.statistics() for lane in lanes
+                },
+                "unbound": self.unbound_lane.statistics(),
+            }
@@ -0,0 +1,41 @@
+import asyncio
+import threading
+
+try:
+    from mcp.server.fastmcp import Context as McpContext
+except ModuleNotFoundError:
+    McpContext = None
+
+
+class McpToolProgress:
+    def __init__(self, mcp_context=None, event_loop=None):
+        self.mcp_context = mcp_context
+        self.event_loop = event_loop
+        self.stop_requested = threading.Event()
+
+    @property
+    def can_report(self):
+        return self.mcp_context is not None and self.event_loop is not None
+
+    def report(self, progress, total=None, message=None):
+        if not self.can_report:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(
+                self.mcp_context.report_progress(progress, total, message),
+                self.event_loop,
+            )
+        except RuntimeError:
+            pass
+
+    def request_stop(self):
+        self.stop_requested.set()
+
+    def should_stop(self):
+        return self.stop_requested.is_set()
+
+
+def tool_progress_for(tool_progress):
+    if isinstance(tool_progress, McpToolProgress):
+        return tool_progress
+    return McpToolProgress()
@@ -1,3 +1,4 @@
+import asyncio
 import functools
 import re
 import threading
@@ -12,13 +13,17 @@ from reahl.swordfish.gemstone import (
     GemstoneDebugSession,
     abort_transaction,
     begin_transaction,
-    close_session,
     commit_transaction,
     create_linked_session,
     create_rpc_session,
+    domain_error_payload,
     gemstone_error_payload,
     session_summary,
 )
+from reahl.swordfish.gemstone.metadata_cache import (
+    metadata_cache_for_session,
+)
+from reahl.swordfish.gemstone.timing_history import current_timing_history
 from reahl.swordfish.mcp.ast_assets import (
     AST_SUPPORT_VERSION,
     ast_support_source,
@@ -33,19 +38,34 @@ from reahl.swordfish.mcp.debug_registry import (
     remove_debug_sessions_for_connection,
 )
 from reahl.swordfish.mcp.integration_state import IntegratedSessionState
+from reahl.swordfish.mcp.result_snapshots import (
+    add_result_snapshot,
+    continuation_token_for,
+    get_result_snapshot,
+    remove_result_snapshot,
+    remove_result_snapshots_for_connection,
+    snapshot_position_from_token,
+)
 from reahl.swordfish.mcp.session_registry import (
     add_connection,
+    add_worker_session_source,
+    current_session_pool,
     get_metadata,
     get_session,
+    get_worker_session_source,
     has_connection,
+    list_connection_ids,
     remove_connection,
+    session_pool_key,
 )
-from reahl.swordfish.mcp.tracer_assets import (
-    TRACER_VERSION,
-    tracer_source,
-    tracer_source_hash,
+from reahl.swordfish.mcp.tool_progress import (
+    McpContext,
+    McpToolProgress,
+    tool_progress_for,
 )
 
+MAXIMUM_TEST_WORKER_COUNT = 16
+
 
 def register_tools(
     mcp_server,
@@ -61,9 +81,13 @@ def register_tools(
     require_gemstone_ast=False,
     experimental=False,
     get_permissions=None,
+    tool_executor=None,
+    timing_history=None,
 ):
     if integrated_session_state is None:
         integrated_session_state = IntegratedSessionState()
+    if timing_history is None:
+        timing_history = current_timing_history()
     if get_permissions is None:
         _static_permissions = {
             'allow_source_read': allow_source_read,
@@ -82,8 +106,9 @@ def register_tools(
     unary_selector_pattern = re.compile("^[A-Za-z][A-Za-z0-9_]*$")
     keyword_selector_pattern = re.compile("^([A-Za-z][A-Za-z0-9_]*:)+$")
     keyword_token_pattern = re.compile("^[A-Za-z][A-Za-z0-9_]*:$")
-    tracer_alias_selector_prefix = "swordfishMcpTracerOriginal__"
     collected_sender_evidence = {}
+    active_test_runs_by_key = {}
+    tools_run_outside_connection_lane = {"gs_cancel_test_run"}
     planned_sender_tests = {}
     experimental_tool = mcp_server.tool if experimental else (lambda: lambda fn: fn)
 
@@ -127,6 +152,14 @@ def register_tools(
             return False
         return tool_name_writes_model(tool_name)
 
+    def model_refresh_request_for(tool_name, tool_result):
+        class_name = tool_result.get("class_name")
+        if not isinstance(class_name, str) or not class_name:
+            class_name = None
+        if class_name and tool_name in {"gs_compile_method", "gs_delete_method"}:
+            return "methods", class_name
+        return "transaction", None
+
     original_tool_decorator_factory = mcp_server.tool
 
     def coordinated_tool_decorator_factory(*decorator_arguments, **decorator_keywords):
@@ -142,7 +175,9 @@ def register_tools(
                 try:
                     tool_result = function(*function_arguments, **function_keywords)
                     if should_refresh_model(function.__name__, tool_result):
-                        integrated_session_state.request_model_refresh("transaction")
+                        integrated_session_state.request_model_refresh(
+                            *model_refresh_request_for(function.__name__, tool_result)
+                        )
                     notices = integrated_session_state.consume_config_change_notices()
                     if notices and isinstance(tool_result, dict):
                         tool_result = dict(tool_result, config_change_notices=notices)
@@ -150,7 +185,49 @@ def register_tools(
                 finally:
                     integrated_session_state.end_mcp_operation()
 
-            return tool_decorator(coordinated_tool)
+            if tool_executor is None:
+                return tool_decorator(coordinated_tool)
+
+            @functools.wraps(function)
+            async def dispatched_tool(*function_arguments, **function_keywords):
+                connection_id = function_keywords.get("connection_id")
+                lane_connection_id = connection_id
+                if function.__name__ in tools_run_outside_connection_lane:
+                    lane_connection_id = None
+                if not (
+                    has_connection(connection_id)
+                    or integrated_session_state.is_ide_connection_id(connection_id)
+                ):
+                    # AI: An unknown connection_id only gets its error response,
+                    # so it must not leave a lane thread behind for good.
+                    lane_connection_id = None
+                tool_progress = None
+                if "tool_progress" in function_keywords:
+                    tool_progress = McpToolProgress(
+                        function_keywords["tool_progress"],
+                        asyncio.get_running_loop(),
+                    )
+                    function_keywords["tool_progress"] = tool_progress
+                try:
+                    tool_result = await tool_executor.run(
+                        lane_connection_id,
+                        coordinated_tool,
+                        *function_arguments,
+                        **function_keywords,
+                    )
+                except asyncio.CancelledError:
+                    if tool_progress is not None:
+                        tool_progress.request_stop()
+                    raise
+                if (
+                    function.__name__ == "gs_disconnect"
+                    and isinstance(tool_result, dict)
+                    and tool_result.get("ok")
+                ):
+                    tool_executor.retire_connection(connection_id)
+                return tool_result
+
+            return tool_decorator(dispatched_tool)
 
         return coordinated_tool_decorator
 
@@ -172,8 +249,28 @@ def register_tools(
             return None
         return get_metadata(connection_id)
 
+    def ide_session_busy_response(connection_id=None):
+        ide_operation_name = integrated_session_state.current_ide_operation_name()
+        if not ide_operation_name:
+            return None
+        error_response = {
+            "ok": False,
+            "error": {
+                "message": (
+                    "The IDE session is busy: %s. "
+                    "Try again when it has finished." % ide_operation_name
+                ),
+            },
+        }
+        if connection_id is not None:
+            error_response["connection_id"] = connection_id
+        return error_response
+
     def get_active_session(connection_id):
         if integrated_session_state.is_ide_connection_id(connection_id):
+            ide_busy_response = ide_session_busy_response(connection_id)
+            if ide_busy_response is not None:
+                return None, ide_busy_response
             gemstone_session = integrated_session_state.ide_session_for_mcp()
             if gemstone_session is None:
                 return None, {
@@ -235,8 +332,103 @@ def register_tools(
         return GemstoneBrowserSession(
             gemstone_session,
             require_gemstone_ast=get_permissions()['require_gemstone_ast'],
+            metadata_cache=(
+                None
+                if gemstone_session is None
+                else metadata_cache_for_session(gemstone_session)
+            ),
         )
 
+    def metadata_cache_statistics_by_connection_id():
+        connection_ids = list_connection_ids()
+        if integrated_session_state.has_ide_session():
+            connection_ids = [
+                integrated_session_state.ide_connection_id()
+            ] + connection_ids
+        statistics_by_connection_id = {}
+        for connection_id in connection_ids:
+            gemstone_session, error_response = get_active_session(connection_id)
+            if error_response:
+                continue
+            statistics_by_connection_id[connection_id] = metadata_cache_for_session(
+                gemstone_session
+            ).statistics()
+        return statistics_by_connection_id
+
+    def tool_execution_statistics():
+        if tool_executor is None:
+            return {"mode": "synchronous"}
+        return tool_executor.statistics()
+
+    def paging_requested(page_size, continuation_token):
+        return page_size is not None or continuation_token is not None
+
+    def validated_paging_arguments(page_size, continuation_token):
+        if page_size is not None:
+            page_size = validated_positive_integer(page_size, "page_size")
+        if continuation_token is not None:
+            continuation_token = validated_non_empty_string(
+                continuation_token,
+                "continuation_token",
+            )
+        return page_size, continuation_token
+
+    def paged_search_result(
+        connection_id,
+        result_kind,
+        query,
+        entries_for_query,
+        page_size,
+        continuation_token,
+        max_results=None,
+    ):
+        if continuation_token is None:
+            entries = entries_for_query()
+            if max_results is not None:
+                entries = entries[:max_results]
+            snapshot_id = None
+            offset = 0
+        else:
+            snapshot_id, offset = snapshot_position_from_token(continuation_token)
+            result_snapshot = (
+                None if snapshot_id is None else get_result_snapshot(snapshot_id)
+            )
+            if result_snapshot is None or offset < 0:
+                raise DomainException("Unknown or expired continuation_token.")
+            if (
+                result_snapshot.connection_id != connection_id
+                or result_snapshot.result_kind != result_kind
+                or result_snapshot.query != query
+            ):
+                raise DomainException(
+                    "continuation_token does not belong to this query."
+                )
+            entries = result_snapshot.entries
+            if page_size is None:
+                page_size = result_snapshot.page_size
+        page_entries = entries[offset : offset + page_size]
+        next_offset = offset + len(page_entries)
+        next_continuation_token = None
+        if next_offset < len(entries):
+            if snapshot_id is None:
+                snapshot_id = add_result_snapshot(
+                    connection_id,
+                    result_kind,
+                    query,
+                    entries,
+                    page_size,
+                )
+            next_continuation_token = continuation_token_for(snapshot_id, next_offset)
+        elif snapshot_id is not None:
+            remove_result_snapshot(snapshot_id)
+        return {
+            "entries": page_entries,
+            "total_count": len(entries),
+            "offset": offset,
+            "page_size": page_size,
+            "continuation_token": next_continuation_token,
+        }
+
     def get_active_debug_session(connection_id, debug_id):
         if not has_debug_session(debug_id):
             return None, {
@@ -365,6 +557,12 @@ def register_tools(
             % tool_name,
         )
 
+    def record_test_timings(browser_session, test_result):
+        timing_history.record_test_timings(
+            test_result.get("test_timings", []),
+            stone_name=browser_session.stone_name(),
+        )
+
     def require_test_execution_enabled(connection_id, tool_name):
         if get_permissions()['allow_test_execution']:
             return None
@@ -1022,6 +1220,7 @@ def register_tools(
                     + [
                         "gs_run_gemstone_tests",
                         "gs_run_tests_in_package",
+                        "gs_run_tests_with_progress",
                         "gs_run_test_method",
                     ],
                 },
@@ -1215,269 +1414,12 @@ def register_tools(
         if not browser_session.installed_package_named("Reahl-Swordfish"):
             browser_session.create_and_install_package("Reahl-Swordfish")
         browser_session.run_code(ast_support_source())
+        browser_session.install_json_report_support()
         browser_session.run_code(ast_manifest_install_script(browser_session))
 
     def tracer_status_for_browser_session(browser_session):
         return browser_session.tracer_status()
 
-    def tracer_manifest_install_script(browser_session):
-        expected_source_hash = tracer_source_hash()
-        expected_version = TRACER_VERSION
-        expected_version_literal = browser_session.smalltalk_string_literal(
-            expected_version
-        )
-        expected_hash_literal = browser_session.smalltalk_string_literal(
-            expected_source_hash
-        )
-        installed_by_literal = browser_session.smalltalk_string_literal("swordfish")
-        return (
-            "| manifest |\n"
-            "manifest := Dictionary new.\n"
-            "manifest at: #version put: %s.\n"
-            "manifest at: #sourceHash put: %s.\n"
-            "manifest at: #installedBy put: %s.\n"
-            "manifest at: #installedAt put: DateAndTime now printString.\n"
-            "UserGlobals at: #SwordfishMcpTracerManifest put: manifest.\n"
-            "UserGlobals at: #SwordfishMcpTracerEnabled put: false.\n"
-            "true"
-        ) % (
-            expected_version_literal,
-            expected_hash_literal,
-            installed_by_literal,
-        )
-
-    def tracer_alias_selector(method_name):
-        return tracer_alias_selector_prefix + method_name
-
-    def selector_tokens_for_browser_session(browser_session, method_name):
-        return (
-            browser_session.selector_keyword_tokens(method_name)
-            if ":" in method_name
-            else [method_name]
-        )
-
-    def source_with_rewritten_method_header(
-        browser_session,
-        source,
-        old_selector,
-        new_selector,
-    ):
-        old_tokens = selector_tokens_for_browser_session(
-            browser_session,
-            old_selector,
-        )
-        new_tokens = selector_tokens_for_browser_session(
-            browser_session,
-            new_selector,
-        )
-        if len(old_tokens) != len(new_tokens):
-            raise DomainException(
-                "old_selector and new_selector must have the same arity."
-            )
-        selector_token_ranges = browser_session.selector_token_ranges_in_source(
-            source,
-            old_tokens,
-        )
-        if not selector_token_ranges:
-            raise DomainException("Could not locate selector tokens in method source.")
-        replacement_plan = browser_session.replacement_plan_for_selector_tokens(
-            [selector_token_ranges[0]],
-            new_tokens,
-        )
-        return browser_session.source_with_replaced_selector_tokens(
-            source,
-            replacement_plan,
-        )
-
-    def tracer_sender_wrapper_source(
-        browser_session,
-        sender_method_selector,
-        alias_selector,
-        target_method_name,
-        caller_class_name,
-        caller_show_instance_side,
-    ):
-        target_selector_literal = browser_session.selector_reference_expression(
-            target_method_name
-        )
-        caller_class_name_literal = browser_session.smalltalk_string_literal(
-            caller_class_name
-        )
-        caller_method_selector_literal = browser_session.selector_reference_expression(
-            sender_method_selector
-        )
-        caller_show_instance_side_literal = (
-            "true" if caller_show_instance_side else "false"
-        )
-        if ":" in sender_method_selector:
-            method_tokens = browser_session.selector_keyword_tokens(
-                sender_method_selector
-            )
-            alias_tokens = browser_session.selector_keyword_tokens(alias_selector)
-            argument_names = [
-                "argument%s" % (index + 1) for index in range(len(method_tokens))
-            ]
-            method_header_tokens = [
-                "%s %s" % (method_tokens[index], argument_names[index])
-                for index in range(len(method_tokens))
-            ]
-            alias_send_tokens = [
-                "%s %s" % (alias_tokens[index], argument_names[index])
-                for index in range(len(alias_tokens))
-            ]
-            method_header = " ".join(method_header_tokens)
-            alias_send = " ".join(alias_send_tokens)
-        else:
-            method_header = sender_method_selector
-            alias_send = alias_selector
-        return (
-            "%s\n"
-            "    SwordfishMcpTracer\n"
-            "        recordSenderExecutionForTarget: %s\n"
-            "        callerClassName: %s\n"
-            "        callerMethodSelector: %s\n"
-            "        callerShowInstanceSide: %s.\n"
-            "    ^self %s"
-        ) % (
-            method_header,
-            target_selector_literal,
-            caller_class_name_literal,
-            caller_method_selector_literal,
-            caller_show_instance_side_literal,
-            alias_send,
-        )
-
-    def tracer_class_method_sources():
-        return [
-            (
-                "edgeCounts\n"
-                "    ^UserGlobals\n"
-                "        at: #SwordfishMcpTracerEdgeCounts\n"
-                "        ifAbsentPut: [ Dictionary new ]"
-            ),
-            (
-                "clearEdgeCounts\n"
-                "    UserGlobals at: #SwordfishMcpTracerEdgeCounts put: Dictionary new.\n"
-                "    true"
-            ),
-            (
-                "instrumentation\n"
-                "    ^UserGlobals\n"
-                "        at: #SwordfishMcpTracerInstrumentation\n"
-                "        ifAbsentPut: [ Dictionary new ]"
-            ),
-            (
-                "instrumentationEntriesForTarget: aTargetSelector\n"
-                "    ^self instrumentation\n"
-                "        at: aTargetSelector asString\n"
-                "        ifAbsent: [ OrderedCollection new ]"
-            ),
-            (
-                "instrumentationReportForTarget: aTargetSelector\n"
-                "    | instrumentationEntries stream |\n"
-                "    instrumentationEntries := self instrumentationEntriesForTarget: aTargetSelector.\n"
-                "    stream := WriteStream on: String new.\n"
-                "    instrumentationEntries withIndexDo: [ :entry :index |\n"
-                "        stream nextPutAll: (entry at: 1).\n"
-                "        stream nextPut: $|.\n"
-                "        stream nextPutAll: ((entry at: 2) ifTrue: [ 'true' ] ifFalse: [ 'false' ]).\n"
-                "        stream nextPut: $|.\n"
-                "        stream nextPutAll: (entry at: 3).\n"
-                "        stream nextPut: $|.\n"
-                "        stream nextPutAll: (entry at: 4).\n"
-                "        index < instrumentationEntries size\n"
-                "            ifTrue: [ stream nextPut: Character lf ]\n"
-                "    ].\n"
-                "    ^stream contents"
-            ),
-            (
-                "clearInstrumentationForTarget: aTargetSelector\n"
-                "    self instrumentation\n"
-                "        removeKey: aTargetSelector asString\n"
-                "        ifAbsent: [ ].\n"
-                "    true"
-            ),
-            (
-                "registerInstrumentationForTarget: aTargetSelector callerClassName: callerClassName callerMethodSelector: callerMethodSelector callerShowInstanceSide: callerShowInstanceSide aliasSelector: aliasSelector\n"
-                "    | instrumentationEntry instrumentationEntries |\n"
-                "    instrumentationEntry := Array\n"
-                "        with: callerClassName\n"
-                "        with: callerShowInstanceSide\n"
-                "        with: callerMethodSelector asString\n"
-                "        with: aliasSelector asString.\n"
-                "    instrumentationEntries := self instrumentation\n"
-                "        at: aTargetSelector asString\n"
-                "        ifAbsentPut: [ OrderedCollection new ].\n"
-                "    (instrumentationEntries includes: instrumentationEntry)\n"
-                "        ifFalse: [ instrumentationEntries add: instrumentationEntry ].\n"
-                "    true"
-            ),
-            (
-                "selectorEdgeCountsFor: aSelector\n"
-                "    ^self edgeCounts\n"
-                "        at: aSelector asString\n"
-                "        ifAbsentPut: [ Dictionary new ]"
-            ),
-            (
-                "recordSenderExecutionForTarget: aTargetSelector callerClassName: callerClassName callerMethodSelector: callerMethodSelector callerShowInstanceSide: callerShowInstanceSide\n"
-                "    | edge selectorEdgeCounts |\n"
-                "    (UserGlobals at: #SwordfishMcpTracerEnabled ifAbsent: [ false ])\n"
-                "        ifFalse: [ ^self ].\n"
-                "    edge := Array\n"
-                "        with: callerClassName\n"
-                "        with: callerShowInstanceSide\n"
-                "        with: callerMethodSelector asString.\n"
-                "    selectorEdgeCounts := self selectorEdgeCountsFor: aTargetSelector.\n"
-                "    selectorEdgeCounts\n"
-                "        at: edge\n"
-                "        put: ((selectorEdgeCounts at: edge ifAbsent: [ 0 ]) + 1).\n"
-                "    ^self"
-            ),
-            (
-                "observedEdgesFor: aSelector\n"
-                "    | selectorEdgeCounts observedEdges |\n"
-                "    selectorEdgeCounts := self edgeCounts\n"
-                "        at: aSelector asString\n"
-                "        ifAbsent: [ Dictionary new ].\n"
-                "    observedEdges := OrderedCollection new.\n"
-                "    selectorEdgeCounts keysAndValuesDo: [ :edge :count |\n"
-                "        observedEdges add: (Array\n"
-                "            with: (edge at: 1)\n"
-                "            with: (edge at: 2)\n"
-                "            with: (edge at: 3)\n"
-                "            with: count)\n"
-                "    ].\n"
-                "    ^observedEdges asArray"
-            ),
-            (
-                "observedEdgesReportFor: aSelector\n"
-                "    | observedEdges stream |\n"
-                "    observedEdges := self observedEdgesFor: aSelector.\n"
-                "    stream := WriteStream on: String new.\n"
-                "    observedEdges withIndexDo: [ :edge :index |\n"
-                "        stream nextPutAll: (edge at: 1).\n"
-                "        stream nextPut: $|.\n"
-                "        stream nextPutAll: ((edge at: 2) ifTrue: [ 'true' ] ifFalse: [ 'false' ]).\n"
-                "        stream nextPut: $|.\n"
-                "        stream nextPutAll: (edge at: 3).\n"
-                "        stream nextPut: $|.\n"
-                "        stream nextPutAll: (edge at: 4) printString.\n"
-                "        index < observedEdges size\n"
-                "            ifTrue: [ stream nextPut: Character lf ]\n"
-                "    ].\n"
-                "    ^stream contents"
-            ),
-        ]
-
-    def install_tracer_methods(browser_session):
-        for method_source in tracer_class_method_sources():
-            browser_session.compile_method(
-                "SwordfishMcpTracer",
-                False,
-                method_source,
-                "tracing",
-            )
-
     def tracer_status_error_response(connection_id):
         return disabled_tool_response(
             connection_id,
@@ -1971,6 +1913,9 @@ def register_tools(
         netldi_name="gemnetobject",
     ):
         if integrated_session_state.has_ide_session():
+            ide_busy_response = ide_session_busy_response()
+            if ide_busy_response is not None:
+                return ide_busy_response
             gemstone_session = integrated_session_state.ide_session_for_mcp()
             if gemstone_session is None:
                 return {
@@ -2005,13 +1950,13 @@ def register_tools(
                 },
             }
         if connection_mode == "linked":
-            gemstone_session = create_linked_session(
+            create_session = lambda: create_linked_session(
                 gemstone_user_name,
                 gemstone_password,
                 stone_name,
             )
         elif connection_mode == "rpc":
-            gemstone_session = create_rpc_session(
+            create_session = lambda: create_rpc_session(
                 gemstone_user_name,
                 gemstone_password,
                 rpc_hostname,
@@ -2027,11 +1972,24 @@ def register_tools(
                     )
                 },
             }
+        session_pool = current_session_pool()
+        pool_key = session_pool_key(
+            connection_mode,
+            gemstone_user_name,
+            gemstone_password,
+            stone_name,
+            rpc_hostname,
+            netldi_name,
+        )
+        gemstone_session, reused_pooled_session = session_pool.acquire(
+            pool_key,
+            create_session,
+        )
 
         try:
             summary = session_summary(gemstone_session)
         except GemstoneError as error:
-            close_session(gemstone_session)
+            session_pool.discard(gemstone_session)
             return {
                 "ok": False,
                 "error": gemstone_error_payload(error),
@@ -2044,11 +2002,14 @@ def register_tools(
                 "transaction_active": False,
             },
         )
+        if connection_mode == "rpc":
+            add_worker_session_source(connection_id, pool_key, create_session)
         return {
             "ok": True,
             "connection_id": connection_id,
             "connection_mode": connection_mode,
             "session": summary,
+            "reused_pooled_session": reused_pooled_session,
         }
 
     @mcp_server.tool()
@@ -2079,10 +2040,21 @@ def register_tools(
             }
 
         remove_debug_sessions_for_connection(connection_id)
+        remove_result_snapshots_for_connection(connection_id)
         gemstone_session = remove_connection(connection_id)
-        GemstoneBrowserSession(gemstone_session).clear_stored_breakpoints()
+        browser_session = GemstoneBrowserSession(gemstone_session)
         try:
-            close_session(gemstone_session)
+            browser_session.clear_all_breakpoints()
+        except (GemstoneError, DomainException):
+            browser_session.clear_stored_breakpoints()
+            current_session_pool().discard(gemstone_session)
+            return {
+                "ok": True,
+                "connection_id": connection_id,
+            }
+        browser_session.clear_stored_breakpoints()
+        try:
+            current_session_pool().release(gemstone_session)
         except GemstoneError as error:
             return {
                 "ok": False,
@@ -2685,6 +2657,9 @@ def register_tools(
             "server_name": "SwordfishMCP",
             "policy": policy_flags(),
             "shared_ide_connection_id": shared_connection_id,
+            "metadata_cache": metadata_cache_statistics_by_connection_id(),
+            "tool_execution": tool_execution_statistics(),
+            "session_pool": current_session_pool().statistics(),
             "ide_mcp_runtime": ide_mcp_runtime,
             "ast_backend": ast_backend,
             "ast_support": {
@@ -3340,16 +3315,44 @@ def register_tools(
             }
 
     @mcp_server.tool()
-    def gs_find_classes(connection_id, search_input):
+    def gs_find_classes(
+        connection_id,
+        search_input,
+        page_size=None,
+        continuation_token=None,
+    ):
         browser_session, error_response = get_browser_session(connection_id)
         if error_response:
             return error_response
         try:
+            page_size, continuation_token = validated_paging_arguments(
+                page_size,
+                continuation_token,
+            )
+            if not paging_requested(page_size, continuation_token):
+                return {
+                    "ok": True,
+                    "connection_id": connection_id,
+                    "search_input": search_input,
+                    "class_names": browser_session.find_classes(search_input),
+                }
+            search_page = paged_search_result(
+                connection_id,
+                "classes",
+                search_input,
+                lambda: browser_session.find_classes(search_input),
+                page_size,
+                continuation_token,
+            )
             return {
                 "ok": True,
                 "connection_id": connection_id,
                 "search_input": search_input,
-                "class_names": browser_session.find_classes(search_input),
+                "class_names": search_page["entries"],
+                "total_count": search_page["total_count"],
+                "offset": search_page["offset"],
+                "page_size": search_page["page_size"],
+                "continuation_token": search_page["continuation_token"],
             }
         except GemstoneError as error:
             return {
@@ -3597,6 +3600,7 @@ def register_tools(
         max_results=None,
         sort_by="scan_order",
         sort_descending=False,
+        parallel_workers=None,
     ):
         browser_session, error_response = get_browser_session(connection_id)
         if error_response:
@@ -3636,6 +3640,11 @@ def register_tools(
                 sort_descending,
                 "sort_descending",
             )
+            if parallel_workers is not None:
+                parallel_workers = validated_positive_integer(
+                    parallel_workers,
+                    "parallel_workers",
+                )
             started_at = time.perf_counter()
             query_result = browser_session.query_methods_by_ast_pattern(
                 ast_pattern,
@@ -3646,6 +3655,7 @@ def register_tools(
                 max_results=max_results,
                 sort_by=sort_by,
                 sort_descending=sort_descending,
+                parallel_workers=parallel_workers,
             )
             elapsed_ms = int((time.perf_counter() - started_at) * 1000)
             return {
@@ -3659,6 +3669,7 @@ def register_tools(
                 "max_results": max_results,
                 "sort_by": sort_by,
                 "sort_descending": sort_descending,
+                "parallel_workers": parallel_workers,
                 "elapsed_ms": elapsed_ms,
                 "match_count": query_result["match_count"],
                 "scanned_method_count": query_result["scanned_method_count"],
@@ -3666,6 +3677,7 @@ def register_tools(
                 "result_sort_by": query_result["sort_by"],
                 "result_sort_descending": query_result["sort_descending"],
                 "matches": query_result["matches"],
+                "skipped_classes": query_result["skipped_classes"],
             }
         except GemstoneError as error:
             return {
@@ -3687,16 +3699,44 @@ def register_tools(
             }
 
     @mcp_server.tool()
-    def gs_find_selectors(connection_id, search_input):
+    def gs_find_selectors(
+        connection_id,
+        search_input,
+        page_size=None,
+        continuation_token=None,
+    ):
         browser_session, error_response = get_browser_session(connection_id)
         if error_response:
             return error_response
         try:
+            page_size, continuation_token = validated_paging_arguments(
+                page_size,
+                continuation_token,
+            )
+            if not paging_requested(page_size, continuation_token):
+                return {
+                    "ok": True,
+                    "connection_id": connection_id,
+                    "search_input": search_input,
+                    "selectors": browser_session.find_selectors(search_input),
+                }
+            search_page = paged_search_result(
+                connection_id,
+                "selectors",
+                search_input,
+                lambda: browser_session.find_selectors(search_input),
+                page_size,
+                continuation_token,
+            )
             return {
                 "ok": True,
                 "connection_id": connection_id,
                 "search_input": search_input,
-                "selectors": browser_session.find_selectors(search_input),
+                "selectors": search_page["entries"],
+                "total_count": search_page["total_count"],
+                "offset": search_page["offset"],
+                "page_size": search_page["page_size"],
+                "continuation_token": search_page["continuation_token"],
             }
         except GemstoneError as error:
             return {
@@ -3704,6 +3744,12 @@ def register_tools(
                 "connection_id": connection_id,
                 "error": gemstone_error_payload(error),
             }
+        except DomainException as error:
+            return {
+                "ok": False,
+                "connection_id": connection_id,
+                "error": {"message": str(error)},
+            }
 
     @mcp_server.tool()
     def gs_find_implementors(
@@ -3711,6 +3757,8 @@ def register_tools(
         method_name,
         max_results=None,
         count_only=False,
+        page_size=None,
+        continuation_token=None,
     ):
         browser_session, error_response = get_browser_session(connection_id)
         if error_response:
@@ -3722,7 +3770,52 @@ def register_tools(
                 "max_results",
             )
             count_only = validated_boolean(count_only, "count_only")
+            page_size, continuation_token = validated_paging_arguments(
+                page_size,
+                continuation_token,
+            )
             started_at = time.perf_counter()
+            if not count_only and paging_requested(page_size, continuation_token):
+                search_page = paged_search_result(
+                    connection_id,
+                    "implementors",
+                    method_name,
+                    lambda: sorted(
+                        {
+                            (class_name, show_instance_side)
+                            for class_name, show_instance_side, _ in (
+                                browser_session.selector_occurrence_keys(
+                                    method_name,
+                                    "implementors",
+                                )
+                            )
+                        }
+                    ),
+                    page_size,
+                    continuation_token,
+                    max_results=max_results,
+                )
+                implementors = [
+                    {
+                        "class_name": class_name,
+                        "show_instance_side": show_instance_side,
+                    }
+                    for class_name, show_instance_side in search_page["entries"]
+                ]
+                return {
+                    "ok": True,
+                    "connection_id": connection_id,
+                    "method_name": method_name,
+                    "max_results": max_results,
+                    "count_only": count_only,
+                    "total_count": search_page["total_count"],
+                    "returned_count": len(implementors),
+                    "offset": search_page["offset"],
+                    "page_size": search_page["page_size"],
+                    "continuation_token": search_page["continuation_token"],
+                    "elapsed_ms": int((time.perf_counter() - started_at) * 1000),
+                    "implementors": implementors,
+                }
             search_result = browser_session.find_implementors_with_summary(
                 method_name,
                 max_results=max_results,
@@ -3765,6 +3858,8 @@ def register_tools(
         method_name,
         max_results=None,
         count_only=False,
+        page_size=None,
+        continuation_token=None,
     ):
         browser_session, error_response = get_browser_session(connection_id)
         if error_response:
@@ -3776,7 +3871,41 @@ def register_tools(
                 "max_results",
             )
             count_only = validated_boolean(count_only, "count_only")
+            page_size, continuation_token = validated_paging_arguments(
+                page_size,
+                continuation_token,
+            )
             started_at = time.perf_counter()
+            if not count_only and paging_requested(page_size, continuation_token):
+                search_page = paged_search_result(
+                    connection_id,
+                    "senders",
+                    method_name,
+                    lambda: browser_session.selector_occurrence_keys(
+                        method_name,
+                        "senders",
+                    ),
+                    page_size,
+                    continuation_token,
+                    max_results=max_results,
+                )
+                senders = browser_session.method_summaries_for_keys(
+                    search_page["entries"]
+                )
+                return {
+                    "ok": True,
+                    "connection_id": connection_id,
+                    "method_name": method_name,
+                    "max_results": max_results,
+                    "count_only": count_only,
+                    "total_count": search_page["total_count"],
+                    "returned_count": len(senders),
+                    "offset": search_page["offset"],
+                    "page_size": search_page["page_size"],
+                    "continuation_token": search_page["continuation_token"],
+                    "elapsed_ms": int((time.perf_counter() - started_at) * 1000),
+                    "senders": senders,
+                }
             search_result = browser_session.find_senders(
                 method_name,
                 max_results=max_results,
@@ -4052,6 +4181,112 @@ def register_tools(
                 "error": {"message": str(error)},
             }
 
+    @experimental_tool()
+    def gs_change_journal_status(connection_id):
+        browser_session, error_response = get_browser_session(connection_id)
+        if error_response:
+            return error_response
+        try:
+            return {
+                "ok": True,
+                "connection_id": connection_id,
+                **browser_session.change_journal_status(),
+            }
+        except GemstoneError as error:
+            return {
+                "ok": False,
+                "connection_id": connection_id,
+                "error": gemstone_error_payload(error),
+            }
+        except GemstoneApiError as error:
+            return {
+                "ok": False,
+                "connection_id": connection_id,
+                "error": {"message": str(error)},
+            }
+        except DomainException as error:
+            return {
+                "ok": False,
+                "connection_id": connection_id,
+                "error": {"message": str(error)},
+            }
+
+    @experimental_tool()
+    def gs_change_journal_install(connection_id):
+        source_write_error_response = require_source_write_enabled(
+            connection_id,
+            "gs_change_journal_install",
+        )
+        if source_write_error_response:
+            return source_write_error_response
+        gemstone_session, error_response = get_active_session(connection_id)
+        if error_response:
+            return error_response
+        transaction_error_response = require_active_transaction(connection_id)
+        if transaction_error_response:
+            return transaction_error_response
+        browser_session = browser_session_for_policy(gemstone_session)
+        try:
+            browser_session.install_or_refresh_change_journal()
+            return {
+                "ok": True,
+                "connection_id": connection_id,
+                **browser_session.change_journal_status(),
+            }
+        except GemstoneError as error:
+            return {
+                "ok": False,
+                "connection_id": connection_id,
+                "error": gemstone_error_payload(error),
+            }
+        except GemstoneApiError as error:
+            return {
+                "ok": False,
+                "connection_id": connection_id,
+                "error": {"message": str(error)},
+            }
+        except DomainException as error:
+            return {
+                "ok": False,
+                "connection_id": connection_id,
+                "error": {"message": str(error)},
+            }
+
+    @experimental_tool()
+    def gs_change_journal_changes_since(connection_id, since_sequence=0):
+        browser_session, error_response = get_browser_session(connection_id)
+        if error_response:
+            return error_response
+        try:
+            since_sequence = validated_non_negative_integer_or_none(
+                since_sequence,
+                "since_sequence",
+            )
+            return {
+                "ok": True,
+                "connection_id": connection_id,
+                "since_sequence": since_sequence,
+                **browser_session.changes_since(since_sequence or 0),
+            }
+        except GemstoneError as error:
+            return {
+                "ok": False,
+                "connection_id": connection_id,
+                "error": gemstone_error_payload(error),
+            }
+        except GemstoneApiError as error:
+            return {
+                "ok": False,
+                "connection_id": connection_id,
+                "error": {"message": str(error)},
+            }
+        except DomainException as error:
+            return {
+                "ok": False,
+                "connection_id": connection_id,
+                "error": {"message": str(error)},
+            }
+
     @experimental_tool()
     def gs_tracer_trace_selector(
         connection_id,
@@ -5165,7 +5400,7 @@ def register_tools(
             }
 
     @mcp_server.tool()
-    def gs_run_tests_in_package(connection_id, package_name):
+    def gs_run_tests_in_package(connection_id, package_name, worker_count=None):
         test_exec_error = require_test_execution_enabled(
             connection_id, 'gs_run_tests_in_package'
         )
@@ -5179,11 +5414,31 @@ def register_tools(
                 package_name,
                 "package_name",
             )
-            test_result = browser_session.run_tests_in_package(package_name)
+            worker_count = (
+                1
+                if worker_count is None
+                else validated_positive_integer(worker_count, "worker_count")
+            )
+            if worker_count > MAXIMUM_TEST_WORKER_COUNT:
+                raise DomainException(
+                    "worker_count cannot be more than %s." % MAXIMUM_TEST_WORKER_COUNT
+                )
+            worker_sessions = get_worker_session_source(connection_id)
+            if worker_count > 1 and worker_sessions is None:
+                raise DomainException(
+                    "Parallel test runs need an rpc connection made with gs_connect."
+                )
+            test_result = browser_session.run_tests_in_package(
+                package_name,
+                worker_count=worker_count,
+                worker_sessions=worker_sessions,
+            )
+            record_test_timings(browser_session, test_result)
             return {
                 "ok": True,
                 "connection_id": connection_id,
                 "package_name": package_name,
+                "worker_count": test_result["worker_count"],
                 "result": test_result,
                 "tests_passed": test_result["has_passed"],
             }
@@ -5206,6 +5461,141 @@ def register_tools(
                 "error": {"message": str(error)},
             }
 
+    @mcp_server.tool()
+    def gs_run_tests_with_progress(
+        connection_id,
+        package_name=None,
+        test_case_class_name=None,
+        tool_progress: McpContext = None,
+    ):
+        test_exec_error = require_test_execution_enabled(
+            connection_id, "gs_run_tests_with_progress"
+        )
+        if test_exec_error:
+            return test_exec_error
+        browser_session, error_response = get_browser_session(connection_id)
+        if error_response:
+            return error_response
+        test_run_id = str(uuid.uuid4())
+        progress = tool_progress_for(tool_progress)
+        try:
+            if (package_name is None) == (test_case_class_name is None):
+                raise DomainException(
+                    "Specify exactly one of package_name or test_case_class_name."
+                )
+            if package_name is not None:
+                package_name = validated_non_empty_string(
+                    package_name,
+                    "package_name",
+                )
+                test_case_class_names = browser_session.list_test_case_classes(
+                    package_name
+                )
+            else:
+                test_case_class_names = [
+                    validated_identifier(
+                        test_case_class_name,
+                        "test_case_class_name",
+                    )
+                ]
+
+            def report_test_result(test_result):
+                progress.report(
+                    test_result["test_index"],
+                    test_result["test_count"],
+                    "%s %s (%s ms) [test_run_id=%s]"
+                    % (
+                        test_result["description"],
+                        test_result["status"],
+                        test_result["elapsed_ms"],
+                        test_run_id,
+                    ),
+                )
+
+            active_test_runs_by_key[(connection_id, test_run_id)] = progress
+            progress.report(0, None, "Test run started [test_run_id=%s]" % test_run_id)
+            test_result = browser_session.run_tests_incrementally(
+                test_case_class_names,
+                should_stop=progress.should_stop,
+                on_test_result=report_test_result,
+            )
+            record_test_timings(browser_session, test_result)
+            return {
+                "ok": True,
+                "connection_id": connection_id,
+                "test_run_id": test_run_id,
+                "result": test_result,
+                "tests_passed": test_result["has_passed"],
+            }
+        except GemstoneError as error:
+            return {
+                "ok": False,
+                "connection_id": connection_id,
+                "error": gemstone_error_payload(error),
+            }
+        except GemstoneApiError as error:
+            return {
+                "ok": False,
+                "connection_id": connection_id,
+                "error": {"message": str(error)},
+            }
+        except DomainException as error:
+            return {
+                "ok": False,
+                "connection_id": connection_id,
+                "error": {"message": str(error)},
+            }
+        finally:
+            active_test_runs_by_key.pop((connection_id, test_run_id), None)
+
+    @mcp_server.tool()
+    def gs_cancel_test_run(connection_id, test_run_id):
+        progress = active_test_runs_by_key.get((connection_id, test_run_id))
+        if progress is None:
+            return {
+                "ok": False,
+                "connection_id": connection_id,
+                "test_run_id": test_run_id,
+                "error": {
+                    "message": "Unknown or finished test_run_id for this connection_id."
+                },
+            }
+        progress.request_stop()
+        return {
+            "ok": True,
+            "connection_id": connection_id,
+            "test_run_id": test_run_id,
+            "cancel_requested": True,
+        }
+
+    @mcp_server.tool()
+    def gs_test_timing_report(limit=20, package_name=None, stone_name=None):
+        try:
+            limit = validated_positive_integer(limit, "limit")
+            if package_name is not None:
+                package_name = validated_non_empty_string(
+                    package_name,
+                    "package_name",
+                )
+            if stone_name is not None:
+                stone_name = validated_non_empty_string(stone_name, "stone_name")
+            return {
+                "ok": True,
+                "history_file_path": timing_history.history_file_path,
+                "package_name": package_name,
+                "stone_name": stone_name,
+                "report": timing_history.timing_report(
+                    limit=limit,
+                    package_name=package_name,
+                    stone_name=stone_name,
+                ),
+            }
+        except DomainException as error:
+            return {
+                "ok": False,
+                "error": {"message": str(error)},
+            }
+
     @mcp_server.tool()
     def gs_run_test_method(
         connection_id,
@@ -5233,6 +5623,7 @@ def register_tools(
                 test_case_class_name,
                 test_method_selector,
             )
+            record_test_timings(browser_session, test_result)
             return {
                 "ok": True,
                 "connection_id": connection_id,
@@ -5389,6 +5780,7 @@ def register_tools(
         old_selector,
         new_selector,
         show_instance_side=True,
+        plan_id=None,
     ):
         if not get_permissions()['allow_source_write']:
             return disabled_tool_response(
@@ -5415,11 +5807,14 @@ def register_tools(
                 show_instance_side,
                 "show_instance_side",
             )
+            if plan_id is not None:
+                plan_id = validated_non_empty_string(plan_id, "plan_id")
             result = browser_session.apply_method_rename(
                 class_name,
                 show_instance_side,
                 old_selector,
                 new_selector,
+                plan_id=plan_id,
             )
             return {
                 "ok": True,
@@ -5428,6 +5823,7 @@ def register_tools(
                 "show_instance_side": show_instance_side,
                 "old_selector": old_selector,
                 "new_selector": new_selector,
+                "plan_id": plan_id,
                 "result": result,
             }
         except GemstoneError as error:
@@ -5446,7 +5842,7 @@ def register_tools(
             return {
                 "ok": False,
                 "connection_id": connection_id,
-                "error": {"message": str(error)},
+                "error": domain_error_payload(error),
             }
 
     @experimental_tool()
@@ -5528,6 +5924,7 @@ def register_tools(
         target_show_instance_side=True,
         overwrite_target_method=False,
         delete_source_method=True,
+        plan_id=None,
     ):
         if not get_permissions()['allow_source_write']:
             return disabled_tool_response(
@@ -5573,6 +5970,8 @@ def register_tools(
                 delete_source_method,
                 "delete_source_method",
             )
+            if plan_id is not None:
+                plan_id = validated_non_empty_string(plan_id, "plan_id")
             result = browser_session.apply_method_move(
                 source_class_name,
                 source_show_instance_side,
@@ -5581,6 +5980,7 @@ def register_tools(
                 method_selector,
                 overwrite_target_method=overwrite_target_method,
                 delete_source_method=delete_source_method,
+                plan_id=plan_id,
             )
             return {
                 "ok": True,
@@ -5592,6 +5992,7 @@ def register_tools(
                 "method_selector": method_selector,
                 "overwrite_target_method": overwrite_target_method,
                 "delete_source_method": delete_source_method,
+                "plan_id": plan_id,
                 "result": result,
             }
         except GemstoneError as error:
@@ -5610,7 +6011,7 @@ def register_tools(
             return {
                 "ok": False,
                 "connection_id": connection_id,
-                "error": {"message": str(error)},
+                "error": domain_error_payload(error),
             }
 
     @experimental_tool()
@@ -5700,6 +6101,7 @@ def register_tools(
         parameter_name,
         default_argument_source,
         show_instance_side=True,
+        plan_id=None,
     ):
         if not get_permissions()['allow_source_write']:
             return disabled_tool_response(
@@ -5743,6 +6145,8 @@ def register_tools(
                 show_instance_side,
                 "show_instance_side",
             )
+            if plan_id is not None:
+                plan_id = validated_non_empty_string(plan_id, "plan_id")
             result = browser_session.apply_method_add_parameter(
                 class_name,
                 show_instance_side,
@@ -5750,6 +6154,7 @@ def register_tools(
                 parameter_keyword,
                 parameter_name,
                 default_argument_source,
+                plan_id=plan_id,
             )
             return {
                 "ok": True,
@@ -5760,6 +6165,7 @@ def register_tools(
                 "parameter_keyword": parameter_keyword,
                 "parameter_name": parameter_name,
                 "default_argument_source": default_argument_source,
+                "plan_id": plan_id,
                 "result": result,
             }
         except GemstoneError as error:
@@ -5778,7 +6184,7 @@ def register_tools(
             return {
                 "ok": False,
                 "connection_id": connection_id,
-                "error": {"message": str(error)},
+                "error": domain_error_payload(error),
             }
 
     @experimental_tool()
@@ -5861,6 +6267,7 @@ def register_tools(
         show_instance_side=True,
         overwrite_new_method=False,
         rewrite_source_senders=False,
+        plan_id=None,
     ):
         if not get_permissions()['allow_source_write']:
             return disabled_tool_response(
@@ -5904,6 +6311,8 @@ def register_tools(
                 rewrite_source_senders,
                 "rewrite_source_senders",
             )
+            if plan_id is not None:
+                plan_id = validated_non_empty_string(plan_id, "plan_id")
             result = browser_session.apply_method_remove_parameter(
                 class_name,
                 show_instance_side,
@@ -5911,6 +6320,7 @@ def register_tools(
                 parameter_keyword,
                 overwrite_new_method=overwrite_new_method,
                 rewrite_source_senders=rewrite_source_senders,
+                plan_id=plan_id,
             )
             return {
                 "ok": True,
@@ -5921,6 +6331,7 @@ def register_tools(
                 "parameter_keyword": parameter_keyword,
                 "overwrite_new_method": overwrite_new_method,
                 "rewrite_source_senders": rewrite_source_senders,
+                "plan_id": plan_id,
                 "result": result,
             }
         except GemstoneError as error:
@@ -5939,7 +6350,7 @@ def register_tools(
             return {
                 "ok": False,
                 "connection_id": connection_id,
-                "error": {"message": str(error)},
+                "error": domain_error_payload(error),
             }
 
     @experimental_tool()
@@ -6022,6 +6433,7 @@ def register_tools(
         statement_indexes,
         show_instance_side=True,
         overwrite_new_method=False,
+        plan_id=None,
     ):
         if not get_permissions()['allow_source_write']:
             return disabled_tool_response(
@@ -6065,6 +6477,8 @@ def register_tools(
                 overwrite_new_method,
                 "overwrite_new_method",
             )
+            if plan_id is not None:
+                plan_id = validated_non_empty_string(plan_id, "plan_id")
             result = browser_session.apply_method_extract(
                 class_name,
                 show_instance_side,
@@ -6072,6 +6486,7 @@ def register_tools(
                 new_selector,
                 statement_indexes,
                 overwrite_new_method=overwrite_new_method,
+                plan_id=plan_id,
             )
             return {
                 "ok": True,
@@ -6082,6 +6497,7 @@ def register_tools(
                 "new_selector": new_selector,
                 "statement_indexes": statement_indexes,
                 "overwrite_new_method": overwrite_new_method,
+                "plan_id": plan_id,
                 "result": result,
             }
         except GemstoneError as error:
@@ -6100,7 +6516,7 @@ def register_tools(
             return {
                 "ok": False,
                 "connection_id": connection_id,
-                "error": {"message": str(error)},
+                "error": domain_error_payload(error),
             }
 
     @experimental_tool()
@@ -6175,6 +6591,7 @@ def register_tools(
         inline_selector,
         show_instance_side=True,
         delete_inlined_method=False,
+        plan_id=None,
     ):
         if not get_permissions()['allow_source_write']:
             return disabled_tool_response(
@@ -6214,12 +6631,15 @@ def register_tools(
                 delete_inlined_method,
                 "delete_inlined_method",
             )
+            if plan_id is not None:
+                plan_id = validated_non_empty_string(plan_id, "plan_id")
             result = browser_session.apply_method_inline(
                 class_name,
                 show_instance_side,
                 caller_selector,
                 inline_selector,
                 delete_inlined_method=delete_inlined_method,
+                plan_id=plan_id,
             )
             return {
                 "ok": True,
@@ -6229,6 +6649,7 @@ def register_tools(
                 "caller_selector": caller_selector,
                 "inline_selector": inline_selector,
                 "delete_inlined_method": delete_inlined_method,
+                "plan_id": plan_id,
                 "result": result,
             }
         except GemstoneError as error:
@@ -6247,7 +6668,7 @@ def register_tools(
             return {
                 "ok": False,
                 "connection_id": connection_id,
-                "error": {"message": str(error)},
+                "error": domain_error_payload(error),
             }
 
     @experimental_tool()
@@ -6302,6 +6723,7 @@ def register_tools(
         require_observed_sender_evidence=False,
         evidence_run_id=None,
         evidence_max_age_seconds=3600,
+        plan_id=None,
     ):
         if not get_permissions()['allow_source_write']:
             return disabled_tool_response(
@@ -6347,9 +6769,12 @@ def register_tools(
                     evidence_run_id,
                     evidence_max_age_seconds,
                 )
+            if plan_id is not None:
+                plan_id = validated_non_empty_string(plan_id, "plan_id")
             result = browser_session.apply_selector_rename(
                 old_selector,
                 new_selector,
+                plan_id=plan_id,
             )
             return {
                 "ok": True,
@@ -6358,6 +6783,7 @@ def register_tools(
                 "new_selector": new_selector,
                 "require_observed_sender_evidence": (require_observed_sender_evidence),
                 "evidence_validation": evidence_validation,
+                "plan_id": plan_id,
                 "result": result,
             }
         except GemstoneError as error:
@@ -6376,7 +6802,7 @@ def register_tools(
             return {
                 "ok": False,
                 "connection_id": connection_id,
-                "error": {"message": str(error)},
+                "error": domain_error_payload(error),
             }
 
     @mcp_server.tool()
@@ -6561,6 +6987,7 @@ def register_tools(
             return error_response
         try:
             test_result = browser_session.run_gemstone_tests(test_case_class_name)
+            record_test_timings(browser_session, test_result)
             return {
                 "ok": True,
                 "connection_id": connection_id,
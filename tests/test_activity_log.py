@@ -0,0 +1,110 @@
+import json
+import os
+import tempfile
+import threading
+from unittest.mock import patch
+
+from reahl.tofu import Fixture, tear_down, with_fixtures
+
+from reahl.swordfish.main import ActivityLog
+
+
+class ActivityLogFixture(Fixture):
+    def new_log_directory(self):
+        return tempfile.mkdtemp()
+
+    def new_log_file_path(self):
+        return os.path.join(self.log_directory, "activity.jsonl")
+
+    def new_activity_log(self):
+        return ActivityLog(self.log_file_path)
+
+    @tear_down
+    def close_activity_log(self):
+        self.activity_log.close()
+
+    def logged_entries(self, file_path=None):
+        with open(file_path or self.log_file_path, encoding="utf-8") as log_file:
+            return [json.loads(line) for line in log_file]
+
+
+@with_fixtures(ActivityLogFixture)
+def test_mcp_tool_calls_are_written_in_the_background_with_stacks_only_on_error(
+    activity_log_fixture,
+):
+    """AI: Tool calls are enqueued and written by the writer thread, and with on-error stack capture only failed calls carry a stack."""
+    activity_log = activity_log_fixture.activity_log
+
+    def gs_lookup(connection_id):
+        return {"ok": connection_id == "known", "connection_id": connection_id}
+
+    logged_lookup = activity_log.wrap_mcp_tool(gs_lookup)
+    logged_lookup(connection_id="known")
+    logged_lookup(connection_id="missing")
+    activity_log.log_ide_event("SelectedClassChanged", ("Order",), {})
+    activity_log.close()
+
+    logged_entries = activity_log_fixture.logged_entries()
+    assert [
+        (logged_entry["action"], logged_entry.get("outcome"))
+        for logged_entry in logged_entries
+    ] == [
+        ("gs_lookup", "ok"),
+        ("gs_lookup", "error"),
+        ("SelectedClassChanged", None),
+    ]
+    assert ["stack" in logged_entry for logged_entry in logged_entries] == [
+        False,
+        True,
+        False,
+    ]
+    assert logged_entries[1]["stack"]
+
+
+@with_fixtures(ActivityLogFixture)
+def test_activity_log_rotates_by_size_and_counts_entries_dropped_when_full(
+    activity_log_fixture,
+):
+    """AI: A full queue drops entries instead of blocking the caller and records how many were dropped, and a log past its size limit is rotated."""
+    with patch.object(threading.Thread, "start"):
+        activity_log = ActivityLog(
+            activity_log_fixture.log_file_path,
+            maximum_file_bytes=1,
+            backup_count=1,
+            queue_size=1,
+        )
+    activity_log.write_entry({"ts": 0, "source": "ide", "action": "queued"})
+    activity_log.write_entry({"ts": 0, "source": "ide", "action": "overflow"})
+
+    activity_log.write_batch([activity_log.entries.get_nowait()])
+    activity_log.log_file.close()
+
+    rotated_entries = activity_log_fixture.logged_entries(
+        activity_log_fixture.log_file_path + ".1"
+    )
+    assert [
+        (rotated_entry["action"], rotated_entry.get("count"))
+        for rotated_entry in rotated_entries
+    ] == [("queued", None), ("dropped_entries", 1)]
+    assert os.path.getsize(activity_log_fixture.log_file_path) == 0
+
+
+@with_fixtures(ActivityLogFixture)
+def test_sampled_stacks_honour_an_interval_of_one_and_close_does_not_wait_on_a_dead_writer(
+    activity_log_fixture,
+):
+    """AI: With a sample interval of one every entry carries a stack, and closing a log whose writer is gone and whose queue is full returns instead of hanging."""
+    with patch.object(ActivityLog, "write_queued_entries"):
+        activity_log = ActivityLog(
+            activity_log_fixture.log_file_path,
+            stack_capture="sampled",
+            queue_size=1,
+            stack_sample_interval=1,
+        )
+    activity_log.log_ide_event("SelectedClassChanged", ("Order",), {})
+
+    with patch("reahl.swordfish.main.ACTIVITY_LOG_CLOSE_TIMEOUT_SECONDS", 0.01):
+        activity_log.close()
+
+    assert "stack" in activity_log.entries.get_nowait()
+    assert activity_log.should_capture_stack(False)
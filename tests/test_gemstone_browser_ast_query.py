@@ -0,0 +1,165 @@
+from reahl.tofu import Fixture, with_fixtures
+
+from reahl.swordfish.gemstone import browser
+from reahl.swordfish.gemstone.browser import GemstoneBrowserSession
+
+
+class StubbedResult:
+    def __init__(self, value):
+        self.to_py = value
+
+
+class MethodSourceScanBrowserSession(GemstoneBrowserSession):
+    def __init__(self, method_rows_by_class_name):
+        super().__init__(None)
+        self.method_rows_by_class_name = method_rows_by_class_name
+        self.executed_scripts = []
+
+    def all_class_names(self):
+        return sorted(self.method_rows_by_class_name.keys())
+
+    def run_code(self, source):
+        self.executed_scripts.append(source)
+        report = ""
+        for class_name in self.all_class_names():
+            if self.smalltalk_string_literal(class_name) in source:
+                for (
+                    method_selector,
+                    category,
+                    method_source,
+                ) in self.method_rows_by_class_name[class_name]:
+                    report = report + self.length_prefixed_report(
+                        [class_name, method_selector, category, method_source]
+                    )
+        return StubbedResult(report)
+
+    def length_prefixed_report(self, fields):
+        return "".join(["%s:%s" % (len(field), field) for field in fields])
+
+    def get_method_source(self, class_name, method_selector, show_instance_side):
+        raise AssertionError("Method sources should come from the bulk scan.")
+
+    def get_method_category(self, class_name, method_selector, show_instance_side):
+        raise AssertionError("Method categories should come from the bulk scan.")
+
+
+class AstQueryFixture(Fixture):
+    def new_method_rows_by_class_name(self):
+        return {
+            "OrderLine": [
+                ("total", "accessing", "total\n    ^quantity * price"),
+                (
+                    "printOn:",
+                    "printing",
+                    "printOn: aStream\n    aStream nextPutAll: 'a:b'",
+                ),
+            ],
+            "Order": [
+                (
+                    "total",
+                    "accessing",
+                    "total\n    ^lines inject: 0 into: [:a :b | a + b]",
+                ),
+            ],
+        }
+
+    def new_browser_session(self):
+        return MethodSourceScanBrowserSession(self.method_rows_by_class_name)
+
+
+@with_fixtures(AstQueryFixture)
+def test_ast_query_uses_bulk_rows_for_sources_and_categories(ast_query_fixture):
+    """AI: AST queries should read sources and categories from one bulk scan instead of per-method round trips."""
+    query_result = ast_query_fixture.browser_session.query_methods_by_ast_pattern(
+        {"required_selectors": ["*"]},
+    )
+    assert len(ast_query_fixture.browser_session.executed_scripts) == 1
+    assert query_result["scanned_method_count"] == 3
+    assert [
+        (match["class_name"], match["method_selector"], match["method_category"])
+        for match in query_result["matches"]
+    ] == [("OrderLine", "total", "accessing")]
+
+
+@with_fixtures(AstQueryFixture)
+def test_ast_query_decodes_sources_containing_field_separators(ast_query_fixture):
+    """AI: Length-prefixed rows should survive sources that contain colons, digits and newlines."""
+    rows = list(
+        ast_query_fixture.browser_session.method_source_rows_for_classes(
+            ["OrderLine"],
+            True,
+            "all",
+        )
+    )
+    assert rows[1] == {
+        "class_name": "OrderLine",
+        "method_selector": "printOn:",
+        "method_category": "printing",
+        "source": "printOn: aStream\n    aStream nextPutAll: 'a:b'",
+        "show_instance_side": True,
+    }
+
+
+@with_fixtures(AstQueryFixture)
+def test_ast_query_stops_fetching_chunks_once_scan_order_limit_is_reached(
+    ast_query_fixture,
+):
+    """AI: A scan_order query with max_results should not fetch later class chunks once it has enough matches."""
+    original_chunk_size = browser.METHOD_SOURCE_SCAN_CHUNK_SIZE
+    browser.METHOD_SOURCE_SCAN_CHUNK_SIZE = 1
+    try:
+        query_result = ast_query_fixture.browser_session.query_methods_by_ast_pattern(
+            {"required_selectors": ["inject:into:"]},
+            max_results=1,
+        )
+    finally:
+        browser.METHOD_SOURCE_SCAN_CHUNK_SIZE = original_chunk_size
+    assert query_result["truncated"]
+    assert query_result["scanned_method_count"] == 1
+    assert len(ast_query_fixture.browser_session.executed_scripts) == 1
+
+
+@with_fixtures(AstQueryFixture)
+def test_parallel_ast_query_matches_the_serial_scan(ast_query_fixture):
+    """AI: Spreading pattern evaluation over worker processes should not change which methods match or their order."""
+    original_chunk_size = browser.AST_QUERY_PARALLEL_CHUNK_SIZE
+    browser.AST_QUERY_PARALLEL_CHUNK_SIZE = 1
+    try:
+        parallel_result = (
+            ast_query_fixture.browser_session.query_methods_by_ast_pattern(
+                {"required_selectors": ["*"]},
+                sort_by="method_selector",
+                sort_descending=True,
+                parallel_workers=2,
+            )
+        )
+    finally:
+        browser.AST_QUERY_PARALLEL_CHUNK_SIZE = original_chunk_size
+    serial_result = ast_query_fixture.browser_session.query_methods_by_ast_pattern(
+        {"required_selectors": ["*"]},
+        sort_by="method_selector",
+        sort_descending=True,
+    )
+    assert parallel_result == serial_result
+
+
+@with_fixtures(AstQueryFixture)
+def test_ast_query_reports_classes_the_scan_had_to_skip(ast_query_fixture):
+    """AI: Classes the server-side scan could not resolve or read should be reported, so an incomplete scan does not look complete."""
+    browser_session = ast_query_fixture.browser_session
+    browser_session.method_rows_by_class_name["Vanished"] = [
+        ("", "not_found", "Class could not be resolved.")
+    ]
+
+    query_result = browser_session.query_methods_by_ast_pattern(
+        {"required_selectors": ["*"]},
+    )
+
+    assert query_result["scanned_method_count"] == 3
+    assert query_result["skipped_classes"] == [
+        {
+            "class_name": "Vanished",
+            "reason": "not_found",
+            "message": "Class could not be resolved.",
+        }
+    ]
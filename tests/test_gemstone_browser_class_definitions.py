@@ -0,0 +1,89 @@
+from reahl.tofu import Fixture, with_fixtures
+
+from reahl.swordfish.gemstone.browser import GemstoneBrowserSession
+from reahl.swordfish.gemstone.metadata_cache import MetadataCache
+
+
+class StubbedResult:
+    def __init__(self, value):
+        self.to_py = value
+
+
+class ClassDefinitionBrowserSession(GemstoneBrowserSession):
+    def __init__(self, class_rows_by_name):
+        super().__init__(None, metadata_cache=MetadataCache())
+        self.class_rows_by_name = class_rows_by_name
+        self.requested_class_name_lists = []
+
+    def run_code(self, source):
+        requested_class_names = [
+            class_name
+            for class_name in self.class_rows_by_name
+            if self.smalltalk_string_literal(class_name) in source
+        ]
+        self.requested_class_name_lists.append(requested_class_names)
+        include_ancestors = "includeAncestors := true." in source
+        report = ""
+        emitted_class_names = set()
+        for class_name in requested_class_names:
+            lookup_name = class_name
+            while lookup_name and lookup_name not in emitted_class_names:
+                emitted_class_names.add(lookup_name)
+                class_row = self.class_rows_by_name[lookup_name]
+                report = report + "".join(
+                    [
+                        "%s:%s" % (len(field), field)
+                        for field in [lookup_name, lookup_name] + class_row
+                    ]
+                )
+                lookup_name = class_row[0] if include_ancestors else None
+        return StubbedResult(report)
+
+
+class ClassDefinitionFixture(Fixture):
+    def new_class_rows_by_name(self):
+        return {
+            "Object": ["", "Kernel", "", "", "", ""],
+            "Order": ["Object", "Shop-Model", "lines total", "", "cache", ""],
+            "OrderLine": ["Object", "Shop-Model", "quantity price", "Tax", "", ""],
+        }
+
+    def new_browser_session(self):
+        return ClassDefinitionBrowserSession(self.class_rows_by_name)
+
+
+@with_fixtures(ClassDefinitionFixture)
+def test_class_definitions_with_ancestors_come_from_one_script(
+    class_definition_fixture,
+):
+    """AI: Definitions for several classes and their shared ancestors should be fetched by one script."""
+    browser_session = class_definition_fixture.browser_session
+    class_definitions = browser_session.get_class_definitions(["Order", "OrderLine"])
+
+    assert len(browser_session.requested_class_name_lists) == 1
+    assert sorted(class_definitions) == ["Object", "Order", "OrderLine"]
+    assert class_definitions["Object"]["superclass_name"] is None
+    assert class_definitions["OrderLine"] == {
+        "class_name": "OrderLine",
+        "superclass_name": "Object",
+        "package_name": "Shop-Model",
+        "inst_var_names": ["quantity", "price"],
+        "class_var_names": ["Tax"],
+        "class_inst_var_names": [],
+        "pool_dictionary_names": [],
+    }
+
+
+@with_fixtures(ClassDefinitionFixture)
+def test_cached_class_definitions_are_not_fetched_again(class_definition_fixture):
+    """AI: Definitions already cached by a single-class lookup should be reused by the bulk fetch."""
+    browser_session = class_definition_fixture.browser_session
+    browser_session.get_class_definitions(["Order"])
+    class_definitions = browser_session.get_class_definitions(["OrderLine", "Order"])
+
+    assert browser_session.get_class_definition("Order")["inst_var_names"] == [
+        "lines",
+        "total",
+    ]
+    assert sorted(class_definitions) == ["Object", "Order", "OrderLine"]
+    assert browser_session.requested_class_name_lists == [["Order"], ["OrderLine"]]
@@ -0,0 +1,122 @@
+from reahl.tofu import Fixture, with_fixtures
+
+from reahl.swordfish.gemstone.browser import GemstoneBrowserSession
+
+
+class StubbedResult:
+    def __init__(self, value):
+        self.to_py = value
+
+
+class MethodOccurrenceBrowserSession(GemstoneBrowserSession):
+    def __init__(self, occurrence_rows_by_expression):
+        super().__init__(None)
+        self.occurrence_rows_by_expression = occurrence_rows_by_expression
+        self.executed_scripts = []
+
+    def class_categories_by_class_name(self):
+        return {"Order": "Shop-Model"}
+
+    def get_method_category(self, class_name, method_selector, show_instance_side):
+        raise AssertionError("Method categories should come from the occurrence rows.")
+
+    def run_code(self, source):
+        self.executed_scripts.append(source)
+        include_source = "includeSource := true." in source
+        report = ""
+        for expression, occurrence_rows in self.occurrence_rows_by_expression.items():
+            if "writeMethods value: (%s)." % expression in source:
+                for occurrence_row in occurrence_rows:
+                    fields = list(occurrence_row[:4])
+                    if include_source:
+                        fields.append(occurrence_row[4])
+                    report = report + "".join(
+                        ["%s:%s" % (len(field), field) for field in fields]
+                    )
+        return StubbedResult(report)
+
+
+class MethodOccurrenceFixture(Fixture):
+    def new_occurrence_rows_by_expression(self):
+        return {
+            "ClassOrganizer new sendersOf: ('total' asSymbol)": [
+                (
+                    "Order",
+                    "false",
+                    "printOn:",
+                    "printing",
+                    "printOn: s\n    s print: self total",
+                ),
+                (
+                    "Order class",
+                    "true",
+                    "example",
+                    "*Shop-Examples",
+                    "example\n    ^self new total",
+                ),
+            ],
+            "ClassOrganizer new implementorsOf: ('total' asSymbol)": [
+                ("Order", "false", "total", "accessing", "total\n    ^0"),
+            ],
+        }
+
+    def new_browser_session(self):
+        return MethodOccurrenceBrowserSession(self.occurrence_rows_by_expression)
+
+
+@with_fixtures(MethodOccurrenceFixture)
+def test_senders_with_category_details_come_from_one_execute(method_occurrence_fixture):
+    """AI: Sender searches with category details should read class, side, selector and category rows from a single execute."""
+    browser_session = method_occurrence_fixture.browser_session
+    sender_search_result = browser_session.find_senders(
+        "total",
+        include_category_details=True,
+    )
+
+    assert len(browser_session.executed_scripts) == 1
+    assert sender_search_result["senders"] == [
+        {
+            "class_name": "Order",
+            "show_instance_side": False,
+            "method_selector": "example",
+            "class_category": "Shop-Model",
+            "method_category": "*Shop-Examples",
+            "method_category_is_extension": True,
+            "extension_category_name": "Shop-Examples",
+        },
+        {
+            "class_name": "Order",
+            "show_instance_side": True,
+            "method_selector": "printOn:",
+            "class_category": "Shop-Model",
+            "method_category": "printing",
+            "method_category_is_extension": False,
+            "extension_category_name": None,
+        },
+    ]
+
+
+@with_fixtures(MethodOccurrenceFixture)
+def test_selector_rename_plan_uses_sources_from_occurrence_rows(
+    method_occurrence_fixture,
+):
+    """AI: A selector rename plan should take sources and categories from two bulk executes rather than per-method calls."""
+    browser_session = method_occurrence_fixture.browser_session
+    planned_changes = browser_session.selector_rename_plan("total", "grandTotal")
+
+    assert len(browser_session.executed_scripts) == 2
+    assert [
+        (
+            planned_change["class_name"],
+            planned_change["show_instance_side"],
+            planned_change["method_selector"],
+            planned_change["method_category"],
+            planned_change["change_type"],
+        )
+        for planned_change in planned_changes
+    ] == [
+        ("Order", False, "example", "*Shop-Examples", "sender"),
+        ("Order", True, "printOn:", "printing", "sender"),
+        ("Order", True, "total", "accessing", "implementor"),
+    ]
+    assert planned_changes[0]["updated_source"] == "example\n    ^self new grandTotal"
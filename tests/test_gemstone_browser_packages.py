@@ -1,3 +1,5 @@
+import json
+
 from reahl.tofu import Fixture, with_fixtures
 
 from reahl.swordfish.gemstone.browser import GemstoneBrowserSession
@@ -115,11 +117,11 @@ class StubbedDictionaryBrowserSession(GemstoneBrowserSession):
     def run_code(self, source):
         self.executed_sources.append(source)
         if "System myUserProfile symbolList do:" in source:
-            return [NameProxy(name) for name in self.dictionary_names]
+            return NameProxy(json.dumps(self.dictionary_names))
         dictionary_literal = source.split("dictionaryName := ")[1].split(".\n", 1)[0]
         dictionary_name = self.smalltalk_string_value(dictionary_literal)
         class_names = self.class_names_by_dictionary.get(dictionary_name, [])
-        return [NameProxy(class_name) for class_name in class_names]
+        return NameProxy(json.dumps(class_names))
 
 
 class SourceCapturingBrowserSession(GemstoneBrowserSession):
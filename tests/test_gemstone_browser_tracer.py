@@ -1,9 +1,9 @@
+import json
 from unittest.mock import Mock, call
 
 from reahl.tofu import Fixture, with_fixtures
 
 from reahl.swordfish.gemstone.browser import GemstoneBrowserSession
-from reahl.swordfish.gemstone.session import DomainException
 
 
 class TracerSourceFixture(Fixture):
@@ -30,9 +30,7 @@ def test_binary_selector_tracer_wrapper_uses_binary_method_header_shape(
     wrapper_source = tracer_source_fixture.browser_session.tracer_sender_wrapper_source(
         "+",
         alias_selector,
-        "total",
-        "OrderLine",
-        True,
+        7,
     )
     assert wrapper_source.startswith("+ argument1\n")
     assert ("^self %s argument1" % alias_selector) in wrapper_source
@@ -49,21 +47,56 @@ def test_unary_selector_tracer_wrapper_keeps_unary_header_shape(
     wrapper_source = tracer_source_fixture.browser_session.tracer_sender_wrapper_source(
         "total",
         alias_selector,
-        "subtotal",
-        "OrderLine",
-        True,
+        7,
     )
     assert wrapper_source.startswith("total\n")
+    assert "recordEdge: 7." in wrapper_source
     assert ("^self %s" % alias_selector) in wrapper_source
 
 
+def length_prefixed(fields):
+    return "".join("%s:%s" % (len(field), field) for field in fields)
+
+
 @with_fixtures(TracerSourceFixture)
 def test_trace_selector_skips_compile_failures_and_continues(
     tracer_source_fixture,
 ):
     """AI: Tracing should skip uninstrumentable senders instead of aborting the full tracing run."""
     browser_session = tracer_source_fixture.browser_session
-    browser_session.run_code = Mock(return_value=Mock(to_py=""))
+    executed_sources = []
+
+    def run_code(source):
+        executed_sources.append(source)
+        if "clearInstrumentationForTarget:" in source:
+            return Mock(
+                to_py=length_prefixed(
+                    [
+                        "1",
+                        "source",
+                        "+ argument1\n    ^self primitiveFailed",
+                        "arithmetic",
+                        "2",
+                        "source",
+                        "total\n    ^amount * quantity",
+                        "accessing",
+                    ]
+                )
+            )
+        return Mock(
+            to_py=length_prefixed(
+                [
+                    "failed",
+                    "compiling a primitive method requires CompilePrimitives privilege",
+                    "1001",
+                    "traced",
+                    "",
+                    "",
+                ]
+            )
+        )
+
+    browser_session.run_code = Mock(side_effect=run_code)
     browser_session.find_senders = Mock(
         return_value={
             "total_count": 2,
@@ -81,29 +114,6 @@ def test_trace_selector_skips_compile_failures_and_continues(
             ],
         }
     )
-    browser_session.list_methods = Mock(return_value=[])
-    browser_session.get_method_source = Mock(
-        side_effect=[
-            "+ argument1\n    ^self primitiveFailed",
-            "total\n    ^amount * quantity",
-        ],
-    )
-    browser_session.get_method_category = Mock(return_value="accessing")
-
-    def compile_with_primitive_failure(
-        class_name,
-        show_instance_side,
-        source,
-        method_category="as yet unclassified",
-    ):
-        if class_name == "PrimitiveHost":
-            raise DomainException(
-                "compiling a primitive method requires CompilePrimitives privilege"
-            )
-        return Mock()
-
-    browser_session.compile_method = Mock(side_effect=compile_with_primitive_failure)
-    browser_session.delete_method = Mock()
 
     trace_result = browser_session.trace_selector("ifTrue:")
 
@@ -121,13 +131,16 @@ def test_trace_selector_skips_compile_failures_and_continues(
     assert skipped_sender["class_name"] == "PrimitiveHost"
     assert skipped_sender["method_selector"] == "+"
     assert "CompilePrimitives privilege" in skipped_sender["error_message"]
+    assert skipped_sender["error_number"] == 1001
 
-    register_calls = [
-        run_code_call
-        for run_code_call in browser_session.run_code.call_args_list
-        if "registerInstrumentationForTarget:" in run_code_call.args[0]
-    ]
-    assert len(register_calls) == 1
+    assert len(executed_sources) == 2
+    install_source = executed_sources[1]
+    assert install_source.count("registerInstrumentationForTarget:") == 1
+    assert "'swordfishMcpTracerOriginal__total\n    ^amount * quantity'" in (
+        install_source
+    )
+    assert "recordEdge: 2." in install_source
+    assert "recordSenderExecutionForTarget:" not in install_source
     assert browser_session.find_senders.call_args_list == [
         call(
             "ifTrue:",
@@ -135,3 +148,40 @@ def test_trace_selector_skips_compile_failures_and_continues(
             count_only=False,
         )
     ]
+
+
+@with_fixtures(TracerSourceFixture)
+def test_observed_edge_counts_come_from_one_session_local_report(
+    tracer_source_fixture,
+):
+    """AI: Observed edges should be read in one JSON report, with counts for the same edge from precomputed and dynamic recording added together."""
+    browser_session = tracer_source_fixture.browser_session
+    browser_session.run_code = Mock(
+        return_value=Mock(
+            to_py=json.dumps(
+                [
+                    ["total", "OrderLine", True, "printOn:", 3],
+                    ["total", "Order", False, "new", 1],
+                    ["total", "OrderLine", True, "printOn:", 2],
+                ]
+            )
+        )
+    )
+
+    observed_senders = browser_session.observed_senders_for_selector("total")
+
+    [report_source] = [
+        executed_call.args[0]
+        for executed_call in browser_session.run_code.call_args_list
+    ]
+    assert "SwordfishMcpTracer observedEdgesFor: ('total' asSymbol)" in report_source
+    assert observed_senders["total_count"] == 2
+    assert observed_senders["total_observed_calls"] == 6
+    assert [
+        (
+            observed_sender["caller_class_name"],
+            observed_sender["caller_show_instance_side"],
+            observed_sender["observed_count"],
+        )
+        for observed_sender in observed_senders["observed_senders"]
+    ] == [("Order", False, 1), ("OrderLine", True, 5)]
@@ -0,0 +1,161 @@
+from reahl.tofu import Fixture, set_up, tear_down, with_fixtures
+
+from reahl.swordfish.gemstone.change_journal import change_journal_from_report
+from reahl.swordfish.gemstone.metadata_cache import (
+    clear_all_metadata_caches,
+    metadata_cache_for_session,
+)
+from reahl.swordfish.gemstone.session import abort_transaction, commit_transaction
+
+
+class ReportedValue:
+    def __init__(self, to_py):
+        self.to_py = to_py
+
+
+class JournalledGemstoneSession:
+    def __init__(self):
+        self.journal_report = "12 1"
+        self.executed_sources = []
+
+    def abort(self):
+        pass
+
+    def commit(self):
+        pass
+
+    def execute(self, source):
+        self.executed_sources.append(source)
+        return ReportedValue(self.journal_report)
+
+
+class ChangeJournalFixture(Fixture):
+    def new_gemstone_session(self):
+        return JournalledGemstoneSession()
+
+    def new_metadata_cache(self):
+        metadata_cache = metadata_cache_for_session(self.gemstone_session)
+        metadata_cache.follow_change_journal(10)
+        for class_name in ("Order", "Customer"):
+            metadata_cache.store_value(
+                ("class_side", class_name, True),
+                ("selectors",),
+                ["total"],
+            )
+        metadata_cache.store_value(("class_lists",), ("all_class_names",), ["Order"])
+        return metadata_cache
+
+    @set_up
+    def clear_caches_before_test(self):
+        clear_all_metadata_caches()
+
+    @tear_down
+    def clear_caches_after_test(self):
+        clear_all_metadata_caches()
+
+    def cached_class_names(self):
+        return sorted(
+            scope[1]
+            for scope in self.metadata_cache.entries_by_scope
+            if scope[0] == "class_side"
+        )
+
+
+@with_fixtures(ChangeJournalFixture)
+def test_a_transaction_boundary_invalidates_only_journalled_classes(
+    change_journal_fixture,
+):
+    """AI: After an abort only classes changed in the journal since the followed sequence, or by this session's transaction, should be dropped from the cache."""
+    gemstone_session = change_journal_fixture.gemstone_session
+    metadata_cache = change_journal_fixture.metadata_cache
+    gemstone_session.journal_report = (
+        "12 1\n"
+        "11 method_compiled Customer true total 7\n"
+        "12 method_removed Customer false named: 7"
+    )
+
+    abort_transaction(gemstone_session)
+
+    assert change_journal_fixture.cached_class_names() == ["Order"]
+    assert ("class_lists",) in metadata_cache.entries_by_scope
+    assert metadata_cache.change_journal_sequence == 12
+    assert "changesReportSince: 0" in gemstone_session.executed_sources[0]
+
+    metadata_cache.note_class_changed("Order")
+    abort_transaction(gemstone_session)
+
+    assert change_journal_fixture.cached_class_names() == []
+    assert ("class_lists",) not in metadata_cache.entries_by_scope
+
+
+@with_fixtures(ChangeJournalFixture)
+def test_the_whole_cache_is_flushed_when_journal_entries_may_have_been_missed(
+    change_journal_fixture,
+):
+    """AI: If the journal is gone, or has moved on further than it retains, the cache cannot know what changed and must be flushed."""
+    metadata_cache = change_journal_fixture.metadata_cache
+
+    metadata_cache.refresh_from_change_journal(
+        change_journal_from_report("20010 10001")
+    )
+
+    assert metadata_cache.entries_by_scope == {}
+    assert metadata_cache.change_journal_sequence == 20010
+
+    metadata_cache.store_value(("class_lists",), ("all_class_names",), ["Order"])
+    metadata_cache.refresh_from_change_journal(change_journal_from_report(""))
+
+    assert metadata_cache.entries_by_scope == {}
+    assert metadata_cache.change_journal_sequence is None
+
+
+@with_fixtures(ChangeJournalFixture)
+def test_unscoped_changes_are_journalled_as_a_flush_of_everything(
+    change_journal_fixture,
+):
+    """AI: Evaluated code can change any class, so committing after it records a flush_all entry, and a follower that reads one flushes its whole cache."""
+    gemstone_session = change_journal_fixture.gemstone_session
+    metadata_cache = change_journal_fixture.metadata_cache
+
+    commit_transaction(gemstone_session)
+
+    assert not any(
+        "recordChanges:" in source for source in gemstone_session.executed_sources
+    )
+
+    metadata_cache.note_unscoped_change()
+    commit_transaction(gemstone_session)
+
+    assert "recordChanges: #('flush_all' '*' 'true' '')" in (
+        gemstone_session.executed_sources[-2]
+    )
+    assert not metadata_cache.has_unscoped_change_to_journal()
+
+    metadata_cache.store_value(("class_lists",), ("all_class_names",), ["Order"])
+    gemstone_session.journal_report = "13 1\n13 flush_all * true - 7"
+    abort_transaction(gemstone_session)
+
+    assert metadata_cache.entries_by_scope == {}
+    assert metadata_cache.change_journal_sequence == 13
+
+
+@with_fixtures(ChangeJournalFixture)
+def test_a_journal_installed_after_the_first_check_is_followed_at_the_next_boundary(
+    change_journal_fixture,
+):
+    """AI: A session that found no journal should look again at each transaction boundary and follow one that another session has since installed."""
+    gemstone_session = change_journal_fixture.gemstone_session
+    metadata_cache = change_journal_fixture.metadata_cache
+    gemstone_session.journal_report = ""
+    abort_transaction(gemstone_session)
+
+    assert metadata_cache.is_change_journal_checked
+    assert metadata_cache.change_journal_sequence is None
+
+    metadata_cache.store_value(("class_lists",), ("all_class_names",), ["Order"])
+    gemstone_session.journal_report = "15 1"
+    abort_transaction(gemstone_session)
+
+    assert "changesReportSince: -1" in gemstone_session.executed_sources[-1]
+    assert metadata_cache.change_journal_sequence == 15
+    assert metadata_cache.entries_by_scope == {}
@@ -0,0 +1,117 @@
+import json
+from unittest.mock import Mock
+
+from reahl.tofu import Fixture, expected, with_fixtures
+
+from reahl.swordfish.gemstone.browser import GemstoneBrowserSession
+from reahl.swordfish.gemstone.session import (
+    DomainException,
+    MethodsNotCompiled,
+    domain_error_payload,
+)
+
+
+class CompileMethodsFixture(Fixture):
+    def new_browser_session(self):
+        browser_session = GemstoneBrowserSession(None)
+        browser_session.json_report_support_available = True
+        browser_session.run_code = Mock(return_value=Mock(to_py="[]"))
+        return browser_session
+
+    def new_method_entries(self):
+        return [
+            {
+                "class_name": "Order",
+                "show_instance_side": True,
+                "source": "totalWith: tax\n    ^self total + tax",
+                "method_category": "accessing",
+            },
+            {
+                "class_name": "Order",
+                "show_instance_side": False,
+                "source": "named: aName\n    ^self new",
+            },
+        ]
+
+    def executed_sources(self):
+        return [
+            executed_call.args[0]
+            for executed_call in self.browser_session.run_code.call_args_list
+        ]
+
+
+@with_fixtures(CompileMethodsFixture)
+def test_a_batch_of_methods_is_compiled_in_one_script(compile_methods_fixture):
+    """AI: All methods of a refactoring should be compiled by one script against one symbol list, with selectors taken from the method headers."""
+    browser_session = compile_methods_fixture.browser_session
+
+    compile_result = browser_session.compile_methods(
+        compile_methods_fixture.method_entries
+    )
+
+    assert compile_result == {"compiled": True, "compiled_count": 2, "errors": []}
+    [compile_source] = compile_methods_fixture.executed_sources()
+    assert compile_source.count("System myUserProfile symbolList") == 1
+    assert (
+        "'Order' 'true' 'totalWith:' 'accessing' "
+        "'totalWith: tax\n    ^self total + tax'"
+    ) in compile_source
+    assert "'Order' 'false' 'named:' 'as yet unclassified'" in compile_source
+
+
+@with_fixtures(CompileMethodsFixture)
+def test_a_failed_batch_reports_each_error_with_offsets_and_changes_nothing(
+    compile_methods_fixture,
+):
+    """AI: When any method fails the whole batch is rolled back on the server, and each failure is reported against its method with error offsets."""
+    browser_session = compile_methods_fixture.browser_session
+    browser_session.run_code.return_value = Mock(
+        to_py=json.dumps([[2, 1001, "compile error", [[12, "undefined symbol"]]]])
+    )
+
+    compile_result = browser_session.compile_methods(
+        compile_methods_fixture.method_entries
+    )
+
+    assert compile_result == {
+        "compiled": False,
+        "compiled_count": 0,
+        "errors": [
+            {
+                "index": 1,
+                "class_name": "Order",
+                "show_instance_side": False,
+                "method_selector": "named:",
+                "error_number": 1001,
+                "message": "compile error",
+                "error_details": [{"offset": 12, "message": "undefined symbol"}],
+            }
+        ],
+    }
+    assert "compiledRows reverseDo:" in compile_methods_fixture.executed_sources()[0]
+    with expected(DomainException):
+        browser_session.ensure_methods_compiled(compile_methods_fixture.method_entries)
+
+
+@with_fixtures(CompileMethodsFixture)
+def test_a_failed_batch_keeps_its_error_offsets_in_the_error_payload(
+    compile_methods_fixture,
+):
+    """AI: Refactorings that fail to compile should raise with the per-method errors, so tool error payloads still carry the offsets."""
+    browser_session = compile_methods_fixture.browser_session
+    browser_session.run_code.return_value = Mock(
+        to_py=json.dumps([[1, 1001, "compile error", [[7, "expected expression"]]]])
+    )
+
+    error_payload = None
+    try:
+        browser_session.ensure_methods_compiled(compile_methods_fixture.method_entries)
+    except MethodsNotCompiled as error:
+        error_payload = domain_error_payload(error)
+
+    [compile_error] = error_payload["compile_errors"]
+    assert error_payload["message"].startswith("1 of 2 methods failed to compile")
+    assert compile_error["method_selector"] == "totalWith:"
+    assert compile_error["error_details"] == [
+        {"offset": 7, "message": "expected expression"}
+    ]
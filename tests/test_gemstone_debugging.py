@@ -1,4 +1,11 @@
-from reahl.swordfish.gemstone.debugging import GemstoneDebugSession, GemstoneStackFrame
+from reahl.tofu import Fixture, set_up, tear_down, with_fixtures
+
+from reahl.swordfish.gemstone.debugging import (
+    GemstoneCallStack,
+    GemstoneDebugSession,
+    GemstoneStackFrame,
+    clear_debugger_caches,
+)
 
 
 class FakeGemstoneNumber:
@@ -154,3 +161,192 @@ def test_restart_frame_keeps_debug_session_active_when_trim_succeeds():
     outcome = debug_session.restart_frame(2)
 
     assert not outcome.has_completed
+
+
+def length_prefixed_report(fields):
+    return "".join("%s:%s" % (len(field), field) for field in fields)
+
+
+class FakeStackSnapshotSession:
+    def __init__(self, frame_rows, sources_by_level, variable_rows_by_slot):
+        self.frame_rows = frame_rows
+        self.sources_by_level = sources_by_level
+        self.variable_rows_by_slot = variable_rows_by_slot
+        self.executed_sources = []
+
+    def execute(self, source, context=None):
+        self.executed_sources.append(source)
+        if "stackDepth" in source:
+            return FakeGemstoneString(
+                length_prefixed_report(
+                    [field for frame_row in self.frame_rows for field in frame_row]
+                )
+            )
+        requested_levels = source.split("#(")[1].split(")")[0].split()
+        if "limit :=" in source:
+            return FakeGemstoneString(
+                length_prefixed_report(
+                    [
+                        field
+                        for slot_index in requested_levels
+                        for field in [slot_index]
+                        + list(self.variable_rows_by_slot[slot_index])
+                    ]
+                )
+            )
+        return FakeGemstoneString(
+            length_prefixed_report(
+                [
+                    field
+                    for level in requested_levels
+                    for field in [level, self.sources_by_level[level]]
+                ]
+            )
+        )
+
+
+class FakeStackSnapshotProcess:
+    def __init__(self, session):
+        self.session = session
+
+
+class CallStackSnapshotFixture(Fixture):
+    @set_up
+    def clear_cached_sources(self):
+        clear_debugger_caches()
+
+    @tear_down
+    def clear_cached_sources_after_test(self):
+        clear_debugger_caches()
+
+    def new_gemstone_session(self):
+        alpha_source = "alpha\n    ^self beta: 5"
+        beta_source = "beta: aNumber\n    ^aNumber halt"
+        return FakeStackSnapshotSession(
+            [
+                (
+                    "1",
+                    "OrderLine",
+                    "beta:",
+                    "28",
+                    "77",
+                    str(len(beta_source)),
+                    "aNumber",
+                    "1001",
+                    "42",
+                ),
+                (
+                    "2",
+                    "OrderLine",
+                    "alpha",
+                    "23",
+                    "88",
+                    str(len(alpha_source)),
+                    "",
+                    "1001",
+                    "",
+                ),
+                (
+                    "3",
+                    "OrderLine",
+                    "beta:",
+                    "28",
+                    "77",
+                    str(len(beta_source)),
+                    "aNumber",
+                    "1001",
+                    "42",
+                ),
+            ],
+            {"1": beta_source, "2": alpha_source},
+            {"8": ("OrderLine", "anOrderLine"), "11": ("SmallInteger", "5")},
+        )
+
+    def new_call_stack(self):
+        return GemstoneCallStack(FakeStackSnapshotProcess(self.gemstone_session))
+
+
+@with_fixtures(CallStackSnapshotFixture)
+def test_call_stack_snapshot_reads_all_frames_in_one_execute(call_stack_fixture):
+    """AI: Building a call stack should describe every frame with a single server-side script instead of several calls per frame."""
+    call_stack = call_stack_fixture.call_stack
+
+    assert [
+        (frame.level, frame.class_name, frame.method_name, frame.var_names)
+        for frame in call_stack
+    ] == [
+        (1, "OrderLine", "beta:", ["aNumber"]),
+        (2, "OrderLine", "alpha", []),
+        (3, "OrderLine", "beta:", ["aNumber"]),
+    ]
+    assert len(call_stack_fixture.gemstone_session.executed_sources) == 1
+
+
+@with_fixtures(CallStackSnapshotFixture)
+def test_frame_sources_are_fetched_lazily_and_cached_by_hash(call_stack_fixture):
+    """AI: Method sources should be fetched once per distinct source on first use and reused by later call stacks."""
+    call_stack = call_stack_fixture.call_stack
+    gemstone_session = call_stack_fixture.gemstone_session
+
+    assert call_stack[2].method_source == "alpha\n    ^self beta: 5"
+    assert call_stack[1].step_point_offset == len("beta: aNumber\n    ^aNumber ") + 1
+    assert call_stack[2].step_point_offset == len("alpha\n    ^self ") + 1
+    assert "#(1 2)" in gemstone_session.executed_sources[-1]
+
+    next_call_stack = GemstoneCallStack(FakeStackSnapshotProcess(gemstone_session))
+    assert next_call_stack[3].method_source == "beta: aNumber\n    ^aNumber halt"
+    assert len(gemstone_session.executed_sources) == 3
+
+
+@with_fixtures(CallStackSnapshotFixture)
+def test_frame_variable_rows_are_batched_and_reused_within_one_call_stack(
+    call_stack_fixture,
+):
+    """AI: Visible frame variables should be described in one batch, frames of the same stack holding the same oops should reuse those rows, and a later stack should describe them afresh."""
+    call_stack = call_stack_fixture.call_stack
+    gemstone_session = call_stack_fixture.gemstone_session
+    context_variables = call_stack[1].context_variables()
+
+    assert list(context_variables) == ["self", "aNumber"]
+    assert "aNumber" in context_variables
+    assert len(gemstone_session.executed_sources) == 1
+    assert context_variables.display_rows(["self", "aNumber"]) == [
+        ("self", "OrderLine", "anOrderLine"),
+        ("aNumber", "SmallInteger", "5"),
+    ]
+    assert "#(8 11)" in gemstone_session.executed_sources[-1]
+
+    call_stack[3].context_variables().display_rows(["self", "aNumber"])
+    assert len(gemstone_session.executed_sources) == 2
+
+    next_call_stack = GemstoneCallStack(FakeStackSnapshotProcess(gemstone_session))
+    next_call_stack[3].context_variables().display_rows(["self", "aNumber"])
+    assert len(gemstone_session.executed_sources) == 4
+
+
+class FakeSteppingProcess(FakeStackSnapshotProcess):
+    def gciStepOverFromLevel(self, level):
+        return "stepped"
+
+
+class FakeDebuggedException:
+    def __init__(self, context):
+        self.context = context
+
+
+@with_fixtures(CallStackSnapshotFixture)
+def test_stepping_drops_the_frame_variable_rows_of_the_current_stack(
+    call_stack_fixture,
+):
+    """AI: A step can change objects that keep their oops, so rows already shown for the current stack should be described afresh after stepping."""
+    gemstone_session = call_stack_fixture.gemstone_session
+    debug_session = GemstoneDebugSession(
+        FakeDebuggedException(FakeSteppingProcess(gemstone_session))
+    )
+    call_stack = debug_session.call_stack()
+    call_stack[1].context_variables().display_rows(["self", "aNumber"])
+
+    debug_session.step_over(1)
+    call_stack[1].context_variables().display_rows(["self", "aNumber"])
+
+    assert len(gemstone_session.executed_sources) == 3
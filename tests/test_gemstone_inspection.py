@@ -0,0 +1,188 @@
+import re
+
+from reahl.tofu import Fixture, with_fixtures
+
+from reahl.swordfish.gemstone.inspection import GemstoneCollectionPages
+from reahl.swordfish.gemstone.session import abort_transaction
+
+
+class FakeGemstoneValue:
+    def __init__(self, value):
+        self.to_py = value
+
+
+class FakeGemstoneCollection:
+    def __init__(self, session, elements):
+        self.session = session
+        self.elements = elements
+        self.at_calls = []
+
+    def size(self):
+        return FakeGemstoneValue(len(self.elements))
+
+    def at(self, index):
+        self.at_calls.append(index)
+        return self.elements[index - 1]
+
+
+class FakeGemstoneSession:
+    def __init__(self):
+        self.executed_sources = []
+        self.walks_by_holder_id = {}
+        self.walked_element_count = 0
+        self.terminated_holders = []
+
+    def abort(self):
+        pass
+
+    def execute(self, source, context=None):
+        self.executed_sources.append(source)
+        if "changesReportSince:" in source:
+            return FakeGemstoneValue("")
+        if "holder := Array new: 7" in source:
+            snapshot_holder = FakeGemstoneCollection(
+                self, [context, FakeGemstoneCollection(self, [])]
+            )
+            self.walks_by_holder_id[id(snapshot_holder)] = self.walk(
+                list(context.elements), "keysAndValuesDo:" in source
+            )
+            return snapshot_holder
+        if "terminate" in source:
+            self.terminated_holders.append(context)
+            return FakeGemstoneValue(True)
+        if "(self at: 4) signal" in source:
+            return FakeGemstoneValue(self.extend_snapshot(source, context))
+        first_row, last_row = [
+            int(row) for row in re.search(r"(\d+) to: (\d+) do:", source).groups()
+        ]
+        is_dictionary_page = "row * 2" in source
+        fields = []
+        for row in range(first_row, last_row + 1):
+            if is_dictionary_page:
+                label = context.elements[row * 2 - 2]
+                value = context.elements[row * 2 - 1]
+            else:
+                label = "[%s]" % row
+                value = context.elements[row - 1]
+            fields.extend([label, str(1000 + row), "String", "'%s'" % value])
+        return FakeGemstoneValue(
+            "".join("%s:%s" % (len(field), field) for field in fields)
+        )
+
+    def walk(self, elements, is_dictionary):
+        for element in elements:
+            self.walked_element_count += 1
+            yield list(element) if is_dictionary else [element]
+
+    def extend_snapshot(self, source, snapshot_holder):
+        captured = snapshot_holder.elements[1]
+        target = int(re.search(r"self at: 3 put: (\d+)", source).group(1))
+        walk = self.walks_by_holder_id[id(snapshot_holder)]
+        for captured_elements in walk:
+            captured.elements.extend(captured_elements)
+            if len(captured.elements) >= target:
+                break
+        return len(captured.elements)
+
+
+class CollectionPagesFixture(Fixture):
+    def new_gemstone_session(self):
+        return FakeGemstoneSession()
+
+    def new_set(self):
+        return FakeGemstoneCollection(
+            self.gemstone_session,
+            ["item%s" % index for index in range(1, 251)],
+        )
+
+    def new_dictionary(self):
+        return FakeGemstoneCollection(
+            self.gemstone_session,
+            [("first", "one"), ("second", "two")],
+        )
+
+
+@with_fixtures(CollectionPagesFixture)
+def test_set_pages_capture_only_as_far_as_the_pages_asked_for(
+    collection_pages_fixture,
+):
+    """AI: Paging a set should only capture elements up to the last row asked for, not copy the whole set first."""
+    gemstone_session = collection_pages_fixture.gemstone_session
+    set_pages = GemstoneCollectionPages(collection_pages_fixture.set, "set")
+    executed_before_page = len(gemstone_session.executed_sources)
+
+    page_rows = set_pages.rows_for_range(0, 100)
+
+    assert set_pages.total_items == 250
+    assert len(set_pages.snapshot.elements) == 100
+    assert len(gemstone_session.executed_sources) == executed_before_page + 2
+    assert len(page_rows) == 100
+    assert page_rows[0] == {
+        "label": "[1]",
+        "oop": 1001,
+        "class_name": "String",
+        "print_string": "'item1'",
+    }
+
+    set_pages.rows_for_range(100, 200)
+
+    assert len(set_pages.snapshot.elements) == 200
+    assert gemstone_session.walked_element_count == 200
+    assert set_pages.value_at(100) == "item101"
+
+
+@with_fixtures(CollectionPagesFixture)
+def test_set_pages_already_captured_stay_stable(collection_pages_fixture):
+    """AI: Rows already captured should be paged again in one script, and later changes to the set should not shift them."""
+    gemstone_session = collection_pages_fixture.gemstone_session
+    inspected_set = collection_pages_fixture.set
+    set_pages = GemstoneCollectionPages(inspected_set, "set")
+    set_pages.rows_for_range(0, 100)
+    inspected_set.elements.insert(0, "added later")
+    executed_before_page = len(gemstone_session.executed_sources)
+
+    page_rows = set_pages.rows_for_range(0, 100)
+
+    assert len(gemstone_session.executed_sources) == executed_before_page + 1
+    assert page_rows[0]["print_string"] == "'item1'"
+
+
+@with_fixtures(CollectionPagesFixture)
+def test_dictionary_pages_label_rows_by_key_and_fetch_values_on_use(
+    collection_pages_fixture,
+):
+    """AI: Dictionary pages should be labelled by key, and a row's value should be fetched from the snapshot only when used."""
+    dictionary_pages = GemstoneCollectionPages(
+        collection_pages_fixture.dictionary,
+        "dictionary",
+    )
+
+    page_rows = dictionary_pages.rows_for_range(0, 2)
+
+    assert dictionary_pages.total_items == 2
+    assert [(row["label"], row["print_string"]) for row in page_rows] == [
+        ("first", "'one'"),
+        ("second", "'two'"),
+    ]
+    assert dictionary_pages.snapshot.at_calls == []
+    assert dictionary_pages.value_at(1) == "two"
+    assert dictionary_pages.snapshot.at_calls == [4]
+
+
+@with_fixtures(CollectionPagesFixture)
+def test_set_pages_walk_again_after_a_transaction_boundary(collection_pages_fixture):
+    """AI: After an abort the set may be walked in another order, so the old walk is stopped and a new snapshot is captured instead of being extended."""
+    gemstone_session = collection_pages_fixture.gemstone_session
+    inspected_set = collection_pages_fixture.set
+    set_pages = GemstoneCollectionPages(inspected_set, "set")
+    set_pages.rows_for_range(0, 100)
+    first_snapshot_holder = set_pages.snapshot_holder
+    inspected_set.elements.insert(0, "added later")
+
+    abort_transaction(gemstone_session)
+    page_rows = set_pages.rows_for_range(0, 100)
+
+    assert gemstone_session.terminated_holders == [first_snapshot_holder]
+    assert set_pages.snapshot_holder is not first_snapshot_holder
+    assert set_pages.total_items == 251
+    assert page_rows[0]["print_string"] == "'added later'"
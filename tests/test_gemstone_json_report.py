@@ -0,0 +1,52 @@
+from unittest.mock import Mock
+
+from reahl.tofu import Fixture, expected, with_fixtures
+
+from reahl.swordfish.gemstone.browser import GemstoneBrowserSession
+from reahl.swordfish.gemstone.session import DomainException
+
+
+class JsonReportFixture(Fixture):
+    def new_browser_session(self):
+        browser_session = GemstoneBrowserSession(None)
+        browser_session.run_code = Mock(
+            return_value=Mock(to_py='[["Order", true, 3], {"key": null}]')
+        )
+        return browser_session
+
+
+@with_fixtures(JsonReportFixture)
+def test_json_report_decodes_a_whole_collection_from_one_script(json_report_fixture):
+    """AI: A bulk report should be one script and one decode, with the serialiser sent inline when the installed helper is not available."""
+    browser_session = json_report_fixture.browser_session
+
+    report_value = browser_session.json_report("Array with: 1 with: 2")
+
+    assert report_value == [["Order", True, 3], {"key": None}]
+    [report_source] = [
+        executed_call.args[0]
+        for executed_call in browser_session.run_code.call_args_list
+    ]
+    assert report_source.startswith("| jsonReportValue ")
+    assert "jsonReportValue := [\nArray with: 1 with: 2\n] value." in report_source
+    assert report_source.endswith(
+        "writeJson value: jsonReportValue.\njsonStream contents"
+    )
+
+
+@with_fixtures(JsonReportFixture)
+def test_json_report_uses_the_installed_helper_and_rejects_malformed_reports(
+    json_report_fixture,
+):
+    """AI: Once the helper is installed only the value script is sent, and a report that is not JSON is a domain error."""
+    browser_session = json_report_fixture.browser_session
+    browser_session.json_report_support_available = True
+
+    browser_session.json_report("Array new")
+    browser_session.run_code.return_value = Mock(to_py="1:a")
+
+    assert browser_session.run_code.call_args_list[0].args[0] == (
+        "SwordfishMcpAstSupport jsonReportFor: [\nArray new\n] value"
+    )
+    with expected(DomainException):
+        browser_session.json_report("Array new")
@@ -0,0 +1,170 @@
+from reahl.tofu import Fixture, set_up, tear_down, with_fixtures
+
+from reahl.swordfish.gemstone.browser import GemstoneBrowserSession
+from reahl.swordfish.gemstone.metadata_cache import (
+    clear_all_metadata_caches,
+    metadata_cache_for_session,
+)
+from reahl.swordfish.gemstone.session import abort_transaction
+
+
+class ExecutedValue:
+    def __init__(self, to_py):
+        self.to_py = to_py
+
+
+class ResolvedGemstoneClass:
+    def __init__(self, class_name):
+        self.class_name = class_name
+
+    def gemstone_class(self):
+        return ResolvedGemstoneClass("%s class" % self.class_name)
+
+
+class CountingGemstoneSession:
+    def __init__(self):
+        self.abort_count = 0
+        self.resolved_symbols = []
+        self.executed_sources = []
+
+    def abort(self):
+        self.abort_count = self.abort_count + 1
+
+    def resolve_symbol(self, symbol_name):
+        self.resolved_symbols.append(symbol_name)
+        return ResolvedGemstoneClass(symbol_name)
+
+    def execute(self, source):
+        self.executed_sources.append(source)
+        return ExecutedValue("")
+
+
+class CountingBrowserSession(GemstoneBrowserSession):
+    def __init__(self, gemstone_session, metadata_cache):
+        super().__init__(gemstone_session, metadata_cache=metadata_cache)
+        self.fetch_count = 0
+        self.executed_scripts = []
+
+    def uncached_method_source(self, class_name, method_selector, show_instance_side):
+        self.fetch_count = self.fetch_count + 1
+        return "%s\n    ^1" % method_selector
+
+    def uncached_selectors_for_class_side(self, class_name, show_instance_side):
+        self.fetch_count = self.fetch_count + 1
+        return ["first", "second"]
+
+    def run_code(self, source):
+        self.executed_scripts.append(source)
+        return ExecutedValue("")
+
+
+class MetadataCacheFixture(Fixture):
+    def new_gemstone_session(self):
+        return CountingGemstoneSession()
+
+    def new_browser_session(self):
+        return CountingBrowserSession(
+            self.gemstone_session,
+            metadata_cache_for_session(self.gemstone_session),
+        )
+
+    @set_up
+    def clear_caches_before_test(self):
+        clear_all_metadata_caches()
+
+    @tear_down
+    def clear_caches_after_test(self):
+        clear_all_metadata_caches()
+
+
+@with_fixtures(MetadataCacheFixture)
+def test_repeated_reads_are_served_from_the_metadata_cache(metadata_cache_fixture):
+    """AI: Reading the same method source twice should fetch it from the stone only once."""
+    browser_session = metadata_cache_fixture.browser_session
+    browser_session.get_method_source("OrderLine", "total", True)
+    browser_session.get_method_source("OrderLine", "total", True)
+
+    assert browser_session.fetch_count == 1
+    statistics = browser_session.metadata_cache.statistics()
+    assert statistics["hit_count"] == 1
+    assert statistics["miss_count"] == 1
+
+
+@with_fixtures(MetadataCacheFixture)
+def test_cached_lists_cannot_be_mutated_by_callers(metadata_cache_fixture):
+    """AI: Callers that extend a returned selector list must not corrupt the cached entry."""
+    browser_session = metadata_cache_fixture.browser_session
+    selector_names = browser_session.selectors_for_class_side("OrderLine", True)
+    selector_names += ["third"]
+
+    assert browser_session.selectors_for_class_side("OrderLine", True) == [
+        "first",
+        "second",
+    ]
+
+
+@with_fixtures(MetadataCacheFixture)
+def test_deleting_a_method_invalidates_only_that_class_side(metadata_cache_fixture):
+    """AI: Write paths should drop cached entries for the class side they change and keep the rest."""
+    browser_session = metadata_cache_fixture.browser_session
+    browser_session.selectors_for_class_side("OrderLine", True)
+    browser_session.selectors_for_class_side("OrderLine", False)
+
+    browser_session.delete_method("OrderLine", "first", True)
+    browser_session.selectors_for_class_side("OrderLine", True)
+    browser_session.selectors_for_class_side("OrderLine", False)
+
+    assert browser_session.fetch_count == 3
+
+
+@with_fixtures(MetadataCacheFixture)
+def test_aborting_the_transaction_flushes_the_metadata_cache(metadata_cache_fixture):
+    """AI: An abort gives the session a new view of the stone, so every cached entry must be dropped."""
+    browser_session = metadata_cache_fixture.browser_session
+    browser_session.get_method_source("OrderLine", "total", True)
+
+    abort_transaction(metadata_cache_fixture.gemstone_session)
+    browser_session.get_method_source("OrderLine", "total", True)
+
+    assert metadata_cache_fixture.gemstone_session.abort_count == 1
+    assert browser_session.fetch_count == 2
+
+
+@with_fixtures(MetadataCacheFixture)
+def test_class_and_symbol_list_resolution_is_cached_until_globals_change(
+    metadata_cache_fixture,
+):
+    """AI: A class, its metaclass and the symbol list should each be resolved once per session view, and changing a global must resolve them afresh."""
+    gemstone_session = metadata_cache_fixture.gemstone_session
+    browser_session = metadata_cache_fixture.browser_session
+    browser_session.class_to_query("OrderLine", True)
+    metaclass = browser_session.class_to_query("OrderLine", False)
+    browser_session.class_to_query("OrderLine", False)
+    browser_session.symbol_list()
+    browser_session.symbol_list()
+
+    browser_session.global_remove("OrderLine")
+    browser_session.class_to_query("OrderLine", True)
+
+    assert metaclass.class_name == "OrderLine class"
+    assert gemstone_session.resolved_symbols == ["OrderLine", "OrderLine"]
+    assert gemstone_session.executed_sources == ["System myUserProfile symbolList"]
+
+
+@with_fixtures(MetadataCacheFixture)
+def test_a_value_fetched_across_a_flush_is_not_cached(metadata_cache_fixture):
+    """AI: When another thread flushes the cache while a value is being fetched, the stale value is returned to its caller but not kept."""
+    metadata_cache = metadata_cache_fixture.browser_session.metadata_cache
+
+    def fetch_while_another_thread_flushes():
+        metadata_cache.flush()
+        return ["stale"]
+
+    metadata_cache.cached_value(
+        ("class_lists",), "all", fetch_while_another_thread_flushes
+    )
+
+    assert metadata_cache.cached_value_if_present(("class_lists",), "all") == (
+        False,
+        None,
+    )
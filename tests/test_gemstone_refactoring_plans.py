@@ -0,0 +1,125 @@
+import json
+from unittest.mock import Mock
+
+from reahl.tofu import Fixture, expected, with_fixtures
+
+from reahl.swordfish.gemstone.browser import GemstoneBrowserSession
+from reahl.swordfish.gemstone.metadata_cache import MetadataCache
+from reahl.swordfish.gemstone.session import DomainException
+
+
+class RefactoringPlansFixture(Fixture):
+    def new_metadata_cache(self):
+        return MetadataCache()
+
+    def new_browser_session(self):
+        browser_session = GemstoneBrowserSession(
+            None,
+            metadata_cache=self.metadata_cache,
+        )
+        browser_session.json_report_support_available = True
+        browser_session.ensure_refactoring_uses_real_ast = Mock()
+        browser_session.ensure_methods_compiled = Mock()
+        browser_session.delete_method = Mock()
+        self.current_sources = ["total\n    ^items size", None]
+        self.current_usages = ["Invoice>>printOn:", "Order>>total"]
+        browser_session.run_code = Mock(
+            side_effect=lambda source: Mock(
+                to_py=json.dumps([self.current_sources, self.current_usages])
+            )
+        )
+        return browser_session
+
+    def new_planned_changes(self):
+        return [
+            {
+                "class_name": "Order",
+                "show_instance_side": True,
+                "method_selector": "total",
+                "method_category": "accessing",
+                "change_type": "implementor",
+                "updated_source": "grandTotal\n    ^items size",
+            }
+        ]
+
+
+@with_fixtures(RefactoringPlansFixture)
+def test_applying_a_previewed_plan_only_checks_fingerprints(refactoring_plans_fixture):
+    """AI: Applying by plan id should check the fingerprints of the affected methods in one script and reuse the previewed plan instead of planning again."""
+    browser_session = refactoring_plans_fixture.browser_session
+    plan_id = browser_session.remembered_refactoring_plan(
+        "selector_rename",
+        ["total", "grandTotal"],
+        refactoring_plans_fixture.planned_changes,
+    )
+    browser_session.selector_rename_plan = Mock(side_effect=AssertionError)
+    executed_before_apply = browser_session.run_code.call_count
+
+    result = browser_session.apply_selector_rename(
+        "total",
+        "grandTotal",
+        plan_id=plan_id,
+    )
+
+    assert browser_session.run_code.call_count == executed_before_apply + 1
+    assert result["applied_change_count"] == 1
+    assert result["implementor_count"] == 1
+    assert browser_session.delete_method.call_count == 1
+    assert refactoring_plans_fixture.metadata_cache.refactoring_plans.plan_count() == 0
+
+
+@with_fixtures(RefactoringPlansFixture)
+def test_a_plan_is_refused_when_its_methods_changed_or_it_is_for_another_refactoring(
+    refactoring_plans_fixture,
+):
+    """AI: A plan whose method sources changed since the preview, or that was previewed for different arguments, must not be applied."""
+    browser_session = refactoring_plans_fixture.browser_session
+    plan_id = browser_session.remembered_refactoring_plan(
+        "selector_rename",
+        ["total", "grandTotal"],
+        refactoring_plans_fixture.planned_changes,
+    )
+
+    with expected(DomainException):
+        browser_session.previewed_refactoring_plan(
+            plan_id,
+            "selector_rename",
+            ["total", "sum"],
+        )
+    refactoring_plans_fixture.current_sources = ["total\n    ^0", None]
+    with expected(DomainException):
+        browser_session.previewed_refactoring_plan(
+            plan_id,
+            "selector_rename",
+            ["total", "grandTotal"],
+        )
+    assert (
+        refactoring_plans_fixture.metadata_cache.refactoring_plans.get(plan_id) is None
+    )
+
+
+@with_fixtures(RefactoringPlansFixture)
+def test_a_rename_plan_is_refused_when_senders_or_implementors_changed(
+    refactoring_plans_fixture,
+):
+    """AI: A sender of the old selector added after the preview would not be rewritten, so a rename plan must be refused when the set of senders and implementors changed."""
+    browser_session = refactoring_plans_fixture.browser_session
+    plan_id = browser_session.remembered_refactoring_plan(
+        "selector_rename",
+        ["total", "grandTotal"],
+        refactoring_plans_fixture.planned_changes,
+    )
+    refactoring_plans_fixture.current_usages = [
+        "Invoice>>printOn:",
+        "Order>>total",
+        "Receipt>>summary",
+    ]
+
+    with expected(DomainException):
+        browser_session.apply_selector_rename("total", "grandTotal", plan_id=plan_id)
+
+    assert "sendersOf: usageSelector" in browser_session.run_code.call_args.args[0]
+    assert browser_session.delete_method.call_count == 0
+    assert (
+        refactoring_plans_fixture.metadata_cache.refactoring_plans.get(plan_id) is None
+    )
@@ -0,0 +1,170 @@
+from unittest.mock import patch
+
+from reahl.tofu import Fixture, with_fixtures
+
+from reahl.swordfish.gemstone import browser
+from reahl.swordfish.gemstone.browser import GemstoneBrowserSession
+from reahl.swordfish.gemstone.metadata_cache import MetadataCache
+
+
+class StubbedResult:
+    def __init__(self, value):
+        self.to_py = value
+
+
+class SelectorIndexBrowserSession(GemstoneBrowserSession):
+    def __init__(self, methods_by_class_name):
+        super().__init__(None, metadata_cache=MetadataCache())
+        self.methods_by_class_name = methods_by_class_name
+        self.exported_class_names = []
+        self.fingerprint_report_count = 0
+
+    def uncached_all_class_names(self):
+        return sorted(self.methods_by_class_name.keys())
+
+    def run_code(self, source):
+        if "asOop" in source:
+            self.fingerprint_report_count = self.fingerprint_report_count + 1
+            return StubbedResult(
+                "".join(
+                    [
+                        self.length_prefixed_report(
+                            [class_name, repr(self.methods_by_class_name[class_name])]
+                        )
+                        for class_name in sorted(self.methods_by_class_name.keys())
+                    ]
+                )
+            )
+        if "_selectorPool" not in source:
+            return StubbedResult(None)
+        report = ""
+        for class_name in sorted(self.methods_by_class_name.keys()):
+            if self.smalltalk_string_literal(class_name) in source:
+                self.exported_class_names.append(class_name)
+                for is_meta, selector, sent_selectors in self.methods_by_class_name[
+                    class_name
+                ]:
+                    report = report + self.length_prefixed_report(
+                        [class_name, is_meta, selector, sent_selectors]
+                    )
+        return StubbedResult(report)
+
+    def length_prefixed_report(self, fields):
+        return "".join(["%s:%s" % (len(field), field) for field in fields])
+
+
+class SelectorIndexFixture(Fixture):
+    def new_methods_by_class_name(self):
+        return {
+            "Order": [
+                ("false", "total", "inject:into: + "),
+                ("true", "new", "initialize "),
+            ],
+            "OrderLine": [
+                ("false", "total", "* "),
+                ("false", "printOn:", "nextPutAll: total "),
+            ],
+        }
+
+    def new_browser_session(self):
+        return SelectorIndexBrowserSession(self.methods_by_class_name)
+
+
+@with_fixtures(SelectorIndexFixture)
+def test_find_selectors_and_implementors_use_one_bulk_export(selector_index_fixture):
+    """AI: Selector and implementor searches should be answered from one bulk export of the image."""
+    browser_session = selector_index_fixture.browser_session
+
+    assert browser_session.find_selectors("TOT") == ["total"]
+    assert browser_session.find_implementors("total") == [
+        {"class_name": "Order", "show_instance_side": True},
+        {"class_name": "OrderLine", "show_instance_side": True},
+    ]
+    assert selector_index_fixture.browser_session.exported_class_names == [
+        "Order",
+        "OrderLine",
+    ]
+
+
+@with_fixtures(SelectorIndexFixture)
+def test_find_senders_reads_class_side_methods_from_the_index(selector_index_fixture):
+    """AI: Sender searches should report class-side senders with their side taken from the export."""
+    sender_search_result = selector_index_fixture.browser_session.find_senders(
+        "initialize"
+    )
+
+    assert sender_search_result["senders"] == [
+        {
+            "class_name": "Order",
+            "show_instance_side": False,
+            "method_selector": "new",
+        }
+    ]
+
+
+@with_fixtures(SelectorIndexFixture)
+def test_deleting_a_method_refreshes_only_the_changed_class(selector_index_fixture):
+    """AI: After Swordfish deletes a method, the next search should re-export only that class."""
+    browser_session = selector_index_fixture.browser_session
+    browser_session.find_senders("total")
+
+    selector_index_fixture.methods_by_class_name["OrderLine"] = [
+        ("false", "total", "* "),
+    ]
+    browser_session.delete_method("OrderLine", "printOn:", True)
+    sender_search_result = browser_session.find_senders("total")
+
+    assert sender_search_result["total_count"] == 0
+    assert browser_session.exported_class_names == ["Order", "OrderLine", "OrderLine"]
+
+
+@with_fixtures(SelectorIndexFixture)
+def test_a_flush_refreshes_only_the_classes_whose_methods_changed(
+    selector_index_fixture,
+):
+    """AI: Evaluating code flushes the metadata cache; the next search should re-export only the classes whose method fingerprints changed, instead of the whole image."""
+    browser_session = selector_index_fixture.browser_session
+    browser_session.find_senders("total")
+
+    selector_index_fixture.methods_by_class_name["Order"] = [
+        ("false", "total", "inject:into: + "),
+        ("false", "grandTotal", "total "),
+        ("true", "new", "initialize "),
+    ]
+    browser_session.flush_metadata_cache()
+    sender_search_result = browser_session.find_senders("total")
+
+    assert [
+        sender["method_selector"] for sender in sender_search_result["senders"]
+    ] == [
+        "grandTotal",
+        "printOn:",
+    ]
+    assert browser_session.exported_class_names == ["Order", "OrderLine", "Order"]
+    assert browser_session.fingerprint_report_count == 2
+    selector_index_statistics = (
+        browser_session.metadata_cache.selector_index.statistics()
+    )
+    assert selector_index_statistics["build_count"] == 1
+    assert selector_index_statistics["stale_refresh_count"] == 1
+
+
+@with_fixtures(SelectorIndexFixture)
+def test_a_stopped_find_leaves_the_selector_index_unbuilt(selector_index_fixture):
+    """AI: A find the user stops should not export further batches, and the partial index should be rebuilt by the next search."""
+    browser_session = selector_index_fixture.browser_session
+    stop_requests = []
+
+    def should_stop():
+        stop_requests.append(True)
+        return len(stop_requests) > 1
+
+    with patch.object(browser, "SELECTOR_INDEX_CHUNK_SIZE", 1):
+        assert browser_session.find_selectors("total", should_stop=should_stop) == [
+            "total"
+        ]
+        assert browser_session.exported_class_names == ["Order"]
+        assert not browser_session.metadata_cache.selector_index.is_built
+
+        assert browser_session.find_selectors("printOn") == ["printOn:"]
+        assert browser_session.exported_class_names == ["Order", "Order", "OrderLine"]
@@ -0,0 +1,78 @@
+from reahl.tofu import Fixture, with_fixtures
+
+from reahl.swordfish.gemstone.browser import GemstoneBrowserSession
+from reahl.swordfish.gemstone.source_analysis import (
+    smalltalk_tokens,
+    source_analysis_for,
+)
+
+
+class SourceAnalysisFixture(Fixture):
+    def new_browser_session(self):
+        return GemstoneBrowserSession(None)
+
+    def new_source(self):
+        return (
+            "total\n"
+            '    "sum the lines"\n'
+            "    ^lines inject: 0 into: [:sum :each | sum + each price]"
+        )
+
+
+def test_lexer_produces_one_token_per_lexeme():
+    """AI: The lexer should classify keywords, assignments, strings and comments in a single pass."""
+    tokens = smalltalk_tokens("x := 'it''s' , \"note\" y at: 1")
+
+    assert [(kind, text) for kind, _, _, text in tokens if kind != "whitespace"] == [
+        ("identifier", "x"),
+        ("assignment", ":="),
+        ("string", "'it''s'"),
+        ("binary", ","),
+        ("comment", '"note"'),
+        ("identifier", "y"),
+        ("keyword", "at:"),
+        ("number", "1"),
+    ]
+
+
+@with_fixtures(SourceAnalysisFixture)
+def test_character_literal_quote_does_not_start_a_string(source_analysis_fixture):
+    """AI: A $' character literal must not hide the rest of the method from send detection."""
+    source = "test\n    stream nextPut: $'.\n    self flush"
+    method_sends = source_analysis_fixture.browser_session.source_method_sends(source)
+
+    assert [send_entry["selector"] for send_entry in method_sends["sends"]] == [
+        "nextPut:",
+        "flush",
+    ]
+
+
+@with_fixtures(SourceAnalysisFixture)
+def test_analysis_is_memoised_per_source(source_analysis_fixture):
+    """AI: Repeated heuristics over the same source should reuse one memoised analysis."""
+    browser_session = source_analysis_fixture.browser_session
+    source = source_analysis_fixture.source
+    browser_session.source_method_control_flow_summary(source)
+
+    memoised_names = source_analysis_for(source).memoised_values.keys()
+    assert {
+        "tokens",
+        "code_character_map",
+        "method_sends",
+        "structure_summary",
+        "control_flow_summary",
+    } <= set(memoised_names)
+
+
+@with_fixtures(SourceAnalysisFixture)
+def test_memoised_results_are_returned_as_copies(source_analysis_fixture):
+    """AI: Callers that decorate an AST result must not change what later callers see."""
+    browser_session = source_analysis_fixture.browser_session
+    source = source_analysis_fixture.source
+    first_ast = browser_session.source_method_ast(source, "total")
+    first_ast["argument_names"] = ["changed"]
+    first_ast["sends"].clear()
+
+    second_ast = browser_session.source_method_ast(source, "total")
+    assert second_ast["argument_names"] == []
+    assert len(second_ast["sends"]) == first_ast["structure_summary"]["send_count"]
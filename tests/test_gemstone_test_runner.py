@@ -0,0 +1,274 @@
+import re
+import threading
+
+from reahl.tofu import Fixture, with_fixtures
+
+from reahl.swordfish.gemstone.browser import GemstoneBrowserSession
+
+
+class FakeGemstoneValue:
+    def __init__(self, value):
+        self.to_py = value
+
+
+def length_prefixed(fields):
+    return "".join("%s:%s" % (len(field), field) for field in fields)
+
+
+class FakeWorkerSession:
+    def __init__(self, failing_class_names):
+        self.failing_class_names = failing_class_names
+        self.executed_class_name_lists = []
+        self.abort_count = 0
+
+    def abort(self):
+        self.abort_count += 1
+
+    def execute(self, source):
+        class_names = re.findall(r"'([A-Za-z]+)'", source.split(" do: [ :className")[0])
+        self.executed_class_name_lists.append(class_names)
+        fields = []
+        for class_name in class_names:
+            failures = (
+                ["%s>>#testTotal" % class_name]
+                if class_name in self.failing_class_names
+                else []
+            )
+            fields.extend(
+                [class_name, "Shop-Tests", "2", "15", str(len(failures))] + failures
+            )
+            fields.extend(["0", "2", "testTotal", "passed", "10"])
+            fields.extend(["testLines", "passed", "5"])
+        return FakeGemstoneValue(length_prefixed(fields))
+
+
+class FakeWorkerSessions:
+    def __init__(self, failing_class_names):
+        self.lock = threading.Lock()
+        self.available_sessions = [
+            FakeWorkerSession(failing_class_names) for _ in range(3)
+        ]
+        self.acquired_sessions = []
+        self.released_sessions = []
+
+    def acquire(self):
+        with self.lock:
+            worker_session = self.available_sessions.pop()
+            self.acquired_sessions.append(worker_session)
+            return worker_session
+
+    def release(self, worker_session):
+        with self.lock:
+            self.released_sessions.append(worker_session)
+
+
+class PackageTestBrowserSession(GemstoneBrowserSession):
+    def __init__(self, test_case_class_names):
+        super().__init__(None)
+        self.test_case_class_names = test_case_class_names
+        self.executed_sources = []
+        self.needs_commit = False
+
+    def list_test_case_classes(self, package_name=None):
+        return list(self.test_case_class_names)
+
+    def run_code(self, source):
+        if source == "System needsCommit":
+            return FakeGemstoneValue(self.needs_commit)
+        self.executed_sources.append(source)
+        return FakeWorkerSession(["OrderTest"]).execute(source)
+
+
+class PackageTestRunFixture(Fixture):
+    def new_test_case_class_names(self):
+        return ["OrderTest", "InvoiceTest", "CustomerTest", "LineTest", "TaxTest"]
+
+    def new_browser_session(self):
+        return PackageTestBrowserSession(self.test_case_class_names)
+
+    def new_worker_sessions(self):
+        return FakeWorkerSessions(["OrderTest"])
+
+
+@with_fixtures(PackageTestRunFixture)
+def test_package_tests_run_in_one_script_with_per_class_timings(
+    package_test_run_fixture,
+):
+    """AI: Running a package's tests without workers should take one script and report timings for each test case class."""
+    browser_session = package_test_run_fixture.browser_session
+
+    test_result = browser_session.run_tests_in_package("Shop-Tests")
+
+    assert len(browser_session.executed_sources) == 1
+    assert test_result["run_count"] == 10
+    assert test_result["failure_count"] == 1
+    assert not test_result["has_passed"]
+    assert test_result["failures"] == ["OrderTest>>#testTotal"]
+    assert test_result["class_timings"][0] == {
+        "test_case_class_name": "CustomerTest",
+        "run_count": 2,
+        "elapsed_ms": 15,
+    }
+    assert len(test_result["test_timings"]) == 10
+    assert test_result["test_timings"][0] == {
+        "test_case_class_name": "CustomerTest",
+        "test_method_selector": "testTotal",
+        "package_name": "Shop-Tests",
+        "status": "passed",
+        "elapsed_ms": 10,
+    }
+
+
+@with_fixtures(PackageTestRunFixture)
+def test_sharded_package_tests_run_on_worker_sessions_and_merge(
+    package_test_run_fixture,
+):
+    """AI: With several workers, each shard should run on its own freshly aborted worker session that is released afterwards, and the merged result should match a serial run."""
+    browser_session = package_test_run_fixture.browser_session
+    worker_sessions = package_test_run_fixture.worker_sessions
+    serial_result = browser_session.run_tests_in_package("Shop-Tests")
+
+    sharded_result = browser_session.run_tests_in_package(
+        "Shop-Tests",
+        worker_count=3,
+        worker_sessions=worker_sessions,
+    )
+
+    executed_class_names = sorted(
+        class_name
+        for worker_session in worker_sessions.acquired_sessions
+        for class_name_list in worker_session.executed_class_name_lists
+        for class_name in class_name_list
+    )
+    assert executed_class_names == sorted(
+        package_test_run_fixture.test_case_class_names
+    )
+    assert len(worker_sessions.acquired_sessions) == 3
+    assert sorted(map(id, worker_sessions.released_sessions)) == sorted(
+        map(id, worker_sessions.acquired_sessions)
+    )
+    assert all(
+        worker_session.abort_count == 1
+        for worker_session in worker_sessions.acquired_sessions
+    )
+    assert len(browser_session.executed_sources) == 1
+    assert sharded_result["worker_count"] == 3
+    assert not sharded_result["ran_serially_because_of_uncommitted_changes"]
+    for result_key in ("run_count", "failures", "errors", "class_timings"):
+        assert sharded_result[result_key] == serial_result[result_key]
+
+
+@with_fixtures(PackageTestRunFixture)
+def test_package_tests_run_serially_while_the_session_has_uncommitted_changes(
+    package_test_run_fixture,
+):
+    """AI: Worker sessions cannot see uncommitted code, so a sharded run with uncommitted changes should run serially in this session and say so."""
+    browser_session = package_test_run_fixture.browser_session
+    worker_sessions = package_test_run_fixture.worker_sessions
+    browser_session.needs_commit = True
+
+    test_result = browser_session.run_tests_in_package(
+        "Shop-Tests",
+        worker_count=3,
+        worker_sessions=worker_sessions,
+    )
+
+    assert worker_sessions.acquired_sessions == []
+    assert len(browser_session.executed_sources) == 1
+    assert test_result["worker_count"] == 1
+    assert test_result["requested_worker_count"] == 3
+    assert test_result["ran_serially_because_of_uncommitted_changes"]
+    assert test_result["run_count"] == 10
+
+
+class IncrementalTestBrowserSession(GemstoneBrowserSession):
+    def __init__(self, test_method_selectors_by_class_name, failing_selectors):
+        super().__init__(None)
+        self.test_method_selectors_by_class_name = test_method_selectors_by_class_name
+        self.failing_selectors = failing_selectors
+        self.executed_sources = []
+
+    def run_code(self, source):
+        self.executed_sources.append(source)
+        if "writeTests value: testCaseClass suite" in source:
+            fields = [
+                field
+                for class_name, selectors in (
+                    self.test_method_selectors_by_class_name.items()
+                )
+                for selector in selectors
+                for field in (class_name, selector)
+            ]
+            return FakeGemstoneValue(length_prefixed(fields))
+        class_name, selector = re.findall(r"'([A-Za-z]+)' asSymbol", source)
+        status = "failure" if selector in self.failing_selectors else "passed"
+        return FakeGemstoneValue(
+            length_prefixed(
+                [status, "7", "%s>>#%s" % (class_name, selector), "Shop-Tests"]
+            )
+        )
+
+
+class IncrementalTestRunFixture(Fixture):
+    def new_browser_session(self):
+        return IncrementalTestBrowserSession(
+            {
+                "OrderTest": ["testTotal", "testLines"],
+                "InvoiceTest": ["testNumber"],
+            },
+            ["testLines"],
+        )
+
+    def new_reported_test_results(self):
+        return []
+
+
+@with_fixtures(IncrementalTestRunFixture)
+def test_incremental_test_run_reports_each_test_as_it_finishes(
+    incremental_test_run_fixture,
+):
+    """AI: The incremental runner should report every test as soon as it has run, and summarise the run at the end."""
+    browser_session = incremental_test_run_fixture.browser_session
+    reported_test_results = incremental_test_run_fixture.reported_test_results
+
+    def record_test_result(test_result):
+        reported_test_results.append(test_result)
+        assert len(browser_session.executed_sources) == len(reported_test_results) + 1
+
+    run_summary = browser_session.run_tests_incrementally(
+        ["OrderTest", "InvoiceTest"],
+        on_test_result=record_test_result,
+    )
+
+    assert [
+        (test_result["test_index"], test_result["status"])
+        for test_result in reported_test_results
+    ] == [(1, "passed"), (2, "failure"), (3, "passed")]
+    assert reported_test_results[0]["test_count"] == 3
+    assert reported_test_results[0]["elapsed_ms"] == 7
+    assert "(test isKindOf: TestSuite)" in browser_session.executed_sources[0]
+    assert run_summary["run_count"] == 3
+    assert run_summary["failures"] == ["OrderTest>>#testLines"]
+    assert not run_summary["has_passed"]
+    assert not run_summary["cancelled"]
+
+
+@with_fixtures(IncrementalTestRunFixture)
+def test_incremental_test_run_stops_between_tests_when_asked(
+    incremental_test_run_fixture,
+):
+    """AI: Asking the runner to stop should end the run before the next test, keeping the results so far and marking the run cancelled."""
+    browser_session = incremental_test_run_fixture.browser_session
+    reported_test_results = incremental_test_run_fixture.reported_test_results
+
+    run_summary = browser_session.run_tests_incrementally(
+        ["OrderTest", "InvoiceTest"],
+        should_stop=lambda: len(reported_test_results) == 1,
+        on_test_result=reported_test_results.append,
+    )
+
+    assert run_summary["cancelled"]
+    assert not run_summary["has_passed"]
+    assert run_summary["test_count"] == 3
+    assert run_summary["run_count"] == 1
+    assert len(browser_session.executed_sources) == 2
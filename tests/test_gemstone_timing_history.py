@@ -0,0 +1,116 @@
+import os
+import tempfile
+
+from reahl.tofu import Fixture, with_fixtures
+
+from reahl.swordfish.gemstone.timing_history import TimingHistory
+
+
+class TimingHistoryFixture(Fixture):
+    def new_history_directory(self):
+        return tempfile.TemporaryDirectory()
+
+    def del_history_directory(self):
+        self.history_directory.cleanup()
+
+    def new_history_file_path(self):
+        return os.path.join(self.history_directory.name, "swordfish", "timings.json")
+
+    def new_timing_history(self):
+        return TimingHistory(self.history_file_path)
+
+    def test_timing(self, class_name, selector, elapsed_ms, package_name="Shop-Tests"):
+        return {
+            "test_case_class_name": class_name,
+            "test_method_selector": selector,
+            "package_name": package_name,
+            "status": "passed",
+            "elapsed_ms": elapsed_ms,
+        }
+
+
+@with_fixtures(TimingHistoryFixture)
+def test_timing_report_lists_slowest_tests_and_package_totals(timing_history_fixture):
+    """AI: The report should rank tests by their latest time and total the latest times per package."""
+    timing_history = timing_history_fixture.timing_history
+    timing_history.record_test_timings(
+        [
+            timing_history_fixture.test_timing("OrderTest", "testTotal", 40),
+            timing_history_fixture.test_timing("OrderTest", "testLines", 900),
+            timing_history_fixture.test_timing(
+                "LedgerTest", "testPost", 300, package_name="Accounts-Tests"
+            ),
+        ]
+    )
+
+    timing_report = TimingHistory(
+        timing_history_fixture.history_file_path
+    ).timing_report(limit=2)
+
+    assert timing_report["test_count"] == 3
+    assert [
+        test_timing["test_method_selector"]
+        for test_timing in timing_report["slowest_tests"]
+    ] == ["testLines", "testPost"]
+    assert timing_report["package_totals"] == [
+        {"package_name": "Shop-Tests", "test_count": 2, "elapsed_ms": 940},
+        {"package_name": "Accounts-Tests", "test_count": 1, "elapsed_ms": 300},
+    ]
+    assert timing_report["regressions"] == []
+
+
+@with_fixtures(TimingHistoryFixture)
+def test_timing_report_flags_tests_much_slower_than_their_previous_run(
+    timing_history_fixture,
+):
+    """AI: A test should count as a regression only when it got both relatively and absolutely slower than its previous run."""
+    timing_history = timing_history_fixture.timing_history
+    test_timing = timing_history_fixture.test_timing
+    timing_history.record_test_timings(
+        [
+            test_timing("OrderTest", "testTotal", 100),
+            test_timing("OrderTest", "testLines", 10),
+            test_timing("OrderTest", "testTax", 100),
+        ]
+    )
+    timing_history.record_test_timings(
+        [
+            test_timing("OrderTest", "testTotal", 400),
+            test_timing("OrderTest", "testLines", 30),
+            test_timing("OrderTest", "testTax", 120),
+        ]
+    )
+
+    regressions = timing_history.timing_report()["regressions"]
+
+    assert [
+        (
+            regression["test_method_selector"],
+            regression["previous_elapsed_ms"],
+            regression["elapsed_ms"],
+        )
+        for regression in regressions
+    ] == [("testTotal", 100, 400)]
+
+
+@with_fixtures(TimingHistoryFixture)
+def test_timings_from_different_stones_are_kept_apart(timing_history_fixture):
+    """AI: The same test run against two stones should keep a history per stone, so a slower stone is not reported as a regression of a faster one."""
+    timing_history = timing_history_fixture.timing_history
+    test_timing = timing_history_fixture.test_timing
+    timing_history.record_test_timings(
+        [test_timing("OrderTest", "testTotal", 100)], stone_name="fastStone"
+    )
+    timing_history.record_test_timings(
+        [test_timing("OrderTest", "testTotal", 400)], stone_name="slowStone"
+    )
+
+    fast_stone_report = timing_history.timing_report(stone_name="fastStone")
+    full_report = timing_history.timing_report()
+
+    assert [
+        (test_timing["stone_name"], test_timing["elapsed_ms"])
+        for test_timing in fast_stone_report["slowest_tests"]
+    ] == [("fastStone", 100)]
+    assert full_report["test_count"] == 2
+    assert full_report["regressions"] == []
@@ -1,6 +1,7 @@
 import json
 import os
 import tempfile
+import time
 import tkinter as tk
 import types
 from tkinter import ttk
@@ -18,6 +19,7 @@ from reahl.tofu import (
 )
 
 from reahl.swordfish.gemstone.browser import GemstoneBrowserSession
+from reahl.swordfish.gemstone.debugging import GemstoneFrameVariables
 from reahl.swordfish.gemstone.session import DomainException as GemstoneDomainException
 from reahl.swordfish.main import (
     BreakpointsDialog,
@@ -181,6 +183,21 @@ class SwordfishGuiFixture(Fixture):
 
         self.mock_browser.get_class_definition.side_effect = get_class_definition
 
+        def get_class_definitions(class_names, include_ancestors=True):
+            found_definitions = {}
+            pending_class_names = list(class_names)
+            while pending_class_names:
+                class_name = pending_class_names.pop(0)
+                class_definition = class_definitions.get(class_name)
+                if class_definition is None or class_name in found_definitions:
+                    continue
+                found_definitions[class_name] = class_definition
+                if include_ancestors and class_definition["superclass_name"]:
+                    pending_class_names.append(class_definition["superclass_name"])
+            return found_definitions
+
+        self.mock_browser.get_class_definitions.side_effect = get_class_definitions
+
         # AI: get_compiled_method returns an object whose sourceString() method
         # returns an object with a .to_py attribute (the raw Smalltalk source string).
         mock_method = Mock()
@@ -1708,6 +1725,21 @@ class SwordfishAppFixture(Fixture):
 
         self.mock_browser.get_class_definition.side_effect = get_class_definition
 
+        def get_class_definitions(class_names, include_ancestors=True):
+            found_definitions = {}
+            pending_class_names = list(class_names)
+            while pending_class_names:
+                class_name = pending_class_names.pop(0)
+                class_definition = class_definitions.get(class_name)
+                if class_definition is None or class_name in found_definitions:
+                    continue
+                found_definitions[class_name] = class_definition
+                if include_ancestors and class_definition["superclass_name"]:
+                    pending_class_names.append(class_definition["superclass_name"])
+            return found_definitions
+
+        self.mock_browser.get_class_definitions.side_effect = get_class_definitions
+
         # AI: Chained mock for EditorTab.repopulate() which calls
         # get_compiled_method().sourceString().to_py
         mock_method = Mock()
@@ -2616,6 +2648,32 @@ def test_mcp_busy_state_publishes_events_for_listeners(fixture):
     assert listener.events[-1] == (False, "")
 
 
+@with_fixtures(SwordfishAppFixture)
+def test_mcp_model_refresh_requests_are_coalesced_into_one_targeted_refresh(fixture):
+    """AI: A burst of MCP refresh requests schedules one refresh on the Tk thread, which skips methods changed in classes that are not selected and lets a transaction refresh subsume the rest."""
+    fixture.simulate_login()
+    fixture.session_record.select_class("Order")
+    integrated_session_state = fixture.app.integrated_session_state
+
+    with patch.object(fixture.app, "publish_model_change_events") as publish_events:
+        with patch.object(fixture.app, "after") as schedule_after:
+            integrated_session_state.request_model_refresh("methods", "Order")
+            integrated_session_state.request_model_refresh("methods", "Order")
+            integrated_session_state.request_model_refresh("methods", "OrderLine")
+            fixture.app.update()
+        fixture.app.apply_coalesced_model_refresh()
+
+        assert schedule_after.call_count == 1
+        assert publish_events.call_args_list == [call("methods")]
+
+        publish_events.reset_mock()
+        integrated_session_state.request_model_refresh("methods", "Order")
+        integrated_session_state.request_model_refresh("transaction")
+        fixture.app.apply_coalesced_model_refresh()
+
+        assert publish_events.call_args_list == [call("transaction")]
+
+
 @with_fixtures(SwordfishAppFixture)
 def test_mcp_busy_state_disables_run_and_session_controls(fixture):
     """AI: When MCP is busy, Run and Session controls are visually disabled and re-enabled when idle."""
@@ -7070,6 +7128,32 @@ def test_array_inspector_shows_size_and_pages_through_values(fixture):
     assert array_inspector.treeview.item(next_rows[0], "values")[0] == "[101]"
 
 
+@with_fixtures(ObjectInspectorFixture)
+def test_frame_variable_inspector_renders_batched_rows_and_fetches_values_on_use(
+    fixture,
+):
+    """AI: Debugger frame variables are listed from one batched row fetch; a variable's value is only fetched when its row is used."""
+    frame_value = make_mock_gemstone_object("OrderLine", "anOrderLine", oop=3002)
+    frame = Mock()
+    frame.frame_data.at.return_value = frame_value
+    frame_variables = GemstoneFrameVariables(frame, [("line", 11, 3002)])
+    frame_variables.display_rows = Mock(
+        return_value=[("line", "OrderLine", "anOrderLine")]
+    )
+    inspector = ObjectInspector(fixture.root, values=frame_variables)
+    inspector.pack()
+    fixture.root.update()
+
+    row = inspector.treeview.get_children()[0]
+    assert inspector.treeview.item(row, "values")[1:] == ("OrderLine", "anOrderLine")
+    frame_variables.display_rows.assert_called_once_with(["line"])
+    frame.frame_data.at.assert_not_called()
+
+    inspector.treeview.focus(row)
+    assert inspector.selected_row_value() is frame_value
+    frame.frame_data.at.assert_called_once_with(11)
+
+
 @with_fixtures(SwordfishGuiFixture)
 def test_right_click_on_method_runs_test_and_shows_pass_result(fixture):
     """Right-clicking a method and choosing Run Test calls run_test_method on
@@ -7421,10 +7505,19 @@ def test_right_click_on_method_shows_error_dialog_when_test_fails(fixture):
     mock_msgbox.showerror.assert_called_once()
 
 
+def wait_for_test_run(root, test_run_dialog):
+    """AI: Pump Tk until the background test run has published its finish event."""
+    deadline = time.monotonic() + 5
+    while test_run_dialog.is_running and time.monotonic() < deadline:
+        root.update()
+        time.sleep(0.01)
+    root.update()
+
+
 @with_fixtures(SwordfishGuiFixture)
 def test_right_click_on_class_runs_all_tests_and_shows_result(fixture):
-    """Right-clicking a class and choosing Run All Tests calls run_gemstone_tests
-    for that class and shows the result summary in a dialog."""
+    """AI: Right-clicking a class and choosing Run All Tests runs that class's tests
+    incrementally and lists each test result in a progress dialog as it arrives."""
     fixture.select_in_listbox(
         fixture.browser_window.packages_widget.selection_list.selection_listbox,
         "Kernel",
@@ -7436,21 +7529,74 @@ def test_right_click_on_class_runs_all_tests_and_shows_result(fixture):
         "OrderLine",
     )
 
-    passing_result = {
-        "run_count": 3,
-        "failure_count": 0,
-        "error_count": 0,
-        "has_passed": True,
-        "failures": [],
-        "errors": [],
-    }
-    fixture.mock_browser.run_gemstone_tests = Mock(return_value=passing_result)
+    def run_tests_incrementally(class_names, should_stop=None, on_test_result=None):
+        for test_index, selector in enumerate(["testTotal", "testLines", "testTax"]):
+            on_test_result(
+                {
+                    "test_case_class_name": "OrderLine",
+                    "test_method_selector": selector,
+                    "status": "passed",
+                    "elapsed_ms": 4,
+                    "description": "OrderLine>>#%s" % selector,
+                    "test_index": test_index + 1,
+                    "test_count": 3,
+                }
+            )
+        return {"run_count": 3, "has_passed": True, "cancelled": False}
 
-    with patch("reahl.swordfish.browser.messagebox") as mock_msgbox:
-        fixture.browser_window.classes_widget.run_all_tests()
+    fixture.mock_browser.run_tests_incrementally = Mock(
+        side_effect=run_tests_incrementally
+    )
 
-    fixture.mock_browser.run_gemstone_tests.assert_called_once_with("OrderLine")
-    mock_msgbox.showinfo.assert_called_once()
+    fixture.browser_window.classes_widget.run_all_tests()
+    test_run_dialog = fixture.browser_window.classes_widget.test_run_dialog
+    wait_for_test_run(fixture.root, test_run_dialog)
+
+    assert fixture.mock_browser.run_tests_incrementally.call_args[0][0] == [
+        "OrderLine"
+    ]
+    assert test_run_dialog.results_listbox.size() == 3
+    assert test_run_dialog.summary_label.cget("text").startswith("Passed.")
+
+
+@with_fixtures(SwordfishGuiFixture)
+def test_test_run_reserves_the_ide_session_and_closing_waits_for_the_run(fixture):
+    """AI: While Run All Tests uses the shared IDE session, MCP clients should be kept off it, and closing the dialog should stop the run before the dialog goes away."""
+    fixture.select_in_listbox(
+        fixture.browser_window.packages_widget.selection_list.selection_listbox,
+        "Kernel",
+    )
+    fixture.select_in_listbox(
+        fixture.browser_window.classes_widget.selection_list.selection_listbox,
+        "OrderLine",
+    )
+
+    def run_tests_incrementally(class_names, should_stop=None, on_test_result=None):
+        deadline = time.monotonic() + 5
+        while not should_stop() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return {"run_count": 0, "has_passed": False, "cancelled": True}
+
+    fixture.mock_browser.run_tests_incrementally = Mock(
+        side_effect=run_tests_incrementally
+    )
+    integrated_session_state = (
+        fixture.browser_window.application.integrated_session_state
+    )
+
+    fixture.browser_window.classes_widget.run_all_tests()
+    test_run_dialog = fixture.browser_window.classes_widget.test_run_dialog
+
+    assert integrated_session_state.current_ide_operation_name() == (
+        "Running tests in OrderLine..."
+    )
+    test_run_dialog.close_dialog()
+    assert test_run_dialog.winfo_exists()
+
+    wait_for_test_run(fixture.root, test_run_dialog)
+
+    assert integrated_session_state.current_ide_operation_name() == ""
+    assert not test_run_dialog.winfo_exists()
 
 
 @with_fixtures(SwordfishGuiFixture)
@@ -7674,10 +7820,15 @@ def test_run_all_tests_opens_debugger_on_gemstone_error(fixture):
     classes_listbox.insert(tk.END, "SwordfishDebuggerDemoTest")
     classes_listbox.selection_set(0)
 
-    fixture.mock_browser.run_gemstone_tests = Mock(side_effect=FakeGemstoneError())
+    fixture.mock_browser.run_tests_incrementally = Mock(
+        side_effect=FakeGemstoneError()
+    )
 
     fixture.app.browser_tab.classes_widget.run_all_tests()
-    fixture.app.update()
+    wait_for_test_run(
+        fixture.app,
+        fixture.app.browser_tab.classes_widget.test_run_dialog,
+    )
 
     tab_labels = [
         fixture.app.notebook.tab(t, "text") for t in fixture.app.notebook.tabs()
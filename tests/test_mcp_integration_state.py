@@ -0,0 +1,49 @@
+from reahl.tofu import Fixture, with_fixtures
+
+from reahl.swordfish.mcp.integration_state import IntegratedSessionState
+
+
+class ModelRefreshListener:
+    def __init__(self):
+        self.notified_change_kinds = []
+
+    def model_refresh_requested(self, change_kind=""):
+        self.notified_change_kinds.append(change_kind)
+
+
+class IntegratedSessionStateFixture(Fixture):
+    def new_integrated_session_state(self):
+        return IntegratedSessionState()
+
+    def new_listener(self):
+        listener = ModelRefreshListener()
+        self.integrated_session_state.subscribe_model_refresh_requests(
+            listener.model_refresh_requested
+        )
+        return listener
+
+
+@with_fixtures(IntegratedSessionStateFixture)
+def test_model_refresh_requests_notify_once_per_batch_and_are_deduplicated(
+    integrated_session_state_fixture,
+):
+    """AI: Subscribers hear about the first request of a batch only, and the batch holds each kind and class once until it is consumed."""
+    integrated_session_state = integrated_session_state_fixture.integrated_session_state
+    listener = integrated_session_state_fixture.listener
+
+    integrated_session_state.request_model_refresh("methods", "Order")
+    integrated_session_state.request_model_refresh("transaction")
+    integrated_session_state.request_model_refresh("methods", "Order")
+    integrated_session_state.request_model_refresh("methods", "OrderLine")
+
+    assert listener.notified_change_kinds == ["methods"]
+    assert integrated_session_state.consume_model_refresh_requests() == [
+        ("methods", "Order"),
+        ("transaction", None),
+        ("methods", "OrderLine"),
+    ]
+    assert integrated_session_state.consume_model_refresh_requests() == []
+
+    integrated_session_state.request_model_refresh("transaction")
+
+    assert listener.notified_change_kinds == ["methods", "transaction"]
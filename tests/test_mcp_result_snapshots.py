@@ -0,0 +1,131 @@
+from unittest.mock import patch
+
+from reahl.tofu import Fixture, set_up, tear_down, with_fixtures
+
+from reahl.swordfish.mcp.result_snapshots import (
+    clear_result_snapshots,
+    result_snapshots_by_id,
+)
+from reahl.swordfish.mcp.session_registry import add_connection, clear_connections
+from reahl.swordfish.mcp.tools import register_tools
+
+
+class FakeGemstoneSession:
+    def execute(self, source):
+        return None
+
+    def log_out(self):
+        pass
+
+
+class McpToolRegistrar:
+    def __init__(self):
+        self.registered_tools_by_name = {}
+
+    def tool(self):
+        def register(function):
+            self.registered_tools_by_name[function.__name__] = function
+            return function
+
+        return register
+
+
+class PagedSearchFixture(Fixture):
+    @set_up
+    def register_connections(self):
+        clear_connections()
+        clear_result_snapshots()
+        self.connection_id = add_connection(FakeGemstoneSession(), {})
+        self.other_connection_id = add_connection(FakeGemstoneSession(), {})
+
+    @tear_down
+    def clear_registries(self):
+        clear_connections()
+        clear_result_snapshots()
+
+    def new_registered_mcp_tools(self):
+        registrar = McpToolRegistrar()
+        register_tools(registrar, allow_source_read=True)
+        return registrar.registered_tools_by_name
+
+    def new_class_names(self):
+        return ["Order%02d" % class_number for class_number in range(7)]
+
+    def new_find_class_calls(self):
+        return []
+
+    def find_classes(self, search_input):
+        self.find_class_calls.append(search_input)
+        return list(self.class_names)
+
+
+@with_fixtures(PagedSearchFixture)
+def test_class_search_pages_through_one_server_side_snapshot(paged_search_fixture):
+    """AI: Continuation tokens should walk one snapshot of the results, so the search itself runs once however many pages are read."""
+    gs_find_classes = paged_search_fixture.registered_mcp_tools["gs_find_classes"]
+    with patch(
+        "reahl.swordfish.mcp.tools.GemstoneBrowserSession.find_classes",
+        side_effect=paged_search_fixture.find_classes,
+    ):
+        pages = [
+            gs_find_classes(
+                paged_search_fixture.connection_id,
+                "Order",
+                page_size=3,
+            )
+        ]
+        while pages[-1]["continuation_token"] is not None:
+            pages.append(
+                gs_find_classes(
+                    paged_search_fixture.connection_id,
+                    "Order",
+                    continuation_token=pages[-1]["continuation_token"],
+                )
+            )
+
+    assert [page["offset"] for page in pages] == [0, 3, 6]
+    assert [page["total_count"] for page in pages] == [7, 7, 7]
+    assert sum([page["class_names"] for page in pages], []) == (
+        paged_search_fixture.class_names
+    )
+    assert paged_search_fixture.find_class_calls == ["Order"]
+    assert result_snapshots_by_id == {}
+
+
+@with_fixtures(PagedSearchFixture)
+def test_continuation_token_is_rejected_for_another_query_or_connection(
+    paged_search_fixture,
+):
+    """AI: A continuation token only continues the query and connection that produced it."""
+    gs_find_classes = paged_search_fixture.registered_mcp_tools["gs_find_classes"]
+    with patch(
+        "reahl.swordfish.mcp.tools.GemstoneBrowserSession.find_classes",
+        side_effect=paged_search_fixture.find_classes,
+    ):
+        first_page = gs_find_classes(
+            paged_search_fixture.connection_id,
+            "Order",
+            page_size=2,
+        )
+        continuation_token = first_page["continuation_token"]
+        other_query_page = gs_find_classes(
+            paged_search_fixture.connection_id,
+            "Invoice",
+            continuation_token=continuation_token,
+        )
+        other_connection_page = gs_find_classes(
+            paged_search_fixture.other_connection_id,
+            "Order",
+            continuation_token=continuation_token,
+        )
+        paged_search_fixture.registered_mcp_tools["gs_disconnect"](
+            paged_search_fixture.connection_id
+        )
+        disconnected_snapshot_count = len(result_snapshots_by_id)
+
+    assert not other_query_page["ok"]
+    assert not other_connection_page["ok"]
+    assert other_query_page["error"]["message"] == (
+        "continuation_token does not belong to this query."
+    )
+    assert disconnected_snapshot_count == 0
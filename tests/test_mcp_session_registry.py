@@ -1,13 +1,27 @@
-from reahl.tofu import NoException, expected
+from unittest.mock import patch
 
+from reahl.tofu import Fixture, NoException, expected, with_fixtures
+
+from reahl.swordfish.gemstone.breakpoint_registry import (
+    list_breakpoints_for_session,
+    record_breakpoint_for_session,
+)
+from reahl.swordfish.gemstone.metadata_cache import metadata_cache_for_session
+from reahl.swordfish.gemstone.refactoring_plans import RefactoringPlan
 from reahl.swordfish.mcp.session_registry import (
+    SessionPool,
     add_connection,
     clear_connections,
+    configure_session_pool,
     get_metadata,
     get_session,
     has_connection,
     remove_connection,
+    reset_pooled_session,
+    current_session_pool,
+    session_pool_key,
 )
+from reahl.swordfish.mcp.tools import register_tools
 
 
 def test_add_and_remove_connection():
@@ -30,3 +44,255 @@ def test_add_and_remove_connection():
     assert not has_connection(connection_id)
     with expected(NoException):
         clear_connections()
+
+
+class PooledSession:
+    def __init__(self, session_number):
+        self.session_number = session_number
+        self.abort_count = 0
+        self.is_logged_out = False
+
+
+class ReportedValue:
+    def __init__(self, to_py):
+        self.to_py = to_py
+
+
+class ResettableSession:
+    def __init__(self):
+        self.abort_count = 0
+        self.executed_sources = []
+        self.is_logged_out = False
+
+    def abort(self):
+        self.abort_count = self.abort_count + 1
+
+    def execute(self, source):
+        self.executed_sources.append(source)
+        return ReportedValue("12 1")
+
+    def log_out(self):
+        self.is_logged_out = True
+
+    def from_py(self, value):
+        return value
+
+
+class DisabledBreakpoints:
+    def __init__(self):
+        self.disabled_step_points = []
+
+    def perform(self, selector, step_point):
+        self.disabled_step_points.append((selector, step_point))
+
+
+class McpToolRegistrar:
+    def __init__(self):
+        self.registered_tools_by_name = {}
+
+    def tool(self):
+        def register(function):
+            self.registered_tools_by_name[function.__name__] = function
+            return function
+
+        return register
+
+
+class SessionPoolFixture(Fixture):
+    def new_now(self):
+        return [0]
+
+    def new_created_sessions(self):
+        return []
+
+    def new_session_pool(self):
+        return SessionPool(
+            minimum_idle_sessions=0,
+            maximum_idle_sessions=1,
+            idle_timeout_seconds=60,
+            reset_session=self.reset_session,
+            close_session=self.close_session,
+            clock=lambda: self.now[0],
+        )
+
+    def new_pool_key(self):
+        return session_pool_key(
+            "rpc", "DataCurator", "swordfish", "gs64stone", "localhost", "netldi"
+        )
+
+    def create_session(self):
+        gemstone_session = PooledSession(len(self.created_sessions) + 1)
+        self.created_sessions.append(gemstone_session)
+        return gemstone_session
+
+    def reset_session(self, gemstone_session):
+        gemstone_session.abort_count = gemstone_session.abort_count + 1
+
+    def close_session(self, gemstone_session):
+        gemstone_session.is_logged_out = True
+
+
+@with_fixtures(SessionPoolFixture)
+def test_released_session_is_aborted_and_reused_without_login(session_pool_fixture):
+    """AI: A session returned to the pool should be aborted and handed to the next matching connect instead of logging in again."""
+    session_pool = session_pool_fixture.session_pool
+    pool_key = session_pool_fixture.pool_key
+    first_session, first_reused = session_pool.acquire(
+        pool_key, session_pool_fixture.create_session
+    )
+    session_pool.release(first_session)
+    second_session, second_reused = session_pool.acquire(
+        pool_key, session_pool_fixture.create_session
+    )
+
+    assert not first_reused
+    assert second_reused
+    assert second_session is first_session
+    assert not first_session.is_logged_out
+    assert first_session.abort_count == 2
+    pool_statistics = session_pool.statistics()["pools"][
+        "rpc:DataCurator@gs64stone/localhost#netldi"
+    ]
+    assert pool_statistics["login_count"] == 1
+    assert pool_statistics["reuse_count"] == 1
+    assert pool_statistics["checked_out_count"] == 1
+
+
+@with_fixtures(SessionPoolFixture)
+def test_pool_keys_separate_credentials_and_expire_idle_sessions(
+    session_pool_fixture,
+):
+    """AI: Sessions should only be reused for identical credentials and should be logged out once idle past the timeout."""
+    session_pool = session_pool_fixture.session_pool
+    pool_key = session_pool_fixture.pool_key
+    other_password_key = session_pool_key(
+        "linked", "DataCurator", "other", "gs64stone", "localhost", "netldi"
+    )
+    first_session, _ = session_pool.acquire(
+        pool_key, session_pool_fixture.create_session
+    )
+    session_pool.release(first_session)
+
+    other_session, reused = session_pool.acquire(
+        other_password_key, session_pool_fixture.create_session
+    )
+    assert not reused
+    assert other_session is not first_session
+
+    session_pool_fixture.now[0] = 61
+    session_pool.acquire(pool_key, session_pool_fixture.create_session)
+    assert first_session.is_logged_out
+    assert len(session_pool_fixture.created_sessions) == 3
+
+
+def test_disabled_pool_logs_out_released_sessions():
+    """AI: Without pooling configured, disconnecting should log the session out as before."""
+    logged_out_sessions = []
+    session_pool = SessionPool(close_session=logged_out_sessions.append)
+    gemstone_session, _ = session_pool.acquire(("linked",) * 6, object)
+    session_pool.release(gemstone_session)
+
+    assert logged_out_sessions == [gemstone_session]
+
+
+@with_fixtures(SessionPoolFixture)
+def test_linked_sessions_are_not_pooled(session_pool_fixture):
+    """AI: A linked session lives in this process, so it should be logged out on release rather than kept for reuse."""
+    session_pool = session_pool_fixture.session_pool
+    linked_pool_key = session_pool_key(
+        "linked", "DataCurator", "swordfish", "gs64stone", "localhost", "netldi"
+    )
+    first_session, _ = session_pool.acquire(
+        linked_pool_key, session_pool_fixture.create_session
+    )
+    session_pool.release(first_session)
+    second_session, reused = session_pool.acquire(
+        linked_pool_key, session_pool_fixture.create_session
+    )
+
+    assert first_session.is_logged_out
+    assert not reused
+    assert second_session is not first_session
+
+
+@with_fixtures(SessionPoolFixture)
+def test_releasing_a_session_logs_out_expired_idle_sessions(session_pool_fixture):
+    """AI: Idle sessions past the timeout should be logged out when another session is released, not only on the next connect."""
+    session_pool = session_pool_fixture.session_pool
+    pool_key = session_pool_fixture.pool_key
+    other_pool_key = session_pool_key(
+        "rpc", "SystemUser", "swordfish", "gs64stone", "localhost", "netldi"
+    )
+    idle_session, _ = session_pool.acquire(
+        pool_key, session_pool_fixture.create_session
+    )
+    other_session, _ = session_pool.acquire(
+        other_pool_key, session_pool_fixture.create_session
+    )
+    session_pool.release(idle_session)
+
+    session_pool_fixture.now[0] = 61
+    session_pool.release(other_session)
+
+    assert idle_session.is_logged_out
+    assert not other_session.is_logged_out
+
+
+def test_resetting_a_pooled_session_drops_swordfish_session_temps():
+    """AI: A session handed to another connection should not carry over this connection's transaction or tracer counters kept in SessionTemps."""
+    gemstone_session = ResettableSession()
+
+    reset_pooled_session(gemstone_session)
+
+    assert gemstone_session.abort_count == 1
+    [reset_source] = gemstone_session.executed_sources
+    assert "SessionTemps current removeKey: name" in reset_source
+    assert "#SwordfishMcpTracerEdgeCounters" in reset_source
+
+
+def test_a_disconnected_session_is_reused_without_the_previous_connections_state():
+    """AI: A pooled session handed to the next connection should have its gem breakpoints disabled and its metadata cache, with any refactoring plans, discarded."""
+    clear_connections()
+    configure_session_pool(maximum_idle_sessions=1)
+    pool_key = session_pool_key(
+        "rpc", "DataCurator", "swordfish", "gs64stone", "localhost", "netldi"
+    )
+    registrar = McpToolRegistrar()
+    register_tools(registrar, allow_source_read=True)
+    compiled_method = DisabledBreakpoints()
+    try:
+        gemstone_session, _ = current_session_pool().acquire(
+            pool_key, ResettableSession
+        )
+        connection_id = add_connection(gemstone_session, {})
+        record_breakpoint_for_session(gemstone_session, "Order", True, "total", 5, 2)
+        metadata_cache = metadata_cache_for_session(gemstone_session)
+        metadata_cache.follow_change_journal(12)
+        plan_id = metadata_cache.refactoring_plans.add(
+            RefactoringPlan("rename_method", {}, {}, {})
+        )
+
+        with patch(
+            "reahl.swordfish.mcp.tools.GemstoneBrowserSession.get_compiled_method",
+            return_value=compiled_method,
+        ):
+            disconnect_result = registrar.registered_tools_by_name["gs_disconnect"](
+                connection_id
+            )
+        reused_session, reused = current_session_pool().acquire(
+            pool_key, ResettableSession
+        )
+
+        assert disconnect_result["ok"]
+        assert reused
+        assert reused_session is gemstone_session
+        assert compiled_method.disabled_step_points == [("disableBreakAtStepPoint:", 2)]
+        assert list_breakpoints_for_session(reused_session) == []
+        assert metadata_cache_for_session(reused_session) is not metadata_cache
+        assert (
+            metadata_cache_for_session(reused_session).refactoring_plans.get(plan_id)
+            is None
+        )
+    finally:
+        clear_connections()
+        configure_session_pool()
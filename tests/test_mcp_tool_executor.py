@@ -0,0 +1,200 @@
+import asyncio
+import inspect
+import re
+import threading
+from unittest.mock import patch
+
+from reahl.tofu import Fixture, with_fixtures
+
+from reahl.swordfish.mcp.session_registry import add_connection, clear_connections
+from reahl.swordfish.mcp.tool_executor import ConnectionToolExecutor
+from reahl.swordfish.mcp.tools import register_tools
+
+
+class ExecutedValue:
+    def __init__(self, to_py):
+        self.to_py = to_py
+
+
+class FakeGemstoneSession:
+    def execute(self, source):
+        return ExecutedValue("gs64stone")
+
+
+class FakeMcpContext:
+    def __init__(self):
+        self.progress_reports = []
+
+    async def report_progress(self, progress, total=None, message=None):
+        self.progress_reports.append((progress, total, message))
+
+
+class McpToolRegistrar:
+    def __init__(self):
+        self.registered_tools_by_name = {}
+
+    def tool(self):
+        def register(function):
+            self.registered_tools_by_name[function.__name__] = function
+            return function
+
+        return register
+
+
+class ToolExecutorFixture(Fixture):
+    def new_tool_executor(self):
+        return ConnectionToolExecutor()
+
+    def del_tool_executor(self):
+        self.tool_executor.shutdown(wait=True)
+
+    def new_registered_mcp_tools(self):
+        registrar = McpToolRegistrar()
+        register_tools(
+            registrar,
+            allow_test_execution=True,
+            tool_executor=self.tool_executor,
+        )
+        return registrar.registered_tools_by_name
+
+    def new_connection_id(self):
+        clear_connections()
+        return add_connection(FakeGemstoneSession(), {})
+
+    def del_connection_id(self):
+        clear_connections()
+
+    def run_tests_until_stopped(
+        self,
+        test_case_class_names,
+        should_stop=None,
+        on_test_result=None,
+    ):
+        on_test_result(
+            {
+                "test_index": 1,
+                "test_count": 2,
+                "status": "passed",
+                "elapsed_ms": 3,
+                "description": "OrderTest>>#testTotal",
+            }
+        )
+        stopped = threading.Event()
+        while not should_stop():
+            stopped.wait(timeout=0.01)
+        return {"run_count": 1, "cancelled": True, "has_passed": False}
+
+
+@with_fixtures(ToolExecutorFixture)
+def test_calls_on_one_connection_run_serially_while_connections_run_concurrently(
+    tool_executor_fixture,
+):
+    """AI: A slow call on one connection must delay later calls on that connection but not calls on another connection."""
+    tool_executor = tool_executor_fixture.tool_executor
+    slow_call_started = threading.Event()
+    slow_call_may_finish = threading.Event()
+    finished_call_names = []
+
+    def slow_call():
+        slow_call_started.set()
+        slow_call_may_finish.wait(timeout=5)
+        finished_call_names.append("slow")
+
+    def quick_call(call_name):
+        finished_call_names.append(call_name)
+
+    slow_future = tool_executor.submit("first", slow_call)
+    queued_future = tool_executor.submit("first", quick_call, "queued")
+    other_connection_future = tool_executor.submit("second", quick_call, "other")
+    other_connection_future.result(timeout=5)
+    slow_call_started.wait(timeout=5)
+
+    statistics = tool_executor.statistics()
+    assert statistics["connections"]["first"]["in_flight"] == 1
+    assert statistics["connections"]["first"]["queue_depth"] == 1
+    assert finished_call_names == ["other"]
+
+    slow_call_may_finish.set()
+    slow_future.result(timeout=5)
+    queued_future.result(timeout=5)
+    assert finished_call_names == ["other", "slow", "queued"]
+    assert tool_executor.statistics()["connections"]["first"]["completed_count"] == 2
+
+
+@with_fixtures(ToolExecutorFixture)
+def test_registered_tools_are_dispatched_through_the_executor(tool_executor_fixture):
+    """AI: With an executor, registered tools become coroutines whose work runs on the executor and whose metrics show in gs_capabilities."""
+    gs_capabilities = tool_executor_fixture.registered_mcp_tools["gs_capabilities"]
+
+    assert inspect.iscoroutinefunction(gs_capabilities)
+    capabilities_result = asyncio.run(gs_capabilities())
+    assert capabilities_result["ok"], capabilities_result
+    assert capabilities_result["tool_execution"]["mode"] == "per_connection_serial"
+    assert (
+        tool_executor_fixture.tool_executor.statistics()["unbound"]["completed_count"]
+        == 1
+    )
+
+
+@with_fixtures(ToolExecutorFixture)
+def test_calls_with_unknown_connection_ids_do_not_leave_lanes_behind(
+    tool_executor_fixture,
+):
+    """AI: A mistyped or stale connection_id should be answered on the shared lane, so it does not leave a lane thread behind for the life of the server."""
+    gs_abort = tool_executor_fixture.registered_mcp_tools["gs_abort"]
+
+    abort_result = asyncio.run(gs_abort(connection_id="no-such-connection"))
+
+    assert not abort_result["ok"]
+    statistics = tool_executor_fixture.tool_executor.statistics()
+    assert statistics["connections"] == {}
+    assert statistics["unbound"]["completed_count"] == 1
+
+
+@with_fixtures(ToolExecutorFixture)
+def test_test_run_sends_progress_per_test_and_can_be_cancelled(
+    tool_executor_fixture,
+):
+    """AI: A test run should send a progress notification for each test, and gs_cancel_test_run should stop it part-way."""
+    registered_mcp_tools = tool_executor_fixture.registered_mcp_tools
+    mcp_context = FakeMcpContext()
+
+    async def run_tests_and_cancel():
+        test_run = asyncio.ensure_future(
+            registered_mcp_tools["gs_run_tests_with_progress"](
+                connection_id=tool_executor_fixture.connection_id,
+                test_case_class_name="OrderTest",
+                tool_progress=mcp_context,
+            )
+        )
+        while len(mcp_context.progress_reports) < 2:
+            await asyncio.sleep(0.01)
+        test_run_id = re.search(
+            r"test_run_id=([^\]]+)", mcp_context.progress_reports[0][2]
+        ).group(1)
+        other_connection_cancel_result = await registered_mcp_tools[
+            "gs_cancel_test_run"
+        ](connection_id="other-connection", test_run_id=test_run_id)
+        assert not other_connection_cancel_result["ok"]
+        cancel_result = await registered_mcp_tools["gs_cancel_test_run"](
+            connection_id=tool_executor_fixture.connection_id,
+            test_run_id=test_run_id,
+        )
+        return await test_run, cancel_result
+
+    with patch(
+        "reahl.swordfish.mcp.tools.GemstoneBrowserSession.run_tests_incrementally",
+        autospec=True,
+        side_effect=lambda browser_session, *arguments, **keywords: (
+            tool_executor_fixture.run_tests_until_stopped(*arguments, **keywords)
+        ),
+    ):
+        run_result, cancel_result = asyncio.run(
+            asyncio.wait_for(run_tests_and_cancel(), timeout=5)
+        )
+
+    assert cancel_result["ok"], cancel_result
+    assert run_result["ok"], run_result
+    assert run_result["result"]["cancelled"]
+    assert mcp_context.progress_reports[1][:2] == (1, 2)
+    assert "OrderTest>>#testTotal passed" in mcp_context.progress_reports[1][2]
@@ -3295,6 +3295,42 @@ def test_gs_commit_is_enabled_when_ide_owns_session():
     assert fake_session.commit_count == 1
 
 
+def test_ide_session_tools_are_refused_while_the_ide_runs_an_operation():
+    registrar = McpToolRegistrar()
+    shared_state = IntegratedSessionState()
+    fake_session = FakeGemstoneSession()
+    shared_state.attach_ide_session(fake_session)
+    register_tools(
+        registrar,
+        allow_source_read=True,
+        allow_eval_arbitrary=True,
+        allow_source_write=True,
+        allow_ide_read=True,
+        allow_ide_write=True,
+        allow_commit=True,
+        allow_tracing=True,
+        integrated_session_state=shared_state,
+    )
+    shared_state.begin_ide_operation("Running tests in OrderTest...")
+    commit_result = registrar.registered_tools_by_name["gs_commit"](
+        shared_state.ide_connection_id(),
+        approved_by_user=True,
+        approval_note="User explicitly approved this commit.",
+    )
+    assert not commit_result["ok"]
+    assert "Running tests in OrderTest..." in commit_result["error"]["message"]
+    assert fake_session.commit_count == 0
+
+    shared_state.end_ide_operation()
+    commit_result = registrar.registered_tools_by_name["gs_commit"](
+        shared_state.ide_connection_id(),
+        approved_by_user=True,
+        approval_note="User explicitly approved this commit.",
+    )
+    assert commit_result["ok"], commit_result
+    assert fake_session.commit_count == 1
+
+
 def test_gs_commit_can_be_enabled_when_ide_owns_session():
     registrar = McpToolRegistrar()
     shared_state = IntegratedSessionState()